@@ -0,0 +1,114 @@
+# pylint: disable=protected-access
+""" Benchmark checking the backend kwargs of liquid handling operations.
+
+Compares `LiquidHandler._check_args` with the signature of every backend method computed once and
+cached (`get_backend_method_signature`) against the original implementation, which called
+`inspect.signature` and rebuilt the sets of arguments on every operation. Reports the time per
+check for the 40 parameter `STAR.aspirate` without and with backend kwargs, and the time per
+`aspirate` and `dispense` of one channel on a liquid handler with a `SaverBackend`.
+
+Usage: `python -m benchmarks.check_args`
+"""
+
+import asyncio
+import contextlib
+import inspect
+import time
+import timeit
+import warnings
+
+from pylabrobot.liquid_handling import LiquidHandler
+from pylabrobot.liquid_handling.backends import STAR, SaverBackend
+from pylabrobot.liquid_handling.liquid_handler import logger
+from pylabrobot.liquid_handling.strictness import Strictness, get_strictness
+from pylabrobot.resources import Coordinate, Cor_96_wellplate_360ul_Fb, STARLetDeck
+from pylabrobot.resources.ml_star import STF_L
+
+
+def legacy_check_args(self, method, backend_kwargs, default):
+  # pylint: disable=unused-argument
+  default_args = default.union({"self"})
+
+  sig = inspect.signature(method)
+  args = {arg: param for arg, param in sig.parameters.items() if arg not in default_args}
+  vars_keyword = {arg for arg, param in sig.parameters.items() # **kwargs
+                  if param.kind == inspect.Parameter.VAR_KEYWORD}
+  args = {arg: param for arg, param in args.items() # keep only *args and **kwargs
+          if param.kind not in {inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD}}
+  non_default = {arg for arg, param in args.items() if param.default == inspect.Parameter.empty}
+
+  strictness = get_strictness()
+
+  backend_kws = set(backend_kwargs.keys())
+
+  missing = non_default - backend_kws
+  if len(missing) > 0:
+    raise TypeError(f"Missing arguments to backend.{method.__name__}: {missing}")
+
+  if len(vars_keyword) > 0:
+    return set() # no extra arguments if the method accepts **kwargs
+
+  extra = backend_kws - set(args.keys())
+  if len(extra) > 0 and len(vars_keyword) == 0:
+    if strictness == Strictness.STRICT:
+      raise TypeError(f"Extra arguments to backend.{method.__name__}: {extra}")
+    elif strictness == Strictness.WARN:
+      warnings.warn(f"Extra arguments to backend.{method.__name__}: {extra}")
+    else:
+      logger.debug("Extra arguments to backend.%s: %s", method.__name__, extra)
+
+  return extra
+
+
+@contextlib.contextmanager
+def legacy_checks():
+  check_args = LiquidHandler._check_args
+  LiquidHandler._check_args = legacy_check_args # type: ignore
+  try:
+    yield
+  finally:
+    LiquidHandler._check_args = check_args # type: ignore
+
+
+def check_time(number: int):
+  lh = LiquidHandler(backend=STAR(), deck=STARLetDeck())
+  default = {"ops", "use_channels"}
+  kwargs = {"jet": [False], "blow_out": [False], "immersion_depth": [0]}
+  def check():
+    return lh._check_args(lh.backend.aspirate, {}, default=default)
+  def check_kwargs():
+    return lh._check_args(lh.backend.aspirate, kwargs, default=default)
+  return [timeit.timeit(f, number=number) / number * 1e6 for f in [check, check_kwargs]]
+
+
+async def operation_time(number: int) -> float:
+  deck = STARLetDeck()
+  lh = LiquidHandler(backend=SaverBackend(num_channels=8), deck=deck)
+  tip_rack = STF_L(name="tip_rack")
+  plate = Cor_96_wellplate_360ul_Fb(name="plate")
+  deck.assign_child_resource(tip_rack, location=Coordinate(0, 0, 0))
+  deck.assign_child_resource(plate, location=Coordinate(100, 100, 0))
+  await lh.setup()
+  await lh.pick_up_tips(tip_rack["A1"])
+
+  t0 = time.perf_counter()
+  for _ in range(number):
+    await lh.aspirate(plate["A1"], vols=[1])
+    await lh.dispense(plate["A1"], vols=[1])
+  elapsed = time.perf_counter() - t0
+  await lh.stop()
+  return elapsed / number * 1e6
+
+
+def main(number: int = 10_000):
+  with legacy_checks():
+    legacy = check_time(number), asyncio.run(operation_time(number // 10))
+  cached = check_time(number), asyncio.run(operation_time(number // 10))
+
+  for label, ((check, check_kwargs), operation) in [("legacy", legacy), ("cached", cached)]:
+    print(f"{label}: STAR.aspirate check {check:6.2f}us, with 3 kwargs {check_kwargs:6.2f}us, "
+          f"aspirate and dispense {operation:6.1f}us")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,166 @@
+# pylint: disable=protected-access
+""" Benchmark reading and decoding CLARIOStar measurement values.
+
+Reading: a fake FTDI device makes the bytes of a measurement values response available at the
+125000 baud of the plate reader. Compares assembling the frame in a buffer using its length prefix
+against the original implementation, which read 25 bytes at a time and guessed the end of the
+response from 0x0d bytes. Reports the time from the last byte until the response is returned, the
+CPU time spent reading, and how many responses were returned incomplete.
+
+Decoding: absorbance values decoded with a single `array` pass, and into a NumPy array, against the
+original implementation that unpacked every value with `struct.unpack`.
+
+Usage: `python -m benchmarks.clario_star_reading`
+"""
+
+import asyncio
+import contextlib
+import math
+import statistics
+import struct
+import time
+import timeit
+from typing import List
+
+from pylabrobot import utils
+from pylabrobot.plate_reading.clario_star import HAS_NUMPY, CLARIOStar, decode_absorbance
+
+
+BYTES_PER_SECOND = 125000 / 10 # 8N1
+
+
+async def legacy_read_resp(self: CLARIOStar, timeout=20) -> bytes:
+  assert self.dev is not None
+  d = b""
+  last_read = b""
+  end_byte_found = False
+  t = time.time()
+  while True:
+    last_read = self.dev.read(25)
+    if len(last_read) > 0:
+      d += last_read
+      end_byte_found = d[-1] == 0x0d
+      if len(last_read) < 25 and end_byte_found:
+        break
+    else:
+      if end_byte_found:
+        break
+      if time.time() - t > timeout:
+        break
+      await asyncio.sleep(0.0001)
+  return d
+
+
+@contextlib.contextmanager
+def legacy_reading():
+  read_resp = CLARIOStar.read_resp
+  CLARIOStar.read_resp = legacy_read_resp # type: ignore[method-assign]
+  try:
+    yield
+  finally:
+    CLARIOStar.read_resp = read_resp # type: ignore[method-assign]
+
+
+def legacy_decode_absorbance(vals: bytes) -> List[List[float]]:
+  div = b"\x00"*6
+  start_idx = vals.index(div) + len(div)
+  chromatic_data = vals[start_idx:start_idx+96*4]
+  ref_data = vals[start_idx+96*4:start_idx+(96*2)*4]
+  chromatic_bytes = [bytes(chromatic_data[i:i+4]) for i in range(0, len(chromatic_data), 4)]
+  ref_bytes = [bytes(ref_data[i:i+4]) for i in range(0, len(ref_data), 4)]
+  chromatic_reading = [struct.unpack(">i", x)[0] for x in chromatic_bytes]
+  reference_reading = [struct.unpack(">i", x)[0] for x in ref_bytes]
+  after_values_idx = start_idx+(96*2)*4
+  c100, c0, r100, r0 = struct.unpack(">iiii", vals[after_values_idx:after_values_idx+4*4])
+  real_chromatic_reading = []
+  for cr in chromatic_reading:
+    real_chromatic_reading.append((cr-c0)/c100)
+  real_reference_reading = []
+  for rr in reference_reading:
+    real_reference_reading.append((rr-r0)/r100)
+  transmittance = []
+  for rcr, rrr in zip(real_chromatic_reading, real_reference_reading):
+    transmittance.append(rcr/rrr*100)
+  od = []
+  for t in transmittance:
+    od.append(math.log10(100/t))
+  return utils.reshape_2d(od, (8, 12))
+
+
+def measurement_values(num_wells: int) -> bytes:
+  ints = [1000 + i for i in range(num_wells)] + [2000 + i for i in range(num_wells)]
+  payload = b"\x02\x05\x06\x26\x00\x00\x00\x00\x00\x00" + \
+    struct.pack(f">{num_wells * 2 + 4}i", *ints, 4000, 10, 5000, 20)
+  data = b"\x02" + (len(payload) + 6).to_bytes(2, byteorder="big") + payload
+  return data + (sum(data) & 0xffff).to_bytes(2, byteorder="big") + b"\x0d"
+
+
+class FakeFTDIDevice:
+  """ Makes the bytes of `response` available at the baud rate of the plate reader, in USB packets
+  of at most 62 bytes. """
+
+  def __init__(self, response: bytes):
+    self.response = response
+    self.position = 0
+    self.start = time.perf_counter()
+
+  def read(self, size: int) -> bytes:
+    available = int((time.perf_counter() - self.start) * BYTES_PER_SECOND)
+    end = min(self.position + size, self.position + 62, available, len(self.response))
+    data = self.response[self.position:end]
+    self.position = max(self.position, end)
+    return data
+
+
+async def read(response: bytes, number: int):
+  """ Returns the mean time in ms until a complete response was returned after the device sent it,
+  the mean CPU time in ms per complete read, and the number of incomplete responses. """
+
+  backend = CLARIOStar()
+  latencies, cpu_times = [], []
+  incomplete = 0
+  for _ in range(number):
+    backend.dev = FakeFTDIDevice(response) # type: ignore[assignment]
+    cpu = time.process_time()
+    resp = await backend.read_resp(timeout=5)
+    cpu_time = (time.process_time() - cpu) * 1000
+    sent = backend.dev.start + len(response) / BYTES_PER_SECOND # type: ignore[attr-defined]
+    if resp != response:
+      incomplete += 1
+      await asyncio.sleep(len(response) / BYTES_PER_SECOND) # let the device finish sending
+      continue
+    latencies.append((time.perf_counter() - sent) * 1000)
+    cpu_times.append(cpu_time)
+  return statistics.mean(latencies), statistics.mean(cpu_times), incomplete
+
+
+def decode_time(num_wells: int, as_numpy: bool, number: int = 2000) -> float:
+  """ Returns the mean time in us to decode absorbance values of a plate. """
+
+  vals = measurement_values(num_wells)
+  return timeit.timeit(lambda: decode_absorbance(vals, "OD", num_wells, as_numpy=as_numpy),
+                       number=number) / number * 1e6
+
+
+def main(number: int = 20):
+  response = measurement_values(96)
+  print(f"reading a {len(response)} byte absorbance response at 125000 baud:")
+  with legacy_reading():
+    legacy = asyncio.run(read(response, number))
+  buffered = asyncio.run(read(response, number))
+  for label, (latency, cpu, incomplete) in [("legacy", legacy), ("buffered", buffered)]:
+    print(f"{label:>10}: returned {latency:5.2f}ms after the last byte, {cpu:6.2f}ms CPU per read, "
+          f"{incomplete}/{number} responses incomplete")
+
+  print("decoding absorbance values (OD):")
+  vals = measurement_values(96)
+  legacy_time = timeit.timeit(lambda: legacy_decode_absorbance(vals), number=2000) / 2000 * 1e6
+  print(f"{'legacy':>10}: 96 wells {legacy_time:8.1f}us")
+  for num_wells in (96, 384, 1536):
+    line = f"{'array':>10}: {num_wells} wells {decode_time(num_wells, as_numpy=False):8.1f}us"
+    if HAS_NUMPY:
+      line += f", numpy {decode_time(num_wells, as_numpy=True):8.1f}us"
+    print(line)
+
+if __name__ == "__main__":
+  main()
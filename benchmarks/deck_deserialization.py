@@ -0,0 +1,95 @@
+""" Benchmark loading a fully loaded STAR deck from its serialized form.
+
+Compares :meth:`Resource.deserialize` using the class registry of :mod:`pylabrobot.serializer` and
+the cached subclass lookup of :class:`Resource`, against the original implementation that ran
+`inspect.getmembers` over `pylabrobot.resources` and `pylabrobot.liquid_handling` for every
+serialized object, and searched all subclasses of :class:`Resource` for every resource.
+
+Usage: `python -m benchmarks.deck_deserialization`
+"""
+
+import contextlib
+import inspect
+import time
+import timeit
+
+from pylabrobot import serializer
+from pylabrobot.resources import (
+  Cor_96_wellplate_360ul_Fb,
+  HTF_L,
+  PLT_CAR_L5AC_A00,
+  TIP_CAR_480_A00,
+  Resource,
+  STARDeck,
+)
+from pylabrobot.resources.hamilton import HamiltonDeck
+from pylabrobot.utils.object_parsing import find_subclass
+
+
+def legacy_get_plr_class_from_string(klass_type: str):
+  # pylint: disable=import-outside-toplevel
+  import pylabrobot.resources as resource_module
+  import pylabrobot.liquid_handling as lh_module
+  for name, obj in inspect.getmembers(resource_module) + inspect.getmembers(lh_module):
+    if inspect.isclass(obj) and name == klass_type:
+      return obj
+  raise ValueError(f"Could not find class {klass_type}")
+
+
+@contextlib.contextmanager
+def legacy_lookups():
+  # pylint: disable=protected-access
+  get_plr_class_from_string = serializer.get_plr_class_from_string
+  find_resource_subclass = Resource.__dict__["_find_subclass"]
+  serializer.get_plr_class_from_string = legacy_get_plr_class_from_string
+  Resource._find_subclass = staticmethod( # type: ignore[method-assign]
+    lambda class_name: find_subclass(class_name, cls=Resource))
+  try:
+    yield
+  finally:
+    serializer.get_plr_class_from_string = get_plr_class_from_string
+    Resource._find_subclass = find_resource_subclass # type: ignore[method-assign]
+
+
+def make_deck() -> HamiltonDeck:
+  deck = STARDeck()
+  for i in range(4):
+    tip_car = TIP_CAR_480_A00(name=f"tip_carrier_{i}")
+    for j in range(5):
+      tip_car[j] = HTF_L(name=f"tips_{i}_{j}")
+    deck.assign_child_resource(tip_car, rails=1 + i * 6)
+  for i in range(5):
+    plt_car = PLT_CAR_L5AC_A00(name=f"plate_carrier_{i}")
+    for j in range(5):
+      plt_car[j] = Cor_96_wellplate_360ul_Fb(name=f"plate_{i}_{j}")
+    deck.assign_child_resource(plt_car, rails=25 + i * 6)
+  return deck
+
+
+def main(number: int = 3):
+  data = make_deck().serialize()
+  print(f"{len(make_deck().get_all_children())} resources")
+
+  with legacy_lookups():
+    legacy = timeit.timeit(lambda: HamiltonDeck.deserialize(data), number=number) / number
+    legacy_deck = HamiltonDeck.deserialize(data)
+
+  t0 = time.perf_counter()
+  deck = HamiltonDeck.deserialize(data) # includes building the class registry
+  first = time.perf_counter() - t0
+  registry = timeit.timeit(lambda: HamiltonDeck.deserialize(data), number=number) / number
+  assert deck == legacy_deck
+
+  print(f"Deck.deserialize: legacy {legacy * 1000:.0f}ms, registry {registry * 1000:.0f}ms "
+        f"(first load {first * 1000:.0f}ms, {legacy / registry:.1f}x)")
+
+  lookup_number = 1000
+  legacy = timeit.timeit(lambda: legacy_get_plr_class_from_string("Coordinate"),
+    number=lookup_number) / lookup_number
+  registry = timeit.timeit(lambda: serializer.get_plr_class_from_string("Coordinate"),
+    number=lookup_number) / lookup_number
+  print(f"get_plr_class_from_string: legacy {legacy * 1e6:.1f}us, registry {registry * 1e6:.2f}us")
+
+
+if __name__ == "__main__":
+  main()
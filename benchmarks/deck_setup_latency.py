@@ -0,0 +1,161 @@
+""" Benchmark assigning resources to the deck of a liquid handler, and setting it up.
+
+Compares delivering resource assignment callbacks on the long-lived callback loop of
+:class:`LiquidHandler`, and the bulk `assigned_resources_callback` awaited in `setup`, against the
+original implementation that started a new thread and event loop for every callback.
+
+Setup is measured with a :class:`SerializingBackend` that waits 5ms for every command it sends, like
+a network round trip to a robot or server.
+
+Usage: `python -m benchmarks.deck_setup_latency`
+"""
+
+import asyncio
+import contextlib
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from pylabrobot.liquid_handling import LiquidHandler, LiquidHandlerBackend
+from pylabrobot.liquid_handling.backends import SaverBackend
+from pylabrobot.liquid_handling.backends.serializing_backend import SerializingBackend
+from pylabrobot.machines.machine import Machine
+from pylabrobot.resources import (
+  Cor_96_wellplate_360ul_Fb,
+  HTF_L,
+  PLT_CAR_L5AC_A00,
+  TIP_CAR_480_A00,
+  Resource,
+  STARDeck,
+)
+from pylabrobot.resources.hamilton import HamiltonDeck
+
+
+class RoundTripBackend(SerializingBackend):
+  """ A serializing backend that sleeps for `round_trip` seconds for every command. """
+
+  def __init__(self, round_trip: float, bulk: bool = True):
+    super().__init__(num_channels=8)
+    self.round_trip = round_trip
+    self.bulk = bulk
+    self.commands_sent = 0
+
+  async def send_command(self, command: str, data: Optional[Dict[str, Any]] = None):
+    self.commands_sent += 1
+    await asyncio.sleep(self.round_trip)
+    return None
+
+  async def assigned_resources_callback(self, resources: List[Resource]):
+    if self.bulk:
+      await super().assigned_resources_callback(resources)
+    else:
+      await LiquidHandlerBackend.assigned_resources_callback(self, resources)
+
+
+def legacy_run_async_in_thread(self: LiquidHandler, func, *args, **kwargs):
+  del self
+  def callback(*args, **kwargs):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    loop.run_until_complete(func(*args, **kwargs))
+    loop.close()
+
+  t = threading.Thread(target=callback, args=args, kwargs=kwargs)
+  t.start()
+  t.join()
+
+
+async def legacy_setup(self: LiquidHandler, **backend_kwargs):
+  # pylint: disable=protected-access
+  self.backend.set_deck(self.deck)
+  await Machine.setup(self, **backend_kwargs)
+  self._send_assigned_resource_to_backend(self.deck)
+  for resource in self.deck.children:
+    self._send_assigned_resource_to_backend(resource)
+
+
+@contextlib.contextmanager
+def legacy_callbacks():
+  # pylint: disable=protected-access
+  run_async_in_thread = LiquidHandler._run_async_in_thread
+  setup = LiquidHandler.setup
+  LiquidHandler._run_async_in_thread = legacy_run_async_in_thread # type: ignore[method-assign]
+  LiquidHandler.setup = legacy_setup # type: ignore[method-assign]
+  try:
+    yield
+  finally:
+    LiquidHandler._run_async_in_thread = run_async_in_thread # type: ignore[method-assign]
+    LiquidHandler.setup = setup # type: ignore[method-assign]
+
+
+def load_deck(deck: HamiltonDeck):
+  for i in range(4):
+    tip_car = TIP_CAR_480_A00(name=f"tip_carrier_{i}")
+    for j in range(5):
+      tip_car[j] = HTF_L(name=f"tips_{i}_{j}")
+    deck.assign_child_resource(tip_car, rails=1 + i * 6)
+  for i in range(5):
+    plt_car = PLT_CAR_L5AC_A00(name=f"plate_carrier_{i}")
+    for j in range(5):
+      plt_car[j] = Cor_96_wellplate_360ul_Fb(name=f"plate_{i}_{j}")
+    deck.assign_child_resource(plt_car, rails=25 + i * 6)
+
+
+class NoOpBackend(SaverBackend):
+  """ A backend that does nothing when resources are assigned. """
+
+  async def assigned_resource_callback(self, *args, **kwargs):
+    pass
+
+
+async def callback_latency(number: int) -> float:
+  """ Average time in microseconds to deliver one assignment callback from synchronous code. """
+
+  lh = LiquidHandler(backend=NoOpBackend(num_channels=8), deck=STARDeck())
+  await lh.setup()
+  resource = lh.deck.children[0]
+  t0 = time.perf_counter()
+  for _ in range(number):
+    lh._send_assigned_resource_to_backend(resource) # pylint: disable=protected-access
+  return (time.perf_counter() - t0) / number * 1e6
+
+
+async def setup_latency(round_trip: float, bulk: bool, number: int) -> Tuple[float, int]:
+  """ Fastest time in milliseconds to set up a liquid handler with a loaded deck, and the number of
+  commands sent during setup. """
+
+  deck = STARDeck()
+  load_deck(deck)
+  times = []
+  for _ in range(number):
+    backend = RoundTripBackend(round_trip=round_trip, bulk=bulk)
+    lh = LiquidHandler(backend=backend, deck=deck)
+    t0 = time.perf_counter()
+    await lh.setup()
+    times.append(time.perf_counter() - t0)
+    commands = backend.commands_sent
+    await lh.stop()
+  return min(times) * 1000, commands
+
+
+def main(number: int = 5, round_trip: float = 0.005):
+  callbacks = 500
+  with legacy_callbacks():
+    legacy = asyncio.run(callback_latency(callbacks))
+  loop = asyncio.run(callback_latency(callbacks))
+  print(f"assignment callback: legacy {legacy:6.1f}us, callback loop {loop:6.1f}us "
+        f"({legacy / loop:.1f}x)")
+
+  with legacy_callbacks():
+    legacy_setup_time, legacy_commands = asyncio.run(setup_latency(round_trip, False, number))
+  native_time, native_commands = asyncio.run(setup_latency(round_trip, False, number))
+  bulk_time, bulk_commands = asyncio.run(setup_latency(round_trip, True, number))
+  print(f"setup with a loaded deck, {round_trip * 1000:.0f}ms per command:")
+  for label, t, commands in [("legacy", legacy_setup_time, legacy_commands),
+                             ("awaited", native_time, native_commands),
+                             ("awaited + bulk", bulk_time, bulk_commands)]:
+    print(f"  {label:>14}: {t:6.1f}ms ({commands} commands)")
+
+
+if __name__ == "__main__":
+  main()
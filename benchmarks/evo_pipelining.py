@@ -0,0 +1,87 @@
+""" Benchmark pipelined LiHa commands on a fake Tecan EVO.
+
+Transfers a full 96-well plate column by column (12 aspirations and 12 dispenses with 8 channels)
+and reports the wall time per transfer, with commands sent one at a time, pipelined per operation,
+and pipelined with redundant set commands coalesced.
+
+Usage: `python -m benchmarks.evo_pipelining`
+"""
+# pylint: disable=protected-access
+
+import asyncio
+import logging
+import time
+
+from pylabrobot.liquid_handling.backends.tecan.EVO import EVO, EVOArm, LiHa
+from pylabrobot.liquid_handling.standard import Aspiration, Dispense
+from pylabrobot.resources import (
+  Coordinate,
+  EVO150Deck,
+  DeepWell_96_Well,
+  DiTi_100ul_Te_MO,
+  DiTi_SBS_3_Pos_MCA96,
+  MP_3Pos_PCR
+)
+
+from tests.usb import FakeTecanDevice, MockEndpoint
+
+
+LATENCY = 0.002 # round trip, seconds
+EXECUTION_TIME = 0.0005 # seconds per command
+
+
+def make_evo(**kwargs):
+  evo = EVO(diti_count=8, **kwargs)
+  evo.dev = FakeTecanDevice(latency=LATENCY, execution_time=EXECUTION_TIME, # type: ignore
+    reports={"RPX": "3000"})
+  evo.read_endpoint = evo.write_endpoint = MockEndpoint() # type: ignore
+  evo._num_channels = 8
+  evo._z_range = 2000
+  evo.liha = LiHa(evo, EVO.LIHA)
+  EVOArm._pos_cache.clear()
+
+  deck = EVO150Deck()
+  tr_carrier = DiTi_SBS_3_Pos_MCA96(name="tip_rack_carrier")
+  tr_carrier[0] = tip_rack = DiTi_100ul_Te_MO(name="tip_rack")
+  deck.assign_child_resource(tr_carrier, rails=10)
+  plate_carrier = MP_3Pos_PCR(name="plate_carrier")
+  plate_carrier[0] = source = DeepWell_96_Well(name="source")
+  plate_carrier[1] = destination = DeepWell_96_Well(name="destination")
+  deck.assign_child_resource(plate_carrier, rails=16)
+  return evo, tip_rack, source, destination
+
+
+async def transfer_plate(evo, tip_rack, source, destination):
+  channels = list(range(8))
+  for column in range(12):
+    tips = [tip_rack.get_tip(column * 8 + i) for i in channels]
+    await evo.aspirate([Aspiration(resource=source.get_item(column * 8 + i),
+      offset=Coordinate.zero(), tip=tips[i], volume=50, flow_rate=None, liquid_height=None, blow_out_air_volume=0,
+      liquids=[(None, 50)]) for i in channels], use_channels=channels)
+    await evo.dispense([Dispense(resource=destination.get_item(column * 8 + i),
+      offset=Coordinate.zero(), tip=tips[i], volume=50, flow_rate=None, liquid_height=None,
+      blow_out_air_volume=0, liquids=[(None, 50)]) for i in channels], use_channels=channels)
+
+
+def main():
+  logging.getLogger("pylabrobot").setLevel(logging.WARNING)
+
+  sent_commands = {}
+  for name, kwargs in [
+    ("sequential", {}),
+    ("pipelined", {"pipeline_commands": True}),
+    ("pipelined + coalesced", {"pipeline_commands": True, "coalesce_set_commands": True}),
+  ]:
+    evo, tip_rack, source, destination = make_evo(**kwargs)
+    t = time.perf_counter()
+    asyncio.run(transfer_plate(evo, tip_rack, source, destination))
+    wall = time.perf_counter() - t
+    sent_commands[name] = evo.dev.commands
+    print(f"{name:>22}: {wall * 1000:7.1f} ms per 96-well transfer, "
+          f"{len(evo.dev.commands)} commands")
+
+  assert sent_commands["pipelined"] == sent_commands["sequential"]
+
+
+if __name__ == "__main__":
+  main()
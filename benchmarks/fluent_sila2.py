@@ -0,0 +1,168 @@
+""" Benchmark transferring a 96-well plate with the FLUENT backend and a fake Fluent SiLA2 server.
+
+Compares calling the SiLA2 client on a worker thread with aspirations and dispenses on adjacent
+channels grouped into multichannel commands, against the original implementation that called the
+synchronous client on the event loop, once for every operation. Reports the wall time, the number
+of SiLA2 calls, and the longest time the event loop was blocked, measured by a coroutine that wakes
+up every millisecond. Also reports recording the transfer in a worklist and running it with a single
+prepared method, polling until the method has finished.
+
+The fake server takes 5ms for every round trip, and 20ms to execute every tip and pipetting
+command, whether it uses one channel or all of them.
+
+Usage: `python -m benchmarks.fluent_sila2`
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import tempfile
+import time
+from typing import List, Optional
+
+from pylabrobot.liquid_handling import LiquidHandler
+from pylabrobot.liquid_handling.backends.tecan.FLUENT import FLUENT
+from pylabrobot.liquid_handling.standard import Aspiration, Dispense, Drop, Pickup
+from pylabrobot.machines.polling import Backoff
+from pylabrobot.resources import (
+  Fluent780Deck,
+  DeepWell_96_Well,
+  DiTi_100ul_Te_MO,
+  DiTi_SBS_3_Pos_MCA96,
+  MP_3Pos_PCR
+)
+
+from tests.fluent import FakeFluentServer
+
+LATENCY = 0.005
+EXECUTION_TIME = 0.02
+
+
+async def legacy_setup(self: FLUENT):
+  self.client.start_fluent(simulation_mode=self.simulation_mode)
+  self.connected = True
+
+
+async def legacy_stop(self: FLUENT):
+  self.client.shutdown(10)
+  self.connected = False
+
+
+async def legacy_pick_up_tips(self: FLUENT, ops: List[Pickup],
+                              use_channels: List[int], # pylint: disable=unused-argument
+                              diti_type=None):
+  for _ in ops:
+    self.client.get_tips(airgap_volume=0, airgap_speed=0, diti_type=diti_type)
+
+
+async def legacy_drop_tips(self: FLUENT, ops: List[Drop],
+                           use_channels: List[int]): # pylint: disable=unused-argument
+  for op in ops:
+    self.client.drop_tips(labware=op.resource.name)
+
+
+async def legacy_aspirate(self: FLUENT, ops: List[Aspiration], use_channels: List[int]):
+  for op in ops:
+    volumes = [op.volume for _ in use_channels]
+    self.client.aspirate(volume=volumes, labware=op.resource.name, liquid_class="Water",
+      well_offset=0)
+
+
+async def legacy_dispense(self: FLUENT, ops: List[Dispense], use_channels: List[int]):
+  for op in ops:
+    volumes = [op.volume for _ in use_channels]
+    self.client.dispense(volume=volumes, labware=op.resource.name, liquid_class="Water",
+      well_offset=0)
+
+
+@contextlib.contextmanager
+def legacy_fluent():
+  originals = {name: getattr(FLUENT, name) for name in
+    ["setup", "stop", "pick_up_tips", "drop_tips", "aspirate", "dispense"]}
+  FLUENT.setup = legacy_setup # type: ignore[method-assign]
+  FLUENT.stop = legacy_stop # type: ignore[method-assign]
+  FLUENT.pick_up_tips = legacy_pick_up_tips # type: ignore[method-assign,assignment]
+  FLUENT.drop_tips = legacy_drop_tips # type: ignore[method-assign]
+  FLUENT.aspirate = legacy_aspirate # type: ignore[method-assign,assignment]
+  FLUENT.dispense = legacy_dispense # type: ignore[method-assign,assignment]
+  try:
+    yield
+  finally:
+    for name, method in originals.items():
+      setattr(FLUENT, name, method)
+
+
+async def transfer_plate(worklist_path: Optional[str] = None):
+  """ Transfer every well of a 96-well plate to another plate, one column at a time with 8 channels
+  and new tips. If `worklist_path` is given, the transfer is recorded in a worklist and run from
+  that path. Returns the wall time, the number of SiLA2 calls and the longest time the event loop
+  was blocked. """
+
+  server = FakeFluentServer(latency=LATENCY, execution_time=EXECUTION_TIME)
+  if worklist_path is not None:
+    server.methods["PLR worklist"] = worklist_path
+  # Poll for the end of a worklist method at the time scale of the fake server, not of a real
+  # method that takes minutes.
+  fluent = FLUENT(num_channels=8, method_backoff=Backoff(initial=0.01, maximum=0.05))
+  fluent.client = server
+  deck = Fluent780Deck()
+  lh = LiquidHandler(backend=fluent, deck=deck)
+  tr_carrier = DiTi_SBS_3_Pos_MCA96(name="tip_rack_carrier")
+  tr_carrier[0] = tip_rack = DiTi_100ul_Te_MO(name="tip_rack")
+  deck.assign_child_resource(tr_carrier, rails=10)
+  plate_carrier = MP_3Pos_PCR(name="plate_carrier")
+  plate_carrier[0] = source = DeepWell_96_Well(name="source")
+  plate_carrier[1] = destination = DeepWell_96_Well(name="destination")
+  deck.assign_child_resource(plate_carrier, rails=16)
+  await lh.setup()
+  server.calls.clear()
+
+  done = False
+  longest_stall = 0.0
+
+  async def ticker():
+    nonlocal longest_stall
+    while not done:
+      t0 = time.perf_counter()
+      await asyncio.sleep(0.001)
+      longest_stall = max(longest_stall, time.perf_counter() - t0 - 0.001)
+
+  ticker_task = asyncio.create_task(ticker())
+  await asyncio.sleep(0) # start the ticker
+  t = time.perf_counter()
+  async with contextlib.AsyncExitStack() as stack:
+    if worklist_path is not None:
+      worklist = await stack.enter_async_context(fluent.record_worklist())
+    for column in range(1, 13):
+      await lh.pick_up_tips(tip_rack[f"A{column}:H{column}"], diti_type="FCA, 100ul SBS")
+      await lh.aspirate(source[f"A{column}:H{column}"], vols=[10] * 8)
+      await lh.dispense(destination[f"A{column}:H{column}"], vols=[10] * 8)
+      await lh.drop_tips(tip_rack[f"A{column}:H{column}"])
+  if worklist_path is not None:
+    async for _ in fluent.run_worklist(worklist, "PLR worklist", worklist_path):
+      pass
+  wall = time.perf_counter() - t
+  done = True
+  await ticker_task
+  await lh.stop()
+  return wall, len(server.calls), longest_stall
+
+
+def main():
+  # Measure the SiLA2 calls, not the log handlers.
+  logging.getLogger("pylabrobot").setLevel(logging.WARNING)
+
+  with legacy_fluent():
+    legacy = asyncio.run(transfer_plate())
+  current = asyncio.run(transfer_plate())
+  with tempfile.TemporaryDirectory() as tmp:
+    worklist = asyncio.run(transfer_plate(worklist_path=os.path.join(tmp, "plr.gwl")))
+  for name, (wall, calls, stall) in [("legacy", legacy), ("executor", current),
+                                     ("worklist", worklist)]:
+    print(f"{name:>8}: {wall:.2f}s for 96 wells, {calls} SiLA2 calls, "
+          f"longest event loop stall {stall * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+  main()
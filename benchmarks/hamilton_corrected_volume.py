@@ -0,0 +1,71 @@
+""" Benchmark correcting volumes with Hamilton liquid class correction curves.
+
+Compares :meth:`HamiltonLiquidClass.compute_corrected_volume`, which looks up precomputed sorted
+breakpoints with bisect, against the original implementation that sorted the curve and searched it
+linearly on every call. Also compares correcting volumes one at a time against
+:meth:`HamiltonLiquidClass.compute_corrected_volumes`, which is vectorized if NumPy is installed.
+
+Usage: `python -m benchmarks.hamilton_corrected_volume`
+"""
+
+import random
+import timeit
+
+from pylabrobot.liquid_handling.liquid_classes.hamilton import star
+from pylabrobot.liquid_handling.liquid_classes.hamilton.base import HAS_NUMPY, HamiltonLiquidClass
+
+if HAS_NUMPY:
+  import numpy as np
+
+
+def legacy_compute_corrected_volume(hlc: HamiltonLiquidClass, target_volume: float) -> float:
+  targets = sorted(hlc.curve.keys())
+
+  if len(targets) == 0:
+    return target_volume
+
+  if target_volume in hlc.curve:
+    return hlc.curve[target_volume]
+
+  if target_volume < targets[1]: # smaller than min
+    return hlc.curve[targets[1]]/targets[1] * target_volume
+  if target_volume > targets[-1]: # larger than max
+    return hlc.curve[targets[-1]]/targets[-1] * target_volume
+
+  for pt, t in zip(targets[:-1], targets[1:]):
+    if pt < target_volume < t:
+      return (hlc.curve[t]-hlc.curve[pt])/(t-pt) * (target_volume - t) + hlc.curve[t]
+
+  assert False
+
+
+def main(number: int = 2000):
+  hlc = star.HighVolume_Water_DispenseJet_Empty
+  print(f"curve with {len(hlc.curve)} points, "
+        f"NumPy {'installed' if HAS_NUMPY else 'not installed'}")
+
+  random.seed(0)
+  for n in [1, 8, 32, 96, 384]:
+    volumes = [random.uniform(1, 1000) for _ in range(n)]
+    expected = [legacy_compute_corrected_volume(hlc, v) for v in volumes]
+    assert [hlc.compute_corrected_volume(v) for v in volumes] == expected
+    assert hlc.compute_corrected_volumes(volumes) == expected
+
+    def run(f):
+      return timeit.timeit(f, number=number) / number * 1e6
+
+    legacy = run(lambda vs=volumes: [legacy_compute_corrected_volume(hlc, v) for v in vs])
+    scalar = run(lambda vs=volumes: [hlc.compute_corrected_volume(v) for v in vs])
+    batch = run(lambda vs=volumes: hlc.compute_corrected_volumes(vs))
+    line = (f"{n:>4} volumes: legacy {legacy:8.2f}us, bisect {scalar:8.2f}us, "
+            f"batch (list) {batch:8.2f}us")
+    if HAS_NUMPY:
+      array = np.array(volumes)
+      assert list(hlc.compute_corrected_volumes(array)) == expected
+      batch_array = run(lambda a=array: hlc.compute_corrected_volumes(a))
+      line += f", batch (array) {batch_array:8.2f}us"
+    print(line)
+
+
+if __name__ == "__main__":
+  main()
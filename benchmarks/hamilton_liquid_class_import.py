@@ -0,0 +1,123 @@
+""" Benchmark importing the Hamilton liquid class tables.
+
+The STAR and Vantage liquid classes are stored as JSON and only turned into
+:class:`HamiltonLiquidClass` objects when they are first looked up. This compares the time of a
+first lookup against eagerly building every liquid class at import time, which is how the tables
+used to be defined as Python modules. The eager modules are generated from the JSON files into a
+temporary directory.
+
+Every measurement runs in a fresh interpreter, both with cached bytecode (after a warm-up run) and
+without, like in read-only installs or with `PYTHONDONTWRITEBYTECODE`.
+
+Usage: `python -m benchmarks.hamilton_liquid_class_import`
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from pylabrobot.liquid_handling.liquid_classes.hamilton import star
+
+
+PARAMETERS = [
+  "aspiration_flow_rate",
+  "aspiration_mix_flow_rate",
+  "aspiration_air_transport_volume",
+  "aspiration_blow_out_volume",
+  "aspiration_swap_speed",
+  "aspiration_settling_time",
+  "aspiration_over_aspirate_volume",
+  "aspiration_clot_retract_height",
+  "dispense_flow_rate",
+  "dispense_mode",
+  "dispense_mix_flow_rate",
+  "dispense_air_transport_volume",
+  "dispense_blow_out_volume",
+  "dispense_swap_speed",
+  "dispense_settling_time",
+  "dispense_stop_flow_rate",
+  "dispense_stop_back_volume",
+]
+
+
+def write_eager_module(path: str, mapping_name: str, rows) -> None:
+  """ Write a module that builds all liquid classes at import time. """
+
+  with open(path, "w", encoding="utf-8") as f:
+    f.write("from pylabrobot.resources.liquid import Liquid\n")
+    f.write("from pylabrobot.liquid_handling.liquid_classes.hamilton.base import "
+            "HamiltonLiquidClass\n\n")
+    f.write(f"{mapping_name} = {{}}\n")
+    for key, name, _, curve, params in rows:
+      tip_volume, is_core, is_tip, has_filter, liquid, jet, blow_out = key
+      f.write(f"\n{mapping_name}[({tip_volume}, {is_core}, {is_tip}, {has_filter}, "
+              f"Liquid.{liquid}, {jet}, {blow_out})] = \\\n")
+      f.write(f"{name} = HamiltonLiquidClass(\n  curve={dict((t, c) for t, c in curve)!r},\n")
+      for parameter, value in zip(PARAMETERS, params):
+        f.write(f"  {parameter}={value!r},\n")
+      f.write(")\n")
+
+
+def time_in_subprocess(setup: str, statement: str, env, repeat: int) -> float:
+  """ Median wall time of `statement` in a fresh interpreter, in ms. """
+
+  script = (
+    f"{setup}\n"
+    "import time\n"
+    "t0 = time.perf_counter()\n"
+    f"{statement}\n"
+    "print(time.perf_counter() - t0)\n"
+  )
+  times = []
+  for i in range(repeat + 1):
+    out = subprocess.run([sys.executable, "-c", script], env=env, check=True,
+      stdout=subprocess.PIPE, universal_newlines=True).stdout
+    if i > 0: # the first run is a warm-up
+      times.append(float(out.strip().splitlines()[-1]) * 1000)
+  return statistics.median(times)
+
+
+def main(repeat: int = 5):
+  rows = {}
+  for machine in ("star", "vantage"):
+    path = os.path.join(os.path.dirname(star.__file__), f"{machine}_liquid_classes.json")
+    with open(path, "r", encoding="utf-8") as f:
+      rows[machine] = json.load(f)
+
+  with tempfile.TemporaryDirectory() as tmp:
+    write_eager_module(os.path.join(tmp, "eager_star.py"), "star_mapping", rows["star"])
+    write_eager_module(os.path.join(tmp, "eager_vantage.py"), "vantage_mapping", rows["vantage"])
+    cached_env = dict(os.environ)
+    cached_env.pop("PYTHONDONTWRITEBYTECODE", None)
+    cached_env["PYTHONPYCACHEPREFIX"] = os.path.join(tmp, "pycache")
+    cached_env["PYTHONPATH"] = os.pathsep.join(
+      p for p in [tmp, os.getcwd(), cached_env.get("PYTHONPATH")] if p)
+    uncached_env = dict(cached_env, PYTHONDONTWRITEBYTECODE="1",
+      PYTHONPYCACHEPREFIX=os.path.join(tmp, "empty"))
+
+    # pylabrobot.liquid_handling imports the backends, which import the liquid class tables.
+    setup = "import pylabrobot.liquid_handling"
+    cases = [
+      ("import pylabrobot.liquid_handling", "", setup),
+      ("eager tables, import", setup, "import eager_star, eager_vantage"),
+      ("lazy tables, first lookup", setup, (
+        "from pylabrobot.liquid_handling.liquid_classes.hamilton import get_star_liquid_class\n"
+        "from pylabrobot.resources.liquid import Liquid\n"
+        "get_star_liquid_class(1000, False, True, False, Liquid.WATER, False, False)")),
+      ("lazy tables, build all", setup, (
+        "from pylabrobot.liquid_handling.liquid_classes.hamilton import star, vantage\n"
+        "_ = list(star.star_mapping.values()), list(vantage.vantage_mapping.values())")),
+    ]
+    print(f"{len(rows['star'])} STAR and {len(rows['vantage'])} Vantage liquid classes")
+    print(f"{'':>33}  {'cached':>9}  {'uncached':>9}")
+    for label, case_setup, statement in cases:
+      cached = time_in_subprocess(case_setup, statement, env=cached_env, repeat=repeat)
+      uncached = time_in_subprocess(case_setup, statement, env=uncached_env, repeat=repeat)
+      print(f"{label:>33}: {cached:7.2f}ms  {uncached:7.2f}ms")
+
+
+if __name__ == "__main__":
+  main()
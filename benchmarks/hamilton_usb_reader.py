@@ -0,0 +1,127 @@
+# pylint: disable=protected-access
+""" Benchmark the Hamilton USB reading thread against a fake USB device.
+
+Compares the long-lived reading thread (dispatch table keyed by command id, timeout heap) against
+the original implementation, which started a new thread for every burst of commands and scanned all
+waiting commands on every read. Reports round-trip latency and CPU time per command.
+
+Usage: `python -m benchmarks.hamilton_usb_reader`
+"""
+
+import asyncio
+import logging
+import statistics
+import threading
+import time
+from typing import Type
+
+from pylabrobot.liquid_handling.backends.hamilton.STAR import STAR
+
+from tests.usb import FakeUSBDevice, MockEndpoint
+
+
+class LegacyReaderSTAR(STAR):
+  """ STAR with the original per-burst reading thread. """
+
+  async def _write_and_read_command(self, id_, cmd, write_timeout=None, read_timeout=None,
+    wait=True):
+    self.write(cmd, timeout=write_timeout)
+    if not wait:
+      return None
+    if read_timeout is None:
+      read_timeout = self.read_timeout
+    loop = asyncio.get_event_loop()
+    fut = loop.create_future()
+    self._start_reading(id_, loop, fut, cmd, read_timeout)
+    return await fut
+
+  def _start_reading(self, id_, loop, fut, cmd, timeout):
+    timeout_time = time.time() + timeout
+    self._waiting_tasks[id_] = (loop, fut, cmd, timeout_time)
+    if len(self._waiting_tasks) == 1:
+      self._reading_thread = threading.Thread(target=self._continuously_read)
+      self._reading_thread.start()
+
+  def _continuously_read(self):
+    while len(self._waiting_tasks) > 0:
+      for id_, (loop, fut, _, timeout_time) in self._waiting_tasks.items():
+        if time.time() > timeout_time:
+          loop.call_soon_threadsafe(fut.set_exception, TimeoutError())
+          del self._waiting_tasks[id_]
+          break
+      try:
+        resp = self.read().decode("utf-8")
+      except TimeoutError:
+        continue
+      try:
+        response_id = self.get_id_from_fw_response(resp)
+      except ValueError:
+        continue
+      for id_, (loop, fut, _, _) in self._waiting_tasks.items():
+        if response_id == id_:
+          loop.call_soon_threadsafe(fut.set_result, resp)
+          del self._waiting_tasks[id_]
+          break
+    self._reading_thread = None
+
+
+def make_backend(cls: Type[STAR], delay: float = 0) -> STAR:
+  star = cls(packet_read_timeout=1, read_timeout=10)
+  star.dev = FakeUSBDevice(delay=delay) # type: ignore
+  star.read_endpoint = MockEndpoint() # type: ignore
+  star.write_endpoint = MockEndpoint() # type: ignore
+  return star
+
+
+async def sequential(cls: Type[STAR], n: int, delay: float):
+  """ Send `n` commands one after the other, with `delay` seconds device latency. """
+
+  star = make_backend(cls, delay=delay)
+  latencies = []
+  cpu_start = time.process_time()
+  for _ in range(n):
+    t = time.perf_counter()
+    await star.send_command("C0", command="QM")
+    latencies.append(time.perf_counter() - t)
+  cpu = time.process_time() - cpu_start
+  if cls is STAR:
+    star._stop_reading_thread()
+  return latencies, cpu
+
+
+async def concurrent(cls: Type[STAR], n: int, delay: float):
+  """ Send `n` commands at once, with `delay` seconds device latency. """
+
+  star = make_backend(cls, delay=delay)
+  cpu_start = time.process_time()
+  t = time.perf_counter()
+  await asyncio.gather(*[star.send_command("C0", command="QM") for _ in range(n)])
+  wall = time.perf_counter() - t
+  cpu = time.process_time() - cpu_start
+  if cls is STAR:
+    star._stop_reading_thread()
+  return wall, cpu
+
+
+def main():
+  # Measure the reading thread, not the log handlers.
+  logging.getLogger("pylabrobot").setLevel(logging.WARNING)
+
+  for name, cls in [("legacy", LegacyReaderSTAR), ("long-lived", STAR)]:
+    for delay in [0, 0.002]:
+      latencies, cpu = asyncio.run(sequential(cls, n=1000, delay=delay))
+      latencies.sort()
+      print(f"{name:>10} sequential delay={delay * 1000:.0f}ms: "
+            f"p50={statistics.median(latencies) * 1e6:.0f}us "
+            f"p99={latencies[int(len(latencies) * 0.99)] * 1e6:.0f}us "
+            f"cpu/cmd={cpu / len(latencies) * 1e6:.0f}us")
+
+  # The legacy implementation iterates over `_waiting_tasks` while the event loop thread adds to
+  # it, so it can not be benchmarked with concurrent commands.
+  for n in [100, 1000]:
+    wall, cpu = asyncio.run(concurrent(STAR, n=n, delay=0.001))
+    print(f"long-lived concurrent n={n}: wall={wall * 1000:.1f}ms cpu/cmd={cpu / n * 1e6:.0f}us")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,159 @@
+""" Benchmark the number of commands per second that :class:`HTTPBackend` sends to a server.
+
+Compares sending commands from a pool of worker threads with keep-alive connections, one at a time,
+concurrently, and in batches with :meth:`HTTPBackend.batch_commands`, against the original
+implementation that called `requests.Session.post` on the event loop. Also reports the longest time
+the event loop was blocked while sending, measured by a coroutine that wakes up every millisecond.
+
+The server is a local stand-in that takes 2ms to handle every request, and 0.1ms for every command
+in a batch.
+
+Usage: `python -m benchmarks.http_backend_throughput`
+"""
+
+import asyncio
+import contextlib
+import http.server
+import json
+import threading
+import time
+from typing import Any, Dict, Optional, cast
+
+import requests
+
+from pylabrobot.__version__ import STANDARD_FORM_JSON_VERSION
+from pylabrobot.liquid_handling.backends import HTTPBackend
+from pylabrobot.resources import STARLetDeck
+
+REQUEST_TIME = 0.002
+BATCH_COMMAND_TIME = 0.0001
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+  """ Replies to every request with a queued task, like the liquid handling server. """
+
+  protocol_version = "HTTP/1.1" # keep-alive
+  disable_nagle_algorithm = True
+
+  def do_POST(self): # pylint: disable=invalid-name
+    data = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"null")
+    num_commands = len(data["commands"]) if self.path.endswith("/batch") else 1
+    time.sleep(REQUEST_TIME + BATCH_COMMAND_TIME * (num_commands - 1))
+    body = json.dumps({"id": 0, "status": "queued"}).encode()
+    self.send_response(200)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, format, *args): # pylint: disable=redefined-builtin
+    pass
+
+
+@contextlib.contextmanager
+def stand_in_server():
+  server = http.server.ThreadingHTTPServer(("localhost", 0), StandInHandler)
+  thread = threading.Thread(target=server.serve_forever, daemon=True)
+  thread.start()
+  try:
+    yield server.server_address[1]
+  finally:
+    server.shutdown()
+    server.server_close()
+
+
+async def legacy_send_command(self: HTTPBackend, command: str,
+                              data: Optional[Dict[str, Any]] = None):
+  assert self.session is not None
+  resp = self.session.post(
+    self.url + command.replace("_", "-"),
+    json=data,
+    headers={"User-Agent": f"pylabrobot/{STANDARD_FORM_JSON_VERSION}"})
+  return cast(dict, resp.json())
+
+
+@contextlib.contextmanager
+def legacy_transport():
+  send_command = HTTPBackend.send_command
+  HTTPBackend.send_command = legacy_send_command # type: ignore[method-assign]
+  try:
+    yield
+  finally:
+    HTTPBackend.send_command = send_command # type: ignore[method-assign]
+
+
+ASPIRATION = {
+  "channels": [{
+    "resource_name": f"plate_well_{i}_0",
+    "offset": {"type": "Coordinate", "x": 0, "y": 0, "z": 0},
+    "tip": {"type": "HamiltonTip", "total_tip_length": 95.1, "has_filter": True,
+            "maximal_volume": 1065, "fitting_depth": 8},
+    "volume": 100,
+    "flow_rate": None,
+    "liquid_height": None,
+    "blow_out_air_volume": None,
+    "liquids": [[None, 100]],
+  } for i in range(8)],
+  "use_channels": list(range(8)),
+}
+
+
+async def measure(port: int, mode: str, number: int, concurrency: int = 4, batch_size: int = 20):
+  """ Returns commands per second and the longest time the event loop was blocked, in ms. """
+
+  backend = HTTPBackend("localhost", port, num_channels=8, max_connections=concurrency)
+  backend.set_deck(STARLetDeck())
+  await backend.setup()
+
+  longest_stall = 0.0
+  done = False
+
+  async def ticker():
+    nonlocal longest_stall
+    while not done:
+      t0 = time.perf_counter()
+      await asyncio.sleep(0.001)
+      longest_stall = max(longest_stall, time.perf_counter() - t0 - 0.001)
+
+  async def send(n: int):
+    for _ in range(n):
+      await backend.send_command("aspirate", data=ASPIRATION)
+
+  ticker_task = asyncio.create_task(ticker())
+  await asyncio.sleep(0.01)
+  t0 = time.perf_counter()
+  if mode == "concurrent":
+    await asyncio.gather(*[send(number // concurrency) for _ in range(concurrency)])
+  elif mode == "batch":
+    for _ in range(number // batch_size):
+      async with backend.batch_commands():
+        await send(batch_size)
+  else:
+    await send(number)
+  duration = time.perf_counter() - t0
+  done = True
+  await ticker_task
+
+  await backend.stop()
+  return number / duration, longest_stall * 1000
+
+
+def main(number: int = 400):
+  with stand_in_server() as port:
+    requests.post(f"http://localhost:{port}/events/setup", json={}, timeout=10) # warm up
+
+    with legacy_transport():
+      results = [("legacy", asyncio.run(measure(port, "sequential", number)))]
+    results += [
+      ("sequential", asyncio.run(measure(port, "sequential", number))),
+      ("4 concurrent", asyncio.run(measure(port, "concurrent", number))),
+      ("batches of 20", asyncio.run(measure(port, "batch", number))),
+    ]
+
+  print(f"{number} aspirate commands, {REQUEST_TIME * 1000:.0f}ms per request")
+  for label, (rate, stall) in results:
+    print(f"{label:>14}: {rate:7.0f} commands/s, event loop blocked for up to {stall:5.1f}ms")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,115 @@
+""" Benchmark importing pylabrobot.
+
+Measures the time to import `pylabrobot`, `pylabrobot.resources` and `pylabrobot.liquid_handling`
+in a fresh interpreter, with the config file, labware catalogs, machine backends, NumPy and IPython
+loaded when they are first used, vs. loading all of them on import, like these imports used to:
+loading the config file and setting up logging, star-importing every labware catalog and backend,
+and importing NumPy for plate volume trackers and IPython for audio.
+
+Also reports the cumulative import time from `python -X importtime` against a budget, and lists the
+slowest modules imported by `import pylabrobot.liquid_handling`. The tests check that importing
+these modules does not import the deferred modules, see `pylabrobot/tests/import_time_tests.py`.
+
+Usage: `python -m benchmarks.import_time`
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict
+
+from pylabrobot import project_root
+
+
+# Cumulative import time budgets in ms, measured with `python -X importtime`. They are a few times
+# the import time on a laptop, to catch modules that are imported on import again, like the labware
+# catalogs, the machine backends and their dependencies, not to measure small changes.
+IMPORT_TIME_BUDGETS = {
+  "pylabrobot": 100,
+  "pylabrobot.resources": 250,
+  "pylabrobot.liquid_handling": 500,
+}
+
+# What importing each module used to load.
+EAGER_IMPORTS = {
+  "pylabrobot": [
+    "pylabrobot.get_config()",
+  ],
+  "pylabrobot.resources": [
+    "pylabrobot.get_config()",
+    "from pylabrobot.resources import *",
+    "import pylabrobot.resources.plate_volume_tracker",
+  ],
+  "pylabrobot.liquid_handling": [
+    "pylabrobot.get_config()",
+    "from pylabrobot.resources import *",
+    "import pylabrobot.resources.plate_volume_tracker",
+    "from pylabrobot.liquid_handling import *",
+    "from pylabrobot.plate_reading import *",
+    "import IPython.display",
+  ],
+}
+
+
+def run_python(code: str, cwd: str, importtime: bool = False) -> str:
+  env = dict(os.environ)
+  env["PYTHONPATH"] = os.pathsep.join(p for p in [str(project_root()), env.get("PYTHONPATH")] if p)
+  args = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code]
+  result = subprocess.run(args, cwd=cwd, env=env, check=True, stdout=subprocess.PIPE,
+    stderr=subprocess.PIPE, universal_newlines=True)
+  return result.stderr if importtime else result.stdout
+
+
+def parse_importtime(output: str) -> Dict[str, float]:
+  """ Parse the output of `python -X importtime` into the cumulative import time of every module,
+  in ms. """
+
+  times = {}
+  for line in output.splitlines():
+    if not line.startswith("import time:"):
+      continue
+    _, cumulative, module = line[len("import time:"):].split("|")
+    if cumulative.strip().isdigit():
+      times[module.strip()] = int(cumulative) / 1000
+  return times
+
+
+def wall_time(module: str, statements, cwd: str, repeat: int) -> float:
+  """ Median wall time of importing `module` and running `statements` in a fresh interpreter, in
+  ms. The first run is a warm-up that writes the bytecode cache. """
+
+  code = "\n".join([
+    "import time",
+    "t0 = time.perf_counter()",
+    f"import {module}",
+    "import pylabrobot",
+    *statements,
+    "print(time.perf_counter() - t0)",
+  ])
+  times = [float(run_python(code, cwd).strip().splitlines()[-1]) * 1000 for _ in range(repeat + 1)]
+  return statistics.median(times[1:])
+
+
+def main(repeat: int = 5):
+  with tempfile.TemporaryDirectory() as tmp: # loading the config writes a config file and a log
+    print(f"{'':>26}  {'lazy':>8}  {'eager':>8}  {'importtime':>10}  {'budget':>8}")
+    for module, budget in IMPORT_TIME_BUDGETS.items():
+      lazy = wall_time(module, [], tmp, repeat)
+      eager = wall_time(module, EAGER_IMPORTS[module], tmp, repeat)
+      importtime = statistics.median(
+        parse_importtime(run_python(f"import {module}", tmp, importtime=True))[module]
+        for _ in range(repeat))
+      over = "  over budget" if importtime > budget else ""
+      print(f"{module:>26}: {lazy:6.1f}ms  {eager:6.1f}ms  {importtime:8.1f}ms  {budget:6.0f}ms"
+            f"{over}")
+
+    times = parse_importtime(run_python("import pylabrobot.liquid_handling", tmp, importtime=True))
+    print("\nslowest modules imported by `import pylabrobot.liquid_handling`:")
+    for name, time in sorted(times.items(), key=lambda item: -item[1])[:10]:
+      print(f"{time:8.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+  main()
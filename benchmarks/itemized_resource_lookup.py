@@ -0,0 +1,57 @@
+""" Benchmark looking up wells on 1536-well plates.
+
+Compares :class:`ItemizedResource` lookups, which use a dict from identifier to index, a cached
+range parser and a single pass over all identifiers in `get_items`, against the original
+implementation that searched `ordering` for every identifier.
+
+Usage: `python -m benchmarks.itemized_resource_lookup`
+"""
+
+import timeit
+
+from pylabrobot.resources.greiner.plates import Gre_1536_Sq
+from pylabrobot.utils.positions import _expand_string_range
+
+
+def legacy_get_item(plate, identifier):
+  if isinstance(identifier, str):
+    identifier = plate._ordering.index(identifier) # pylint: disable=protected-access
+  return plate.children[identifier]
+
+
+def legacy_get_items(plate, identifiers):
+  return [legacy_get_item(plate, i) for i in identifiers]
+
+
+def main(number: int = 5):
+  plate = Gre_1536_Sq("plate")
+  identifiers = plate._ordering # pylint: disable=protected-access
+  rows = [f"{row}1:{row}48" for row in ["A", "H", "P", "Z", "AF"]]
+  print(f"{plate.num_items} wells")
+
+  def run(f):
+    return timeit.timeit(f, number=number) / number * 1000
+
+  cases = [
+    ("get_item, every well by name",
+      lambda: [legacy_get_item(plate, i) for i in identifiers],
+      lambda: [plate.get_item(i) for i in identifiers]),
+    ("get_items, every well by name",
+      lambda: legacy_get_items(plate, identifiers),
+      lambda: plate.get_items(identifiers)),
+    ("get_items, \"A1:AF48\"",
+      lambda: legacy_get_items(plate, _expand_string_range.__wrapped__("A1:AF48")),
+      lambda: plate.get_items("A1:AF48")),
+    ("get_items, 5 rows",
+      lambda: [legacy_get_items(plate, _expand_string_range.__wrapped__(r)) for r in rows],
+      lambda: [plate.get_items(r) for r in rows]),
+  ]
+  for label, legacy, new in cases:
+    assert legacy() == new()
+    legacy_time, new_time = run(legacy), run(new)
+    print(f"{label:>30}: legacy {legacy_time:8.2f}ms, indexed {new_time:6.2f}ms "
+          f"({legacy_time / new_time:.0f}x)")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,129 @@
+""" Load test the liquid handling server with a :class:`ChatterBoxBackend`.
+
+Several client threads post pick up and drop tip commands to the Flask app as fast as they can,
+while the number of threads in the process and the number of tasks kept by the server are
+sampled. Compares the :class:`TaskQueue` of the server, which runs tasks one at a time on a single
+event loop and evicts finished tasks, against the original implementation that started a new
+thread and event loop for every task and kept every task forever.
+
+Usage: `python -m benchmarks.lh_server_load`
+"""
+
+import asyncio
+import contextlib
+import os
+import threading
+import time
+from typing import Tuple
+
+from pylabrobot.liquid_handling import LiquidHandler
+from pylabrobot.liquid_handling.backends import ChatterBoxBackend
+from pylabrobot.resources import HTF_L, TIP_CAR_480_A00, Coordinate, no_tip_tracking
+from pylabrobot.resources.hamilton import HamiltonDeck, STARLetDeck
+from pylabrobot.serializer import serialize
+from pylabrobot.server.liquid_handling_server import Task, TaskQueue, create_app
+
+
+class LegacyTaskQueue(TaskQueue):
+  """ Runs every task in a new thread with a new event loop, and keeps every task. """
+
+  def add(self, task: Task) -> Task:
+    with self._lock:
+      task.id = self._next_id
+      self._next_id += 1
+      self._tasks[task.id] = task
+
+    def runner():
+      task.status = "running"
+      loop = asyncio.new_event_loop()
+      asyncio.set_event_loop(loop)
+      try:
+        loop.run_until_complete(task.co)
+      except Exception as e:  # pylint: disable=broad-except
+        task.error = str(e)
+        task.status = "error"
+      else:
+        task.status = "succeeded"
+
+    threading.Thread(target=runner).start()
+    return task
+
+
+def make_deck() -> HamiltonDeck:
+  deck = STARLetDeck()
+  tip_car = TIP_CAR_480_A00(name="tip_carrier")
+  tip_car[0] = HTF_L(name="tips")
+  deck.assign_child_resource(tip_car, rails=1)
+  return deck
+
+
+def run(task_queue: TaskQueue, num_clients: int, commands_per_client: int
+        ) -> Tuple[float, float, int, int]:
+  """ Returns the number of requests per second, the time until all tasks finished, the largest
+  number of threads and the number of tasks kept by the server. """
+
+  lh = LiquidHandler(backend=ChatterBoxBackend(), deck=make_deck())
+  app = create_app(lh=lh, task_queue=task_queue)
+  with app.test_client() as client:
+    client.post("/setup")
+  while not lh.setup_finished:
+    time.sleep(0.01)
+
+  tip_spot = lh.deck.get_resource("tips_tipspot_0_0")
+  with no_tip_tracking():
+    tip = serialize(tip_spot.get_tip()) # type: ignore[attr-defined]
+  data = {"channels": [{"resource_name": tip_spot.name, "tip": tip,
+                        "offset": serialize(Coordinate.zero())}], "use_channels": [0]}
+
+  max_threads = threading.active_count()
+  done = threading.Event()
+
+  def sample_threads():
+    nonlocal max_threads
+    while not done.is_set():
+      max_threads = max(max_threads, threading.active_count())
+      time.sleep(0.001)
+
+  def client_thread():
+    with app.test_client() as client:
+      for i in range(commands_per_client):
+        endpoint = "/pick-up-tips" if i % 2 == 0 else "/drop-tips"
+        response = client.post(endpoint, json=data)
+        assert response.json is not None and "id" in response.json, response.json
+
+  sampler = threading.Thread(target=sample_threads)
+  sampler.start()
+  clients = [threading.Thread(target=client_thread) for _ in range(num_clients)]
+  t0 = time.perf_counter()
+  for c in clients:
+    c.start()
+  for c in clients:
+    c.join()
+  requests_time = time.perf_counter() - t0
+  # pylint: disable-next=protected-access
+  while any(t.status in {"queued", "running"} for t in task_queue._tasks.values()):
+    time.sleep(0.001)
+  finished_time = time.perf_counter() - t0
+  done.set()
+  sampler.join()
+
+  num_kept = len(task_queue.get_all())
+  task_queue.stop()
+  num_requests = num_clients * commands_per_client
+  return num_requests / requests_time, finished_time, max_threads, num_kept
+
+
+def main(num_clients: int = 8, commands_per_client: int = 250):
+  with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+    legacy = run(LegacyTaskQueue(), num_clients, commands_per_client)
+    queue = run(TaskQueue(max_unfinished=num_clients * commands_per_client, max_finished=100),
+                num_clients, commands_per_client)
+
+  print(f"{num_clients} clients, {commands_per_client} commands each")
+  for label, (rate, finished, threads, kept) in [("legacy", legacy), ("task queue", queue)]:
+    print(f"{label:>10}: {rate:6.0f} requests/s, all tasks finished after {finished:5.2f}s, "
+          f"up to {threads:3d} threads, {kept:4d} tasks kept")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,118 @@
+""" Benchmark volume tracking for whole plates.
+
+Compares a :class:`~pylabrobot.resources.PlateVolumeTracker`, which keeps the liquids in all wells
+of a plate in NumPy arrays, against a `VolumeTracker` per well:
+
+- the memory held by the volume trackers of a 1536-well plate with liquid in every well,
+- the time to remove liquid from 96 wells and commit, in the tracker alone,
+- the time per 96-head stamp (`aspirate96` from one 96-well plate and `dispense96` to another) on a
+  liquid handler with a `SaverBackend`, with volume tracking enabled.
+
+Usage: `python -m benchmarks.plate_volume_tracking`
+"""
+
+import asyncio
+import gc
+import time
+import timeit
+import tracemalloc
+
+from pylabrobot.liquid_handling import LiquidHandler
+from pylabrobot.liquid_handling.backends import SaverBackend
+from pylabrobot.resources import (
+  Coordinate,
+  Cor_96_wellplate_360ul_Fb,
+  Gre_1536_Sq,
+  STARLetDeck,
+  set_tip_tracking,
+  set_volume_tracking,
+)
+from pylabrobot.resources.liquid import Liquid
+from pylabrobot.resources.ml_star import STF_L
+
+
+def tracker_memory(use_plate_tracker: bool) -> float:
+  """ Bytes held by the volume trackers of a 1536-well plate, per well. """
+
+  gc.collect()
+  tracemalloc.start()
+  plate = Gre_1536_Sq("plate")
+  plate.set_well_liquids((Liquid.WATER, 5))
+  if use_plate_tracker:
+    plate.use_plate_volume_tracker()
+  gc.collect()
+  with_trackers = tracemalloc.get_traced_memory()[0]
+  plate.volume_tracker = None
+  for well in plate.get_all_items():
+    well.tracker = None # type: ignore[assignment]
+  gc.collect()
+  without_trackers = tracemalloc.get_traced_memory()[0]
+  tracemalloc.stop()
+  return (with_trackers - without_trackers) / plate.num_items
+
+
+def tracker_time(use_plate_tracker: bool, number: int) -> float:
+  """ Milliseconds to remove liquid from 96 wells of a 1536-well plate and commit. """
+
+  plate = Gre_1536_Sq("plate")
+  plate.set_well_liquids((Liquid.WATER, 10))
+  wells = plate.get_all_items()[:96]
+
+  if use_plate_tracker:
+    plate_tracker = plate.use_plate_volume_tracker()
+    indices = list(range(96))
+    def stamp():
+      plate_tracker.remove_liquid(0.001, wells=indices)
+      plate_tracker.commit(wells=indices)
+  else:
+    def stamp():
+      for well in wells:
+        well.tracker.remove_liquid(0.001)
+      for well in wells:
+        well.tracker.commit()
+
+  return timeit.timeit(stamp, number=number) / number * 1000
+
+
+async def stamp_time(use_plate_tracker: bool, number: int) -> float:
+  """ Milliseconds per `aspirate96` and `dispense96` with volume tracking. """
+
+  deck = STARLetDeck()
+  lh = LiquidHandler(backend=SaverBackend(num_channels=8), deck=deck)
+  tip_rack = STF_L(name="tip_rack")
+  source = Cor_96_wellplate_360ul_Fb(name="source")
+  target = Cor_96_wellplate_360ul_Fb(name="target")
+  deck.assign_child_resource(tip_rack, location=Coordinate(0, 0, 0))
+  deck.assign_child_resource(source, location=Coordinate(100, 100, 0))
+  deck.assign_child_resource(target, location=Coordinate(300, 100, 0))
+  await lh.setup()
+  source.set_well_liquids((Liquid.WATER, 300))
+  if use_plate_tracker:
+    source.use_plate_volume_tracker()
+    target.use_plate_volume_tracker()
+  await lh.pick_up_tips96(tip_rack)
+
+  t0 = time.perf_counter()
+  for _ in range(number):
+    await lh.aspirate96(source, volume=1)
+    await lh.dispense96(target, volume=1)
+  elapsed = time.perf_counter() - t0
+  assert target.get_well("H12").tracker.get_used_volume() == number
+  await lh.stop()
+  return elapsed / number * 1000
+
+
+def main(number: int = 200):
+  set_tip_tracking(True)
+  set_volume_tracking(True)
+
+  for label, use_plate_tracker in [("tracker per well", False), ("plate tracker", True)]:
+    memory = tracker_memory(use_plate_tracker)
+    remove_commit = tracker_time(use_plate_tracker, number)
+    stamp = asyncio.run(stamp_time(use_plate_tracker, number))
+    print(f"{label:>16}: {memory:6.0f} bytes per well of a 1536-well plate, "
+          f"remove and commit 96 wells {remove_commit:6.3f}ms, 96-head stamp {stamp:6.3f}ms")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,153 @@
+# pylint: disable=protected-access
+""" Benchmark how soon waits for a device return after the device is ready.
+
+A fake temperature controller reaches its target, and a fake CLARIOStar becomes ready, after a
+random time. Compares polling with exponential backoff (`pylabrobot.machines.polling.poll_until`)
+against the original fixed ticks: every 1s for `TemperatureController.wait_for_temperature` and
+every 100ms for `CLARIOStar._wait_for_ready_and_return`. Reports the mean and maximum time between
+the device becoming ready and the wait returning, and the number of polls per wait. Prints the wait
+timing histograms at the end.
+
+Usage: `python -m benchmarks.polling_latency`
+"""
+
+import asyncio
+import contextlib
+import random
+import statistics
+import time
+from typing import List, Tuple
+
+from pylabrobot.machines.polling import get_wait_timings, reset_wait_timings
+from pylabrobot.plate_reading.clario_star import CLARIOStar
+from pylabrobot.temperature_controlling import TemperatureController
+from pylabrobot.temperature_controlling.backend import TemperatureControllerBackend
+
+
+async def legacy_wait_for_temperature(self: TemperatureController, timeout: float = 300.0,
+                                      tolerance: float = 0.5, backoff=None):
+  del backoff
+  assert self.target_temperature is not None
+  start = time.time()
+  while time.time() - start < timeout:
+    temperature = await self.get_temperature()
+    if abs(temperature - self.target_temperature) < tolerance:
+      return
+    await asyncio.sleep(1.0)
+  raise TimeoutError(f"Temperature did not reach target temperature within {timeout} seconds.")
+
+
+async def legacy_wait_for_ready_and_return(self: CLARIOStar, ret, timeout=150):
+  t = time.time()
+  while time.time() - t < timeout:
+    await asyncio.sleep(0.1)
+    command_status = await self.read_command_status()
+    if command_status[5] == 0x05:
+      return ret
+  return None
+
+
+@contextlib.contextmanager
+def legacy_polling():
+  wait_for_temperature = TemperatureController.wait_for_temperature
+  wait_for_ready_and_return = CLARIOStar._wait_for_ready_and_return
+  TemperatureController.wait_for_temperature = legacy_wait_for_temperature # type: ignore
+  CLARIOStar._wait_for_ready_and_return = legacy_wait_for_ready_and_return # type: ignore
+  try:
+    yield
+  finally:
+    TemperatureController.wait_for_temperature = wait_for_temperature # type: ignore
+    CLARIOStar._wait_for_ready_and_return = wait_for_ready_and_return # type: ignore
+
+
+class FakeTemperatureControllerBackend(TemperatureControllerBackend):
+  """ Reaches the target temperature `ramp_time` seconds after it is set. """
+
+  def __init__(self):
+    self.ramp_time = 0.0
+    self.target = 20.0
+    self.ready_at = 0.0
+    self.polls = 0
+
+  async def setup(self):
+    pass
+
+  async def stop(self):
+    pass
+
+  async def set_temperature(self, temperature: float):
+    self.target, self.ready_at = temperature, time.monotonic() + self.ramp_time
+
+  async def get_current_temperature(self) -> float:
+    self.polls += 1
+    await asyncio.sleep(0.002) # serial round trip
+    return self.target if time.monotonic() >= self.ready_at else 20.0
+
+  async def deactivate(self):
+    pass
+
+
+class FakeCLARIOStar(CLARIOStar):
+  """ Reports busy until `ready_at`, then ready. """
+
+  def __init__(self):
+    super().__init__()
+    self.ready_at = 0.0
+    self.polls = 0
+
+  async def read_command_status(self) -> bytes:
+    self.polls += 1
+    await asyncio.sleep(0.002) # USB round trip
+    state = 0x05 if time.monotonic() >= self.ready_at else 0x25
+    return b"\x02\x00\x18\x0c\x01" + bytes([state]) + b"\x00" * 18
+
+
+async def temperature_waits(ramp_times: List[float]) -> Tuple[List[float], float]:
+  backend = FakeTemperatureControllerBackend()
+  tc = TemperatureController(name="tc", size_x=1, size_y=1, size_z=1, backend=backend)
+  await tc.setup()
+  late = []
+  for ramp_time in ramp_times:
+    backend.ramp_time = ramp_time
+    await tc.set_temperature(37)
+    await tc.wait_for_temperature()
+    late.append((time.monotonic() - backend.ready_at) * 1000)
+  return late, backend.polls / len(ramp_times)
+
+
+async def ready_waits(busy_times: List[float]) -> Tuple[List[float], float]:
+  clario_star = FakeCLARIOStar()
+  late = []
+  for busy_time in busy_times:
+    clario_star.ready_at = time.monotonic() + busy_time
+    await clario_star._wait_for_ready_and_return(None)
+    late.append((time.monotonic() - clario_star.ready_at) * 1000)
+  return late, clario_star.polls / len(busy_times)
+
+
+def main(number: int = 10):
+  random.seed(0)
+  ramp_times = [random.uniform(0.5, 3) for _ in range(number)]
+  busy_times = [random.uniform(0.01, 0.5) for _ in range(number * 5)]
+
+  with legacy_polling():
+    results = [
+      ("temperature, legacy", asyncio.run(temperature_waits(ramp_times))),
+      ("clario star, legacy", asyncio.run(ready_waits(busy_times))),
+    ]
+  reset_wait_timings()
+  results += [
+    ("temperature, backoff", asyncio.run(temperature_waits(ramp_times))),
+    ("clario star, backoff", asyncio.run(ready_waits(busy_times))),
+  ]
+
+  for label, (late, polls) in results:
+    print(f"{label:>20}: returned {statistics.mean(late):6.1f}ms (max {max(late):6.1f}ms) after "
+          f"the device was ready, {polls:5.1f} polls per wait")
+  print()
+  for timings in get_wait_timings().values():
+    print(timings)
+
+
+if __name__ == "__main__":
+  main()
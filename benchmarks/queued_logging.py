@@ -0,0 +1,115 @@
+# pylint: disable=protected-access
+""" Benchmark how long logging blocks the event loop while a STAR sends commands at a high rate.
+
+A STAR backend sends commands to a fake USB device that answers immediately, with the `pylabrobot`
+logger at INFO, so every command and response is logged. The log files are written by file handlers
+that stall for 50ms every 200 records, like a disk that is busy flushing. Compares writing the log
+file on the thread that logs, which is how logging is set up by default, with writing it on a
+listener thread through a bounded queue (`Config.Logging.queue`), with and without the JSONL command
+trace (`Config.Logging.command_trace`), and with each overflow policy for a queue of 100 records
+that fills up because the disk is slower than the commands are logged. Commands sent without logging
+show how late the event loop is without logging.
+
+Reports commands per second, the longest and 99th percentile time the event loop was blocked,
+measured by a coroutine that wakes up every millisecond, and the number of dropped log records.
+
+Usage: `python -m benchmarks.queued_logging`
+"""
+
+import asyncio
+import contextlib
+import logging
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+import pylabrobot
+from pylabrobot import setup_logger
+from pylabrobot.liquid_handling.backends.hamilton.STAR import STAR
+
+from tests.usb import FakeUSBDevice, MockEndpoint
+
+STALL_EVERY = 200
+STALL_TIME = 0.05
+
+
+@contextlib.contextmanager
+def slow_disk():
+  """ Make file handlers stall for `STALL_TIME` seconds every `STALL_EVERY` records. """
+
+  emit = logging.FileHandler.emit
+  count = 0
+
+  def slow_emit(self, record):
+    nonlocal count
+    count += 1
+    if count % STALL_EVERY == 0:
+      time.sleep(STALL_TIME)
+    emit(self, record)
+
+  logging.FileHandler.emit = slow_emit # type: ignore[method-assign]
+  try:
+    yield
+  finally:
+    logging.FileHandler.emit = emit # type: ignore[method-assign]
+
+
+async def measure(n: int, concurrency: int = 4):
+  """ Returns commands per second and the sorted times the event loop was late, in seconds. """
+
+  star = STAR(packet_read_timeout=1, read_timeout=10)
+  star.dev = FakeUSBDevice() # type: ignore
+  star.read_endpoint = MockEndpoint() # type: ignore
+  star.write_endpoint = MockEndpoint() # type: ignore
+
+  done = False
+  stalls = []
+
+  async def ticker():
+    while not done:
+      t0 = time.perf_counter()
+      await asyncio.sleep(0.001)
+      stalls.append(time.perf_counter() - t0 - 0.001)
+
+  async def send(num: int):
+    for _ in range(num):
+      await star.send_command("C0", command="QM")
+
+  ticker_task = asyncio.create_task(ticker())
+  t = time.perf_counter()
+  await asyncio.gather(*[send(n // concurrency) for _ in range(concurrency)])
+  wall = time.perf_counter() - t
+  done = True
+  await ticker_task
+  star._stop_reading_thread()
+  return n / wall, sorted(stalls)
+
+
+def main(n: int = 5000):
+  modes: List[Tuple[str, Dict[str, Any]]] = [
+    ("no logging", {"level": logging.WARNING}),
+    ("sync", {}),
+    ("sync+trace", {"command_trace": True}),
+    ("queued", {"queue": True}),
+    ("queued+trace", {"queue": True, "command_trace": True}),
+    ("queued 100 drop", {"queue": True, "queue_size": 100}),
+    ("queued 100 oldest", {"queue": True, "queue_size": 100, "overflow": "drop_oldest"}),
+    ("queued 100 block", {"queue": True, "queue_size": 100, "overflow": "block"}),
+  ]
+
+  with tempfile.TemporaryDirectory() as tmp, slow_disk():
+    print(f"{'':>20}  {'cmds/s':>8}  {'max stall':>10}  {'p99 stall':>10}  {'dropped':>8}")
+    for name, options in modes:
+      setup_logger(tmp, **{"level": logging.INFO, **options})
+      rate, stalls = asyncio.run(measure(n))
+      queued = pylabrobot._queued_logging
+      dropped = queued.handler.dropped if queued is not None else 0
+      setup_logger(tmp, logging.INFO) # wait for the queued records to be written
+      print(f"{name:>20}: {rate:8.0f}  {stalls[-1] * 1000:8.1f}ms  "
+            f"{stalls[int(len(stalls) * 0.99)] * 1000:8.1f}ms  {dropped:8d}")
+    for handler in logging.getLogger("pylabrobot").handlers:
+      handler.close()
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,97 @@
+""" Benchmark resolving the absolute location of every well and tip spot on a loaded deck.
+
+Compares :meth:`Resource.get_absolute_location`, which caches the absolute location and rotation of
+every resource until the resource tree changes, against the original implementation that walked up
+to the deck and recomputed the rotation matrix of every parent on each call.
+
+Usage: `python -m benchmarks.resource_absolute_location`
+"""
+
+import timeit
+
+from pylabrobot.resources import (
+  Coordinate,
+  Cor_96_wellplate_360ul_Fb,
+  Gre_1536_Sq,
+  HTF_L,
+  PLT_CAR_L5AC_A00,
+  TIP_CAR_480_A00,
+  Resource,
+  STARLetDeck,
+)
+from pylabrobot.utils.linalg import matrix_vector_multiply_3x3
+
+
+def legacy_get_absolute_rotation(resource: Resource):
+  if resource.parent is None:
+    return resource.rotation
+  return legacy_get_absolute_rotation(resource.parent) + resource.rotation
+
+
+def legacy_get_absolute_location(resource: Resource, x: str = "l", y: str = "f", z: str = "b"):
+  assert resource.location is not None
+  if resource.parent is None:
+    return resource.location
+  parent_pos = legacy_get_absolute_location(resource.parent)
+  parent_rotation_matrix = legacy_get_absolute_rotation(resource.parent).get_rotation_matrix()
+  local_vector = (resource.location + resource.get_anchor(x=x, y=y, z=z)).vector()
+  rotated_position = Coordinate(*matrix_vector_multiply_3x3(parent_rotation_matrix, local_vector))
+  return parent_pos + rotated_position
+
+
+def legacy_get_size_x(resource: Resource):
+  # pylint: disable=protected-access
+  rot_mat = legacy_get_absolute_rotation(resource).get_rotation_matrix()
+  size_x, size_y, size_z = resource._size_x, resource._size_y, resource._size_z
+  corners = [Coordinate(*matrix_vector_multiply_3x3(rot_mat, corner.vector())) for corner in [
+    Coordinate(0, 0, 0), Coordinate(size_x, 0, 0), Coordinate(0, size_y, 0),
+    Coordinate(size_x, size_y, 0), Coordinate(0, 0, size_z), Coordinate(size_x, 0, size_z),
+    Coordinate(0, size_y, size_z), Coordinate(size_x, size_y, size_z)]]
+  return max(c.x for c in corners) - min(c.x for c in corners)
+
+
+def make_deck() -> STARLetDeck:
+  deck = STARLetDeck()
+  tip_car = TIP_CAR_480_A00(name="tip_carrier")
+  for i in range(5):
+    tip_car[i] = HTF_L(name=f"tips_{i}")
+  deck.assign_child_resource(tip_car, rails=1)
+  plt_car = PLT_CAR_L5AC_A00(name="plate_carrier")
+  for i in range(4):
+    plt_car[i] = Cor_96_wellplate_360ul_Fb(name=f"plate_{i}")
+  plt_car[4] = Gre_1536_Sq(name="plate_1536")
+  deck.assign_child_resource(plt_car, rails=15)
+  return deck
+
+
+def main(number: int = 5):
+  deck = make_deck()
+  leaves = [r for r in deck.get_all_children() if len(r.children) == 0]
+  print(f"{len(leaves)} wells and tip spots")
+
+  def run(f):
+    return timeit.timeit(f, number=number) / number * 1000
+
+  def invalidate():
+    deck.location = deck.location # clears the cache of the whole tree
+
+  cases = [
+    ("lfb", lambda: [legacy_get_absolute_location(r) for r in leaves],
+      lambda: [r.get_absolute_location() for r in leaves]),
+    ("center bottom", lambda: [legacy_get_absolute_location(r, "c", "c", "b") for r in leaves],
+      lambda: [r.get_absolute_location("c", "c", "b") for r in leaves]),
+    ("get_size_x", lambda: [legacy_get_size_x(r) for r in leaves],
+      lambda: [r.get_size_x() for r in leaves]),
+  ]
+  for label, legacy, cached in cases:
+    invalidate()
+    assert legacy() == cached()
+    legacy_time = run(legacy)
+    cold_time = run(lambda f=cached: (invalidate(), f()))
+    warm_time = run(cached)
+    print(f"{label:>14}: legacy {legacy_time:7.2f}ms, cold cache {cold_time:6.2f}ms, "
+          f"warm cache {warm_time:6.2f}ms ({legacy_time / warm_time:.0f}x)")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,96 @@
+""" Benchmark copying a deck and taking and restoring snapshots of its state.
+
+Compares :meth:`Resource.copy`, which deep copies the resource tree directly, against the original
+implementation that deserialized the serialized deck and loaded its serialized state. Also compares
+:meth:`Resource.snapshot_all_state` and :meth:`Resource.restore_all_state` against
+:meth:`Resource.serialize_all_state` and :meth:`Resource.load_all_state`.
+
+The deck is a STARLet deck with four 384-well plates with liquid in every well, and five racks of
+tips.
+
+Usage: `python -m benchmarks.resource_copy`
+"""
+
+import timeit
+from typing import cast
+
+from pylabrobot.resources import (
+  HTF_L,
+  PLT_CAR_L5AC_A00,
+  TIP_CAR_480_A00,
+  Plate,
+  Resource,
+  Revvity_384_wellplate_28ul_Ub,
+  STARLetDeck,
+  TipRack,
+  set_tip_tracking,
+  set_volume_tracking,
+)
+from pylabrobot.resources.hamilton import HamiltonDeck
+from pylabrobot.resources.liquid import Liquid
+
+
+def legacy_copy(resource: Resource) -> Resource:
+  resource_copy = resource.__class__.deserialize(resource.serialize(), allow_marshal=True)
+  resource_copy.load_all_state(resource.serialize_all_state())
+  return resource_copy
+
+
+def make_deck() -> HamiltonDeck:
+  deck = STARLetDeck()
+  tip_car = TIP_CAR_480_A00(name="tip_carrier")
+  for i in range(5):
+    tip_car[i] = HTF_L(name=f"tips_{i}")
+  deck.assign_child_resource(tip_car, rails=1)
+  plt_car = PLT_CAR_L5AC_A00(name="plate_carrier")
+  for i in range(4):
+    plate = Revvity_384_wellplate_28ul_Ub(name=f"plate_{i}")
+    plate.set_well_liquids((Liquid.WATER, 20))
+    plt_car[i] = plate
+  deck.assign_child_resource(plt_car, rails=15)
+  return deck
+
+
+def main(number: int = 5):
+  set_tip_tracking(True)
+  set_volume_tracking(True)
+  deck = make_deck()
+  print(f"{len(deck.get_all_children())} resources")
+
+  def run(f, n: int = number):
+    return timeit.timeit(f, number=n) / n * 1000
+
+  deck_copy = deck.copy()
+  assert deck_copy == legacy_copy(deck)
+  assert deck_copy.serialize_all_state() == deck.serialize_all_state()
+  legacy, native = run(lambda: legacy_copy(deck)), run(deck.copy)
+  print(f"              copy: legacy {legacy:7.2f}ms, native {native:7.2f}ms "
+        f"({legacy / native:.0f}x)")
+
+  state = deck.serialize_all_state()
+  snapshot = deck.snapshot_all_state()
+  legacy, native = run(deck.serialize_all_state, 20), run(deck.snapshot_all_state, 20)
+  print(f"     take snapshot: legacy {legacy:7.2f}ms, native {native:7.2f}ms "
+        f"({legacy / native:.0f}x)")
+
+  # change the state of one plate and one tip rack, then restore
+  def change():
+    cast(Plate, deck.get_resource("plate_0")).get_well("A1").tracker.remove_liquid(10)
+    cast(TipRack, deck.get_resource("tips_0")).get_item("A1").tracker.remove_tip(commit=True)
+
+  def legacy_restore():
+    change()
+    deck.load_all_state(state)
+
+  def native_restore():
+    change()
+    deck.restore_all_state(snapshot)
+
+  legacy, native = run(legacy_restore, 20), run(native_restore, 20)
+  assert deck.serialize_all_state() == state
+  print(f"  change + restore: legacy {legacy:7.2f}ms, native {native:7.2f}ms "
+        f"({legacy / native:.0f}x)")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,108 @@
+""" Benchmark querying resources on a deck with tens of thousands of resources.
+
+Loads a deck with 1536-well plates, and compares queries on the deck's
+:class:`~pylabrobot.resources.ResourceIndex` by type, name prefix, category, box and nearest
+location against scanning every resource on the deck. Also compares the iterative
+`Resource.get_resource` against the original recursive search, which raised and caught an exception
+for every resource that did not contain the name, and reports the time to load the deck and to build
+the spatial grid.
+
+Usage: `python -m benchmarks.resource_queries`
+"""
+
+import math
+import time
+import timeit
+
+from pylabrobot.resources import Coordinate, Deck, Plate, Resource, ResourceNotFoundError, Well
+from pylabrobot.resources.greiner.plates import Gre_1536_Sq
+from pylabrobot.resources.utils import query
+
+
+def legacy_get_resource(resource: Resource, name: str) -> Resource:
+  if resource.name == name:
+    return resource
+  for child in resource.children:
+    try:
+      return legacy_get_resource(child, name)
+    except ResourceNotFoundError:
+      pass
+  raise ResourceNotFoundError(f"Resource with name '{name}' does not exist.")
+
+
+def scan_within(deck: Deck, min_corner: Coordinate, max_corner: Coordinate):
+  found = []
+  for resource in deck.get_all_children():
+    location = resource.get_absolute_location()
+    if min_corner.x <= location.x <= max_corner.x and min_corner.y <= location.y <= max_corner.y \
+      and min_corner.z <= location.z <= max_corner.z:
+      found.append(resource)
+  return found
+
+
+def scan_nearest(deck: Deck, location: Coordinate, type_, k: int):
+  def distance(resource):
+    return math.dist(resource.get_absolute_location().vector(), location.vector())
+  resources = [r for r in deck.get_all_children() if isinstance(r, type_)]
+  return sorted(resources, key=distance)[:k]
+
+
+def main(number: int = 5, num_plates: int = 30):
+  t0 = time.perf_counter()
+  deck = Deck()
+  for i in range(num_plates):
+    deck.assign_child_resource(Gre_1536_Sq(f"plate_{i}"),
+                               location=Coordinate(x=(i % 10) * 130, y=(i // 10) * 100, z=0))
+  load_time = time.perf_counter() - t0
+  t0 = time.perf_counter()
+  deck.index.nearest(Coordinate.zero())
+  grid_time = time.perf_counter() - t0
+  print(f"{len(deck.index)} resources, loaded in {load_time:.2f}s, grid built in "
+        f"{grid_time * 1000:.0f}ms")
+
+  box = (Coordinate(130, 100, 0), Coordinate(160, 120, 20))
+  location = Coordinate(400, 150, 5)
+  last_well = deck.get_all_children()[-1].name
+
+  def run(f):
+    return timeit.timeit(f, number=number) / number * 1000
+
+  cases = [
+    ("plates by type",
+      lambda: [r for r in deck.get_all_children() if isinstance(r, Plate)],
+      lambda: deck.index.by_type(Plate)),
+    ("plates by type, utils.query",
+      lambda: query(deck, Plate),
+      lambda: deck.index.by_type(Plate)),
+    ("wells by name prefix",
+      lambda: [r for r in deck.get_all_children() if r.name.startswith("plate_7_")],
+      lambda: deck.index.by_name_prefix("plate_7_")),
+    ("plates by category",
+      lambda: [r for r in deck.get_all_children() if r.category == "plate"],
+      lambda: deck.index.by_category("plate")),
+    ("resources within a box",
+      lambda: scan_within(deck, *box),
+      lambda: deck.index.within(*box)),
+    ("wells by prefix within a box",
+      lambda: [r for r in scan_within(deck, *box) if isinstance(r, Well) and
+               r.name.startswith("plate_1_")],
+      lambda: deck.index.query(Well, name_prefix="plate_1_", box=box)),
+    ("8 nearest wells",
+      lambda: scan_nearest(deck, location, Well, k=8),
+      lambda: deck.index.nearest(location, type_=Well, k=8)),
+    ("get_resource, last well",
+      lambda: legacy_get_resource(deck, last_well),
+      lambda: Resource.get_resource(deck, last_well)),
+    ("get_resource, last well, deck",
+      lambda: legacy_get_resource(deck, last_well),
+      lambda: deck.get_resource(last_well)),
+  ]
+  for label, legacy, new in cases:
+    assert legacy() == new(), label
+    legacy_time, new_time = run(legacy), run(new)
+    print(f"{label:>30}: scan {legacy_time:8.2f}ms, indexed {new_time:7.3f}ms "
+          f"({legacy_time / new_time:.0f}x)")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,129 @@
+""" Benchmark STAR firmware string parsing.
+
+Compares :func:`parse_star_fw_string`, which compiles each format string once and extracts all
+parameters in a single pass, against the original implementation that built and ran a regex per
+parameter on every call.
+
+Usage: `python -m benchmarks.star_fw_parsing`
+"""
+
+import re
+import timeit
+
+from pylabrobot.liquid_handling.backends.hamilton.STAR import (
+  compile_star_fw_format,
+  parse_star_fw_string,
+)
+
+
+def legacy_parse_star_fw_string(resp: str, fmt: str = "") -> dict:
+  """ The original implementation of `parse_star_fw_string`, kept for comparison.
+  """
+
+  # Remove device and cmd identifier from response.
+  resp = resp[4:]
+
+  # Parse the parameters in the fmt string.
+  info = {}
+
+  def find_param(param):
+    name, data = param[0:2], param[2:]
+    type_ = {
+      "#": "int",
+      "*": "hex",
+      "&": "str"
+    }[data[0]]
+
+    # Build a regex to match this parameter.
+    exp = {
+      "int": r"[-+]?[\d ]",
+      "hex": r"[\da-fA-F ]",
+      "str": ".",
+    }[type_]
+    len_ = len(data.split(" ")[0]) # Get length of first block.
+    regex = f"{name}((?:{exp}{ {len_} }"
+
+    if param.endswith(" (n)"):
+      regex += " ?)+)"
+      is_list = True
+    else:
+      regex += "))"
+      is_list = False
+
+    # Match response against regex, save results in right datatype.
+    r = re.search(regex, resp)
+    if r is None:
+      raise ValueError(f"could not find matches for parameter {name}")
+
+    g = r.groups()
+    if len(g) == 0:
+      raise ValueError(f"could not find value for parameter {name}")
+    m = g[0]
+
+    if is_list:
+      m = m.split(" ")
+
+      if type_ == "str":
+        info[name] = m
+      elif type_ == "int":
+        info[name] = [int(m_) for m_ in m if m_ != ""]
+      elif type_ == "hex":
+        info[name] = [int(m_, base=16) for m_ in m if m_ != ""]
+    else:
+      if type_ == "str":
+        info[name] = m
+      elif type_ == "int":
+        info[name] = int(m)
+      elif type_ == "hex":
+        info[name] = int(m, base=16)
+
+  # Find params in string. All params are identified by 2 lowercase chars.
+  param = ""
+  prevchar = None
+  for char in fmt:
+    if char.islower() and prevchar != "(":
+      if len(param) > 2:
+        find_param(param)
+        param = ""
+    param += char
+    prevchar = char
+  if param != "":
+    find_param(param) # last parameter is not closed by loop.
+
+  # If id not in fmt, add it.
+  if "id" not in info:
+    find_param("id####")
+
+  return info
+
+
+CASES = [
+  ("C0QMid1111", "id####"),
+  ("C0RTid0003rt0 1 0 0 0 0 1 0", "rt# (n)"),
+  ("C0RLid0004lh0120 0130 0140 0150 0160 0170 0180 0190", "lh#### (n)"),
+  ("C0QWid0005qw1", "qw#"),
+  (
+    "C0RMid0006ka00e020ke000a3f1cxt30xa30xw13400xl29xn07xr06xo01xm03600xx11400xu3700xv0000kc1kr1"
+    "ys090",
+    "ka******ke********xt##xa##xw#####xl**xn**xr**xo**xm#####xx#####xu####xv####kc#kr#ys###",
+  ),
+  ("C0RFid0007rf7.5K 2023-01-05 (GRU C0)", "rf" + "&" * 24),
+]
+
+
+def main(number: int = 20_000):
+  for resp, fmt in CASES:
+    assert parse_star_fw_string(resp, fmt) == legacy_parse_star_fw_string(resp, fmt), (resp, fmt)
+
+  print(f"{'format':<40} {'legacy (us)':>12} {'compiled (us)':>14} {'speedup':>8}")
+  for resp, fmt in CASES:
+    legacy = timeit.timeit(lambda r=resp, f=fmt: legacy_parse_star_fw_string(r, f), number=number)
+    compiled = timeit.timeit(lambda r=resp, f=fmt: parse_star_fw_string(r, f), number=number)
+    print(f"{fmt[:40]:<40} {legacy / number * 1e6:>12.2f} {compiled / number * 1e6:>14.2f} "
+          f"{legacy / compiled:>7.1f}x")
+
+  print(compile_star_fw_format.cache_info())
+
+
+if __name__ == "__main__":
+  main()
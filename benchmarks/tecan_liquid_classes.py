@@ -0,0 +1,42 @@
+""" Benchmark Tecan liquid class lookups.
+
+Compares :func:`get_liquid_class`, which uses an index of sorted volume intervals per (liquid, tip
+type), against a linear scan over all registered liquid classes.
+
+Usage: `python -m benchmarks.tecan_liquid_classes`
+"""
+
+import timeit
+
+from pylabrobot.liquid_handling.liquid_classes.tecan import get_liquid_class, mapping
+from pylabrobot.resources.liquid import Liquid
+from pylabrobot.resources.tecan import TipType
+
+
+def linear_get_liquid_class(target_volume, liquid_class, tip_type):
+  for (mnv, mxv, lc, tt), tlc in mapping.items():
+    if mnv <= target_volume < mxv and lc == liquid_class and tt == tip_type:
+      return tlc
+  return None
+
+
+def main(number: int = 100_000):
+  print(f"{len(mapping)} liquid classes")
+  for liquid, tip_type, volume in [
+    (Liquid.DMSO, TipType.STANDARD, 10),
+    (Liquid.WATER, TipType.DITI, 100),
+    (Liquid.SERUM, TipType.AIRDITI, 500),
+  ]:
+    assert get_liquid_class(volume, liquid, tip_type) is \
+      linear_get_liquid_class(volume, liquid, tip_type)
+    linear = timeit.timeit(lambda l=liquid, t=tip_type, v=volume: linear_get_liquid_class(v, l, t),
+      number=number)
+    indexed = timeit.timeit(lambda l=liquid, t=tip_type, v=volume: get_liquid_class(v, l, t),
+      number=number)
+    print(f"{liquid.name:>8} {tip_type.name:>9} {volume:>5}uL: "
+          f"linear {linear / number * 1e6:.2f}us, indexed {indexed / number * 1e6:.2f}us "
+          f"({linear / indexed:.1f}x)")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,157 @@
+""" Benchmark the state updates the :class:`Visualizer` sends to the browser during a plate stamp.
+
+A liquid handler with a :class:`ChatterBoxBackend` stamps a 96-well plate into another with the
+96-head: pick up tips, aspirate, dispense and return the tips, with tip and volume tracking enabled.
+An in-process websocket client plays the browser and counts the `set_state` messages and bytes it
+receives. Compares sending all resources updated in a frame in a single message, against the
+original implementation that sent a message for every state update of every resource.
+
+Usage: `python -m benchmarks.visualizer_state_streaming`
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import threading
+import time
+from typing import Tuple
+
+import websockets
+import websockets.client
+
+from pylabrobot.liquid_handling import LiquidHandler
+from pylabrobot.liquid_handling.backends import ChatterBoxBackend
+from pylabrobot.resources import (
+  Cor_96_wellplate_360ul_Fb,
+  HTF_L,
+  PLT_CAR_L5AC_A00,
+  TIP_CAR_480_A00,
+  Resource,
+  STARLetDeck,
+  set_tip_tracking,
+  set_volume_tracking,
+)
+from pylabrobot.resources.liquid import Liquid
+from pylabrobot.visualizer import Visualizer
+
+
+def legacy_handle_state_update_callback(self: Visualizer, resource: Resource) -> None:
+  data = {resource.name: resource.serialize_state()}
+  fut = self.send_command(event="set_state", data=data, wait_for_response=False)
+  asyncio.run_coroutine_threadsafe(fut, self.loop)
+
+
+@contextlib.contextmanager
+def legacy_state_updates():
+  # pylint: disable=protected-access
+  handle_state_update_callback = Visualizer._handle_state_update_callback
+  Visualizer._handle_state_update_callback = legacy_handle_state_update_callback # type: ignore
+  try:
+    yield
+  finally:
+    Visualizer._handle_state_update_callback = handle_state_update_callback # type: ignore
+
+
+class Browser:
+  """ A websocket client that counts the `set_state` messages it receives, on its own thread. """
+
+  def __init__(self, port: int):
+    self.port = port
+    self.messages = 0
+    self.bytes = 0
+    self.counting = False
+    self._loop = asyncio.new_event_loop()
+    self._stop: "asyncio.Future[None]" = self._loop.create_future()
+    self._connected = threading.Event()
+    self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self._run(),),
+                                    daemon=True)
+
+  async def _run(self):
+    async with websockets.client.connect(f"ws://localhost:{self.port}") as ws:
+      await ws.send(json.dumps({"event": "ready"}))
+      self._connected.set()
+      while True:
+        recv = asyncio.ensure_future(ws.recv())
+        done, _ = await asyncio.wait([recv, self._stop], return_when=asyncio.FIRST_COMPLETED)
+        if recv not in done:
+          recv.cancel()
+          return
+        message = recv.result()
+        if self.counting and json.loads(message)["event"] == "set_state":
+          self.messages += 1
+          self.bytes += len(message)
+
+  def __enter__(self):
+    self._thread.start()
+    self._connected.wait()
+    time.sleep(0.2) # receive the root resource and state
+    self.counting = True
+    return self
+
+  def __exit__(self, *exc):
+    self._loop.call_soon_threadsafe(self._stop.set_result, None)
+    self._thread.join()
+    self._loop.close()
+
+
+async def stamp(op_time: float) -> Tuple[int, int, float]:
+  """ Returns the number of `set_state` messages, the number of bytes in them, and the time in ms
+  until the browser received the last one. Waits `op_time` seconds between operations, like a
+  robot. """
+
+  deck = STARLetDeck()
+  tip_car = TIP_CAR_480_A00(name="tip_carrier")
+  tip_car[0] = tips = HTF_L(name="tips")
+  deck.assign_child_resource(tip_car, rails=1)
+  plt_car = PLT_CAR_L5AC_A00(name="plate_carrier")
+  plt_car[0] = source = Cor_96_wellplate_360ul_Fb(name="source")
+  plt_car[1] = destination = Cor_96_wellplate_360ul_Fb(name="destination")
+  deck.assign_child_resource(plt_car, rails=15)
+  source.set_well_liquids((Liquid.WATER, 200))
+
+  lh = LiquidHandler(backend=ChatterBoxBackend(), deck=deck)
+  vis = Visualizer(deck, ws_port=2800, fs_port=2900, open_browser=False)
+  await lh.setup()
+  await vis.setup()
+
+  with Browser(vis.ws_port) as browser:
+    t0 = time.perf_counter()
+    await lh.pick_up_tips96(tips)
+    await asyncio.sleep(op_time)
+    await lh.aspirate96(source, volume=100)
+    await asyncio.sleep(op_time)
+    await lh.dispense96(destination, volume=100)
+    await asyncio.sleep(op_time)
+    await lh.return_tips96()
+
+    # wait until no message arrived for a while
+    messages, last_received = browser.messages, time.perf_counter()
+    while time.perf_counter() - last_received < 0.5:
+      if browser.messages != messages:
+        messages, last_received = browser.messages, time.perf_counter()
+      await asyncio.sleep(0.001)
+    duration = (last_received - t0) * 1000
+
+    await vis.stop()
+  await lh.stop()
+  return browser.messages, browser.bytes, duration
+
+
+def main(op_time: float = 0.1):
+  set_tip_tracking(True)
+  set_volume_tracking(True)
+  with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+    with legacy_state_updates():
+      legacy = asyncio.run(stamp(op_time))
+    coalesced = asyncio.run(stamp(op_time))
+
+  print("96-head stamp of a 96-well plate (pick up tips, aspirate, dispense, return tips), "
+        f"{op_time * 1000:.0f}ms between operations")
+  for label, (messages, num_bytes, duration) in [("legacy", legacy), ("coalesced", coalesced)]:
+    print(f"{label:>10}: {messages:4d} set_state messages, {num_bytes / 1000:6.1f}kB, "
+          f"last received after {duration:6.1f}ms")
+
+
+if __name__ == "__main__":
+  main()
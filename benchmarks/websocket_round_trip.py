@@ -0,0 +1,169 @@
+""" Benchmark the round trip latency of commands sent by :class:`WebSocketBackend` and
+:class:`Visualizer`.
+
+An in-process websocket client, running on its own thread, plays the browser and answers every
+command as soon as it arrives. Compares waiting for the response on a future that is resolved when
+the response is received, against the original implementation that polled the received messages
+every 100ms. Also reports the longest time the event loop of the caller was blocked while waiting,
+measured by a coroutine that wakes up every millisecond.
+
+Usage: `python -m benchmarks.websocket_round_trip`
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import statistics
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import websockets
+import websockets.client
+
+from pylabrobot.liquid_handling.backends import WebSocketBackend
+from pylabrobot.resources import Resource
+from pylabrobot.visualizer import Visualizer
+
+
+async def legacy_backend_send_command(self: WebSocketBackend, command: str,
+                                      data: Optional[Dict[str, Any]] = None,
+                                      wait_for_response: bool = True, timeout=None):
+  # pylint: disable=protected-access
+  del timeout
+  serialized_data, id_ = self._assemble_command(command, data or {})
+  asyncio.run_coroutine_threadsafe(self.websocket.send(serialized_data), self.loop)
+  if wait_for_response:
+    while True:
+      if len(self.received) > 0:
+        message = self.received.pop()
+        if "id" in message and message["id"] == id_:
+          break
+      time.sleep(0.1)
+    return message
+  return None
+
+
+async def legacy_visualizer_send_command(self: Visualizer, event: str,
+                                         data: Optional[Dict[str, Any]] = None,
+                                         wait_for_response: bool = True, timeout=None):
+  # pylint: disable=protected-access
+  del timeout
+  serialized_data, id_ = self._assemble_command(event=event, data=data or {})
+  await asyncio.wrap_future(
+    asyncio.run_coroutine_threadsafe(self.websocket.send(serialized_data), self.loop))
+  if wait_for_response:
+    while True:
+      if len(self.received) > 0:
+        message = self.received.pop()
+        if "id" in message and message["id"] == id_:
+          break
+      await asyncio.sleep(0.1)
+    return message
+  return None
+
+
+@contextlib.contextmanager
+def legacy_waiting():
+  backend_send_command = WebSocketBackend.send_command
+  visualizer_send_command = Visualizer.send_command
+  WebSocketBackend.send_command = legacy_backend_send_command # type: ignore[method-assign]
+  Visualizer.send_command = legacy_visualizer_send_command # type: ignore[method-assign]
+  try:
+    yield
+  finally:
+    WebSocketBackend.send_command = backend_send_command # type: ignore[method-assign]
+    Visualizer.send_command = visualizer_send_command # type: ignore[method-assign]
+
+
+@contextlib.contextmanager
+def browser(port: int):
+  """ Connect a client that answers every command with a success response, on its own thread. """
+
+  loop = asyncio.new_event_loop()
+  connected = threading.Event()
+  stop: "asyncio.Future[None]" = loop.create_future()
+
+  async def run():
+    async with websockets.client.connect(f"ws://localhost:{port}") as ws:
+      await ws.send(json.dumps({"event": "ready"}))
+      connected.set()
+      while not stop.done():
+        recv = asyncio.ensure_future(ws.recv())
+        done, _ = await asyncio.wait([recv, stop], return_when=asyncio.FIRST_COMPLETED)
+        if recv not in done:
+          recv.cancel()
+          break
+        data = json.loads(recv.result())
+        if "id" in data:
+          await ws.send(json.dumps({"event": data["event"], "id": data["id"], "success": True}))
+
+  thread = threading.Thread(target=loop.run_until_complete, args=(run(),), daemon=True)
+  thread.start()
+  connected.wait()
+  time.sleep(0.1) # let the server handle the ready event
+  try:
+    yield
+  finally:
+    loop.call_soon_threadsafe(stop.set_result, None)
+    thread.join()
+    loop.close()
+
+
+async def measure(target: Union[WebSocketBackend, Visualizer], number: int
+                  ) -> Tuple[List[float], float]:
+  """ Returns the round trip times in ms and the longest time the event loop was blocked, in ms. """
+
+  await target.setup()
+  longest_stall = 0.0
+  done = False
+
+  async def ticker():
+    nonlocal longest_stall
+    while not done:
+      t0 = time.perf_counter()
+      await asyncio.sleep(0.001)
+      longest_stall = max(longest_stall, time.perf_counter() - t0 - 0.001)
+
+  with browser(target.ws_port):
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    times = []
+    for _ in range(number):
+      t0 = time.perf_counter()
+      await target.send_command("ping_back")
+      times.append((time.perf_counter() - t0) * 1000)
+    done = True
+    await ticker_task
+    await target.stop()
+  return times, longest_stall * 1000
+
+
+def main(number: int = 20):
+  def backend():
+    return WebSocketBackend(num_channels=8, ws_port=2500)
+
+  def visualizer():
+    return Visualizer(Resource(name="root", size_x=10, size_y=10, size_z=10), ws_port=2600,
+                      fs_port=2700, open_browser=False)
+
+  with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+    with legacy_waiting():
+      results = [
+        ("backend, legacy", asyncio.run(measure(backend(), number))),
+        ("visualizer, legacy", asyncio.run(measure(visualizer(), number))),
+      ]
+    results += [
+      ("backend, futures", asyncio.run(measure(backend(), number * 50))),
+      ("visualizer, futures", asyncio.run(measure(visualizer(), number * 50))),
+    ]
+
+  for label, (times, stall) in results:
+    mean, median = statistics.mean(times), statistics.median(times)
+    print(f"{label:>20}: mean {mean:7.2f}ms, median {median:7.2f}ms, "
+          f"max {max(times):7.2f}ms per command, event loop blocked for up to {stall:6.1f}ms")
+
+
+if __name__ == "__main__":
+  main()
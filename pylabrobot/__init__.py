@@ -1,16 +1,28 @@
+import atexit
 import datetime
 import logging
+import logging.handlers
 from pathlib import Path
-from typing import Union
+from typing import List, Optional, Union
 
 from pylabrobot.__version__ import __version__
 
 from pylabrobot.config import load_config, Config
+from pylabrobot.utils.log_handlers import (
+  CommandTraceHandler,
+  QueuedLogging,
+  command_logger,
+  start_queued_logging,
+)
 
 CONFIG_FILE_NAME = "pylabrobot"
 
-CONFIG = load_config(CONFIG_FILE_NAME, create_default=True)
-"""The loaded configuration for pylabrobot."""
+# The configuration, loaded when first used rather than on import, because finding the config file
+# walks all parent directories and may write a default config file. Available as `CONFIG`.
+_config: Optional[Config] = None
+
+# The queue and listener thread of the log files, if they are written on a separate thread.
+_queued_logging: Optional[QueuedLogging] = None
 
 
 def project_root() -> Path:
@@ -22,15 +34,34 @@ def project_root() -> Path:
   """
   return Path(__file__).parent.parent
 
-def setup_logger(log_dir: Union[Path, str], level: int):
+def setup_logger(
+  log_dir: Union[Path, str],
+  level: int,
+  queue: bool = False,
+  queue_size: int = 10_000,
+  overflow: str = "drop",
+  max_bytes: int = 0,
+  backup_count: int = 5,
+  command_trace: bool = False,
+):
   """
   Set up the logger for pylabrobot. If the log_dir does not exist, it will be created.
 
   Args:
     log_dir: The directory to store the log files.
     level: The logging level.
-
+    queue: Whether to write the log files on a separate thread, through a queue of at most
+      `queue_size` records, so that logging does not wait for the disk.
+    queue_size: The maximum number of records in the queue.
+    overflow: What to do when the queue is full: "drop", "drop_oldest" or "block". See
+      :class:`~pylabrobot.utils.log_handlers.BoundedQueueHandler`.
+    max_bytes: Rotate the log files when they grow larger than this many bytes. 0 to never rotate.
+    backup_count: The number of rotated log files to keep.
+    command_trace: Whether to write the commands sent to and the responses received from devices
+      to `pylabrobot-commands-<date>.jsonl` in `log_dir`.
   """
+  global _queued_logging # pylint: disable=global-statement
+
   # Create a logger
   if isinstance(log_dir, str):
     log_dir = Path(log_dir)
@@ -39,21 +70,59 @@ def setup_logger(log_dir: Union[Path, str], level: int):
   logger = logging.getLogger("pylabrobot")
   logger.setLevel(level)
 
+  # write the records that are still queued with the previous configuration
+  if _queued_logging is not None:
+    _queued_logging.stop()
+    _queued_logging = None
+
   now = datetime.datetime.now().strftime("%Y%m%d")
   # remove file handler if it exists
   if len(logger.handlers) > 0:
+    for handler in logger.handlers:
+      handler.close()
     logger.handlers.clear()
     # delete empty log file if it has been created
     log_file = Path(f"pylabrobot-{now}.log")
     if log_file.exists() and log_file.stat().st_size == 0:
       log_file.unlink()
+  for handler in command_logger.handlers:
+    handler.close()
+  command_logger.handlers.clear()
 
   # Add a file handler
-  fh = logging.FileHandler(log_dir / f"pylabrobot-{now}.log")
+  fh: logging.FileHandler
+  if max_bytes > 0:
+    fh = logging.handlers.RotatingFileHandler(log_dir / f"pylabrobot-{now}.log",
+      maxBytes=max_bytes, backupCount=backup_count)
+  else:
+    fh = logging.FileHandler(log_dir / f"pylabrobot-{now}.log")
   fh.setLevel(level)
   fh.setFormatter(
     logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
-  logger.addHandler(fh)
+
+  handlers: List[logging.Handler] = [fh]
+  if command_trace:
+    handlers.append(CommandTraceHandler(log_dir / f"pylabrobot-commands-{now}.jsonl",
+      maxBytes=max_bytes, backupCount=backup_count))
+  command_logger.disabled = not command_trace
+
+  if queue:
+    # one listener thread handles the records of both loggers
+    fh.addFilter(lambda record: record.name != command_logger.name)
+    for handler in handlers[1:]:
+      handler.addFilter(logging.Filter(command_logger.name))
+    _queued_logging = start_queued_logging([logger, command_logger], handlers,
+      maxsize=queue_size, overflow=overflow)
+  else:
+    logger.addHandler(fh)
+    for handler in handlers[1:]:
+      command_logger.addHandler(handler)
+
+
+@atexit.register
+def _stop_queued_logging():
+  if _queued_logging is not None:
+    _queued_logging.stop()
 
 
 def configure(cfg: Config):
@@ -63,7 +132,36 @@ def configure(cfg: Config):
   Args:
     cfg: The Config object.
   """
-  setup_logger(cfg.logging.log_dir, cfg.logging.level)
+  global _config # pylint: disable=global-statement
+  _config = cfg
+  setup_logger(
+    log_dir=cfg.logging.log_dir,
+    level=cfg.logging.level,
+    queue=cfg.logging.queue,
+    queue_size=cfg.logging.queue_size,
+    overflow=cfg.logging.overflow,
+    max_bytes=cfg.logging.max_bytes,
+    backup_count=cfg.logging.backup_count,
+    command_trace=cfg.logging.command_trace,
+  )
+
+
+def get_config() -> Config:
+  """
+  Get the configuration of pylabrobot. If :func:`configure` has not been called, the config file
+  is loaded (see :func:`pylabrobot.config.load_config`) and pylabrobot is configured with it.
+  This happens when the first machine is created.
+
+  Returns:
+    The configuration, also available as `pylabrobot.CONFIG`.
+  """
+  if _config is None:
+    configure(load_config(CONFIG_FILE_NAME, create_default=True))
+  assert _config is not None
+  return _config
 
 
-configure(CONFIG)
+def __getattr__(name: str) -> Config:
+  if name == "CONFIG":
+    return get_config()
+  raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,13 +4,10 @@ Source of audio: https://simpleguics2pygame.readthedocs.io/en/latest/_static/lin
 """
 
 import functools
+import importlib.util
 
-
-try:
-  from IPython.display import display, Audio
-  USE_AUDIO = True
-except ImportError:
-  USE_AUDIO = False
+# IPython is slow to import, so it is only imported when audio is played.
+USE_AUDIO = importlib.util.find_spec("IPython") is not None
 
 
 def _audio_check(func):
@@ -22,17 +19,18 @@ def _audio_check(func):
   return wrapper
 
 
+def _play(url: str):
+  from IPython.display import display, Audio # pylint: disable=import-outside-toplevel
+  display(Audio(url=url, autoplay=True))
+
+
 # ====== 1. Identifying items on deck (e.g. through LLD or Z-drive engagement) ======
 
 @_audio_check
 def play_not_found():
-  display(Audio(
-      url="https://codeskulptor-demos.commondatastorage.googleapis.com/pang/arrow.mp3",
-      autoplay=True))
+  _play("https://codeskulptor-demos.commondatastorage.googleapis.com/pang/arrow.mp3")
 
 
 @_audio_check
 def play_got_item():
-  display(Audio(
-      url="https://codeskulptor-demos.commondatastorage.googleapis.com/descent/gotitem.mp3",
-      autoplay=True))
+  _play("https://codeskulptor-demos.commondatastorage.googleapis.com/descent/gotitem.mp3")
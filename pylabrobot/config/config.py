@@ -19,19 +19,47 @@ class Config:
 
   @dataclass
   class Logging:
-    """The logging configuration."""
+    """The logging configuration.
+
+    Attributes:
+      level: The logging level.
+      log_dir: The directory to store the log files in.
+      queue: Whether to write the log files on a separate thread, so that logging does not wait for
+        the disk. Records are buffered in a queue of at most `queue_size` records.
+      queue_size: The maximum number of records in the queue.
+      overflow: What to do when the queue is full: "drop" the new record, "drop_oldest" to drop the
+        oldest record in the queue, or "block" to wait for room in the queue.
+      max_bytes: Rotate the log files when they grow larger than this many bytes. 0 to never rotate.
+      backup_count: The number of rotated log files to keep.
+      command_trace: Whether to write the commands sent to and the responses received from devices
+        to a JSONL file, `pylabrobot-commands-<date>.jsonl`, in `log_dir`.
+    """
     level: int = logging.INFO
     log_dir: Path = Path(".")
+    queue: bool = False
+    queue_size: int = 10_000
+    overflow: str = "drop"
+    max_bytes: int = 0
+    backup_count: int = 5
+    command_trace: bool = False
 
   logging: Logging = field(default_factory=Logging)
 
   @classmethod
   def from_dict(cls, d: dict) -> "Config":
-    """Create a Config object from a dictionary."""
+    """Create a Config object from a dictionary. Values may be strings, like in INI files."""
+    log = d["logging"]
+    default = cls.Logging()
     return cls(
       logging=cls.Logging(
-        level=LOG_FROM_STRING[d["logging"]["level"]],
-        log_dir=Path(d["logging"]["log_dir"]),
+        level=LOG_FROM_STRING[log.get("level", LOG_TO_STRING[default.level])],
+        log_dir=Path(log.get("log_dir", default.log_dir)),
+        queue=_to_bool(log.get("queue", default.queue)),
+        queue_size=int(log.get("queue_size", default.queue_size)),
+        overflow=str(log.get("overflow", default.overflow)),
+        max_bytes=int(log.get("max_bytes", default.max_bytes)),
+        backup_count=int(log.get("backup_count", default.backup_count)),
+        command_trace=_to_bool(log.get("command_trace", default.command_trace)),
       )
     )
 
@@ -42,5 +70,17 @@ class Config:
       "logging": {
         "level": LOG_TO_STRING[self.logging.level],
         "log_dir": str(self.logging.log_dir),
+        "queue": self.logging.queue,
+        "queue_size": self.logging.queue_size,
+        "overflow": self.logging.overflow,
+        "max_bytes": self.logging.max_bytes,
+        "backup_count": self.logging.backup_count,
+        "command_trace": self.logging.command_trace,
       }
     }
+
+
+def _to_bool(value) -> bool:
+  if isinstance(value, str):
+    return value.strip().lower() in ("true", "yes", "1", "on")
+  return bool(value)
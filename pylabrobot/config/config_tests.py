@@ -1,3 +1,4 @@
+import logging
 from pathlib import Path
 import tempfile
 import unittest
@@ -57,3 +58,31 @@ class ConfigTests(unittest.TestCase):
     assert cfg == Config()
 
     (cwd / "test_config.ini").unlink()
+
+  def test_file_reader_writer_logging_options(self):
+    tmp_path: Path = Path(tempfile.mkdtemp())
+    fake_config = Config(
+      logging=Config.Logging(
+        level=logging.DEBUG,
+        log_dir=tmp_path / "logs",
+        queue=True,
+        queue_size=100,
+        overflow="drop_oldest",
+        max_bytes=1_000_000,
+        backup_count=2,
+        command_trace=True,
+      )
+    )
+    cases = (
+      (IniLoader(), IniSaver(), "fake_config.ini"),
+      (JsonLoader(), JsonSaver(), "fake_config.json"),
+    )
+    for rdr, wr, fp in cases:
+      self.run_file_reader_writer_test(
+        rdr, wr, tmp_path / fp, fake_config
+      )
+
+  def test_from_dict_strings(self):
+    cfg = Config.from_dict({"logging": {"level": "WARNING", "queue": "true", "queue_size": "50",
+      "command_trace": "False"}})
+    assert cfg == Config(logging=Config.Logging(level=logging.WARNING, queue=True, queue_size=50))
@@ -1,5 +1,4 @@
 import configparser
-from pathlib import Path
 from typing import IO
 
 from pylabrobot.config.config import Config
@@ -16,8 +15,7 @@ class IniLoader(ConfigLoader):
     """Load a Config object from an opened IO stream that is INI formatted."""
     config = configparser.ConfigParser()
     config.read_file(r)
-    log_config = config["logging"]
-    return Config(logging=Config.Logging(log_dir=Path(log_config["log_dir"])))
+    return Config.from_dict({section: dict(config[section]) for section in config.sections()})
 
 
 class IniSaver(ConfigSaver):
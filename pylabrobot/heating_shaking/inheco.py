@@ -1,13 +1,37 @@
-import time
+import logging
 import typing
+from typing import List, Optional
 
 from pylabrobot.heating_shaking.backend import HeaterShakerBackend
+from pylabrobot.machines.backends.transport import HIDTransport
 
-try:
-  import hid  # type: ignore
-  USE_IDE = True
-except ImportError:
-  USE_IDE = False
+
+logger = logging.getLogger("pylabrobot")
+
+
+class InhecoHIDTransport(HIDTransport):
+  """ HID transport for Inheco devices.
+
+  Responses are split over reports: a report that ends with `#` is continued by the next report, a
+  report that ends with `\x00` ends the response. Frames are the responses without these markers.
+  """
+
+  def __init__(self, vid: int, pid: int, serial_number: Optional[str] = None):
+    super().__init__(vid=vid, pid=pid, serial_number=serial_number, report_size=64,
+                     write_report_size=9)
+
+  def _split_frames(self, chunk: bytes) -> List[bytes]:
+    if chunk.endswith(b"\x00"):
+      frame = bytes(self._buffer) + chunk.rstrip(b"\x00") # strip trailing \x00's
+      self._buffer.clear()
+      return [frame]
+    if chunk.endswith(b"#"):
+      self._buffer += chunk[:-1]
+    else:
+      # I have never seen this happen, commands always end with \x00 or '#'
+      logger.warning("[InhecoHIDTransport] Weird packet, please report: %r", chunk)
+      self._buffer += chunk
+    return []
 
 
 class InhecoThermoShake(HeaterShakerBackend):
@@ -20,16 +44,15 @@ class InhecoThermoShake(HeaterShakerBackend):
     self.vid = vid
     self.pid = pid
     self.serial_number = serial_number
+    self.io = InhecoHIDTransport(vid=vid, pid=pid, serial_number=serial_number)
 
   async def setup(self):
-    if not USE_IDE:
-      raise RuntimeError("This backend requires the `hid` package to be installed")
-    self.device = hid.Device(vid=self.vid, pid=self.pid, serial=self.serial_number)
+    await self.io.setup()
 
   async def stop(self):
     await self.stop_shaking()
     await self.stop_temperature_control()
-    self.device.close()
+    await self.io.stop()
 
   def serialize(self) -> dict:
     return {
@@ -96,28 +119,8 @@ class InhecoThermoShake(HeaterShakerBackend):
       num -= 1
     return crc
 
-  def _read_until_end(self, timeout: int) -> str:
-    """ Read until a packet ends with a \\x00 byte. May read multiple packets. """
-    start = time.time()
-    response = b""
-    while time.time() - start < timeout:
-      packet = self.device.read(64, timeout=timeout)
-      if packet is not None and packet != b"":
-        if packet.endswith(b"\x00"):
-          response += packet.rstrip(b"\x00") # strip trailing \x00's
-          break
-        elif packet.endswith(b"#"):
-          response += packet[:-1]
-          continue
-        else:
-          # I have never seen this happen, commands always end with \x00 or '#'
-          print("weird packet, please report", packet)
-          response += packet
-
-    return response.decode("unicode_escape")
-
-  def _read_response(self, command: str, timeout: int = 60) -> str:
-    """ Read the response for a given command.
+  async def send_command(self, command: str, timeout: int = 3):
+    """ Send a command to the device and return the response.
 
     "The MTC/STC replies to the first four characters of every command with a modified echo. The
     modification changes the capitals of the commands to small letters. i.e. the reply to 5ASE1
@@ -125,22 +128,12 @@ class InhecoThermoShake(HeaterShakerBackend):
     increase integrity of the communication."
     """
 
-    start = time.time()
-    while time.time() - start < timeout:
-      response = self._read_until_end(timeout=int(timeout - (time.time() - start)))
-
-      if response[:4] == command[:4].lower():
-        return response
-
-    raise TimeoutError("Timeout while waiting for response from device.")
-
-  async def send_command(self, command: str, timeout: int = 3):
-    """ Send a command to the device and return the response """
     packets = self._generate_packets(command)
-    for packet in packets:
-      self.device.write(bytes(packet))
-
-    response = self._read_response(command, timeout=timeout)
+    frame = await self.io.send_command(
+      b"".join(bytes(packet) for packet in packets),
+      match=lambda frame: frame.decode("unicode_escape")[:4] == command[:4].lower(),
+      timeout=timeout)
+    response = frame.decode("unicode_escape")
 
     if response[4] != "0":
       raise RuntimeError(f"Error response from device: {response}")
@@ -1,4 +1,14 @@
-from .backends import *
+from typing import TYPE_CHECKING
+
+from pylabrobot.utils.lazy_import import LazyAttributes
+
+from .backends import (
+  LiquidHandlerBackend,
+  ChatterBoxBackend,
+  SerializingBackend,
+  SerializingSavingBackend,
+  SaverBackend,
+)
 from .liquid_handler import LiquidHandler
 from .standard import (
   Pickup,
@@ -12,3 +22,19 @@ from .standard import (
   Move
 )
 from .strictness import Strictness, set_strictness, get_strictness
+
+if TYPE_CHECKING:
+  from .backends import *
+
+# Backends for machines are imported on first use, see `pylabrobot.liquid_handling.backends`.
+_lazy = LazyAttributes(__name__, attributes=dict.fromkeys(
+  ["WebSocketBackend", "STAR", "Vantage", "HTTPBackend", "OpentronsBackend", "EVO", "FLUENT"],
+  ".backends"))
+
+
+def __getattr__(name: str):
+  return _lazy.getattr(name)
+
+
+def __dir__():
+  return _lazy.dir()
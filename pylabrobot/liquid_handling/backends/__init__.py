@@ -1,12 +1,36 @@
+from typing import TYPE_CHECKING
+
+from pylabrobot.utils.lazy_import import LazyAttributes
+
 from .backend import LiquidHandlerBackend
 from .chatterbox_backend import ChatterBoxBackend
 from .serializing_backend import SerializingBackend, SerializingSavingBackend # many rely on this
-from .websocket import WebSocketBackend
-
-from .hamilton.STAR import STAR
-from .hamilton.vantage import Vantage
-from .http import HTTPBackend
-from .opentrons_backend import OpentronsBackend
 from .saver_backend import SaverBackend
-from .tecan.EVO import EVO
-from .tecan.FLUENT import FLUENT
+
+if TYPE_CHECKING:
+  from .websocket import WebSocketBackend
+  from .hamilton.STAR import STAR
+  from .hamilton.vantage import Vantage
+  from .http import HTTPBackend
+  from .opentrons_backend import OpentronsBackend
+  from .tecan.EVO import EVO
+  from .tecan.FLUENT import FLUENT
+
+# Backends for machines, and the libraries they use to communicate, are imported on first use.
+_lazy = LazyAttributes(__name__, attributes={
+  "WebSocketBackend": ".websocket",
+  "STAR": ".hamilton.STAR",
+  "Vantage": ".hamilton.vantage",
+  "HTTPBackend": ".http",
+  "OpentronsBackend": ".opentrons_backend",
+  "EVO": ".tecan.EVO",
+  "FLUENT": ".tecan.FLUENT",
+})
+
+
+def __getattr__(name: str):
+  return _lazy.getattr(name)
+
+
+def __dir__():
+  return _lazy.dir()
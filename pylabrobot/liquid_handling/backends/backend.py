@@ -52,14 +52,29 @@ class LiquidHandlerBackend(MachineBackend, metaclass=ABCMeta):
   async def assigned_resource_callback(self, resource: Resource):
     """ Called when a new resource was assigned to the robot.
 
-    This callback will also be called immediately after the setup method has been called for any
-    resources that were assigned to the robot before it was set up. The first resource will always
-    be the deck itself.
+    Resources that were assigned to the robot before it was set up are passed to
+    :meth:`assigned_resources_callback` immediately after the setup method has been called.
 
     Args:
       resource: The resource that was assigned to the robot.
     """
 
+  async def assigned_resources_callback(self, resources: List[Resource]):
+    """ Called immediately after the setup method has been called with the resources that were
+    assigned to the robot before it was set up. The first resource will always be the deck itself,
+    followed by its children.
+
+    The default implementation calls :meth:`assigned_resource_callback` for every resource in
+    order. Backends that can send multiple resources to the robot in one round trip should override
+    this method.
+
+    Args:
+      resources: The resources that were assigned to the robot.
+    """
+
+    for resource in resources:
+      await self.assigned_resource_callback(resource)
+
   async def unassigned_resource_callback(self, name: str):
     """ Called when a resource is unassigned from the robot.
 
@@ -9,7 +9,8 @@ import enum
 import functools
 import logging
 import re
-from typing import Callable, Dict, List, Literal, Optional, Sequence, Type, TypeVar, Union, cast
+from typing import (Callable, Dict, List, Literal, Optional, Sequence, Tuple, Type, TypeVar, Union,
+  cast)
 
 from pylabrobot.liquid_handling.backends.hamilton.base import HamiltonLiquidHandler
 from pylabrobot.liquid_handling.errors import ChannelizedError
@@ -87,6 +88,113 @@ def _fill_in_defaults(val: Optional[List[T]], default: List[T]) -> List[T]:
   return val
 
 
+class STARFirmwareFormat:
+  """ A compiled firmware format string, used to parse STAR responses in a single pass.
+
+  Compiling a format string splits it into its parameters and builds one regex that matches any of
+  them. The regex is wrapped in a lookahead so that a scan over the response visits every position,
+  meaning each parameter resolves to its first occurrence exactly like a separate `re.search` would.
+
+  Use :func:`compile_star_fw_format` to get (cached) instances.
+  """
+
+  _TYPES = {"#": "int", "*": "hex", "&": "str"}
+  _EXPRESSIONS = {"int": r"[-+]?[\d ]", "hex": r"[\da-fA-F ]", "str": "."}
+
+  def __init__(self, fmt: str):
+    self.fmt = fmt
+
+    # Find params in string. All params are identified by 2 lowercase chars.
+    params: List[str] = []
+    param = ""
+    prevchar = None
+    for char in fmt:
+      if char.islower() and prevchar != "(":
+        if len(param) > 2:
+          params.append(param)
+          param = ""
+      param += char
+      prevchar = char
+    if param != "":
+      params.append(param) # last parameter is not closed by loop.
+
+    # If id not in fmt, add it.
+    if not any(param.startswith("id") for param in params):
+      params.append("id####")
+
+    # (type, is_list, regex) for each parameter, in order of the format string. When a name occurs
+    # more than once, the last definition wins, but the key keeps its first position.
+    specs: Dict[str, Tuple[str, bool, str]] = {}
+    for param in params:
+      name, data = param[0:2], param[2:]
+      type_ = STARFirmwareFormat._TYPES[data[0]]
+      len_ = len(data.split(" ")[0]) # Get length of first block.
+      regex = f"{name}((?:{STARFirmwareFormat._EXPRESSIONS[type_]}{ {len_} }"
+      is_list = param.endswith(" (n)")
+      regex += " ?)+)" if is_list else "))"
+      specs[name] = (type_, is_list, regex)
+
+    self.names: List[str] = list(specs.keys())
+    self._types: List[Tuple[str, bool]] = [(type_, is_list) for type_, is_list, _ in specs.values()]
+    # Every alternative has exactly one capturing group, so `lastindex` identifies the parameter.
+    self._regex = re.compile("(?=" + "|".join(regex for _, _, regex in specs.values()) + ")")
+
+  def __repr__(self) -> str:
+    return f"STARFirmwareFormat({self.fmt!r})"
+
+  @staticmethod
+  def _convert(m: str, type_: str, is_list: bool):
+    if is_list:
+      parts = m.split(" ")
+      if type_ == "str":
+        return parts
+      if type_ == "int":
+        return [int(m_) for m_ in parts if m_ != ""]
+      return [int(m_, base=16) for m_ in parts if m_ != ""]
+
+    if type_ == "str":
+      return m
+    if type_ == "int":
+      return int(m)
+    return int(m, base=16)
+
+  def parse(self, resp: str) -> dict:
+    """ Parse a response string according to this format. See :func:`parse_star_fw_string`. """
+
+    # Remove device and cmd identifier from response.
+    resp = resp[4:]
+
+    # Single scan over the response, keeping the first match of every parameter.
+    matches: Dict[int, str] = {}
+    remaining = len(self.names)
+    for match in self._regex.finditer(resp):
+      index = cast(int, match.lastindex) - 1
+      if index not in matches:
+        matches[index] = match.group(index + 1)
+        remaining -= 1
+        if remaining == 0:
+          break
+
+    info = {}
+    for index, name in enumerate(self.names):
+      if index not in matches:
+        raise ValueError(f"could not find matches for parameter {name}")
+      type_, is_list = self._types[index]
+      info[name] = STARFirmwareFormat._convert(matches[index], type_, is_list)
+    return info
+
+
+@functools.lru_cache(maxsize=512)
+def compile_star_fw_format(fmt: str) -> STARFirmwareFormat:
+  """ Compile a STAR firmware format string, returning a cached instance if available.
+
+  The number of distinct format strings used by the backend is small and fixed, so the cache is
+  bounded mostly to protect against callers generating format strings dynamically.
+  """
+
+  return STARFirmwareFormat(fmt)
+
+
 def parse_star_fw_string(resp: str, fmt: str = "") -> dict:
   """ Parse a machine command or response string according to a format string.
 
@@ -102,6 +210,9 @@ def parse_star_fw_string(resp: str, fmt: str = "") -> dict:
 
   The identifier parameter (id####) is added automatically.
 
+  The format string is compiled once (see :func:`compile_star_fw_format`) and all parameters are
+  extracted in a single pass over the response.
+
   TODO: string parsing
   The firmware docs mention strings in the following format: '...'
   However, the length of these is always known (except when reading
@@ -133,81 +244,7 @@ def parse_star_fw_string(resp: str, fmt: str = "") -> dict:
     ```
   """
 
-  # Remove device and cmd identifier from response.
-  resp = resp[4:]
-
-  # Parse the parameters in the fmt string.
-  info = {}
-
-  def find_param(param):
-    name, data = param[0:2], param[2:]
-    type_ = {
-      "#": "int",
-      "*": "hex",
-      "&": "str"
-    }[data[0]]
-
-    # Build a regex to match this parameter.
-    exp = {
-      "int": r"[-+]?[\d ]",
-      "hex": r"[\da-fA-F ]",
-      "str": ".",
-    }[type_]
-    len_ = len(data.split(" ")[0]) # Get length of first block.
-    regex = f"{name}((?:{exp}{ {len_} }"
-
-    if param.endswith(" (n)"):
-      regex += " ?)+)"
-      is_list = True
-    else:
-      regex += "))"
-      is_list = False
-
-    # Match response against regex, save results in right datatype.
-    r = re.search(regex, resp)
-    if r is None:
-      raise ValueError(f"could not find matches for parameter {name}")
-
-    g = r.groups()
-    if len(g) == 0:
-      raise ValueError(f"could not find value for parameter {name}")
-    m = g[0]
-
-    if is_list:
-      m = m.split(" ")
-
-      if type_ == "str":
-        info[name] = m
-      elif type_ == "int":
-        info[name] = [int(m_) for m_ in m if m_ != ""]
-      elif type_ == "hex":
-        info[name] = [int(m_, base=16) for m_ in m if m_ != ""]
-    else:
-      if type_ == "str":
-        info[name] = m
-      elif type_ == "int":
-        info[name] = int(m)
-      elif type_ == "hex":
-        info[name] = int(m, base=16)
-
-  # Find params in string. All params are identified by 2 lowercase chars.
-  param = ""
-  prevchar = None
-  for char in fmt:
-    if char.islower() and prevchar != "(":
-      if len(param) > 2:
-        find_param(param)
-        param = ""
-    param += char
-    prevchar = char
-  if param != "":
-    find_param(param) # last parameter is not closed by loop.
-
-  # If id not in fmt, add it.
-  if "id" not in info:
-    find_param("id####")
-
-  return info
+  return compile_star_fw_format(fmt).parse(resp)
 
 
 class STARModuleError(Exception, metaclass=ABCMeta):
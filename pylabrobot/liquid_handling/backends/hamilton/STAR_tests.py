@@ -1,3 +1,4 @@
+import asyncio
 from typing import cast
 import unittest
 import unittest.mock
@@ -14,10 +15,11 @@ from pylabrobot.resources import (
 from pylabrobot.resources.hamilton import STARLetDeck
 from pylabrobot.resources.ml_star import STF_L
 
-from tests.usb import MockDev, MockEndpoint
+from tests.usb import FakeUSBDevice, MockDev, MockEndpoint
 
 from .STAR import (
   STAR,
+  compile_star_fw_format,
   parse_star_fw_string,
   STARFirmwareError,
   CommandSyntaxError,
@@ -82,6 +84,27 @@ class TestSTARResponseParsing(unittest.TestCase):
     with self.assertRaises(ValueError):
       parse_star_fw_string("C0RV", "") # pylint: disable=expression-not-assigned
 
+  def test_parse_response_lists(self):
+    parsed = parse_star_fw_string("C0RTid0003rt0 1 0 1", "rt# (n)")
+    self.assertEqual(parsed, {"rt": [0, 1, 0, 1], "id": 3})
+
+    parsed = parse_star_fw_string("C0QMid0004pqA0 0B ff", "pq** (n)")
+    self.assertEqual(parsed, {"pq": [0xA0, 0x0B, 0xFF], "id": 4})
+
+    parsed = parse_star_fw_string("C0QMid0005aaab cd", "aa&& (n)")
+    self.assertEqual(parsed, {"aa": ["ab", "cd"], "id": 5})
+
+  def test_parse_response_overlapping_params(self):
+    # "bb" occurs inside the value of "aa", and should still be found there.
+    parsed = parse_star_fw_string("C0QMid0006aabb12cc", "aa&&&&bb##")
+    self.assertEqual(parsed, {"aa": "bb12", "bb": 12, "id": 6})
+
+  def test_compile_fw_format_cached(self):
+    fmt = compile_star_fw_format("xs#####xd#")
+    self.assertIs(fmt, compile_star_fw_format("xs#####xd#"))
+    self.assertEqual(fmt.names, ["xs", "xd", "id"])
+    self.assertEqual(fmt.parse("C0RXid0007xd1xs12345"), {"xs": 12345, "xd": 1, "id": 7})
+
   def test_parse_response_no_errors(self):
     parsed = parse_star_fw_string("C0QMid1111", "")
     self.assertEqual(parsed, {"id": 1111})
@@ -164,6 +187,54 @@ class TestSTARUSBComms(unittest.IsolatedAsyncioTestCase):
       await star.send_command("C0", command="QM")
 
 
+class TestSTARUSBReadingThread(unittest.IsolatedAsyncioTestCase):
+  """ Test the long-lived reading thread that dispatches responses to waiting commands. """
+
+  def _make_star(self, dev: FakeUSBDevice) -> STAR:
+    star = STAR(read_timeout=2, packet_read_timeout=1)
+    star.dev = dev # type: ignore
+    star.read_endpoint = MockEndpoint() # type: ignore
+    star.write_endpoint = MockEndpoint() # type: ignore
+    return star
+
+  async def test_reading_thread_is_reused(self):
+    star = self._make_star(FakeUSBDevice())
+    await star.send_command("C0", command="QM", fmt="id####")
+    thread = star._reading_thread # pylint: disable=protected-access
+    self.assertIsNotNone(thread)
+    resp = await star.send_command("C0", command="RF", fmt="id####")
+    self.assertEqual(resp, {"id": 2})
+    self.assertIs(star._reading_thread, thread) # pylint: disable=protected-access
+    await star._stop_reading_thread() # pylint: disable=protected-access
+    self.assertIsNone(star._reading_thread) # pylint: disable=protected-access
+
+  async def test_concurrent_commands(self):
+    star = self._make_star(FakeUSBDevice(delay=0.05))
+    results = await asyncio.gather(*[
+      star.send_command("C0", command="QM", fmt="id####") for _ in range(10)])
+    self.assertEqual(sorted(r["id"] for r in results), list(range(1, 11)))
+    await star._stop_reading_thread() # pylint: disable=protected-access
+
+  async def test_timeout_does_not_affect_other_commands(self):
+    star = self._make_star(FakeUSBDevice(delay=0.05, ignore_ids=[1]))
+    results = await asyncio.gather(
+      star.send_command("C0", command="QM", read_timeout=1),
+      star.send_command("C0", command="QM", fmt="id####"),
+      return_exceptions=True)
+    self.assertIsInstance(results[0], TimeoutError)
+    self.assertEqual(results[1], {"id": 2})
+    self.assertEqual(star._waiting_tasks, {}) # pylint: disable=protected-access
+    await star._stop_reading_thread() # pylint: disable=protected-access
+
+  async def test_stop_fails_waiting_commands(self):
+    star = self._make_star(FakeUSBDevice(ignore_ids=[1]))
+    task = asyncio.create_task(star.send_command("C0", command="QM"))
+    await asyncio.sleep(0.05)
+    await star._stop_reading_thread() # pylint: disable=protected-access
+    with self.assertRaises(RuntimeError):
+      await task
+
+
 class STARCommandCatcher(STAR):
   """ Mock backend for star that catches commands and saves them instead of sending them to the
   machine. """
@@ -1,6 +1,7 @@
 from abc import ABCMeta, abstractmethod
 import asyncio
 import datetime
+import heapq
 import logging
 import threading
 import time
@@ -58,8 +59,14 @@ class HamiltonLiquidHandler(LiquidHandlerBackend, USBBackend, metaclass=ABCMeta)
     self.id_ = 0
 
     self._reading_thread: Optional[threading.Thread] = None
+    # Dispatch table of commands waiting for a response, keyed by command id, and a heap of
+    # (timeout_time, id) for expiring them. Both are guarded by `_reading_condition`, which the
+    # reading thread also waits on while no commands are outstanding.
     self._waiting_tasks: Dict[int,
       Tuple[asyncio.AbstractEventLoop, asyncio.Future, str, float]] = {}
+    self._timeout_heap: List[Tuple[float, int]] = []
+    self._reading_condition = threading.Condition()
+    self._stop_reading = False
     self._tth2tti: dict[int, int] = {} # hash to tip type index
 
     # Whether to allow the firmware to plan liquid handling operations when the y positions are
@@ -73,7 +80,7 @@ class HamiltonLiquidHandler(LiquidHandlerBackend, USBBackend, metaclass=ABCMeta)
     await USBBackend.setup(self)
 
   async def stop(self):
-    self._waiting_tasks.clear()
+    await self._stop_reading_thread()
     await super().stop()
 
   def serialize(self) -> dict:
@@ -222,18 +229,26 @@ class HamiltonLiquidHandler(LiquidHandlerBackend, USBBackend, metaclass=ABCMeta)
     wait: bool = True
   ) -> Optional[str]:
     """ Write a command to the Hamilton machine and read the response. """
-    self.write(cmd, timeout=write_timeout)
 
     if not wait:
+      self.write(cmd, timeout=write_timeout)
       return None
 
     # Attempt to read packets until timeout, or when we identify the right id.
     if read_timeout is None:
       read_timeout = self.read_timeout
 
+    # Register the command before writing it, so that a fast response can never arrive at the
+    # reading thread before there is a task waiting for it.
     loop = asyncio.get_event_loop()
     fut = loop.create_future()
     self._start_reading(id_, loop, fut, cmd, read_timeout)
+    try:
+      self.write(cmd, timeout=write_timeout)
+    except Exception:
+      with self._reading_condition:
+        self._waiting_tasks.pop(id_, None)
+      raise
     result = await fut
     return cast(str, result) # Futures are generic in Python 3.9, but not in 3.8, so we need cast.
 
@@ -244,15 +259,82 @@ class HamiltonLiquidHandler(LiquidHandlerBackend, USBBackend, metaclass=ABCMeta)
     fut: asyncio.Future,
     cmd: str,
     timeout: int) -> None:
-    """ Submit a task to the reading thread. Starts reading thread if it is not already running. """
+    """ Submit a task to the reading thread. Starts reading thread if it is not already running.
 
-    timeout_time = time.time() + timeout
-    self._waiting_tasks[id_] = (loop, fut, cmd, timeout_time)
+    The reading thread is long-lived: it is started on the first command and keeps running (idle
+    while no commands are outstanding) until :meth:`stop` is called.
+    """
+
+    timeout_time = time.monotonic() + timeout
+    with self._reading_condition:
+      self._waiting_tasks[id_] = (loop, fut, cmd, timeout_time)
+      heapq.heappush(self._timeout_heap, (timeout_time, id_))
+
+      if self._reading_thread is None:
+        self._stop_reading = False
+        self._reading_thread = threading.Thread(target=self._continuously_read, daemon=True,
+          name="hamilton-usb-reader")
+        self._reading_thread.start()
+      self._reading_condition.notify()
+
+  async def _stop_reading_thread(self) -> None:
+    """ Stop the reading thread, failing all commands that are still waiting for a response. """
+
+    with self._reading_condition:
+      self._stop_reading = True
+      self._reading_condition.notify()
+      thread = self._reading_thread
+      tasks = list(self._waiting_tasks.values())
+      self._waiting_tasks.clear()
+      self._timeout_heap.clear()
+
+    if thread is not None:
+      # The thread blocks on a read for at most its read timeout, so join it on a worker thread.
+      await asyncio.get_running_loop().run_in_executor(None, thread.join)
+    self._reading_thread = None
+
+    for loop, fut, cmd, _ in tasks:
+      self._complete_future(loop, fut,
+        exception=RuntimeError(f"Backend stopped while waiting for response to command {cmd}."))
+
+  @staticmethod
+  def _complete_future(
+    loop: asyncio.AbstractEventLoop,
+    fut: asyncio.Future,
+    result: Optional[str] = None,
+    exception: Optional[BaseException] = None
+  ) -> None:
+    """ Thread-safely complete a future, unless it is already done (e.g. cancelled). """
+
+    def complete():
+      if fut.done():
+        return
+      if exception is not None:
+        fut.set_exception(exception)
+      else:
+        fut.set_result(result)
+
+    if loop.is_closed():
+      return
+    loop.call_soon_threadsafe(complete)
+
+  def _expire_waiting_tasks(self, now: float) -> None:
+    """ Fail all tasks whose timeout has passed with a `TimeoutError`. Must hold the lock.
+
+    Entries on the heap for tasks that were already completed, or whose id was reused by a newer
+    command with a later timeout, are skipped.
+    """
 
-    # Start reading thread if it is not already running.
-    if len(self._waiting_tasks) == 1:
-      self._reading_thread = threading.Thread(target=self._continuously_read)
-      self._reading_thread.start()
+    while len(self._timeout_heap) > 0 and self._timeout_heap[0][0] <= now:
+      timeout_time, id_ = heapq.heappop(self._timeout_heap)
+      task = self._waiting_tasks.get(id_)
+      if task is None or task[3] != timeout_time:
+        continue
+      del self._waiting_tasks[id_]
+      loop, fut, cmd, _ = task
+      logger.warning("Timeout while waiting for response to command %s.", cmd)
+      self._complete_future(loop, fut,
+        exception=TimeoutError(f"Timeout while waiting for response to command {cmd}."))
 
   @abstractmethod
   def get_id_from_fw_response(self, resp: str) -> Optional[int]:
@@ -267,55 +349,62 @@ class HamiltonLiquidHandler(LiquidHandlerBackend, USBBackend, metaclass=ABCMeta)
     """ Parse a firmware response. """
 
   def _continuously_read(self) -> None:
-    """ Continuously read from the USB port until all tasks are completed.
+    """ Continuously read from the USB port and dispatch responses to waiting tasks.
 
-    Tasks are stored in the `self._waiting_tasks` dictionary, and contain a future that will be
-    completed when the task is finished. Tasks are submitted to the dictionary using the
-    `self._start_reading` method.
+    Tasks are stored in the `self._waiting_tasks` dictionary, keyed by command id, and contain a
+    future that will be completed when the task is finished. Tasks are submitted to the dictionary
+    using the `self._start_reading` method.
 
-    On each iteration, read the USB port. If a response is received, parse it and check if it is
-    relevant to any of the tasks. If so, complete the future and remove the task from the
-    dictionary. If a task has timed out, complete the future with a `TimeoutError`.
+    While there are no tasks, the thread waits on `self._reading_condition` instead of polling the
+    device. Otherwise, read the USB port. If a response is received, parse its id and complete the
+    future of the matching task (a dictionary lookup). Timeouts are kept in a heap, so only tasks
+    that have actually timed out are visited, and their future is completed with a `TimeoutError`.
+    The thread runs until `self._stop_reading` is set.
     """
 
     logger.debug("Starting reading thread...")
 
-    while len(self._waiting_tasks) > 0:
-      for id_, (loop, fut, cmd, timeout_time) in self._waiting_tasks.items():
-        if time.time() > timeout_time:
-          logger.warning("Timeout while waiting for response to command %s.", cmd)
-          loop.call_soon_threadsafe(fut.set_exception,
-            TimeoutError(f"Timeout while waiting for response to command {cmd}."))
-          del self._waiting_tasks[id_]
+    while True:
+      with self._reading_condition:
+        while len(self._waiting_tasks) == 0 and not self._stop_reading:
+          self._reading_condition.wait()
+        if self._stop_reading:
           break
+        self._expire_waiting_tasks(time.monotonic())
+        if len(self._waiting_tasks) == 0:
+          continue
 
       try:
         resp = self.read().decode("utf-8")
       except TimeoutError:
         continue
 
+      if resp == "":
+        continue
+
       logger.info("Received response: %s", resp)
 
       # Parse response.
       try:
         response_id = self.get_id_from_fw_response(resp)
       except ValueError as e:
-        if resp != "":
-          logger.warning("Could not parse response: %s (%s)", resp, e)
+        logger.warning("Could not parse response: %s (%s)", resp, e)
         continue
 
-      for id_, (loop, fut, cmd, timeout_time) in self._waiting_tasks.items():
-        if response_id == id_:
-          try:
-            self.check_fw_string_error(resp)
-          except Exception as e: # pylint: disable=broad-exception-caught
-            loop.call_soon_threadsafe(fut.set_exception, e)
-          else:
-            loop.call_soon_threadsafe(fut.set_result, resp)
-          del self._waiting_tasks[id_]
-          break
+      with self._reading_condition:
+        task = self._waiting_tasks.pop(response_id, None) if response_id is not None else None
+      if task is None:
+        logger.debug("Received response for unknown command: %s", resp)
+        continue
+
+      loop, fut, _, _ = task
+      try:
+        self.check_fw_string_error(resp)
+      except Exception as e: # pylint: disable=broad-exception-caught
+        self._complete_future(loop, fut, exception=e)
+      else:
+        self._complete_future(loop, fut, result=resp)
 
-    self._reading_thread = None
     logger.debug("Reading thread stopped.")
 
   def _ops_to_fw_positions(
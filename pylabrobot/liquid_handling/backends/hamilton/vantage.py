@@ -1,10 +1,11 @@
 # pylint: disable=invalid-name
 
 import asyncio
+import functools
 import random
 import re
 import sys
-from typing import Dict, List, Optional, Sequence, Union, cast
+from typing import Dict, List, Optional, Sequence, Tuple, Union, cast
 
 from pylabrobot.liquid_handling.backends.hamilton.base import HamiltonLiquidHandler
 from pylabrobot.liquid_handling.liquid_classes.hamilton import (
@@ -64,32 +65,43 @@ def parse_vantage_fw_string(s: str, fmt: Optional[Dict[str, str]] = None) -> dic
   if "id" not in fmt:
     fmt["id"] = "int"
 
-  for key, data_type in fmt.items():
+  for key, data_type, pattern in _compile_vantage_fw_format(tuple(fmt.items())):
+    matches = pattern.findall(s)
+    if len(matches) != 1:
+      raise ValueError(f"Expected exactly one match for {key} in {s}")
     if data_type == "int":
-      matches = re.findall(fr"{key}([-+]?\d+)", s)
-      if len(matches) != 1:
-        raise ValueError(f"Expected exactly one match for {key} in {s}")
       parsed[key] = int(matches[0])
     elif data_type == "str":
-      matches = re.findall(fr"{key}\"(.*)\"", s)
-      if len(matches) != 1:
-        raise ValueError(f"Expected exactly one match for {key} in {s}")
       parsed[key] = matches[0]
     elif data_type == "[int]":
-      matches = re.findall(fr"{key}((?:[-+]?[\d ]+)+)", s)
-      if len(matches) != 1:
-        raise ValueError(f"Expected exactly one match for {key} in {s}")
       parsed[key] = [int(x) for x in matches[0].split()]
     elif data_type == "hex":
-      matches = re.findall(fr"{key}([0-9a-fA-F]+)", s)
-      if len(matches) != 1:
-        raise ValueError(f"Expected exactly one match for {key} in {s}")
       parsed[key] = int(matches[0], 16)
-    else:
-      raise ValueError(f"Unknown data type {data_type}")
 
   return parsed
 
+
+@functools.lru_cache(maxsize=512)
+def _compile_vantage_fw_format(
+  fmt: Tuple[Tuple[str, str], ...]
+) -> List[Tuple[str, str, "re.Pattern[str]"]]:
+  """ Compile the regexes for a Vantage format (as a tuple of `fmt.items()`) once. """
+
+  patterns = {
+    "int": r"{key}([-+]?\d+)",
+    "str": r"{key}\"(.*)\"",
+    "[int]": r"{key}((?:[-+]?[\d ]+)+)",
+    "hex": r"{key}([0-9a-fA-F]+)",
+  }
+
+  compiled = []
+  for key, data_type in fmt:
+    if data_type not in patterns:
+      raise ValueError(f"Unknown data type {data_type}")
+    compiled.append((key, data_type, re.compile(patterns[data_type].format(key=key))))
+  return compiled
+
+
 core96_errors = {
   0: "No error",
   21: "No communication to digital potentiometer",
@@ -1,11 +1,17 @@
-from typing import Optional, Dict, Any, cast
+import asyncio
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Optional, Dict, Any, List, cast
 import urllib.parse
 
+from pylabrobot.liquid_handling.backends.backend import LiquidHandlerBackend
 from pylabrobot.liquid_handling.backends.serializing_backend import SerializingBackend
+from pylabrobot.resources import Resource
 from pylabrobot.__version__ import STANDARD_FORM_JSON_VERSION
 
 try:
   import requests
+  from requests.adapters import HTTPAdapter
   HAS_REQUESTS = True
 except ImportError:
   HAS_REQUESTS = False
@@ -17,6 +23,10 @@ class HTTPBackend(SerializingBackend):
   This backend is used when you want to run a :class:`~pylabrobot.liquid_handling.LiquidHandler`
   locally and have a server communicating with the robot elsewhere.
 
+  Requests are made by a pool of worker threads that share keep-alive connections, so that waiting
+  for the server does not block the event loop. Commands sent concurrently (for example with
+  `asyncio.gather`) are sent over up to `max_connections` connections at the same time.
+
   .. note::
     This backend is designed to work with
     `the PyLabRobot server <https://github.com/PyLabRobot/PyLabRobot/tree/main/pylabrobot/server>`_.
@@ -29,6 +39,7 @@ class HTTPBackend(SerializingBackend):
     num_channels: int,
     protocol: str = "http",
     base_path: str = "events",
+    max_connections: int = 4,
   ):
     """ Create a new web socket backend.
 
@@ -38,13 +49,21 @@ class HTTPBackend(SerializingBackend):
       protocol: The protocol to use. Either `http` or `https`.
       base_path: The base path of the server. Note that events will be sent to `base_path/<event>`
         where `<event>` is the event identifier, such as `/aspirate`.
+      max_connections: The maximum number of requests that are sent to the server at the same time,
+        and the number of connections that are kept alive.
     """
 
+    if max_connections < 1:
+      raise ValueError("max_connections must be at least 1.")
+
     if not HAS_REQUESTS:
       raise RuntimeError("The http backend requires the requests module.")
 
     super().__init__(num_channels=num_channels)
     self.session: Optional[requests.Session] = None
+    self.max_connections = max_connections
+    self._executor: Optional[ThreadPoolExecutor] = None
+    self._batch: Optional[List[Dict[str, Any]]] = None
 
     self.host = host
     self.port = port
@@ -60,6 +79,8 @@ class HTTPBackend(SerializingBackend):
   ) -> Optional[dict]:
     """ Send an event to the server.
 
+    Inside :meth:`batch_commands`, the event is queued and `None` is returned.
+
     Args:
       event: The event identifier.
       data: The event arguments, which must be serializable by `json.dumps`.
@@ -68,21 +89,85 @@ class HTTPBackend(SerializingBackend):
     if self.session is None:
       raise RuntimeError("The backend is not running. Did you call `setup()`?")
 
-    command = command.replace("_", "-")
-    url = urllib.parse.urljoin(self.url, command)
+    if self._batch is not None:
+      self._batch.append({"command": command, "data": data})
+      return None
+
+    return await self._post(command, data)
+
+  async def _post(self, command: str, data: Optional[Any]) -> dict:
+    """ Post `data` to the endpoint of `command` in a worker thread, and return the response. """
+
+    session = self.session
+    assert session is not None and self._executor is not None
+    url = urllib.parse.urljoin(self.url, command.replace("_", "-"))
+
+    def post() -> dict:
+      resp = session.post(
+        url,
+        json=data,
+        headers={
+          "User-Agent": f"pylabrobot/{STANDARD_FORM_JSON_VERSION}",
+        })
+      return cast(dict, resp.json())
+
+    return await asyncio.get_running_loop().run_in_executor(self._executor, post)
+
+  @contextlib.asynccontextmanager
+  async def batch_commands(self) -> AsyncIterator[None]:
+    """ Queue commands sent inside this context, and send them to the server in a single request.
+
+    When the context exits, the queued commands are posted to the `batch` endpoint of the server,
+    which runs them in order as one task. The responses to the queued commands are `None`. If an
+    exception is raised inside the context, the queued commands are discarded. Nested batches join
+    the outermost batch.
+
+    Example:
+      >>> async with backend.batch_commands():
+      ...   await lh.aspirate(...)
+      ...   await lh.dispense(...)
+    """
+
+    if self._batch is not None: # join the outer batch
+      yield
+      return
+
+    self._batch = []
+    try:
+      yield
+      await self.flush_commands()
+    finally:
+      self._batch = None
+
+  async def flush_commands(self) -> Optional[dict]:
+    """ Send the commands queued in the current batch to the server, and return the response of the
+    `batch` endpoint. Returns `None` if no commands were queued. """
 
-    resp = self.session.post(
-      url,
-      json=data,
-      headers={
-        "User-Agent": f"pylabrobot/{STANDARD_FORM_JSON_VERSION}",
-      })
-    return cast(dict, resp.json())
+    if not self._batch:
+      return None
+    commands, self._batch = self._batch, []
+    return await self._post("batch", {"commands": commands})
 
   async def setup(self):
     self.session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_connections)
+    self.session.mount(f"{self.protocol}://", adapter)
+    self._executor = ThreadPoolExecutor(max_workers=self.max_connections,
+      thread_name_prefix="pylabrobot-http")
     await super().setup()
 
   async def stop(self):
-    await super().stop()
-    self.session = None
+    try:
+      await super().stop()
+    finally:
+      if self._executor is not None:
+        # Wait for requests that are still being sent on a worker thread, not on the event loop.
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        self._executor = None
+      if self.session is not None:
+        self.session.close()
+        self.session = None
+
+  async def assigned_resources_callback(self, resources: List[Resource]):
+    # servers are not required to have a `resources-assigned` endpoint, post resources one by one
+    await LiquidHandlerBackend.assigned_resources_callback(self, resources)
@@ -1,3 +1,4 @@
+import asyncio
 import unittest
 
 import responses
@@ -6,10 +7,12 @@ from responses import matchers
 from pylabrobot.liquid_handling import LiquidHandler
 from pylabrobot.liquid_handling.backends import HTTPBackend
 from pylabrobot.resources.hamilton import STARLetDeck
+from pylabrobot.serializer import serialize
 from pylabrobot.resources import (
   PLT_CAR_L5AC_A00,
   TIP_CAR_480_A00,
   HTF_L,
+  Coordinate,
   Cor_96_wellplate_360ul_Fb,
   no_tip_tracking,
   no_volume_tracking
@@ -95,6 +98,48 @@ class TestHTTPBackendOps(unittest.IsolatedAsyncioTestCase):
     )
     await self.lh.stop()
 
+  @responses.activate
+  async def test_batch_commands(self):
+    responses.add(
+      responses.POST,
+      "http://localhost:8080/events/batch",
+      match=[header_match, matchers.json_params_matcher({"commands": [
+        {"command": "pick_up_tips", "data": {
+          "channels": [{
+            "resource_name": "tiprack_tipspot_0_0",
+            "offset": serialize(Coordinate.zero()),
+            "tip": self.tip_rack.get_tip("A1").serialize(),
+          }],
+          "use_channels": [0]}},
+        {"command": "drop_tips", "data": {
+          "channels": [{
+            "resource_name": "tiprack_tipspot_0_0",
+            "offset": serialize(Coordinate.zero()),
+            "tip": self.tip_rack.get_tip("A1").serialize(),
+          }],
+          "use_channels": [0]}},
+      ]})],
+      json={"id": 0, "status": "queued"},
+      status=200,
+    )
+    async with self.backend.batch_commands():
+      await self.lh.pick_up_tips(self.tip_rack["A1"])
+      await self.lh.drop_tips(self.tip_rack["A1"])
+      self.assertEqual(len(responses.calls), 0)
+    self.assertEqual(len(responses.calls), 1)
+
+  @responses.activate
+  async def test_concurrent_commands(self):
+    responses.add(
+      responses.POST,
+      "http://localhost:8080/events/move-channel-x",
+      match=[header_match],
+      json={"status": "ok"},
+      status=200,
+    )
+    await asyncio.gather(*[self.backend.move_channel_x(channel=c, x=100) for c in range(8)])
+    self.assertEqual(len(responses.calls), 8)
+
   @responses.activate
   async def test_tip_pickup(self):
     responses.add(
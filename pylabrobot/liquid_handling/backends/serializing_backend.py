@@ -59,6 +59,12 @@ class SerializingBackend(LiquidHandlerBackend, metaclass=ABCMeta):
     await self.send_command(command="resource_assigned", data={"resource": resource.serialize(),
       "parent_name": (resource.parent.name if resource.parent else None)})
 
+  async def assigned_resources_callback(self, resources: List[Resource]):
+    await self.send_command(command="resources_assigned", data={"resources": [{
+      "resource": resource.serialize(),
+      "parent_name": (resource.parent.name if resource.parent else None)
+    } for resource in resources]})
+
   async def unassigned_resource_callback(self, name: str):
     await self.send_command(command="resource_unassigned", data={"resource_name": name})
 
@@ -37,6 +37,21 @@ class SerializingBackendTests(unittest.IsolatedAsyncioTestCase):
 
     self.maxDiff = None
 
+  async def test_resources_assigned_on_setup(self):
+    backend = SerializingSavingBackend(num_channels=8)
+    lh = LiquidHandler(backend=backend, deck=self.deck)
+    await lh.setup()
+    self.assertEqual(backend.sent_commands[1], {"command": "resources_assigned", "data": {
+      "resources": [{"resource": self.deck.serialize(), "parent_name": "lh_deck"}] +
+        [{"resource": r.serialize(), "parent_name": "deck"} for r in self.deck.children]
+    }})
+
+  async def test_resource_assigned(self):
+    plate = Cor_96_wellplate_360ul_Fb(name="plate_03")
+    self.plt_car[2] = plate
+    self.assertEqual(self.backend.sent_commands, [{"command": "resource_assigned", "data": {
+      "resource": plate.serialize(), "parent_name": self.plt_car[2].name}}])
+
   async def test_pick_up_tips(self):
     tip_spot = self.tip_rack.get_item("A1")
     tip = tip_spot.get_tip()
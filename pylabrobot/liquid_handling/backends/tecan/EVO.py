@@ -5,7 +5,10 @@ This file defines interfaces for all supported Tecan liquid handling robots.
 # pylint: disable=invalid-name
 
 from abc import ABCMeta, abstractmethod
-from typing import Dict, List, Optional, Tuple, Sequence, TypeVar, Union
+import contextlib
+import functools
+from typing import (AsyncIterator, Callable, Dict, List, Optional, Tuple, Sequence, TypeVar,
+  Union)
 
 from pylabrobot.machines.backends import USBBackend
 from pylabrobot.liquid_handling.backends.backend import LiquidHandlerBackend
@@ -37,6 +40,25 @@ from pylabrobot.resources import (
 
 T = TypeVar("T")
 
+
+class _BatchedCommand:
+  """ A command that is queued in a batch, waiting to be sent to the machine. """
+
+  def __init__(self, module: str, command: str, params: List[Optional[int]], cmd: str):
+    self.module = module
+    self.command = command
+    self.params = params
+    self.cmd = cmd
+
+  def overrides(self, other: "_BatchedCommand") -> bool:
+    """ Whether this `S*` (set) command makes `other` redundant: it is the same set command, and it
+    sets at least every parameter that `other` sets. """
+
+    return self.module == other.module and self.command == other.command and \
+      len(self.params) >= len(other.params) and \
+      all(p is not None for p, o in zip(self.params, other.params) if o is not None)
+
+
 class TecanLiquidHandler(LiquidHandlerBackend, USBBackend, metaclass=ABCMeta):
   """
   Abstract base class for Tecan liquid handling robot backends.
@@ -66,6 +88,8 @@ class TecanLiquidHandler(LiquidHandlerBackend, USBBackend, metaclass=ABCMeta):
     LiquidHandlerBackend.__init__(self)
 
     self._cache: Dict[str, List[Optional[int]]] = {}
+    self._batch: Optional[List[_BatchedCommand]] = None
+    self._coalesce_set_commands = False
 
   def _assemble_command(
     self,
@@ -140,6 +164,14 @@ class TecanLiquidHandler(LiquidHandlerBackend, USBBackend, metaclass=ABCMeta):
 
     cmd = self._assemble_command(module, command, [] if params is None else params)
 
+    # Queue commands that do not report anything while batching. Report (`R*`) commands need their
+    # response right away, so the batch is sent first.
+    if self._batch is not None:
+      if command[0] != "R" and wait:
+        self._batch.append(_BatchedCommand(module, command, params or [], cmd))
+        return None
+      await self.flush_commands()
+
     self.write(cmd, timeout=write_timeout)
     if not wait:
       return None
@@ -147,11 +179,136 @@ class TecanLiquidHandler(LiquidHandlerBackend, USBBackend, metaclass=ABCMeta):
     resp = self.read(timeout=read_timeout)
     return self.parse_response(resp)
 
+  @contextlib.asynccontextmanager
+  async def batch_commands(self, coalesce_set_commands: bool = False) -> AsyncIterator[None]:
+    """ Queue commands sent inside this context, and stream them to the machine together.
+
+    Instead of waiting for the response to each command before sending the next, queued commands
+    are written back-to-back when the batch is flushed, after which all responses are read and
+    validated in order. Commands that report values (`R*`) flush the batch before they are sent.
+    The batch is flushed when the context exits. Nested batches join the outermost batch, so a
+    batch can span multiple operations.
+
+    If the body of the context raises, the queued commands are discarded and not sent. The
+    operations that queued them have already returned, so the resource trackers were already
+    updated as if the commands were executed, and no longer match the machine.
+
+    Args:
+      coalesce_set_commands: if True, `S*` (set) commands that are overridden by a later set of the
+        same parameters before the module executes any other command are dropped when flushing.
+
+    Raises:
+      RuntimeError: if the body raises while commands are queued, from the error of the body.
+
+    Example:
+      >>> async with evo.batch_commands():
+      ...   await lh.aspirate(...)
+      ...   await lh.dispense(...)
+    """
+
+    if self._batch is not None: # join the outer batch
+      yield
+      return
+
+    self._batch = []
+    self._coalesce_set_commands = coalesce_set_commands
+    try:
+      yield
+    except Exception as e:
+      if self._batch:
+        raise RuntimeError(f"Batch aborted, {len(self._batch)} queued commands were not sent. The "
+                           "resource trackers may not match the machine.") from e
+      raise
+    else:
+      await self.flush_commands()
+    finally:
+      if self._batch:
+        self._cache.clear() # the queued set commands were cached, but not sent
+      self._batch = None
+
+  async def flush_commands(self, read_timeout: Optional[int] = None) -> None:
+    """ Send all queued commands in the current batch, and read and validate their responses.
+
+    Raises:
+      TecanError: if the machine responds with an error to any of the commands. All responses are
+        read before the first error is raised. Since the machine state is then unknown, the cache
+        of set commands is cleared.
+    """
+
+    if not self._batch:
+      return
+
+    batch = self._batch
+    if self._coalesce_set_commands:
+      batch = self._coalesce(batch)
+    self._batch = []
+
+    for command in batch:
+      self.write(command.cmd)
+
+    # Responses may arrive in one or more reads, so split them into frames (\x02 ... \x00).
+    responses: List[bytearray] = []
+    buffer = bytearray()
+    while len(responses) < len(batch):
+      buffer += self.read(timeout=read_timeout)
+      while 0 in buffer and len(responses) < len(batch):
+        end = buffer.index(0) + 1
+        responses.append(buffer[:end])
+        buffer = buffer[end:]
+
+    error: Optional[TecanError] = None
+    for command, resp in zip(batch, responses):
+      try:
+        parsed = self.parse_response(resp)
+        if parsed["module"] != command.module:
+          raise TecanError(f"Response from {parsed['module']} to command {command.cmd!r}",
+            command.module, 0)
+      except TecanError as e:
+        error = error or e
+    if error is not None:
+      self._cache.clear()
+      raise error
+
+  @staticmethod
+  def _coalesce(batch: List[_BatchedCommand]) -> List[_BatchedCommand]:
+    """ Drop set commands that are overridden before the module executes another command. """
+
+    keep: List[_BatchedCommand] = []
+    # later set commands per module, since the last non-set command of that module
+    pending_sets: Dict[str, List[_BatchedCommand]] = {}
+    for command in reversed(batch):
+      if command.command[0] != "S":
+        pending_sets[command.module] = []
+        keep.append(command)
+        continue
+      later = pending_sets.setdefault(command.module, [])
+      if any(other.overrides(command) for other in later):
+        continue
+      later.append(command)
+      keep.append(command)
+    keep.reverse()
+    return keep
+
   async def setup(self):
     await LiquidHandlerBackend.setup(self)
     await USBBackend.setup(self)
 
 
+def _pipelined(method: Callable):
+  """ Send the firmware commands of a LiHa operation as one batch if `pipeline_commands` is set.
+
+  See :meth:`TecanLiquidHandler.batch_commands`.
+  """
+
+  @functools.wraps(method)
+  async def wrapper(self: "EVO", *args, **kwargs):
+    if not self.pipeline_commands:
+      return await method(self, *args, **kwargs)
+    async with self.batch_commands(coalesce_set_commands=self.coalesce_set_commands):
+      return await method(self, *args, **kwargs)
+  return wrapper
+
+
 class EVO(TecanLiquidHandler):
   """
   Interface for the Tecan Freedom EVO series
@@ -168,6 +325,8 @@ class EVO(TecanLiquidHandler):
     packet_read_timeout: int = 120,
     read_timeout: int = 300,
     write_timeout: int = 300,
+    pipeline_commands: bool = False,
+    coalesce_set_commands: bool = False,
   ):
     """ Create a new EVO interface.
 
@@ -175,6 +334,11 @@ class EVO(TecanLiquidHandler):
       packet_read_timeout: timeout in seconds for reading a single packet.
       read_timeout: timeout in seconds for reading a full response.
       write_timeout: timeout in seconds for writing a command.
+      pipeline_commands: if True, the firmware commands of each LiHa operation (aspirate, dispense,
+        pick up tips, drop tips) are streamed to the machine as one batch, instead of waiting for
+        the response to each command before sending the next. See
+        :meth:`TecanLiquidHandler.batch_commands`.
+      coalesce_set_commands: if True, drop redundant set commands from pipelined batches.
     """
 
     super().__init__(
@@ -185,6 +349,8 @@ class EVO(TecanLiquidHandler):
     self._num_channels: Optional[int] = None
     self.diti_count = diti_count
     # channels [num_channels - diti_count, num_channels) configured for disposable tips
+    self.pipeline_commands = pipeline_commands
+    self.coalesce_set_commands = coalesce_set_commands
 
     self._liha_connected: Optional[bool] = None
     self._roma_connected: Optional[bool] = None
@@ -237,6 +403,8 @@ class EVO(TecanLiquidHandler):
       "packet_read_timeout": self.packet_read_timeout,
       "read_timeout": self.read_timeout,
       "write_timeout": self.write_timeout,
+      "pipeline_commands": self.pipeline_commands,
+      "coalesce_set_commands": self.coalesce_set_commands,
     }
 
   async def setup(self):
@@ -296,6 +464,7 @@ class EVO(TecanLiquidHandler):
 
   # ============== LiquidHandlerBackend methods ==============
 
+  @_pipelined
   async def aspirate(
     self,
     ops: List[Aspiration],
@@ -384,6 +553,7 @@ class EVO(TecanLiquidHandler):
     await self.liha.set_end_speed_plunger(sep)
     await self.liha.move_plunger_relative(ppr)
 
+  @_pipelined
   async def dispense(
     self,
     ops: List[Dispense],
@@ -425,6 +595,7 @@ class EVO(TecanLiquidHandler):
     await self.liha.set_tracking_distance_z(stz)
     await self.liha.move_tracking_relative(mtr)
 
+  @_pipelined
   async def pick_up_tips(
     self,
     ops: List[Pickup],
@@ -467,6 +638,7 @@ class EVO(TecanLiquidHandler):
     await self.liha.get_disposable_tip(self._bin_use_channels(use_channels), 768, 210)
     # TODO: check z params
 
+  @_pipelined
   async def drop_tips(
     self,
     ops: List[Drop],
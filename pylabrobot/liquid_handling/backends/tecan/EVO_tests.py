@@ -4,6 +4,7 @@ from unittest.mock import call
 
 from pylabrobot.liquid_handling import LiquidHandler
 from pylabrobot.liquid_handling.backends.tecan.EVO import EVO, LiHa, RoMa
+from pylabrobot.liquid_handling.backends.tecan.errors import TecanError
 from pylabrobot.liquid_handling.standard import (
   Pickup,
   Aspiration,
@@ -20,6 +21,8 @@ from pylabrobot.resources import (
   MP_3Pos_PCR
 )
 
+from tests.usb import FakeTecanDevice, MockEndpoint
+
 
 class EVOTests(unittest.IsolatedAsyncioTestCase):
   """ Test that the EVO backend is calling `send_command` correctly. """
@@ -224,3 +227,58 @@ class EVOTests(unittest.IsolatedAsyncioTestCase):
       call(module="C1", command="SFY", params=[3500, 1000]),
       call(module="C1", command="SFR", params=[2000, 600])
     ])
+
+
+class EVOBatchTests(unittest.IsolatedAsyncioTestCase):
+  """ Test streaming batches of commands to a (fake) EVO. """
+
+  def setUp(self) -> None:
+    super().setUp()
+    self.dev = FakeTecanDevice(reports={"RPX": "9000"}, errors={"PPR": 3})
+    self.evo = EVO()
+    self.evo.dev = self.dev # type: ignore[assignment]
+    self.evo.read_endpoint = MockEndpoint() # type: ignore[assignment]
+    self.evo.write_endpoint = MockEndpoint() # type: ignore[assignment]
+
+  async def test_batch_streams_commands(self):
+    async with self.evo.batch_commands():
+      await self.evo.send_command("C5", "SEP", [1, None])
+      await self.evo.send_command("C5", "MTR", [10, None])
+      self.assertEqual(self.dev.commands, [])
+      resp = await self.evo.send_command("C5", "RPX", [0]) # flushes the batch
+      self.assertEqual(resp, {"module": "C5", "data": [9000]})
+      await self.evo.send_command("C5", "MTR", [20, None])
+    self.assertEqual(self.dev.commands, ["C5SEP1,", "C5MTR10,", "C5RPX0", "C5MTR20,"])
+
+  async def test_batch_coalesces_set_commands(self):
+    async with self.evo.batch_commands(coalesce_set_commands=True):
+      await self.evo.send_command("C5", "SEP", [1, None])
+      await self.evo.send_command("C5", "SEP", [2, 3]) # overrides the previous SEP
+      await self.evo.send_command("C5", "SSZ", [4, None])
+      await self.evo.send_command("C5", "MTR", [10, None])
+      await self.evo.send_command("C5", "SSZ", [5, None])
+      await self.evo.send_command("C5", "SSZ", [None, 6]) # does not override SSZ 5
+    self.assertEqual(self.dev.commands,
+      ["C5SEP2,3", "C5SSZ4,", "C5MTR10,", "C5SSZ5,", "C5SSZ,6"])
+
+  async def test_batch_raises_errors(self):
+    await self.evo.send_command("C5", "SEP", [1])
+    with self.assertRaises(TecanError):
+      async with self.evo.batch_commands():
+        await self.evo.send_command("C5", "PPR", [10])
+        await self.evo.send_command("C5", "MTR", [10])
+    self.assertEqual(self.dev.commands, ["C5SEP1", "C5PPR10", "C5MTR10"])
+    self.assertEqual(self.evo._cache, {}) # pylint: disable=protected-access
+
+  async def test_batch_aborted(self):
+    with self.assertRaises(RuntimeError) as ctx:
+      async with self.evo.batch_commands():
+        await self.evo.send_command("C5", "SEP", [1])
+        await self.evo.send_command("C5", "MTR", [10])
+        raise ValueError("error in the batch")
+    self.assertIsInstance(ctx.exception.__cause__, ValueError)
+    self.assertEqual(self.dev.commands, [])
+
+    # the discarded set command is sent again
+    await self.evo.send_command("C5", "SEP", [1])
+    self.assertEqual(self.dev.commands, ["C5SEP1"])
@@ -1,157 +1,537 @@
+import asyncio
+import contextlib
+import functools
 import logging
-from typing import List, Union
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Union
+
 from pylabrobot.liquid_handling.backends.backend import LiquidHandlerBackend
-from tecan import Fluent, DiTi
-from pylabrobot.liquid_handling.standard import Pickup, Drop, Aspiration, Dispense
+from pylabrobot.liquid_handling.backends.tecan.fluent_worklist import (
+  FluentWorklist,
+  WorklistProgress,
+  labware_and_index,
+  load_checkpoint,
+  save_checkpoint,
+)
+from pylabrobot.liquid_handling.standard import (
+  Pickup,
+  PickupTipRack,
+  Drop,
+  DropTipRack,
+  Aspiration,
+  AspirationPlate,
+  AspirationContainer,
+  Dispense,
+  DispensePlate,
+  DispenseContainer,
+)
+from pylabrobot.machines.polling import Backoff, poll_until
+from pylabrobot.resources import ItemizedResource, Resource
+from pylabrobot.resources.tecan.tip_creators import TecanTip
+from pylabrobot.utils.log_handlers import log_command
+
+try:
+  from tecan import Fluent
+  HAS_TECAN = True
+except ImportError:
+  HAS_TECAN = False
 
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class PipettingGroup:
+  """ Operations on adjacent channels that are sent to the Fluent as a single multichannel command.
+
+  Attributes:
+    labware: The name of the labware.
+    liquid_class: The liquid class of the operations.
+    well_offset: The index of the well of the first channel in the labware. The next channels use
+      the next wells in the column.
+    volumes: The volume of each channel.
+    channels: The channels.
+  """
+
+  labware: str
+  liquid_class: str
+  well_offset: int
+  volumes: List[float]
+  channels: List[int]
+
+
+def group_pipetting_ops(
+  ops: Sequence[Union[Aspiration, Dispense]],
+  use_channels: List[int],
+  liquid_classes: List[str],
+) -> List[PipettingGroup]:
+  """ Group aspirations or dispenses into multichannel commands.
+
+  Operations are in the same group when they use the same labware and liquid class, and each
+  operation uses the channel after the channel of the previous operation and the well below the
+  well of the previous operation, in the same column. Operations in a labware that is not a
+  container of wells, like a trough, are in the same group when they use the same labware, liquid
+  class and adjacent channels.
+
+  The Fluent uses the tips of a multichannel command from the first channel on, because the `tecan`
+  client cannot select the channels of a command. Therefore only groups that start at channel 0 get
+  more than one operation. Every other operation is a group of its own.
+
+  Args:
+    ops: The operations.
+    use_channels: The channel of each operation.
+    liquid_classes: The liquid class of each operation.
+  """
+
+  groups: List[PipettingGroup] = []
+  num_rows: Dict[str, int] = {} # of each labware that is a container of wells
+  previous_labware: Optional[Resource] = None
+  previous_index = previous_channel = -1
+  for channel, op, liquid_class in sorted(zip(use_channels, ops, liquid_classes),
+                                          key=lambda item: item[0]):
+    labware, index = labware_and_index(op.resource)
+    if isinstance(labware, ItemizedResource) and labware.name not in num_rows:
+      num_rows[labware.name] = labware.num_items_y
+    if len(groups) > 0 and groups[-1].channels[0] == 0 and labware is previous_labware and \
+        liquid_class == groups[-1].liquid_class and channel == previous_channel + 1 and \
+        (labware.name not in num_rows or
+         (index == previous_index + 1 and index % num_rows[labware.name] != 0)):
+      groups[-1].volumes.append(op.volume)
+      groups[-1].channels.append(channel)
+    else:
+      groups.append(PipettingGroup(labware=labware.name, liquid_class=liquid_class,
+        well_offset=index, volumes=[op.volume], channels=[channel]))
+    previous_labware, previous_index, previous_channel = labware, index, channel
+  return groups
+
+
 class FLUENT(LiquidHandlerBackend):
-    def __init__(self, server_ip: str = "127.0.0.1", server_port: int = 50052, num_channels: int = 8, simulation_mode: bool = False):
-        super().__init__()
-        self.server_ip = server_ip
-        self.server_port = server_port
-        self._num_channels = num_channels
-        self.simulation_mode = simulation_mode
-        self.client = Fluent(server_ip=self.server_ip, server_port=self.server_port)
-        self.connected = False
-
-    async def setup(self):
-        try:
-            self.client.start_fluent(simulation_mode=self.simulation_mode)
-            self.connected = True
-            logger.info(f"Connected to Fluent SiLA2 at {self.server_ip}:{self.server_port}")
-        except Exception as e:
-            logger.error(f"Failed to connect to Fluent SiLA2: {e}")
-            self.connected = False
-
-    async def stop(self):
-        try:
-            self.client.shutdown(10)
-            self.connected = False
-            logger.info("Disconnected from Fluent SiLA2")
-        except Exception as e:
-            logger.error(f"Failed to disconnect from Fluent SiLA2: {e}")
-
-    async def check_channel_availability(self, use_channels: List[int]):
-        available_channels = list(range(self.num_channels))
-        for channel in use_channels:
-            if channel not in available_channels:
-                raise RuntimeError(f"Channel {channel} is not available. Available channels: {available_channels}")
-
-    # PICK UP TIPS
-    async def pick_up_tips(self, ops: List[Pickup], use_channels: List[int], **backend_kwargs):
-        if not self.connected:
-            raise RuntimeError("Not connected to Fluent SiLA2")
-        await self.check_channel_availability(use_channels)
-
-        try:
-            for op in ops:
-                # Use SiLA2 GetTips command
-                self.client.get_tips(airgap_volume=0, airgap_speed=0, diti_type=op.tip.tip_type.name)
-                logger.info(f"Picked up tips from {op.resource.name}")
-        except Exception as e:
-            logger.error(f"Failed to pick up tips: {e}")
-
-    # DROP TIPS
-    async def drop_tips(self, ops: List[Drop], use_channels: List[int], **backend_kwargs):
-        if not self.connected:
-            raise RuntimeError("Not connected to Fluent SiLA2")
-        await self.check_channel_availability(use_channels)
-
-        try:
-            for op in ops:
-                # Use SiLA2 DropTips command
-                self.client.drop_tips(labware=op.resource.name)
-                logger.info(f"Dropped tips to {op.resource.name}")
-        except Exception as e:
-            logger.error(f"Failed to drop tips: {e}")
-
-    # ASPIRATE with different volumes for each pipette
-    async def aspirate(self, ops: List[Aspiration], use_channels: List[int], **backend_kwargs):
-        if not self.connected:
-            raise RuntimeError("Not connected to Fluent SiLA2")
-        await self.check_channel_availability(use_channels)
-
-        try:
-            for op in ops:
-                # Handle different volumes for each channel
-                volumes = [op.volume for _ in use_channels] if isinstance(op.volume, (int, float)) else op.volume
-
-                # Ensure that the number of volumes matches the number of channels used
-                if len(volumes) != len(use_channels):
-                    raise ValueError("Number of volumes must match the number of channels used")
-
-                # Use SiLA2 Aspirate command with variable volumes
-                self.client.aspirate(volume=volumes, labware=op.resource.name, liquid_class="Water", well_offset=0)
-                logger.info(f"Aspirated {volumes} from {op.resource.name}")
-        except Exception as e:
-            logger.error(f"Failed to aspirate: {e}")
-
-    # DISPENSE with different volumes for each pipette
-    async def dispense(self, ops: List[Dispense], use_channels: List[int], **backend_kwargs):
-        if not self.connected:
-            raise RuntimeError("Not connected to Fluent SiLA2")
-        await self.check_channel_availability(use_channels)
-
-        try:
-            for op in ops:
-                # Handle different volumes for each channel
-                volumes = [op.volume for _ in use_channels] if isinstance(op.volume, (int, float)) else op.volume
-
-                # Ensure that the number of volumes matches the number of channels used
-                if len(volumes) != len(use_channels):
-                    raise ValueError("Number of volumes must match the number of channels used")
-
-                # Use SiLA2 Dispense command with variable volumes
-                self.client.dispense(volume=volumes, labware=op.resource.name, liquid_class="Water", well_offset=0)
-                logger.info(f"Dispensed {volumes} to {op.resource.name}")
-        except Exception as e:
-            logger.error(f"Failed to dispense: {e}")
-
-    # LABWARE MOVEMENT
-    async def move_resource(self, resource_name: str, target_location: str, rotation: int = 0, position: int = 0):
-        try:
-            self.client.set_location(labware=resource_name, rotation=rotation, target_location=target_location, target_site=position)
-            logger.info(f"Moved {resource_name} to {target_location}")
-        except Exception as e:
-            logger.error(f"Failed to move resource: {e}")
-
-    # ADD LABWARE
-    async def add_labware(self, labware_name: str, labware_type: str, target_location: str):
-        try:
-            self.client.add_labware(labware_name, labware_type, target_location)
-            logger.info(f"Added labware: {labware_name} of type {labware_type}")
-        except Exception as e:
-            logger.error(f"Failed to add labware: {e}")
-
-    # REMOVE LABWARE
-    async def remove_labware(self, labware_name: str):
-        try:
-            self.client.remove_labware(labware_name)
-            logger.info(f"Removed labware: {labware_name}")
-        except Exception as e:
-            logger.error(f"Failed to remove labware: {e}")
-
-    # PREPARE AND RUN METHODS
-    async def prepare_method(self, method_name: str):
-        try:
-            self.client.prepare_method(method_name)
-            logger.info(f"Method {method_name} prepared")
-        except Exception as e:
-            logger.error(f"Failed to prepare method: {e}")
-
-    async def run_method(self):
-        try:
-            self.client.run_method()
-            logger.info("Method running")
-        except Exception as e:
-            logger.error(f"Failed to run method: {e}")
-
-    async def stop_method(self):
-        try:
-            self.client.stop_method()
-            logger.info("Method stopped")
-        except Exception as e:
-            logger.error(f"Failed to stop method: {e}")
+  """ Backend for the Tecan Fluent, controlled through the Fluent SiLA2 server with the `tecan`
+  client.
+
+  The client waits for the server to execute every command. Calls are made from a single worker
+  thread, in the order they are made, so that the event loop is not blocked while the Fluent is
+  moving. Aspirations and dispenses on adjacent wells of the same labware are sent as a single
+  multichannel command, see :func:`group_pipetting_ops`.
+
+  Operations can also be recorded in a worklist with :meth:`record_worklist`, and run by the Fluent
+  with a single prepared method with :meth:`run_worklist`, so that they are not sent one by one.
+  """
+
+  def __init__(
+    self,
+    server_ip: str = "127.0.0.1",
+    server_port: int = 50052,
+    num_channels: int = 8,
+    simulation_mode: bool = False,
+    liquid_class: str = "Water",
+    method_backoff: Backoff = Backoff(initial=0.1, maximum=1.0),
+  ):
+    """ Create a new Fluent backend.
+
+    Args:
+      server_ip: The IP address of the Fluent SiLA2 server.
+      server_port: The port of the Fluent SiLA2 server.
+      num_channels: The number of channels of the FCA arm.
+      simulation_mode: Whether to start FluentControl in simulation mode.
+      liquid_class: The liquid class used when no liquid class is passed to `aspirate` and
+        `dispense`.
+      method_backoff: The times between polls of FluentControl while waiting for a method to
+        finish, see :meth:`wait_for_method`.
+    """
+
+    super().__init__()
+    self.server_ip = server_ip
+    self.server_port = server_port
+    self._num_channels = num_channels
+    self.simulation_mode = simulation_mode
+    self.liquid_class = liquid_class
+    self.method_backoff = method_backoff
+    self.client: Any = None # the `tecan.Fluent` client, created in `setup` if not set
+    self.connected = False
+    self._executor: Optional[ThreadPoolExecutor] = None
+    self._worklist: Optional[FluentWorklist] = None
+
+  @property
+  def num_channels(self) -> int:
+    return self._num_channels
+
+  def serialize(self) -> dict:
+    return {
+      **super().serialize(),
+      "server_ip": self.server_ip,
+      "server_port": self.server_port,
+      "num_channels": self.num_channels,
+      "simulation_mode": self.simulation_mode,
+      "liquid_class": self.liquid_class,
+    }
+
+  async def _run(self, func: Callable, *args, **kwargs) -> Any:
+    """ Run `func` on the worker thread, and wait for it to return. """
+
+    if self._executor is None:
+      raise RuntimeError("Not connected to Fluent SiLA2. Did you call `setup()`?")
+    return await asyncio.get_running_loop().run_in_executor(self._executor,
+      functools.partial(func, *args, **kwargs))
+
+  async def send_command(self, command: str, *args, **kwargs) -> Any:
+    """ Call `command` of the SiLA2 client on the worker thread, and wait for the Fluent to execute
+    it.
+
+    Args:
+      command: The name of the client method, like "aspirate".
+    """
+
+    if self.client is None:
+      raise RuntimeError("Not connected to Fluent SiLA2. Did you call `setup()`?")
+    log_command(self.__class__.__name__, "sent", f"{command} {args} {kwargs}")
+    result = await self._run(getattr(self.client, command), *args, **kwargs)
+    log_command(self.__class__.__name__, "received", f"{command} {result!r}")
+    return result
+
+  async def setup(self):
+    await super().setup()
+    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pylabrobot-fluent")
+    try:
+      if self.client is None:
+        if not HAS_TECAN:
+          raise RuntimeError("The Fluent backend requires the tecan package.")
+        self.client = await self._run(Fluent, server_ip=self.server_ip,
+          server_port=self.server_port)
+      await self.send_command("start_fluent", simulation_mode=self.simulation_mode)
+    except Exception:
+      await self._shutdown_executor()
+      raise
+    self.connected = True
+    logger.info("Connected to Fluent SiLA2 at %s:%s", self.server_ip, self.server_port)
+
+  async def stop(self):
+    try:
+      if self.connected:
+        await self.send_command("shutdown", 10)
+        logger.info("Disconnected from Fluent SiLA2")
+    finally:
+      self.connected = False
+      await self._shutdown_executor()
+
+  async def _shutdown_executor(self):
+    """ Wait for running SiLA2 calls to finish, on a worker thread rather than the event loop. """
+
+    if self._executor is not None:
+      await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+      self._executor = None
+
+  async def check_channel_availability(self, use_channels: List[int]):
+    available_channels = list(range(self.num_channels))
+    for channel in use_channels:
+      if channel not in available_channels:
+        raise RuntimeError(f"Channel {channel} is not available. Available channels: "
+                           f"{available_channels}")
+
+  def _assert_connected(self):
+    if not self.connected:
+      raise RuntimeError("Not connected to Fluent SiLA2")
+
+  async def pick_up_tips(
+    self,
+    ops: List[Pickup],
+    use_channels: List[int],
+    diti_type: Optional[str] = None,
+    airgap_volume: float = 0,
+    airgap_speed: float = 0,
+  ):
+    """ Pick up tips with one `GetTips` command for every DiTi type.
+
+    Args:
+      diti_type: The DiTi type to pick up. Defaults to the tip type of the `TecanTip` of each
+        operation.
+      airgap_volume: The volume of the airgap aspirated after picking up the tips.
+      airgap_speed: The speed at which the airgap is aspirated.
+    """
+
+    await self.check_channel_availability(use_channels)
+
+    op_diti_types: List[str] = []
+    for op in ops:
+      if diti_type is not None:
+        op_diti_types.append(diti_type)
+      elif isinstance(op.tip, TecanTip):
+        op_diti_types.append(op.tip.tip_type.name)
+      else:
+        raise ValueError(f"Unknown DiTi type of tip {op.tip}, pass `diti_type`.")
+
+    if self._worklist is not None:
+      self._worklist.pick_up_tips(use_channels, op_diti_types)
+      return
+
+    self._assert_connected()
+    diti_types: Dict[str, List[Pickup]] = {}
+    for op, op_diti_type in zip(ops, op_diti_types):
+      diti_types.setdefault(op_diti_type, []).append(op)
+
+    for op_diti_type, diti_ops in diti_types.items():
+      await self.send_command("get_tips", airgap_volume=airgap_volume, airgap_speed=airgap_speed,
+        diti_type=op_diti_type)
+      logger.info("Picked up %s tips from %s", op_diti_type,
+        ", ".join(op.resource.name for op in diti_ops))
+
+  async def drop_tips(self, ops: List[Drop], use_channels: List[int]):
+    """ Drop tips with one `DropTips` command for every labware. """
+
+    await self.check_channel_availability(use_channels)
+
+    if self._worklist is not None:
+      self._worklist.replace_tips()
+      return
+
+    self._assert_connected()
+
+    labware_names: List[str] = []
+    for op in ops:
+      labware, _ = labware_and_index(op.resource)
+      if labware.name not in labware_names:
+        labware_names.append(labware.name)
+
+    for labware_name in labware_names:
+      await self.send_command("drop_tips", labware=labware_name)
+      logger.info("Dropped tips to %s", labware_name)
+
+  def _liquid_classes(self, ops: Sequence[Any],
+                      liquid_class: Optional[Union[str, List[str]]]) -> List[str]:
+    if liquid_class is None:
+      return [self.liquid_class] * len(ops)
+    if isinstance(liquid_class, str):
+      return [liquid_class] * len(ops)
+    if len(liquid_class) != len(ops):
+      raise ValueError("Number of liquid classes must match the number of operations")
+    return liquid_class
+
+  async def aspirate(
+    self,
+    ops: List[Aspiration],
+    use_channels: List[int],
+    liquid_class: Optional[Union[str, List[str]]] = None,
+  ):
+    """ Aspirate with one `Aspirate` command for every group of adjacent channels and wells, see
+    :func:`group_pipetting_ops`.
+
+    Args:
+      liquid_class: The liquid class of all operations, or of each operation. Defaults to the
+        liquid class of the backend.
+    """
+
+    await self.check_channel_availability(use_channels)
+    liquid_classes = self._liquid_classes(ops, liquid_class)
+
+    if self._worklist is not None:
+      self._worklist.aspirate(ops, use_channels, liquid_classes)
+      return
+
+    self._assert_connected()
+    for group in group_pipetting_ops(ops, use_channels, liquid_classes):
+      await self.send_command("aspirate", volume=group.volumes, labware=group.labware,
+        liquid_class=group.liquid_class, well_offset=group.well_offset)
+      logger.info("Aspirated %s from %s", group.volumes, group.labware)
+
+  async def dispense(
+    self,
+    ops: List[Dispense],
+    use_channels: List[int],
+    liquid_class: Optional[Union[str, List[str]]] = None,
+  ):
+    """ Dispense with one `Dispense` command for every group of adjacent channels and wells, see
+    :func:`group_pipetting_ops`.
+
+    Args:
+      liquid_class: The liquid class of all operations, or of each operation. Defaults to the
+        liquid class of the backend.
+    """
+
+    await self.check_channel_availability(use_channels)
+    liquid_classes = self._liquid_classes(ops, liquid_class)
+
+    if self._worklist is not None:
+      self._worklist.dispense(ops, use_channels, liquid_classes)
+      return
+
+    self._assert_connected()
+    for group in group_pipetting_ops(ops, use_channels, liquid_classes):
+      await self.send_command("dispense", volume=group.volumes, labware=group.labware,
+        liquid_class=group.liquid_class, well_offset=group.well_offset)
+      logger.info("Dispensed %s to %s", group.volumes, group.labware)
+
+  async def pick_up_tips96(self, pickup: PickupTipRack):
+    raise NotImplementedError()
+
+  async def drop_tips96(self, drop: DropTipRack):
+    raise NotImplementedError()
+
+  async def aspirate96(self, aspiration: Union[AspirationPlate, AspirationContainer]):
+    raise NotImplementedError()
+
+  async def dispense96(self, dispense: Union[DispensePlate, DispenseContainer]):
+    raise NotImplementedError()
+
+  # LABWARE MOVEMENT
+  async def move_resource( # type: ignore[override]
+    self,
+    resource_name: str,
+    target_location: str,
+    rotation: int = 0,
+    position: int = 0
+  ):
+    await self.send_command("set_location", labware=resource_name, rotation=rotation,
+      target_location=target_location, target_site=position)
+    logger.info("Moved %s to %s", resource_name, target_location)
+
+  # ADD LABWARE
+  async def add_labware(self, labware_name: str, labware_type: str, target_location: str):
+    await self.send_command("add_labware", labware_name, labware_type, target_location)
+    logger.info("Added labware: %s of type %s", labware_name, labware_type)
+
+  # REMOVE LABWARE
+  async def remove_labware(self, labware_name: str):
+    await self.send_command("remove_labware", labware_name)
+    logger.info("Removed labware: %s", labware_name)
+
+  # PREPARE AND RUN METHODS
+  async def prepare_method(self, method_name: str):
+    await self.send_command("prepare_method", method_name)
+    logger.info("Method %s prepared", method_name)
+
+  async def run_method(self):
+    """ Start the prepared method. The method runs in the background, see
+    :meth:`wait_for_method`. """
+    await self.send_command("run_method")
+    logger.info("Method running")
+
+  def can_wait_for_method(self) -> bool:
+    """ Whether the client can report if a method is running, see :meth:`is_method_running`. """
+    return callable(getattr(self.client, "is_method_running", None))
+
+  async def is_method_running(self) -> bool:
+    """ Whether FluentControl is running a method. Raises the error of a method that failed.
+
+    This requires a client with an `is_method_running()` method that returns whether a method is
+    running, and raises the error of a method that failed. The `tecan` client is assumed to provide
+    it; clients without it raise a `RuntimeError`, see :meth:`can_wait_for_method`.
+    """
+
+    if not self.can_wait_for_method():
+      raise RuntimeError("The Fluent client cannot report whether a method is running: it has no "
+                         "`is_method_running` method.")
+    return bool(await self.send_command("is_method_running"))
+
+  async def wait_for_method(self, timeout: Optional[float] = None):
+    """ Wait until the method started with :meth:`run_method` has finished. If `run_method` only
+    returns when the method has finished, this returns after a single poll.
+
+    Args:
+      timeout: The maximum time in seconds to wait, or `None` to wait indefinitely.
+
+    Raises:
+      TimeoutError: If the method did not finish within `timeout` seconds.
+    """
+
+    await poll_until(self.is_method_running, lambda running: not running, timeout=timeout,
+      backoff=self.method_backoff, name="FLUENT.wait_for_method")
+    logger.info("Method finished")
+
+  async def stop_method(self):
+    await self.send_command("stop_method")
+    logger.info("Method stopped")
+
+  # WORKLISTS
+  @contextlib.asynccontextmanager
+  async def record_worklist(self) -> AsyncIterator[FluentWorklist]:
+    """ Record the tip and pipetting operations inside this context in a worklist, instead of
+    sending them to the Fluent. Run the worklist with :meth:`run_worklist`.
+
+    Example:
+      >>> async with fluent.record_worklist() as worklist:
+      ...   await lh.pick_up_tips(tip_rack["A1:H1"])
+      ...   await lh.aspirate(source["A1:H1"], vols=[10] * 8)
+      ...   await lh.dispense(destination["A1:H1"], vols=[10] * 8)
+      ...   await lh.drop_tips(tip_rack["A1:H1"])
+      >>> async for progress in fluent.run_worklist(worklist, "PLR worklist", "C:/PLR/plr.gwl"):
+      ...   print(f"{progress.completed}/{progress.total}")
+    """
+
+    if self._worklist is not None:
+      raise RuntimeError("Already recording a worklist.")
+    self._worklist = worklist = FluentWorklist()
+    try:
+      yield worklist
+    finally:
+      self._worklist = None
+
+  async def run_worklist(
+    self,
+    worklist: FluentWorklist,
+    method_name: str,
+    path: str,
+    checkpoint_path: Optional[str] = None,
+    tip_cycles_per_run: Optional[int] = None,
+  ) -> AsyncIterator[WorklistProgress]:
+    """ Run a worklist with a prepared method, and yield the progress after every run.
+
+    The worklist is saved to `path` as a GWL file, and run by preparing and running the method
+    `method_name`, which must run the worklist file at `path` with a Worklist command. A run is
+    complete when the method has finished, see :meth:`wait_for_method`. This requires a client that
+    can report whether a method is running (see :meth:`is_method_running`), which is checked
+    before anything is sent to the Fluent. By default, the whole
+    worklist is run at once. With `tip_cycles_per_run`, the worklist is run in parts of that many
+    tip cycles.
+
+    With `checkpoint_path`, the number of tip cycles that have been run is saved to a checkpoint
+    after every run. If the checkpoint exists, the tip cycles that have been run are skipped, so
+    that a worklist that was interrupted is resumed from the start of the first tip cycle that did
+    not complete. The checkpoint is deleted when the worklist is completed.
+
+    Args:
+      worklist: The worklist, see :meth:`record_worklist`.
+      method_name: The name of the FluentControl method that runs the worklist at `path`.
+      path: The path of the worklist file, which must be readable by FluentControl.
+      checkpoint_path: The path of the checkpoint, or `None` to not save a checkpoint.
+      tip_cycles_per_run: The number of tip cycles to run at once, or `None` to run the whole
+        worklist at once.
+
+    Raises:
+      ValueError: If `tip_cycles_per_run` is less than 1, or the checkpoint belongs to a different
+        worklist.
+      RuntimeError: If the client cannot report whether a method is running.
+    """
+
+    if tip_cycles_per_run is not None and tip_cycles_per_run < 1:
+      raise ValueError("tip_cycles_per_run must be at least 1.")
+    self._assert_connected()
+    if not self.can_wait_for_method():
+      raise RuntimeError("Running worklists requires a Fluent client that can report whether a "
+                         "method is running (`is_method_running`), so that a run is only "
+                         "checkpointed when the method has finished.")
+
+    tip_cycles = worklist.tip_cycles()
+    completed = 0
+    if checkpoint_path is not None and os.path.exists(checkpoint_path):
+      completed = load_checkpoint(checkpoint_path, worklist)
+      logger.info("Resuming worklist after %d of %d tip cycles", completed, len(tip_cycles))
+
+    step = tip_cycles_per_run or len(tip_cycles) or 1
+    total = len(worklist)
+    for start in range(completed, len(tip_cycles), step):
+      records = [record for cycle in tip_cycles[start:start + step] for record in cycle]
+      await self._run(worklist.save, path, records)
+      await self.prepare_method(method_name)
+      await self.run_method()
+      await self.wait_for_method()
+
+      completed = min(start + step, len(tip_cycles))
+      if checkpoint_path is not None:
+        await self._run(save_checkpoint, checkpoint_path, worklist, completed)
+      yield WorklistProgress(completed=sum(len(cycle) for cycle in tip_cycles[:completed]),
+        total=total)
+
+    if checkpoint_path is not None and os.path.exists(checkpoint_path):
+      os.remove(checkpoint_path)
@@ -0,0 +1,134 @@
+import asyncio
+import time
+import unittest
+
+from pylabrobot.liquid_handling import LiquidHandler
+from pylabrobot.liquid_handling.backends.tecan.FLUENT import FLUENT
+from pylabrobot.resources import (
+  Fluent780Deck,
+  DeepWell_96_Well,
+  DiTi_100ul_Te_MO,
+  DiTi_SBS_3_Pos_MCA96,
+  MP_3Pos_PCR
+)
+
+from tests.fluent import FakeFluentServer
+
+
+class FLUENTTests(unittest.IsolatedAsyncioTestCase):
+  """ Test the commands that the FLUENT backend sends to a fake Fluent SiLA2 server. """
+
+  async def asyncSetUp(self):
+    await super().asyncSetUp()
+    self.server = FakeFluentServer()
+    self.fluent = FLUENT(num_channels=8)
+    self.fluent.client = self.server
+
+    self.deck = Fluent780Deck()
+    self.lh = LiquidHandler(backend=self.fluent, deck=self.deck)
+
+    self.tr_carrier = DiTi_SBS_3_Pos_MCA96(name="tip_rack_carrier")
+    self.tr_carrier[0] = self.tr = DiTi_100ul_Te_MO(name="tip_rack")
+    self.deck.assign_child_resource(self.tr_carrier, rails=10)
+
+    self.plate_carrier = MP_3Pos_PCR(name="plate_carrier")
+    self.plate_carrier[0] = self.plate = DeepWell_96_Well(name="plate")
+    self.deck.assign_child_resource(self.plate_carrier, rails=16)
+
+    await self.lh.setup()
+    self.server.calls.clear()
+
+  async def asyncTearDown(self):
+    await self.lh.stop()
+    await super().asyncTearDown()
+
+  async def test_setup_and_stop(self):
+    await self.lh.stop()
+    self.assertEqual(self.server.calls, [("shutdown", {"timeout": 10})])
+    self.server.calls.clear()
+
+    await self.lh.setup()
+    self.assertEqual(self.server.calls, [("start_fluent", {"simulation_mode": False})])
+    # calls are made from the worker thread, not the event loop thread
+    self.assertEqual(len(self.server.threads), 1)
+    self.assertTrue(next(iter(self.server.threads)).startswith("pylabrobot-fluent"))
+
+  async def test_not_connected(self):
+    await self.lh.stop()
+    with self.assertRaises(RuntimeError):
+      await self.fluent.aspirate([], use_channels=[])
+    await self.lh.setup()
+
+  async def test_pick_up_tips(self):
+    await self.lh.pick_up_tips(self.tr["A1:H1"], diti_type="FCA, 100ul SBS")
+    self.assertEqual(self.server.calls, [
+      ("get_tips", {"airgap_volume": 0, "airgap_speed": 0, "diti_type": "FCA, 100ul SBS"})])
+
+  async def test_drop_tips(self):
+    await self.lh.pick_up_tips(self.tr["A1:H1"])
+    self.server.calls.clear()
+    await self.lh.drop_tips(self.tr["A1:H1"])
+    self.assertEqual(self.server.calls, [("drop_tips", {"labware": "tip_rack"})])
+
+  async def test_aspirate_column(self):
+    await self.lh.pick_up_tips(self.tr["A1:H1"])
+    self.server.calls.clear()
+    await self.lh.aspirate(self.plate["A1:H1"], vols=[10, 20, 30, 40, 50, 60, 70, 80])
+    self.assertEqual(self.server.commands("aspirate"), [
+      {"volume": [10, 20, 30, 40, 50, 60, 70, 80], "labware": "plate", "liquid_class": "Water",
+       "well_offset": 0}])
+
+    await self.lh.dispense(self.plate["A2:H2"], vols=[10] * 8, liquid_class="DMSO")
+    self.assertEqual(self.server.commands("dispense"), [
+      {"volume": [10] * 8, "labware": "plate", "liquid_class": "DMSO", "well_offset": 8}])
+
+  async def test_aspirate_groups(self):
+    await self.lh.pick_up_tips(self.tr["A1:D1"])
+    self.server.calls.clear()
+
+    # H1 and A2 are not in the same column, C4 is not below A2
+    await self.lh.aspirate(self.plate["G1", "H1", "A2", "C4"], vols=[1, 2, 3, 4])
+    self.assertEqual([(c["well_offset"], c["volume"]) for c in self.server.commands("aspirate")],
+      [(6, [1, 2]), (8, [3]), (26, [4])])
+    self.server.calls.clear()
+
+    await self.lh.aspirate(self.plate["A1:D1"], vols=[1, 2, 3, 4],
+      liquid_class=["Water", "Water", "DMSO", "DMSO"])
+    self.assertEqual([(c["well_offset"], c["liquid_class"], c["volume"])
+      for c in self.server.commands("aspirate")],
+      [(0, "Water", [1, 2]), (2, "DMSO", [3]), (3, "DMSO", [4])])
+    self.server.calls.clear()
+
+    # only groups starting at channel 0 are sent as multichannel commands
+    await self.lh.aspirate(self.plate["B1:D1"], vols=[1, 2, 3], use_channels=[1, 2, 3])
+    self.assertEqual([(c["well_offset"], c["volume"]) for c in self.server.commands("aspirate")],
+      [(1, [1]), (2, [2]), (3, [3])])
+
+  async def test_does_not_block_event_loop(self):
+    self.server.execution_time = 0.1
+    await self.lh.pick_up_tips(self.tr["A1:H1"])
+
+    ticks = 0
+    async def tick():
+      nonlocal ticks
+      while True:
+        ticks += 1
+        await asyncio.sleep(0.005)
+
+    task = asyncio.create_task(tick())
+    t = time.monotonic()
+    await self.lh.aspirate(self.plate["A1:H1"], vols=[10] * 8)
+    task.cancel()
+    self.assertGreaterEqual(time.monotonic() - t, 0.1)
+    self.assertGreater(ticks, 5)
+
+  async def test_error(self):
+    self.server.errors["aspirate"] = "Liquid level detection error"
+    await self.lh.pick_up_tips(self.tr["A1"])
+    with self.assertRaises(RuntimeError):
+      await self.lh.aspirate(self.plate["A1"], vols=[10])
+
+  def test_serialize(self):
+    data = self.fluent.serialize()
+    self.assertEqual(data["type"], "FLUENT")
+    self.assertEqual(data["num_channels"], 8)
@@ -0,0 +1,181 @@
+""" Worklists for the Tecan Fluent.
+
+A :class:`FluentWorklist` holds liquid handling operations recorded by the
+:class:`~pylabrobot.liquid_handling.backends.tecan.FLUENT.FLUENT` backend, and compiles them to a
+Gemini worklist (GWL) file that a FluentControl method runs with a Worklist command.
+
+A worklist has a line for every channel of an aspiration (`A`) or dispense (`D`), with the labware,
+the 1-based position of the well in the labware, the volume, the liquid class, the DiTi type and
+the tip mask of the channel. Tips are dropped and new tips are picked up at a `W` line. The lines
+between two `W` lines are a tip cycle, and worklists are split into runs at tip cycles.
+"""
+
+import json
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from pylabrobot.liquid_handling.standard import Aspiration, Dispense
+from pylabrobot.resources import ItemizedResource, Resource
+
+
+def labware_and_index(resource: Resource) -> Tuple[Resource, int]:
+  """ The labware of a well or tip spot and its index in the labware, or the resource itself and 0
+  if it is not an item of a labware (like a trough). """
+
+  parent = resource.parent
+  if isinstance(parent, ItemizedResource):
+    for index, item in enumerate(parent.children):
+      if item is resource:
+        return parent, index
+  return resource, 0
+
+
+@dataclass
+class WorklistRecord:
+  """ A line of a worklist.
+
+  Attributes:
+    operation: "A" to aspirate, "D" to dispense, or "W" to drop the tips and pick up new tips.
+    labware: The name of the labware.
+    labware_type: The type of the labware.
+    position: The 1-based position of the well in the labware, in column-major order.
+    volume: The volume in uL.
+    liquid_class: The liquid class.
+    tip_type: The DiTi type.
+    tip_mask: The channel, as a bit mask.
+  """
+
+  operation: str
+  labware: str = ""
+  labware_type: str = ""
+  position: int = 0
+  volume: float = 0
+  liquid_class: str = ""
+  tip_type: str = ""
+  tip_mask: int = 0
+
+  def to_gwl(self) -> str:
+    if self.operation not in ("A", "D"):
+      return f"{self.operation};"
+    return ";".join([self.operation, self.labware, "", self.labware_type, str(self.position), "",
+      f"{self.volume:g}", self.liquid_class, self.tip_type, str(self.tip_mask)])
+
+
+@dataclass
+class WorklistProgress:
+  """ The progress of running a worklist.
+
+  Attributes:
+    completed: The number of lines that have been run.
+    total: The number of lines in the worklist.
+  """
+
+  completed: int
+  total: int
+
+
+class FluentWorklist:
+  """ Liquid handling operations recorded in a worklist, see :meth:`FLUENT.record_worklist`. """
+
+  def __init__(self):
+    self.records: List[WorklistRecord] = []
+    self.tip_types: Dict[int, str] = {} # the DiTi type of the tips picked up by each channel
+
+  def __len__(self) -> int:
+    return len(self.records)
+
+  def pick_up_tips(self, use_channels: List[int], tip_types: List[str]):
+    """ Record the DiTi type of the tips picked up by each channel. Tips are picked up by the Fluent
+    when they are first used. """
+
+    for channel, tip_type in zip(use_channels, tip_types):
+      self.tip_types[channel] = tip_type
+
+  def replace_tips(self):
+    """ Drop the tips, and pick up new tips before the next aspiration. """
+
+    if len(self.records) > 0 and self.records[-1].operation != "W":
+      self.records.append(WorklistRecord("W"))
+
+  def _add_pipetting(
+    self,
+    operation: str,
+    ops: Sequence[Union[Aspiration, Dispense]],
+    use_channels: List[int],
+    liquid_classes: List[str],
+  ):
+    for op, channel, liquid_class in sorted(zip(ops, use_channels, liquid_classes),
+                                            key=lambda item: item[1]):
+      labware, index = labware_and_index(op.resource)
+      self.records.append(WorklistRecord(operation=operation, labware=labware.name,
+        labware_type=labware.model or "", position=index + 1, volume=op.volume,
+        liquid_class=liquid_class, tip_type=self.tip_types.get(channel, ""), tip_mask=1 << channel))
+
+  def aspirate(self, ops: Sequence[Aspiration], use_channels: List[int], liquid_classes: List[str]):
+    """ Record an aspiration with every channel in `use_channels`. """
+    self._add_pipetting("A", ops, use_channels, liquid_classes)
+
+  def dispense(self, ops: Sequence[Dispense], use_channels: List[int], liquid_classes: List[str]):
+    """ Record a dispense with every channel in `use_channels`. """
+    self._add_pipetting("D", ops, use_channels, liquid_classes)
+
+  def tip_cycles(self) -> List[List[WorklistRecord]]:
+    """ Split the records into tip cycles, each ending with the `W` line that drops the tips. """
+
+    cycles: List[List[WorklistRecord]] = [[]]
+    for record in self.records:
+      cycles[-1].append(record)
+      if record.operation == "W":
+        cycles.append([])
+    return [cycle for cycle in cycles if len(cycle) > 0]
+
+  def to_gwl(self, records: Optional[List[WorklistRecord]] = None) -> str:
+    """ The worklist, or the given records, in the GWL format. """
+
+    if records is None:
+      records = self.records
+    return "".join(record.to_gwl() + "\r\n" for record in records)
+
+  def save(self, path: str, records: Optional[List[WorklistRecord]] = None):
+    """ Save the worklist, or the given records, to a GWL file. """
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+      f.write(self.to_gwl(records))
+
+  def checksum(self) -> str:
+    """ A checksum of the worklist, to check that a checkpoint belongs to this worklist. """
+    return hashlib.sha256(self.to_gwl().encode("utf-8")).hexdigest()
+
+
+def load_checkpoint(path: str, worklist: FluentWorklist) -> int:
+  """ The number of tip cycles of `worklist` that have been run, from the checkpoint at `path`.
+
+  Raises:
+    ValueError: If the checkpoint belongs to a different worklist.
+  """
+
+  with open(path, "r", encoding="utf-8") as f:
+    checkpoint = json.load(f)
+  if checkpoint["checksum"] != worklist.checksum():
+    raise ValueError(f"Checkpoint '{path}' belongs to a different worklist.")
+  return int(checkpoint["completed_tip_cycles"])
+
+
+def save_checkpoint(path: str, worklist: FluentWorklist, completed_tip_cycles: int):
+  """ Save the number of tip cycles of `worklist` that have been run to a checkpoint at `path`.
+
+  The checkpoint is written to a temporary file that then replaces the checkpoint, so that a write
+  that is interrupted leaves the previous checkpoint intact.
+  """
+
+  fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+  try:
+    with open(fd, "w", encoding="utf-8") as f:
+      json.dump({"checksum": worklist.checksum(), "completed_tip_cycles": completed_tip_cycles}, f)
+    os.replace(tmp_path, path)
+  except BaseException:
+    os.remove(tmp_path)
+    raise
@@ -0,0 +1,161 @@
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+from pylabrobot.liquid_handling import LiquidHandler
+from pylabrobot.liquid_handling.backends.tecan.FLUENT import FLUENT
+from pylabrobot.liquid_handling.backends.tecan.fluent_worklist import (
+  FluentWorklist,
+  WorklistProgress,
+  load_checkpoint,
+  save_checkpoint,
+)
+from pylabrobot.machines.polling import Backoff
+from pylabrobot.resources import (
+  Fluent780Deck,
+  DeepWell_96_Well,
+  DiTi_100ul_Te_MO,
+  DiTi_SBS_3_Pos_MCA96,
+  MP_3Pos_PCR
+)
+
+from tests.fluent import FakeFluentServer
+
+
+class FluentWorklistTests(unittest.IsolatedAsyncioTestCase):
+  """ Test recording worklists with the FLUENT backend and running them on a fake Fluent SiLA2
+  server. """
+
+  async def asyncSetUp(self):
+    await super().asyncSetUp()
+    self.tmp = tempfile.TemporaryDirectory() # pylint: disable=consider-using-with
+    self.path = os.path.join(self.tmp.name, "plr.gwl")
+    self.checkpoint_path = os.path.join(self.tmp.name, "plr.json")
+
+    self.server = FakeFluentServer()
+    self.server.methods["PLR worklist"] = self.path
+    self.fluent = FLUENT(num_channels=8, method_backoff=Backoff(initial=0.001, maximum=0.01))
+    self.fluent.client = self.server
+
+    self.deck = Fluent780Deck()
+    self.lh = LiquidHandler(backend=self.fluent, deck=self.deck)
+
+    self.tr_carrier = DiTi_SBS_3_Pos_MCA96(name="tip_rack_carrier")
+    self.tr_carrier[0] = self.tr = DiTi_100ul_Te_MO(name="tip_rack")
+    self.deck.assign_child_resource(self.tr_carrier, rails=10)
+
+    self.plate_carrier = MP_3Pos_PCR(name="plate_carrier")
+    self.plate_carrier[0] = self.source = DeepWell_96_Well(name="source")
+    self.plate_carrier[1] = self.destination = DeepWell_96_Well(name="destination")
+    self.deck.assign_child_resource(self.plate_carrier, rails=16)
+
+    await self.lh.setup()
+    self.server.calls.clear()
+
+  async def asyncTearDown(self):
+    await self.lh.stop()
+    self.tmp.cleanup()
+    await super().asyncTearDown()
+
+  async def record_transfer(self, num_columns: int) -> FluentWorklist:
+    """ Record transferring the first `num_columns` columns, with new tips for every column. """
+
+    async with self.fluent.record_worklist() as worklist:
+      for column in range(1, num_columns + 1):
+        await self.lh.pick_up_tips(self.tr[f"A{column}:H{column}"], diti_type="FCA, 100ul SBS")
+        await self.lh.aspirate(self.source[f"A{column}:H{column}"], vols=[10] * 8)
+        await self.lh.dispense(self.destination[f"A{column}:H{column}"], vols=[5] * 8,
+          liquid_class="DMSO")
+        await self.lh.drop_tips(self.tr[f"A{column}:H{column}"])
+    return worklist
+
+  async def run_worklist(self, worklist: FluentWorklist, **kwargs):
+    return [progress async for progress in self.fluent.run_worklist(worklist,
+      method_name="PLR worklist", path=self.path, **kwargs)]
+
+  async def test_record(self):
+    worklist = await self.record_transfer(num_columns=2)
+    self.assertEqual(self.server.calls, []) # nothing is sent while recording
+
+    lines = worklist.to_gwl().split("\r\n")
+    self.assertEqual(len(worklist), 2 * (8 + 8 + 1))
+    model = self.source.model or ""
+    self.assertEqual(lines[0], f"A;source;;{model};1;;10;Water;FCA, 100ul SBS;1")
+    self.assertEqual(lines[7], f"A;source;;{model};8;;10;Water;FCA, 100ul SBS;128")
+    self.assertEqual(lines[8], f"D;destination;;{model};1;;5;DMSO;FCA, 100ul SBS;1")
+    self.assertEqual(lines[16], "W;")
+    self.assertEqual(lines[17], f"A;source;;{model};9;;10;Water;FCA, 100ul SBS;1")
+    self.assertEqual(len(worklist.tip_cycles()), 2)
+
+  async def test_run(self):
+    self.server.execution_time = 0.001
+    worklist = await self.record_transfer(num_columns=12)
+    progress = await self.run_worklist(worklist)
+
+    self.assertEqual(progress, [WorklistProgress(completed=len(worklist), total=len(worklist))])
+    self.assertEqual([name for name, _ in self.server.calls if name != "is_method_running"],
+      ["prepare_method", "run_method"])
+    # the progress is yielded when the method has finished
+    self.assertEqual(self.server.worklist_lines, worklist.to_gwl().splitlines())
+
+  async def test_tip_cycles_per_run(self):
+    worklist = await self.record_transfer(num_columns=2)
+    with self.assertRaises(ValueError):
+      await self.run_worklist(worklist, tip_cycles_per_run=0)
+    self.assertEqual(self.server.calls, [])
+
+  async def test_resume(self):
+    worklist = await self.record_transfer(num_columns=4)
+    lines = worklist.to_gwl().splitlines()
+    self.server.fail_after = 2 * 17 + 3 # in the third tip cycle
+
+    progress = []
+    with self.assertRaises(RuntimeError):
+      async for p in self.fluent.run_worklist(worklist, method_name="PLR worklist", path=self.path,
+                                              checkpoint_path=self.checkpoint_path,
+                                              tip_cycles_per_run=1):
+        progress.append(p)
+    self.assertEqual([p.completed for p in progress], [17, 34])
+    self.assertTrue(os.path.exists(self.checkpoint_path))
+
+    # resume from the start of the third tip cycle
+    progress = await self.run_worklist(worklist, checkpoint_path=self.checkpoint_path,
+      tip_cycles_per_run=1)
+    self.assertEqual([p.completed for p in progress], [51, 68])
+    self.assertEqual(self.server.worklist_lines, lines[:34 + 3] + lines[34:])
+    self.assertFalse(os.path.exists(self.checkpoint_path))
+
+  async def test_checkpoint_of_other_worklist(self):
+    save_checkpoint(self.checkpoint_path, await self.record_transfer(num_columns=1), 1)
+    worklist = await self.record_transfer(num_columns=2)
+    with self.assertRaises(ValueError):
+      await self.run_worklist(worklist, checkpoint_path=self.checkpoint_path)
+    self.assertEqual(self.server.calls, [])
+
+  async def test_interrupted_checkpoint_write(self):
+    worklist = await self.record_transfer(num_columns=2)
+    save_checkpoint(self.checkpoint_path, worklist, 1)
+
+    def interrupted_dump(obj, f):
+      f.write(json.dumps(obj)[:10])
+      raise KeyboardInterrupt()
+
+    with unittest.mock.patch("json.dump", interrupted_dump), self.assertRaises(KeyboardInterrupt):
+      save_checkpoint(self.checkpoint_path, worklist, 2)
+    self.assertEqual(load_checkpoint(self.checkpoint_path, worklist), 1)
+    self.assertEqual(os.listdir(self.tmp.name), ["plr.json"]) # no temporary files are left
+
+  async def test_client_cannot_wait_for_method(self):
+    self.server.is_method_running = None # type: ignore[assignment,method-assign]
+    worklist = await self.record_transfer(num_columns=1)
+    with self.assertRaises(RuntimeError):
+      await self.run_worklist(worklist)
+    self.assertEqual(self.server.calls, []) # the method was not started
+
+  async def test_nested_recording(self):
+    async with self.fluent.record_worklist():
+      with self.assertRaises(RuntimeError):
+        async with self.fluent.record_worklist():
+          pass
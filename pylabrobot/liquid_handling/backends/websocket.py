@@ -1,9 +1,11 @@
 import asyncio
+import collections
+import concurrent.futures
 import json
 import logging
 import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+from typing import Any, Deque, Dict, List, Optional, Tuple, TYPE_CHECKING, cast
 
 try:
   import websockets
@@ -15,6 +17,7 @@ try:
 except ImportError:
   HAS_WEBSOCKETS = False
 
+from pylabrobot.liquid_handling.backends.backend import LiquidHandlerBackend
 from pylabrobot.liquid_handling.backends.serializing_backend import SerializingBackend
 from pylabrobot.resources import Resource
 from pylabrobot.__version__ import STANDARD_FORM_JSON_VERSION
@@ -34,6 +37,7 @@ class WebSocketBackend(SerializingBackend):
     num_channels: int,
     ws_host: str = "127.0.0.1",
     ws_port: int = 2121,
+    max_replay_messages: int = 10000,
   ):
     """ Create a new web socket backend.
 
@@ -41,6 +45,8 @@ class WebSocketBackend(SerializingBackend):
       ws_host: The hostname of the websocket server.
       ws_port: The port of the websocket server. If this port is in use, the port will be
         incremented until a free port is found.
+      max_replay_messages: The maximum number of sent messages that are kept to be replayed when a
+        browser connects. When more messages are sent, the oldest are dropped.
     """
 
     if not HAS_WEBSOCKETS:
@@ -55,8 +61,19 @@ class WebSocketBackend(SerializingBackend):
     self.ws_host = ws_host
     self.ws_port = ws_port
 
-    self._sent_messages: List[str] = []
-    self.received: List[dict] = []
+    if max_replay_messages < 1:
+      raise ValueError("max_replay_messages must be at least 1.")
+    self.max_replay_messages = max_replay_messages
+
+    # Messages to replay when a browser connects, by id. Compacted in `_log_sent_message`.
+    self._sent_messages: "collections.OrderedDict[str, Tuple[str, str]]" = \
+      collections.OrderedDict()
+    self._assigned_message_ids: Dict[str, str] = {} # resource name -> id of resource_assigned
+    self._assigned_parents: Dict[str, Optional[str]] = {} # resource name -> parent name
+
+    # Futures for commands waiting for a response, by id. Resolved in `_socket_handler`.
+    self._pending: Dict[str, concurrent.futures.Future] = {}
+    self.received: Deque[dict] = collections.deque(maxlen=100)
 
     self._id = 0
 
@@ -110,8 +127,8 @@ class WebSocketBackend(SerializingBackend):
       await self.websocket.send(json.dumps({"event": "pong"}))
 
   async def _socket_handler(self, websocket: "websockets.legacy.server.WebSocketServerProtocol"):
-    """ Handle a new websocket connection. Save the websocket connection store received
-    messages in `self.received`. """
+    """ Handle a new websocket connection. Save the websocket connection, resolve the futures of
+    commands waiting for a response and store the last received messages in `self.received`. """
 
     while True:
       try:
@@ -124,6 +141,10 @@ class WebSocketBackend(SerializingBackend):
       data = json.loads(message)
       self.received.append(data)
 
+      future = self._pending.pop(data["id"], None) if "id" in data else None
+      if future is not None and not future.done():
+        future.set_result(data)
+
       # If the event is "ready", then we can save the connection and send the saved messages.
       if data.get("event") == "ready":
         self._websocket = websocket
@@ -167,16 +188,21 @@ class WebSocketBackend(SerializingBackend):
       },
       wait_for_response=False)
 
+  async def assigned_resources_callback(self, resources: List[Resource]):
+    # the simulator does not know `resources_assigned`, send the resources one by one
+    await LiquidHandlerBackend.assigned_resources_callback(self, resources)
+
   async def unassigned_resource_callback(self, name: str):
     # override SerializingBackend so we don't wait for a response
-    await self.send_command(command="resource_unassigned", data={"resource_name": name,
-      "wait_for_response": False})
+    await self.send_command(command="resource_unassigned", data={"resource_name": name},
+      wait_for_response=False)
 
   async def send_command(
     self,
     command: str,
     data: Optional[Dict[str, Any]] = None,
     wait_for_response: bool = True,
+    timeout: Optional[float] = None,
   )-> Optional[dict]:
     """ Send an event to the browser.
 
@@ -190,48 +216,110 @@ class WebSocketBackend(SerializingBackend):
         at a later time. This is useful for sending events that do not require a response. When
         `True`, a `ValueError` will be raised if the response `"success"` field is not `True`.
       data: The event arguments, which must be serializable by `json.dumps`.
+      timeout: The maximum number of seconds to wait for a response. If `None`, wait indefinitely.
 
     Returns:
       The response from the browser, if `wait_for_response` is `True`, otherwise `None`.
+
+    Raises:
+      TimeoutError: If no response was received within `timeout` seconds.
     """
 
     if data is None:
       data = {}
 
     serialized_data, id_ = self._assemble_command(command, data)
-    self._sent_messages.append(serialized_data)
+    self._log_sent_message(id_, command, data, serialized_data)
 
     # Run and save if the websocket connection has been established, otherwise just save.
     if wait_for_response and not self.has_connection():
       raise ValueError("Cannot wait for response when no websocket connection is established.")
 
-    if self.has_connection():
+    if not self.has_connection():
+      return None
+
+    if not wait_for_response:
       asyncio.run_coroutine_threadsafe(self.websocket.send(serialized_data), self.loop)
+      return None
+
+    # Register the future before sending, so that the response can not arrive before it.
+    future: concurrent.futures.Future = concurrent.futures.Future()
+    self._pending[id_] = future
+    try:
+      await asyncio.wrap_future(
+        asyncio.run_coroutine_threadsafe(self.websocket.send(serialized_data), self.loop))
+      message = await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+    except asyncio.TimeoutError as e:
+      raise TimeoutError(f"Timed out waiting for a response to {command} ({id_}).") from e
+    finally:
+      self._pending.pop(id_, None)
+
+    if not message["success"]:
+      error = message.get("error", "unknown error")
+      raise RuntimeError(f"Error during event {command}: " + error)
+
+    return cast(dict, message)
+
+  def _log_sent_message(self, id_: str, command: str, data: Dict[str, Any], serialized_data: str):
+    """ Save a sent message to be replayed when a browser connects.
+
+    Assigning and then unassigning a resource cancels out: when a resource is unassigned and only
+    resource (un)assignments were sent since it was assigned, the assignments of the resource and
+    its descendants are dropped from the log instead of saving the unassignment. When the log holds
+    more than `max_replay_messages` messages, the oldest are dropped.
+    """
+
+    if command == "resource_unassigned" and self._drop_assignment(data["resource_name"]):
+      return
 
-      if wait_for_response:
-        while True:
-          if len(self.received) > 0:
-            message = self.received.pop()
-            if "id" in message and message["id"] == id_:
-              break
-          time.sleep(0.1)
+    if command == "resource_assigned":
+      name = data["resource"]["name"]
+      self._assigned_message_ids[name] = id_
+      self._assigned_parents[name] = data.get("parent_name")
 
-        if not message["success"]:
-          error = message.get("error", "unknown error")
-          raise RuntimeError(f"Error during event {command}: " + error)
+    self._sent_messages[id_] = (command, serialized_data)
+    if len(self._sent_messages) > self.max_replay_messages:
+      dropped_id, (dropped_command, _) = self._sent_messages.popitem(last=False)
+      logger.warning("Dropping %s (%s) from the websocket replay log, a browser that connects "
+                     "later will not receive it.", dropped_command, dropped_id)
 
-        return message
+  def _drop_assignment(self, name: str) -> bool:
+    """ Drop the `resource_assigned` messages of the resource named `name` and its descendants
+    from the replay log, if no other commands were sent since. Returns whether they were dropped.
+    """
 
-    return None
+    names = {name}
+    while True:
+      children = {n for n, parent in self._assigned_parents.items() if parent in names} - names
+      if len(children) == 0:
+        break
+      names |= children
+
+    # Other commands may refer to the resource, so then the assignment must be kept.
+    droppable = False
+    assigned_id = self._assigned_message_ids.get(name)
+    if assigned_id is not None and assigned_id in self._sent_messages:
+      ids = list(self._sent_messages)
+      droppable = all(
+        self._sent_messages[later_id][0] in {"resource_assigned", "resource_unassigned"}
+        for later_id in ids[ids.index(assigned_id):])
+
+    for n in names:
+      if n in self._assigned_message_ids:
+        message_id = self._assigned_message_ids.pop(n)
+        del self._assigned_parents[n]
+        if droppable:
+          self._sent_messages.pop(message_id, None)
+    return droppable
 
   async def _replay(self):
-    """ Send all sent messages.
+    """ Send all sent messages in the replay log, in order.
 
     This is called when the websocket connection is established.
     """
 
-    for message in self._sent_messages:
-      asyncio.run_coroutine_threadsafe(self.websocket.send(message), self.loop)
+    for _, message in list(self._sent_messages.values()):
+      await self.websocket.send(message)
 
   async def setup(self):
     """ Start the websocket server. This will run in a separate thread. """
@@ -279,8 +367,16 @@ class WebSocketBackend(SerializingBackend):
       # must be thread safe, because event loop is running in a separate thread
       self.loop.call_soon_threadsafe(self.stop_.set_result, "done")
 
+    # Fail commands that are still waiting for a response.
+    for future in self._pending.values():
+      if not future.done():
+        future.set_exception(RuntimeError("The web socket server was stopped."))
+    self._pending.clear()
+
     # Clear all relevant attributes.
     self._sent_messages.clear()
+    self._assigned_message_ids.clear()
+    self._assigned_parents.clear()
     self.received.clear()
     self._websocket = None
     self._loop = None
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import unittest
 
@@ -6,6 +7,7 @@ import websockets
 import websockets.client
 
 from pylabrobot.liquid_handling.backends import WebSocketBackend
+from pylabrobot.resources import Coordinate, Resource
 
 
 class WebSocketBackendSetupStopTests(unittest.IsolatedAsyncioTestCase):
@@ -60,3 +62,89 @@ class WebSocketBackendServerTests(unittest.IsolatedAsyncioTestCase):
     recv = await self.client.recv()
     data = json.loads(recv)
     self.assertEqual(data["event"], "test")
+
+  async def _connect(self):
+    await self.client.send('{"event": "ready"}')
+    response = await self.client.recv()
+    self.assertEqual(response, '{"event": "ready"}')
+
+  async def test_send_command_response(self):
+    await self._connect()
+
+    async def respond():
+      data = json.loads(await self.client.recv())
+      await self.client.send(json.dumps({"id": data["id"], "success": True, "result": 1}))
+
+    response, _ = await asyncio.gather(self.backend.send_command("test"), respond())
+    assert response is not None
+    self.assertEqual(response["result"], 1)
+    self.assertEqual(self.backend._pending, {}) # pylint: disable=protected-access
+
+  async def test_send_command_error(self):
+    await self._connect()
+
+    async def respond():
+      data = json.loads(await self.client.recv())
+      await self.client.send(json.dumps({"id": data["id"], "success": False, "error": "oops"}))
+
+    with self.assertRaisesRegex(RuntimeError, "oops"):
+      await asyncio.gather(self.backend.send_command("test"), respond())
+
+  async def test_send_command_timeout(self):
+    await self._connect()
+    with self.assertRaises(TimeoutError):
+      await self.backend.send_command("test", timeout=0.05)
+    self.assertEqual(self.backend._pending, {}) # pylint: disable=protected-access
+
+  async def test_send_command_cancelled(self):
+    await self._connect()
+    task = asyncio.create_task(self.backend.send_command("test"))
+    await self.client.recv()
+    task.cancel()
+    with self.assertRaises(asyncio.CancelledError):
+      await task
+    self.assertEqual(self.backend._pending, {}) # pylint: disable=protected-access
+
+  async def test_replay(self):
+    await self.backend.send_command("test", wait_for_response=False)
+    await self.client.send('{"event": "ready"}')
+    recv = await self.client.recv()
+    self.assertEqual(json.loads(recv)["event"], "test")
+    self.assertEqual(await self.client.recv(), '{"event": "ready"}')
+
+
+class WebSocketBackendReplayLogTests(unittest.IsolatedAsyncioTestCase):
+  """ Tests for the log of messages that are replayed when a browser connects. """
+
+  def setUp(self):
+    super().setUp()
+    self.backend = WebSocketBackend(num_channels=8, max_replay_messages=5)
+    self.root = Resource(name="root", size_x=100, size_y=100, size_z=100)
+
+  def logged_events(self):
+    # pylint: disable=protected-access
+    return [json.loads(m)["event"] for _, m in self.backend._sent_messages.values()]
+
+  async def test_assign_unassign(self):
+    parent = Resource(name="parent", size_x=10, size_y=10, size_z=10)
+    child = Resource(name="child", size_x=10, size_y=10, size_z=10)
+    self.root.assign_child_resource(parent, location=Coordinate.zero())
+    await self.backend.assigned_resource_callback(parent)
+    parent.assign_child_resource(child, location=Coordinate.zero())
+    await self.backend.assigned_resource_callback(child)
+    await self.backend.unassigned_resource_callback("parent")
+    self.assertEqual(self.logged_events(), [])
+
+  async def test_assign_command_unassign(self):
+    resource = Resource(name="resource", size_x=10, size_y=10, size_z=10)
+    self.root.assign_child_resource(resource, location=Coordinate.zero())
+    await self.backend.assigned_resource_callback(resource)
+    await self.backend.send_command("test", wait_for_response=False)
+    await self.backend.unassigned_resource_callback("resource")
+    self.assertEqual(self.logged_events(), ["resource_assigned", "test", "resource_unassigned"])
+
+  async def test_bounded(self):
+    for _ in range(10):
+      await self.backend.send_command("test", wait_for_response=False)
+    # pylint: disable-next=protected-access
+    self.assertEqual(list(self.backend._sent_messages), ["0006", "0007", "0008", "0009", "0010"])
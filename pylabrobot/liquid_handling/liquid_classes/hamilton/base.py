@@ -1,4 +1,22 @@
-from typing import Any, Dict
+import bisect
+import json
+from typing import Any, Dict, Iterator, List, MutableMapping, Optional, Sequence, Tuple, Union
+
+from pylabrobot.resources.liquid import Liquid
+
+try:
+  import numpy as np
+  HAS_NUMPY = True
+except ImportError:
+  HAS_NUMPY = False
+
+
+# (copy of the curve, sorted targets, corrected volumes, slopes), see
+# `HamiltonLiquidClass._compile_curve`.
+_CompiledCurve = Tuple[Dict[float, float], List[float], List[float], List[float]]
+
+# Below this many volumes, converting to and from NumPy arrays costs more than it saves.
+_MIN_VECTORIZED_VOLUMES = 32
 
 
 class HamiltonLiquidClass:
@@ -48,6 +66,27 @@ class HamiltonLiquidClass:
     self.dispense_stop_flow_rate = dispense_stop_flow_rate
     self.dispense_stop_back_volume = dispense_stop_back_volume
 
+    self._compiled_curve: Optional[_CompiledCurve] = None
+    self._compiled_curve_arrays: Optional[tuple] = None
+
+  def _compile_curve(self) -> _CompiledCurve:
+    """ Get the correction curve as sorted breakpoints, the corrected volumes at those breakpoints,
+    and the slope of each segment (`slopes[i]` is the slope between breakpoints `i-1` and `i`),
+    preceded by a copy of the curve they were computed from.
+
+    The result is cached, and recomputed when `curve` is changed or replaced.
+    """
+
+    compiled = self._compiled_curve
+    if compiled is None or compiled[0] != self.curve:
+      targets = sorted(self.curve.keys())
+      corrected = [self.curve[t] for t in targets]
+      slopes = [0.0] + [(y1-y0)/(x1-x0) for x0, x1, y0, y1 in
+                        zip(targets[:-1], targets[1:], corrected[:-1], corrected[1:])]
+      compiled = self._compiled_curve = (dict(self.curve), targets, corrected, slopes)
+      self._compiled_curve_arrays = None
+    return compiled
+
   def compute_corrected_volume(self, target_volume: float) -> float:
     """ Compute corrected volume using the correction curve.
 
@@ -64,29 +103,82 @@ class HamiltonLiquidClass:
       Volume that should actually be pipetted to reach target volume.
     """
 
-    targets = sorted(self.curve.keys())
+    compiled = self._compiled_curve
+    if compiled is None or compiled[0] != self.curve:
+      compiled = self._compile_curve()
+    _, targets, corrected, slopes = compiled
 
     if len(targets) == 0:
       return target_volume
 
-    if target_volume in self.curve:
-      return self.curve[target_volume]
+    i = bisect.bisect_left(targets, target_volume)
+    if i < len(targets) and targets[i] == target_volume:
+      return corrected[i]
 
     # use min non-zero value, so second index (if len(targets)>0,
     # then 0 was automatically added at initialization).
     if target_volume < targets[1]: # smaller than min
-      return self.curve[targets[1]]/targets[1] * target_volume
+      return corrected[1]/targets[1] * target_volume
     if target_volume > targets[-1]: # larger than max
-      return self.curve[targets[-1]]/targets[-1] * target_volume
+      return corrected[-1]/targets[-1] * target_volume
 
     # interpolate between two nearest points.
-    for pt, t in zip(targets[:-1], targets[1:]):
-      if pt < target_volume < t:
-        return (self.curve[t]-self.curve[pt])/(t-pt) * \
-               (target_volume - t) + self.curve[t] # (y = slope * (x-x1) + y1)
+    if 0 < i < len(targets) and targets[i-1] < target_volume: # < targets[i]
+      return slopes[i] * (target_volume - targets[i]) + corrected[i] # (y = slope * (x-x1) + y1)
 
     assert False, "Should never reach this point. Please file an issue."
 
+  def compute_corrected_volumes(
+    self,
+    target_volumes: Union[Sequence[float], "np.ndarray"]
+  ) -> Union[List[float], "np.ndarray"]:
+    """ Compute corrected volumes for multiple target volumes at once, for example for all channels
+    or the 96 head. See :meth:`compute_corrected_volume`.
+
+    If NumPy is installed, longer sequences are corrected in a vectorized way. The results are the
+    same as calling :meth:`compute_corrected_volume` for each volume.
+
+    Args:
+      target_volumes: Volumes that need to be pipetted.
+
+    Returns:
+      Volumes that should actually be pipetted to reach the target volumes: a NumPy array if
+      `target_volumes` is a NumPy array, otherwise a list.
+    """
+
+    if HAS_NUMPY and len(target_volumes) >= _MIN_VECTORIZED_VOLUMES:
+      _, targets, _, _ = self._compile_curve()
+      volumes = np.asarray(target_volumes, dtype=np.float64)
+      # curves with less than two points and nan are left to the scalar path
+      if len(targets) >= 2 and not np.isnan(volumes).any():
+        corrected_array = self._compute_corrected_volumes_numpy(volumes)
+        if isinstance(target_volumes, np.ndarray):
+          return corrected_array
+        return list(corrected_array.tolist())
+
+    corrected_volumes = [self.compute_corrected_volume(v) for v in target_volumes]
+    if HAS_NUMPY and isinstance(target_volumes, np.ndarray):
+      return np.array(corrected_volumes, dtype=np.float64)
+    return corrected_volumes
+
+  def _compute_corrected_volumes_numpy(self, volumes: "np.ndarray") -> "np.ndarray":
+    """ Vectorized version of :meth:`compute_corrected_volume`, doing the same floating point
+    operations in the same order. """
+
+    _, targets, corrected, slopes = self._compile_curve()
+    if self._compiled_curve_arrays is None:
+      self._compiled_curve_arrays = (
+        np.array(targets, dtype=np.float64),
+        np.array(corrected, dtype=np.float64),
+        np.array(slopes, dtype=np.float64))
+    targets_a, corrected_a, slopes_a = self._compiled_curve_arrays
+
+    i = np.minimum(np.searchsorted(targets_a, volumes, side="left"), len(targets) - 1)
+    result = slopes_a[i] * (volumes - targets_a[i]) + corrected_a[i] # interpolation
+    result = np.where(volumes > targets[-1], corrected[-1]/targets[-1] * volumes, result)
+    result = np.where(volumes < targets[1], corrected[1]/targets[1] * volumes, result)
+    return np.where(targets_a[i] == volumes, corrected_a[i], result)
+
   def serialize(self) -> Dict[str, Any]:
     """ Serialize the liquid class to a dictionary. """
     return {
@@ -111,3 +203,83 @@ class HamiltonLiquidClass:
       "dispense_stop_flow_rate": self.dispense_stop_flow_rate,
       "dispense_stop_back_volume": self.dispense_stop_back_volume,
     }
+
+
+HamiltonLiquidClassKey = Tuple[int, bool, bool, bool, Liquid, bool, bool]
+
+
+class HamiltonLiquidClassMapping(MutableMapping[HamiltonLiquidClassKey, HamiltonLiquidClass]):
+  """ A mapping from (tip_volume, is_core, is_tip, has_filter, liquid, jet, blow_out) to liquid
+  classes, backed by a JSON file generated by `tools/make_lc.py`.
+
+  The file contains a list of rows `[key, name, notes, curve, parameters]`, where the liquid in the
+  key is stored by its name in :class:`~pylabrobot.resources.liquid.Liquid`, `curve` is a list of
+  `[target, corrected]` volume pairs and `parameters` are the remaining arguments of
+  :class:`HamiltonLiquidClass` in order. The file is only read on first access, and each liquid
+  class is only created the first time it is looked up, after which it is cached. Later rows take
+  precedence over earlier rows with the same key.
+
+  Liquid classes can be added, replaced and removed like in a regular dictionary.
+  """
+
+  def __init__(self, path: str):
+    """ Create a new mapping.
+
+    Args:
+      path: The path to the JSON file containing the liquid classes.
+    """
+
+    self._path = path
+    # Values are the name of a row that has not been materialized yet, or a liquid class.
+    self._entries: Optional[Dict[HamiltonLiquidClassKey, Union[str, HamiltonLiquidClass]]] = None
+    self._rows: Dict[str, list] = {}
+    self._liquid_classes: Dict[str, HamiltonLiquidClass] = {}
+
+  def _load(self) -> Dict[HamiltonLiquidClassKey, Union[str, HamiltonLiquidClass]]:
+    if self._entries is None:
+      with open(self._path, "r", encoding="utf-8") as f:
+        rows = json.load(f)
+      entries: Dict[HamiltonLiquidClassKey, Union[str, HamiltonLiquidClass]] = {}
+      for row in rows:
+        (tip_volume, is_core, is_tip, has_filter, liquid, jet, blow_out), name = row[0], row[1]
+        entries[(tip_volume, is_core, is_tip, has_filter, Liquid[liquid], jet, blow_out)] = name
+        self._rows[name] = row
+      self._entries = entries
+    return self._entries
+
+  def get_by_name(self, name: str) -> HamiltonLiquidClass:
+    """ Get a liquid class by its name, like `"_1000ulNeedleCRWater_DispenseJet_Empty"`.
+
+    Raises:
+      KeyError: If there is no liquid class with the given name.
+    """
+
+    liquid_class = self._liquid_classes.get(name)
+    if liquid_class is None:
+      self._load()
+      _, _, _, curve, parameters = self._rows[name]
+      liquid_class = HamiltonLiquidClass(dict((t, c) for t, c in curve), *parameters)
+      self._liquid_classes[name] = liquid_class
+    return liquid_class
+
+  def __getitem__(self, key: HamiltonLiquidClassKey) -> HamiltonLiquidClass:
+    entries = self._load()
+    entry = entries[key]
+    if isinstance(entry, str):
+      entry = entries[key] = self.get_by_name(entry)
+    return entry
+
+  def __setitem__(self, key: HamiltonLiquidClassKey, value: HamiltonLiquidClass) -> None:
+    self._load()[key] = value
+
+  def __delitem__(self, key: HamiltonLiquidClassKey) -> None:
+    del self._load()[key]
+
+  def __contains__(self, key: object) -> bool:
+    return key in self._load()
+
+  def __iter__(self) -> Iterator[HamiltonLiquidClassKey]:
+    return iter(self._load())
+
+  def __len__(self) -> int:
+    return len(self._load())
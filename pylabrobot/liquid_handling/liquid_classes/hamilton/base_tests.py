@@ -0,0 +1,140 @@
+import os
+import unittest
+
+from pylabrobot.liquid_handling.liquid_classes.hamilton import star, vantage
+from pylabrobot.liquid_handling.liquid_classes.hamilton.base import (
+  HAS_NUMPY,
+  HamiltonLiquidClass,
+  HamiltonLiquidClassMapping,
+)
+from pylabrobot.liquid_handling.liquid_classes.hamilton.star import get_star_liquid_class
+from pylabrobot.liquid_handling.liquid_classes.hamilton.vantage import get_vantage_liquid_class
+from pylabrobot.resources.liquid import Liquid
+
+
+try:
+  import numpy as np
+except ImportError:
+  pass # the numpy tests are skipped
+
+
+STAR_LIQUID_CLASSES = os.path.join(os.path.dirname(star.__file__), "star_liquid_classes.json")
+
+
+def make_liquid_class(curve):
+  return HamiltonLiquidClass(curve=curve, **{p: 0.0 for p in [
+    "aspiration_flow_rate", "aspiration_mix_flow_rate", "aspiration_air_transport_volume",
+    "aspiration_blow_out_volume", "aspiration_swap_speed", "aspiration_settling_time",
+    "aspiration_over_aspirate_volume", "aspiration_clot_retract_height", "dispense_flow_rate",
+    "dispense_mode", "dispense_mix_flow_rate", "dispense_air_transport_volume",
+    "dispense_blow_out_volume", "dispense_swap_speed", "dispense_settling_time",
+    "dispense_stop_flow_rate", "dispense_stop_back_volume"]})
+
+
+class HamiltonLiquidClassTests(unittest.TestCase):
+  """ Tests for correcting volumes with a HamiltonLiquidClass. """
+
+  def setUp(self):
+    super().setUp()
+    self.hlc = make_liquid_class({500.0: 520.0, 50.0: 61.2, 0.0: 0.0, 20.0: 22.5, 100.0: 113.0,
+      10.0: 11.1, 200.0: 214.0, 1000.0: 1032.0})
+
+  def test_compute_corrected_volume(self):
+    self.assertEqual(self.hlc.compute_corrected_volume(0), 0.0)
+    self.assertEqual(self.hlc.compute_corrected_volume(100), 113.0)
+    self.assertEqual(self.hlc.compute_corrected_volume(5), 11.1/10.0 * 5)
+    self.assertEqual(self.hlc.compute_corrected_volume(2000), 1032.0/1000.0 * 2000)
+    self.assertEqual(self.hlc.compute_corrected_volume(150),
+      (214.0-113.0)/(200.0-100.0) * (150 - 200.0) + 214.0)
+    self.assertEqual(make_liquid_class({}).compute_corrected_volume(150), 150)
+
+  def test_curve_changes(self):
+    self.assertEqual(self.hlc.compute_corrected_volume(100), 113.0)
+    self.hlc.curve[100.0] = 120.0
+    self.assertEqual(self.hlc.compute_corrected_volume(100), 120.0)
+    self.hlc.curve = {0.0: 0.0, 100.0: 200.0}
+    self.assertEqual(self.hlc.compute_corrected_volume(50), 100.0)
+
+  def test_compute_corrected_volumes(self):
+    volumes = [i * 3.7 for i in range(400)]
+    expected = [self.hlc.compute_corrected_volume(v) for v in volumes]
+    self.assertEqual(self.hlc.compute_corrected_volumes(volumes), expected)
+    self.assertEqual(self.hlc.compute_corrected_volumes(volumes[:3]), expected[:3])
+    self.assertEqual(self.hlc.compute_corrected_volumes([]), [])
+
+  @unittest.skipIf(not HAS_NUMPY, "NumPy is not installed")
+  def test_compute_corrected_volumes_numpy(self):
+    volumes = np.linspace(-10, 1500, 1000)
+    expected = [self.hlc.compute_corrected_volume(v) for v in volumes.tolist()]
+    corrected = self.hlc.compute_corrected_volumes(volumes)
+    self.assertIsInstance(corrected, np.ndarray)
+    self.assertEqual(corrected.tolist(), expected)
+    self.assertEqual(self.hlc.compute_corrected_volumes(volumes[:3]).tolist(), expected[:3])
+
+
+class HamiltonLiquidClassMappingTests(unittest.TestCase):
+  """ Tests for the lazily loaded Hamilton liquid class tables. """
+
+  def test_loaded_on_first_access(self):
+    # pylint: disable=protected-access
+    mapping = HamiltonLiquidClassMapping(STAR_LIQUID_CLASSES)
+    self.assertIsNone(mapping._entries)
+    key = (1000, False, True, False, Liquid.WATER, True, True)
+    self.assertIn(key, mapping)
+    self.assertIsNotNone(mapping._entries)
+    self.assertEqual(mapping._liquid_classes, {})
+
+    hlc = mapping[key]
+    self.assertEqual(list(mapping._liquid_classes), ["HighVolume_Water_DispenseJet_Empty"])
+    self.assertIs(mapping[key], hlc)
+
+  def test_lookup(self):
+    hlc = get_star_liquid_class(tip_volume=1000, is_core=False, is_tip=True, has_filter=False,
+      liquid=Liquid.WATER, jet=True, blow_out=True)
+    assert hlc is not None
+    self.assertEqual(hlc.curve, {500.0: 521.7, 50.0: 57.2, 0.0: 0.0, 100.0: 109.6, 20.0: 24.6,
+      1000.0: 1034.0, 200.0: 212.9, 10.0: 13.3})
+    self.assertEqual(hlc.aspiration_flow_rate, 250.0)
+    self.assertEqual(hlc.aspiration_air_transport_volume, 5.0)
+    self.assertEqual(hlc.aspiration_blow_out_volume, 40.0)
+    self.assertEqual(hlc.dispense_flow_rate, 400.0)
+    self.assertEqual(hlc.dispense_mode, 3.0)
+    self.assertEqual(hlc.dispense_stop_flow_rate, 250.0)
+
+    # tip volumes are mapped to those in the table
+    self.assertIs(get_star_liquid_class(tip_volume=1065, is_core=False, is_tip=True,
+      has_filter=False, liquid=Liquid.WATER, jet=True, blow_out=True), hlc)
+
+    self.assertIsNone(get_star_liquid_class(tip_volume=1, is_core=False, is_tip=True,
+      has_filter=False, liquid=Liquid.WATER, jet=True, blow_out=True))
+    self.assertIsNotNone(get_vantage_liquid_class(tip_volume=1000, is_core=False, is_tip=False,
+      has_filter=False, liquid=Liquid.WATER, jet=True, blow_out=True))
+
+  def test_later_rows_take_precedence(self):
+    self.assertIs(star.star_mapping[(10, False, False, False, Liquid.WATER, False, False)],
+      star.LowNeedle_Water_DispenseSurface_Part)
+
+  def test_access_by_name(self):
+    hlc = star.HighVolume_Water_DispenseJet_Empty
+    self.assertIsInstance(hlc, HamiltonLiquidClass)
+    self.assertIs(star.star_mapping[(1000, False, True, False, Liquid.WATER, True, True)], hlc)
+    self.assertIsNot(vantage.HighVolume_Water_DispenseJet_Empty, hlc)
+
+    with self.assertRaises(AttributeError):
+      star.NotALiquidClass # pylint: disable=pointless-statement
+    self.assertFalse(hasattr(star, "__wrapped__"))
+
+  def test_register_at_runtime(self):
+    mapping = HamiltonLiquidClassMapping(STAR_LIQUID_CLASSES)
+    key = (1000, False, True, False, Liquid.WATER, True, True)
+    n = len(mapping)
+    custom = make_liquid_class({})
+
+    mapping[key] = custom
+    self.assertIs(mapping[key], custom)
+    self.assertEqual(len(mapping), n)
+
+    del mapping[key]
+    self.assertNotIn(key, mapping)
+    self.assertIsNone(mapping.get(key))
+    self.assertEqual(len(mapping), n - 1)
@@ -1,5 +1,6 @@
+import bisect
 import re
-from typing import Dict, Tuple, Optional
+from typing import Dict, List, Optional, Tuple
 
 from pylabrobot.resources.liquid import Liquid
 from pylabrobot.resources.tecan import TipType
@@ -133,13 +134,114 @@ class TecanLiquidClass:
     return self.calibration_factor * target_volume + self.calibration_offset
 
 
-mapping: Dict[Tuple[float, float, Liquid, TipType], TecanLiquidClass] = {}
+class _VolumeIntervals:
+  """ The volume intervals of the liquid classes for a single (liquid, tip type) pair. """
+
+  def __init__(self, entries: List[Tuple[float, float, TecanLiquidClass]]):
+    # Entries in order of registration, used when intervals overlap: then the first registered
+    # liquid class containing the volume is returned, like a linear scan would.
+    self.entries = entries
+    self.sorted_entries = sorted(entries, key=lambda e: e[0])
+    self.minimums = [mnv for mnv, _, _ in self.sorted_entries]
+    self.disjoint = all(a[1] <= b[0] for a, b in zip(self.sorted_entries, self.sorted_entries[1:]))
+
+  def find(self, volume: float) -> Optional[TecanLiquidClass]:
+    if not self.disjoint:
+      for mnv, mxv, tlc in self.entries:
+        if mnv <= volume < mxv:
+          return tlc
+      return None
+
+    i = bisect.bisect_right(self.minimums, volume) - 1
+    if i < 0:
+      return None
+    _, mxv, tlc = self.sorted_entries[i]
+    return tlc if volume < mxv else None
+
+
+class _LiquidClassMapping(Dict[Tuple[float, float, Liquid, TipType], TecanLiquidClass]):
+  """ A dict of (min volume, max volume, liquid, tip type) to liquid classes, with an index for
+  fast lookups by volume.
+
+  The index groups the volume intervals by (liquid, tip type), so that a lookup is a dict access
+  and a bisection. It is built on the first lookup and dropped whenever the mapping changes, so
+  liquid classes can be added or replaced at runtime like with a normal dict.
+  """
+
+  def __init__(self, *args, **kwargs):
+    super().__init__(*args, **kwargs)
+    self._index: Optional[Dict[Tuple[int, int], _VolumeIntervals]] = None
+
+  def _invalidate(self):
+    self._index = None
+
+  def __setitem__(self, key, value):
+    super().__setitem__(key, value)
+    self._invalidate()
+
+  def __delitem__(self, key):
+    super().__delitem__(key)
+    self._invalidate()
+
+  def clear(self):
+    super().clear()
+    self._invalidate()
+
+  def pop(self, *args):
+    self._invalidate()
+    return super().pop(*args)
+
+  def popitem(self):
+    self._invalidate()
+    return super().popitem()
+
+  def setdefault(self, key, default=None):
+    self._invalidate()
+    return super().setdefault(key, default)
+
+  def update(self, *args, **kwargs): # pylint: disable=arguments-differ
+    super().update(*args, **kwargs)
+    self._invalidate()
+
+  def __ior__(self, other): # type: ignore[misc]
+    self.update(other)
+    return self
+
+  def find(self, target_volume: float, liquid_class: Liquid, tip_type: TipType) \
+    -> Optional[TecanLiquidClass]:
+    """ Find the liquid class for a volume, liquid and tip type. """
+
+    # Liquids and tip types are enum members, which are singletons, so the index is keyed by their
+    # id. Hashing an enum member is much slower than hashing an int.
+    if self._index is None:
+      grouped: Dict[Tuple[int, int], List[Tuple[float, float, TecanLiquidClass]]] = {}
+      for (mnv, mxv, lc, tt), tlc in self.items():
+        grouped.setdefault((id(lc), id(tt)), []).append((mnv, mxv, tlc))
+      self._index = {key: _VolumeIntervals(entries) for key, entries in grouped.items()}
+
+    intervals = self._index.get((id(liquid_class), id(tip_type)))
+    if intervals is None:
+      return None
+    return intervals.find(target_volume)
+
+
+mapping: Dict[Tuple[float, float, Liquid, TipType], TecanLiquidClass] = _LiquidClassMapping()
 
 def get_liquid_class(
   target_volume: float,
   liquid_class: Liquid,
   tip_type: TipType,
 ) -> Optional[TecanLiquidClass]:
+  """ Get the liquid class for a volume, liquid and tip type, or `None` if there is none.
+
+  Liquid classes are registered in `mapping`, keyed by (min volume, max volume, liquid, tip type).
+  A liquid class applies to volumes in [min volume, max volume).
+  """
+
+  if isinstance(mapping, _LiquidClassMapping):
+    return mapping.find(target_volume, liquid_class, tip_type)
+
+  # `mapping` was replaced by a plain dict.
   for (mnv, mxv, lc, tt), tlc in mapping.items():
     if mnv <= target_volume < mxv and lc == liquid_class and tt == tip_type:
       return tlc
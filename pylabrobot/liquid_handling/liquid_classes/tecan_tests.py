@@ -0,0 +1,73 @@
+import copy
+import unittest
+
+from pylabrobot.liquid_handling.liquid_classes import tecan
+from pylabrobot.liquid_handling.liquid_classes.tecan import get_liquid_class, mapping
+from pylabrobot.resources.liquid import Liquid
+from pylabrobot.resources.tecan import TipType
+
+
+class TecanLiquidClassLookupTests(unittest.TestCase):
+  """ Tests for looking up Tecan liquid classes by volume. """
+
+  def setUp(self):
+    super().setUp()
+    self._original = dict(mapping)
+
+  def tearDown(self):
+    super().tearDown()
+    mapping.clear()
+    mapping.update(self._original)
+
+  def _linear_lookup(self, target_volume, liquid_class, tip_type):
+    for (mnv, mxv, lc, tt), tlc in mapping.items():
+      if mnv <= target_volume < mxv and lc == liquid_class and tt == tip_type:
+        return tlc
+    return None
+
+  def test_lookup_matches_linear_scan(self):
+    volumes = [0, 0.5, 1, 2.99, 3, 3.01, 15, 15.01, 100, 200.01, 999, 1000.01, 5000]
+    for (_, _, liquid, tip_type) in list(mapping.keys()):
+      for volume in volumes:
+        self.assertIs(get_liquid_class(volume, liquid, tip_type),
+                      self._linear_lookup(volume, liquid, tip_type))
+
+  def test_lookup_unknown(self):
+    self.assertIsNone(get_liquid_class(100, Liquid.WATER, TipType.DITILOWVOL))
+    self.assertIsNone(get_liquid_class(-1, Liquid.DMSO, TipType.STANDARD))
+
+  def test_register_at_runtime(self):
+    dmso = get_liquid_class(10, Liquid.DMSO, TipType.STANDARD)
+    assert dmso is not None
+    custom = copy.copy(dmso)
+    mapping[(0.1, 3, Liquid.DMSO, TipType.STANDARD)] = custom
+    self.assertIs(get_liquid_class(1, Liquid.DMSO, TipType.STANDARD), custom)
+    self.assertIs(get_liquid_class(10, Liquid.DMSO, TipType.STANDARD), dmso)
+
+    del mapping[(0.1, 3, Liquid.DMSO, TipType.STANDARD)]
+    self.assertIsNone(get_liquid_class(1, Liquid.DMSO, TipType.STANDARD))
+
+  def test_register_with_in_place_union(self):
+    dmso = get_liquid_class(10, Liquid.DMSO, TipType.STANDARD)
+    assert dmso is not None
+    custom = copy.copy(dmso)
+    tecan.mapping |= {(0.1, 3, Liquid.DMSO, TipType.STANDARD): custom}
+    self.assertIs(tecan.mapping, mapping)
+    self.assertIs(get_liquid_class(1, Liquid.DMSO, TipType.STANDARD), custom)
+
+  def test_overlapping_intervals(self):
+    dmso = get_liquid_class(10, Liquid.DMSO, TipType.STANDARD)
+    assert dmso is not None
+    custom = copy.copy(dmso)
+    # registered later, so the existing liquid class still wins where both apply
+    mapping[(1, 100, Liquid.DMSO, TipType.STANDARD)] = custom
+    self.assertIs(get_liquid_class(10, Liquid.DMSO, TipType.STANDARD), dmso)
+    self.assertIs(get_liquid_class(2, Liquid.DMSO, TipType.STANDARD), custom)
+
+  def test_replaced_mapping(self):
+    original = tecan.mapping
+    try:
+      tecan.mapping = {} # type: ignore[misc]
+      self.assertIsNone(get_liquid_class(10, Liquid.DMSO, TipType.STANDARD))
+    finally:
+      tecan.mapping = original
@@ -4,12 +4,15 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import dataclasses
+import functools
 import inspect
 import json
 import logging
 import numbers
 import threading
-from typing import Any, Callable, Dict, Union, Optional, List, Sequence, Set, Tuple, Protocol, cast
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Union, Optional, List, Sequence, \
+  Set, Tuple, Protocol, cast
 import warnings
 
 from pylabrobot.machines.machine import Machine, need_setup_finished
@@ -27,7 +30,6 @@ from pylabrobot.resources import (
   CarrierSite,
   PlateCarrierSite,
   Lid,
-  MFXModule,
   Plate,
   PlateAdapter,
   Tip,
@@ -42,6 +44,8 @@ from pylabrobot.resources import (
   does_cross_contamination_tracking
 )
 from pylabrobot.resources.liquid import Liquid
+from pylabrobot.resources.ml_star.mfx_modules import MFXModule
+from pylabrobot.resources.tip_tracker import TipTrackerSnapshot
 from pylabrobot.tilting.tilter import Tilter
 
 from .backends import LiquidHandlerBackend
@@ -60,9 +64,32 @@ from .standard import (
   GripDirection
 )
 
+if TYPE_CHECKING:
+  from pylabrobot.resources.plate_volume_tracker import PlateVolumeTracker
+
 
 logger = logging.getLogger("pylabrobot")
 
+_callback_loop: Optional[asyncio.AbstractEventLoop] = None
+_callback_thread: Optional[threading.Thread] = None
+_callback_loop_lock = threading.Lock()
+
+
+def _get_callback_loop() -> asyncio.AbstractEventLoop:
+  """ Get the event loop that runs backend callbacks triggered from synchronous code, such as
+  resource assignment. The loop runs in a daemon thread that is started on first use, and is shared
+  by all liquid handlers so that callbacks are delivered in the order they were made. """
+
+  global _callback_loop, _callback_thread # pylint: disable=global-statement
+  with _callback_loop_lock:
+    if _callback_loop is None:
+      loop = asyncio.new_event_loop()
+      thread = threading.Thread(target=loop.run_forever, name="pylabrobot-backend-callbacks",
+        daemon=True)
+      thread.start()
+      _callback_loop, _callback_thread = loop, thread
+    return _callback_loop
+
 def check_contaminated(liquid_history_tip, liquid_history_well):
   """Helper function used to check if adding a liquid to the container
      would result in cross contamination"""
@@ -74,6 +101,61 @@ def check_updatable(src_tracker: VolumeTracker, dest_tracker: VolumeTracker):
   return not src_tracker.is_cross_contamination_tracking_disabled and \
           not dest_tracker.is_cross_contamination_tracking_disabled
 
+def get_plate_volume_tracker(
+  wells: Sequence[Well]
+) -> Tuple[Optional[PlateVolumeTracker], List[int]]:
+  """ Return the plate volume tracker of the wells and their indices in it, if volume tracking is
+  enabled and the wells share an enabled plate tracker, so that they can be updated at once.
+  Otherwise return `None`. """
+  # the plate volume tracker is only imported when a plate uses one, because it imports NumPy
+  plate = wells[0].parent if len(wells) > 0 else None
+  if not does_volume_tracking() or not isinstance(plate, Plate) or plate.volume_tracker is None:
+    return None, []
+  shared = plate.volume_tracker.shared_by(wells)
+  if shared is None or shared[0].is_disabled(shared[1]):
+    return None, []
+  return shared
+
+
+@dataclasses.dataclass(frozen=True)
+class BackendMethodSignature:
+  """ The keyword arguments a backend method accepts, other than the ones passed by the front end.
+
+  Attributes:
+    name: The name of the method.
+    required: The arguments without a default value.
+    accepted: All named arguments.
+    var_keyword: Whether the method accepts `**kwargs`, in which case it accepts all arguments.
+  """
+
+  name: str
+  required: FrozenSet[str]
+  accepted: FrozenSet[str]
+  var_keyword: bool
+
+
+@functools.lru_cache(maxsize=1024)
+def get_backend_method_signature(
+  method: Callable,
+  default: FrozenSet[str]
+) -> BackendMethodSignature:
+  """ Compute the signature of a backend method, ignoring `self` and the arguments in `default`.
+
+  The result is cached per method, so pass the function of the backend class (`method.__func__`)
+  rather than a bound method, which is a new object every time it is accessed.
+  """
+
+  ignored = default.union({"self"})
+  params = inspect.signature(method).parameters.values()
+  named = [param for param in params if param.name not in ignored and
+           param.kind not in {inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD}]
+  return BackendMethodSignature(
+    name=method.__name__,
+    required=frozenset(param.name for param in named if param.default is inspect.Parameter.empty),
+    accepted=frozenset(param.name for param in named),
+    var_keyword=any(param.kind == inspect.Parameter.VAR_KEYWORD for param in params),
+  )
+
 
 class BlowOutVolumeError(Exception):
   ...
@@ -147,9 +229,12 @@ class LiquidHandler(Machine):
     self.head = {c: TipTracker(thing=f"Channel {c}") for c in range(self.backend.num_channels)}
     self.head96 = {c: TipTracker(thing=f"Channel {c}") for c in range(96)}
 
-    self._send_assigned_resource_to_backend(self.deck)
-    for resource in self.deck.children:
-      self._send_assigned_resource_to_backend(resource)
+    try:
+      await self.backend.assigned_resources_callback([self.deck] + self.deck.children)
+    except Exception:
+      # The backend does not know the resources on the deck, so the setup did not finish.
+      self._setup_finished = False
+      raise
 
   def serialize_state(self) -> Dict[str, Any]:
     """ Serialize the state of this liquid handler. Use :meth:`~Resource.serialize_all_states` to
@@ -166,6 +251,13 @@ class LiquidHandler(Machine):
     for channel, tracker_state in head_state.items():
       self.head[channel].load_state(tracker_state)
 
+  def snapshot_state(self) -> Dict[int, TipTrackerSnapshot]:
+    return {channel: tracker.snapshot() for channel, tracker in self.head.items()}
+
+  def restore_state(self, snapshot: Dict[int, TipTrackerSnapshot]):
+    for channel, tracker_snapshot in snapshot.items():
+      self.head[channel].restore(tracker_snapshot)
+
   def update_head_state(self, state: Dict[int, Optional[Tip]]):
     """ Update the state of the liquid handler head.
 
@@ -194,15 +286,25 @@ class LiquidHandler(Machine):
     self.update_head_state({c: None for c in self.head.keys()})
 
   def _run_async_in_thread(self, func, *args, **kwargs):
-    def callback(*args, **kwargs):
-      loop = asyncio.new_event_loop()
-      asyncio.set_event_loop(loop)
-      loop.run_until_complete(func(*args, **kwargs))
-      loop.close()
-
-    t = threading.Thread(target=callback, args=args, kwargs=kwargs)
-    t.start()
-    t.join()
+    """ Run the coroutine function `func` on the backend callback loop, and block until it is done.
+    Exceptions raised by `func` are raised here. """
+
+    if threading.current_thread() is _callback_thread:
+      # Called from a callback that is running on the callback loop, which would deadlock waiting
+      # on itself. Run on a separate, short-lived loop instead.
+      def callback(*args, **kwargs):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(func(*args, **kwargs))
+        loop.close()
+
+      t = threading.Thread(target=callback, args=args, kwargs=kwargs)
+      t.start()
+      t.join()
+      return
+
+    future = asyncio.run_coroutine_threadsafe(func(*args, **kwargs), _get_callback_loop())
+    future.result()
 
   def _send_assigned_resource_to_backend(self, resource: Resource):
     """ This method is called when a resource is assigned to the deck, and passes this information
@@ -267,35 +369,25 @@ class LiquidHandler(Machine):
       The set of arguments that need to be removed from `backend_kwargs` before passing to `method`.
     """
 
-    default_args = default.union({"self"})
+    signature = get_backend_method_signature(getattr(method, "__func__", method),
+                                             frozenset(default))
 
-    sig = inspect.signature(method)
-    args = {arg: param for arg, param in sig.parameters.items() if arg not in default_args}
-    vars_keyword = {arg for arg, param in sig.parameters.items() # **kwargs
-                    if param.kind == inspect.Parameter.VAR_KEYWORD}
-    args = {arg: param for arg, param in args.items() # keep only *args and **kwargs
-            if param.kind not in {inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD}}
-    non_default = {arg for arg, param in args.items() if param.default == inspect.Parameter.empty}
-
-    strictness = get_strictness()
-
-    backend_kws = set(backend_kwargs.keys())
-
-    missing = non_default - backend_kws
+    missing = signature.required.difference(backend_kwargs)
     if len(missing) > 0:
-      raise TypeError(f"Missing arguments to backend.{method.__name__}: {missing}")
+      raise TypeError(f"Missing arguments to backend.{signature.name}: {set(missing)}")
 
-    if len(vars_keyword) > 0:
+    if signature.var_keyword:
       return set() # no extra arguments if the method accepts **kwargs
 
-    extra = backend_kws - set(args.keys())
-    if len(extra) > 0 and len(vars_keyword) == 0:
+    extra = set(backend_kwargs).difference(signature.accepted)
+    if len(extra) > 0:
+      strictness = get_strictness()
       if strictness == Strictness.STRICT:
-        raise TypeError(f"Extra arguments to backend.{method.__name__}: {extra}")
+        raise TypeError(f"Extra arguments to backend.{signature.name}: {extra}")
       elif strictness == Strictness.WARN:
-        warnings.warn(f"Extra arguments to backend.{method.__name__}: {extra}")
+        warnings.warn(f"Extra arguments to backend.{signature.name}: {extra}")
       else:
-        logger.debug("Extra arguments to backend.%s: %s", method.__name__, extra)
+        logger.debug("Extra arguments to backend.%s: %s", signature.name, extra)
 
     return extra
 
@@ -1370,6 +1462,7 @@ class LiquidHandler(Machine):
 
     tips = [channel.get_tip() for channel in self.head96.values()]
     all_liquids: List[List[Tuple[Optional[Liquid], float]]] = []
+    plate_tracker: Optional[PlateVolumeTracker] = None
     aspiration: Union[AspirationPlate, AspirationContainer]
 
     # Convert everything to floats to handle exotic number types
@@ -1422,10 +1515,17 @@ class LiquidHandler(Machine):
       if not len(wells) == 96:
         raise ValueError(f"aspirate96 expects 96 wells, got {len(wells)}")
 
-      for well, channel in zip(wells, self.head96.values()):
+      # wells of a plate with a plate volume tracker are updated at once
+      plate_tracker, indices = get_plate_volume_tracker(wells)
+      if plate_tracker is not None:
+        all_liquids = plate_tracker.remove_liquid(volume, wells=indices)
+
+      for j, (well, channel) in enumerate(zip(wells, self.head96.values())):
         # superfluous to have append in two places but the type checker is very angry and does not
         # understand that Optional[Liquid] (remove_liquid) is the same as None from the first case
-        if well.tracker.is_disabled or not does_volume_tracking():
+        if plate_tracker is not None:
+          liquids = all_liquids[j]
+        elif well.tracker.is_disabled or not does_volume_tracking():
           liquids = [(None, volume)]
           all_liquids.append(liquids)
         else:
@@ -1449,8 +1549,10 @@ class LiquidHandler(Machine):
     try:
       await self.backend.aspirate96(aspiration=aspiration, **backend_kwargs)
     except Exception as error:  # pylint: disable=broad-except
+      if plate_tracker is not None:
+        plate_tracker.rollback(wells=indices)
       for channel, well in zip(self.head96.values(), wells):
-        if does_volume_tracking() and not well.tracker.is_disabled:
+        if plate_tracker is None and does_volume_tracking() and not well.tracker.is_disabled:
           well.tracker.rollback()
         channel.get_tip().tracker.rollback()
       self._trigger_callback(
@@ -1461,8 +1563,10 @@ class LiquidHandler(Machine):
         **backend_kwargs,
       )
     else:
+      if plate_tracker is not None:
+        plate_tracker.commit(wells=indices)
       for channel, well in zip(self.head96.values(), wells):
-        if does_volume_tracking() and not well.tracker.is_disabled:
+        if plate_tracker is None and does_volume_tracking() and not well.tracker.is_disabled:
           well.tracker.commit()
         channel.get_tip().tracker.commit()
       self._trigger_callback(
@@ -1511,6 +1615,7 @@ class LiquidHandler(Machine):
 
     tips = [channel.get_tip() for channel in self.head96.values()]
     all_liquids: List[List[Tuple[Optional[Liquid], float]]] = []
+    plate_tracker: Optional[PlateVolumeTracker] = None
     dispense: Union[DispensePlate, DispenseContainer]
 
     # Convert everything to floats to handle exotic number types
@@ -1563,6 +1668,9 @@ class LiquidHandler(Machine):
       if not len(wells) == 96:
         raise ValueError(f"dispense96 expects 96 wells, got {len(wells)}")
 
+      # wells of a plate with a plate volume tracker are updated at once
+      plate_tracker, indices = get_plate_volume_tracker(wells)
+
       for channel, well in zip(self.head96.values(), wells):
         # even if the volume tracker is disabled, a liquid (None, volume) is added to the list
         # during the aspiration command
@@ -1570,8 +1678,12 @@ class LiquidHandler(Machine):
         liquids = list(reversed(l))
         all_liquids.append(liquids)
 
-        for liquid, vol in liquids:
-          well.tracker.add_liquid(liquid=liquid, volume=vol)
+        if plate_tracker is None:
+          for liquid, vol in liquids:
+            well.tracker.add_liquid(liquid=liquid, volume=vol)
+
+      if plate_tracker is not None:
+        plate_tracker.add_liquids(all_liquids, wells=indices)
 
       dispense = DispensePlate(
         wells=wells,
@@ -1587,8 +1699,10 @@ class LiquidHandler(Machine):
     try:
       await self.backend.dispense96(dispense=dispense, **backend_kwargs)
     except Exception as error:  # pylint: disable=broad-except
+      if plate_tracker is not None:
+        plate_tracker.rollback(wells=indices)
       for channel, well in zip(self.head96.values(), wells):
-        if does_volume_tracking() and not well.tracker.is_disabled:
+        if plate_tracker is None and does_volume_tracking() and not well.tracker.is_disabled:
           well.tracker.rollback()
         channel.get_tip().tracker.rollback()
 
@@ -1600,8 +1714,10 @@ class LiquidHandler(Machine):
         **backend_kwargs,
       )
     else:
+      if plate_tracker is not None:
+        plate_tracker.commit(wells=indices)
       for channel, well in zip(self.head96.values(), wells):
-        if does_volume_tracking() and not well.tracker.is_disabled:
+        if plate_tracker is None and does_volume_tracking() and not well.tracker.is_disabled:
           well.tracker.commit()
         channel.get_tip().tracker.commit()
 
@@ -10,10 +10,11 @@ import unittest.mock
 from pylabrobot.liquid_handling.strictness import Strictness, set_strictness
 from pylabrobot.resources import no_tip_tracking, set_tip_tracking, Liquid
 from pylabrobot.resources.errors import HasTipError, NoTipError, CrossContaminationError
+from pylabrobot.resources.plate_volume_tracker import HAS_NUMPY
 from pylabrobot.resources.volume_tracker import set_volume_tracking, set_cross_contamination_tracking
 
 from . import backends
-from .liquid_handler import LiquidHandler, OperationCallback
+from .liquid_handler import LiquidHandler, OperationCallback, get_backend_method_signature
 from pylabrobot.resources import (
   Container,
   Coordinate,
@@ -249,6 +250,51 @@ class TestLiquidHandlerLayout(unittest.IsolatedAsyncioTestCase):
     self.assertEqual(plate2.location.z, 15)
     self.assertEqual(stack.get_size_z(), 30)
 
+  def test_assignment_callbacks(self):
+    tip_car = TIP_CAR_480_A00(name="tip_carrier")
+    plt_car = PLT_CAR_L5AC_A00(name="plate carrier")
+    self.deck.assign_child_resource(tip_car, rails=1)
+    self.deck.assign_child_resource(plt_car, rails=21)
+    self.deck.unassign_child_resource(tip_car)
+
+    self.assertEqual([(c["command"], c["args"]) for c in self.backend.commands_received], [
+      ("assigned_resource_callback", (tip_car,)),
+      ("assigned_resource_callback", (plt_car,)),
+      ("unassigned_resource_callback", ("tip_carrier",)),
+    ])
+
+  def test_assignment_callback_error(self):
+    class ErrorBackend(backends.SaverBackend):
+      async def assigned_resource_callback(self, *args, **kwargs):
+        raise RuntimeError("assignment failed")
+
+    deck = STARLetDeck()
+    LiquidHandler(ErrorBackend(num_channels=8), deck=deck)
+    with self.assertRaisesRegex(RuntimeError, "assignment failed"):
+      deck.assign_child_resource(TIP_CAR_480_A00(name="tip_carrier"), rails=1)
+
+  async def test_assignment_callbacks_on_setup(self):
+    tip_car = TIP_CAR_480_A00(name="tip_carrier")
+    plt_car = PLT_CAR_L5AC_A00(name="plate carrier")
+    self.deck.assign_child_resource(tip_car, rails=1)
+    self.deck.assign_child_resource(plt_car, rails=21)
+    self.backend.clear()
+
+    with unittest.mock.patch.object(self.backend, "assigned_resources_callback",
+                                    wraps=self.backend.assigned_resources_callback) as callback:
+      await self.lh.setup()
+    callback.assert_called_once_with([self.deck] + self.deck.children)
+    self.assertEqual([c["args"] for c in self.backend.commands_received],
+      [(r,) for r in [self.deck] + self.deck.children])
+    self.assertEqual(self.deck.children[-2:], [tip_car, plt_car])
+
+  async def test_assignment_callbacks_on_setup_error(self):
+    with unittest.mock.patch.object(self.backend, "assigned_resources_callback",
+                                    side_effect=RuntimeError("assignment failed")):
+      with self.assertRaisesRegex(RuntimeError, "assignment failed"):
+        await self.lh.setup()
+    self.assertFalse(self.lh.setup_finished)
+
   def test_serialize(self):
     serialized = self.lh.serialize()
     deserialized = LiquidHandler.deserialize(serialized)
@@ -653,6 +699,32 @@ class TestLiquidHandlerCommands(unittest.IsolatedAsyncioTestCase):
     set_volume_tracking(enabled=False)
 
 
+class TestBackendMethodSignature(unittest.TestCase):
+  """ Tests for the cached signatures used to check backend kwargs. """
+
+  def test_signature(self):
+    class TestBackend(backends.SaverBackend):
+      async def pick_up_tips(self, ops, use_channels, non_default, *args, default=True): # type: ignore
+        pass
+
+    default = frozenset({"ops", "use_channels"})
+    signature = get_backend_method_signature(TestBackend.pick_up_tips, default)
+    self.assertEqual(signature.name, "pick_up_tips")
+    self.assertEqual(signature.required, {"non_default"})
+    self.assertEqual(signature.accepted, {"non_default", "default"})
+    self.assertFalse(signature.var_keyword)
+
+    # the signature is computed once per method
+    backend = TestBackend(num_channels=8)
+    self.assertIsNot(type(backend).pick_up_tips, backends.SaverBackend.pick_up_tips)
+    self.assertIs(get_backend_method_signature(type(backend).pick_up_tips, default), signature)
+
+  def test_var_keyword(self):
+    signature = get_backend_method_signature(backends.SaverBackend.aspirate, frozenset({"ops"}))
+    self.assertEqual(signature.accepted, set())
+    self.assertTrue(signature.var_keyword)
+
+
 class TestLiquidHandlerVolumeTracking(unittest.IsolatedAsyncioTestCase):
   async def asyncSetUp(self):
     self.backend = backends.SaverBackend(num_channels=8)
@@ -688,6 +760,28 @@ class TestLiquidHandlerVolumeTracking(unittest.IsolatedAsyncioTestCase):
     liquids_now = [self.plate.get_item(i).tracker.liquids for i in range(8)]
     self.assertEqual(liquids_now, initial_liquids)
 
+  @unittest.skipIf(not HAS_NUMPY, "NumPy is not installed")
+  async def test_aspirate_dispense96_plate_volume_tracker(self):
+    self.plate.set_well_liquids((Liquid.WATER, 50))
+    plate_tracker = self.plate.use_plate_volume_tracker()
+    await self.lh.pick_up_tips96(self.tip_rack)
+
+    await self.lh.aspirate96(self.plate, volume=20)
+    self.assertEqual(list(plate_tracker.get_used_volumes()), [30] * 96)
+    self.assertEqual(self.plate.get_item("H12").tracker.liquids, [(Liquid.WATER, 30)])
+    self.assertEqual(self.lh.head96[95].get_tip().tracker.liquids, [(Liquid.WATER, 20)])
+
+    await self.lh.dispense96(self.plate, volume=10)
+    self.assertEqual(self.plate.get_item("A1").tracker.liquids, [(Liquid.WATER, 40)])
+    self.assertEqual(self.lh.head96[0].get_tip().tracker.get_used_volume(), 10)
+
+    with unittest.mock.patch.object(self.backend, "dispense96", side_effect=RuntimeError):
+      with self.assertRaises(RuntimeError):
+        await self.lh.dispense96(self.plate, volume=10)
+    # like a VolumeTracker, the plate tracker clears the pending liquids on rollback
+    self.assertEqual(self.plate.get_item("A1").tracker.liquids, [(Liquid.WATER, 40)])
+    self.assertEqual(list(plate_tracker.get_used_volumes()), [0] * 96)
+
 
 class TestLiquidHandlerCrossContaminationTracking(unittest.IsolatedAsyncioTestCase):
   async def asyncSetUp(self):
@@ -1,4 +1,5 @@
 from abc import ABC, ABCMeta, abstractmethod
+from pylabrobot.utils.lazy_import import import_lazy_attribute
 from pylabrobot.utils.object_parsing import find_subclass
 
 class MachineBackend(ABC):
@@ -19,6 +20,8 @@ class MachineBackend(ABC):
   def deserialize(cls, data: dict):
     class_name = data.pop("type")
     subclass = find_subclass(class_name, cls=cls)
+    if subclass is None and import_lazy_attribute(class_name) is not None:
+      subclass = find_subclass(class_name, cls=cls) # the backend had not been imported yet
     if subclass is None:
       raise ValueError(f'Could not find subclass with name "{data["type"]}"')
     if issubclass(subclass, ABCMeta):
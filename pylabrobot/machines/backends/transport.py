@@ -0,0 +1,425 @@
+from abc import ABCMeta, abstractmethod
+import asyncio
+import collections
+import logging
+import threading
+from typing import Callable, Deque, List, Optional, Tuple
+
+from pylabrobot.utils.log_handlers import log_command
+
+try:
+  import serial
+  HAS_SERIAL = True
+except ImportError:
+  HAS_SERIAL = False
+
+try:
+  import hid # type: ignore
+  HAS_HID = True
+except ImportError:
+  HAS_HID = False
+
+
+logger = logging.getLogger("pylabrobot")
+
+
+FrameMatcher = Callable[[bytes], bool]
+
+
+class Transport(metaclass=ABCMeta):
+  """ An abstract class for the connection to a device that sends framed messages, such as a serial
+  port or a HID device.
+
+  A long-lived reader thread, started in :meth:`setup`, reads from the device and splits what it
+  reads into frames. Each frame is dispatched to the first command waiting for a frame it matches,
+  by completing that command's future on the command's event loop. Frames that no command is waiting
+  for go to the oldest :meth:`read_frame` call, or are kept in a bounded queue for the next one.
+  Commands therefore never block the event loop, so several devices on the same loop do not stall
+  each other.
+  """
+
+  def __init__(self, terminator: bytes = b"\r\n", read_interval: float = 0.1,
+               max_unsolicited_frames: int = 100):
+    """ Initialize a transport.
+
+    Args:
+      terminator: The bytes that end a frame. The terminator is included in the frames.
+      read_interval: The maximum time in seconds that the reader thread blocks on a single read,
+        which is how long :meth:`stop` may wait for it.
+      max_unsolicited_frames: The maximum number of frames that no command was waiting for to keep.
+        When more arrive, the oldest are dropped.
+    """
+
+    self.terminator = terminator
+    self.read_interval = read_interval
+
+    self._buffer = bytearray()
+    self._buffer_lock = threading.Lock()
+    self._reader: Optional[threading.Thread] = None
+    self._stop_reading = threading.Event()
+
+    # Commands waiting for a frame, in order, `read_frame` calls waiting for a frame that no command
+    # was waiting for, and frames that no one was waiting for. All are guarded by `_lock`.
+    self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future, Optional[FrameMatcher]]] \
+      = collections.deque()
+    self._frame_waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = \
+      collections.deque()
+    self._unsolicited: Deque[bytes] = collections.deque(maxlen=max_unsolicited_frames)
+    self._lock = threading.Lock()
+    self._command_lock: Optional[asyncio.Lock] = None
+
+  @abstractmethod
+  def _open(self) -> None:
+    """ Open the connection to the device. """
+
+  @abstractmethod
+  def _close(self) -> None:
+    """ Close the connection to the device. """
+
+  @abstractmethod
+  def _read_chunk(self) -> bytes:
+    """ Read the available bytes from the device. Block for at most `read_interval` seconds while
+    nothing is available, and return `b""` if nothing was read. Called on the reader thread. """
+
+  @abstractmethod
+  def _write(self, data: bytes) -> None:
+    """ Write bytes to the device. Called on a worker thread. """
+
+  def _split_frames(self, chunk: bytes) -> List[bytes]:
+    """ Add a chunk of bytes read from the device to the buffer, and return the complete frames in
+    it. By default, frames end with `terminator`. Called on the reader thread. """
+
+    self._buffer += chunk
+    frames = []
+    while True:
+      end = self._buffer.find(self.terminator)
+      if end == -1:
+        break
+      end += len(self.terminator)
+      frames.append(bytes(self._buffer[:end]))
+      del self._buffer[:end]
+    return frames
+
+  async def setup(self):
+    """ Open the connection and start the reader thread. """
+
+    self._open()
+    self._buffer.clear()
+    self._stop_reading.clear()
+    self._reader = threading.Thread(target=self._continuously_read, daemon=True,
+                                    name=f"{self.__class__.__name__.lower()}-reader")
+    self._reader.start()
+
+  async def stop(self):
+    """ Stop the reader thread and close the connection, failing all commands that are still
+    waiting for a frame. """
+
+    self._stop_reading.set()
+    if self._reader is not None:
+      await asyncio.get_running_loop().run_in_executor(None, self._reader.join)
+      self._reader = None
+    self._close()
+
+    with self._lock:
+      waiters = [(loop, fut) for loop, fut, _ in self._waiters] + list(self._frame_waiters)
+      self._waiters.clear()
+      self._frame_waiters.clear()
+      self._unsolicited.clear()
+    for loop, fut in waiters:
+      self._complete_future(loop, fut,
+        exception=RuntimeError("Transport stopped while waiting for a response."))
+
+  async def write(self, data: bytes) -> None:
+    """ Write bytes to the device on a worker thread. """
+
+    if self._reader is None:
+      raise RuntimeError("Transport not set up.")
+    await asyncio.get_running_loop().run_in_executor(None, self._write, data)
+    logger.debug("[%s] Sent: %r", self.__class__.__name__, data)
+    log_command(self.__class__.__name__, "sent", data)
+
+  async def send_command(self, data: bytes, match: Optional[FrameMatcher] = None,
+                         timeout: Optional[float] = None) -> bytes:
+    """ Write a command to the device and wait for the response.
+
+    Commands are sent one at a time: a command is only written after the response to the previous
+    command was received or timed out.
+
+    Args:
+      data: The bytes to write.
+      match: A function that returns whether a frame is the response to this command. If `None`, the
+        first frame received after writing is the response.
+      timeout: The maximum time in seconds to wait for the response. If `None`, wait indefinitely.
+
+    Returns:
+      The response frame.
+
+    Raises:
+      TimeoutError: If no response was received within `timeout` seconds.
+    """
+
+    if self._command_lock is None:
+      self._command_lock = asyncio.Lock()
+
+    async with self._command_lock:
+      # Register before writing, so that a fast response can not arrive before there is a future.
+      loop = asyncio.get_running_loop()
+      fut = loop.create_future()
+      waiter = (loop, fut, match)
+      with self._lock:
+        self._waiters.append(waiter)
+      try:
+        await self.write(data)
+        return await asyncio.wait_for(fut, timeout=timeout) # type: ignore[no-any-return]
+      except asyncio.TimeoutError as e:
+        raise TimeoutError(f"Timeout while waiting for response to {data!r}.") from e
+      finally:
+        with self._lock:
+          if waiter in self._waiters:
+            self._waiters.remove(waiter)
+
+  async def read_frame(self, timeout: Optional[float] = None) -> bytes:
+    """ Return the oldest frame that no command was waiting for, waiting for one if there is none.
+
+    Frames go to commands waiting for them first, so that reading frames does not take the response
+    to a command.
+
+    Raises:
+      TimeoutError: If no frame was received within `timeout` seconds.
+    """
+
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+    waiter = (loop, fut)
+    with self._lock:
+      if len(self._unsolicited) > 0:
+        return self._unsolicited.popleft()
+      self._frame_waiters.append(waiter)
+    try:
+      return await asyncio.wait_for(fut, timeout=timeout) # type: ignore[no-any-return]
+    except asyncio.TimeoutError as e:
+      raise TimeoutError("Timeout while waiting for a frame.") from e
+    finally:
+      with self._lock:
+        if waiter in self._frame_waiters:
+          self._frame_waiters.remove(waiter)
+
+  def take_partial_frame(self) -> bytes:
+    """ Return and clear the bytes received after the last complete frame, for devices that do not
+    always terminate their responses. """
+
+    with self._buffer_lock:
+      partial = bytes(self._buffer)
+      self._buffer.clear()
+    return partial
+
+  @staticmethod
+  def _complete_future(
+    loop: asyncio.AbstractEventLoop,
+    fut: asyncio.Future,
+    result: Optional[bytes] = None,
+    exception: Optional[BaseException] = None
+  ) -> None:
+    """ Thread-safely complete a future, unless it is already done (e.g. cancelled). """
+
+    def complete():
+      if fut.done():
+        return
+      if exception is not None:
+        fut.set_exception(exception)
+      else:
+        fut.set_result(result)
+
+    if loop.is_closed():
+      return
+    loop.call_soon_threadsafe(complete)
+
+  def _dispatch(self, frame: bytes) -> None:
+    """ Complete the future of the first command waiting for a frame that matches `frame`, or else
+    of the oldest :meth:`read_frame` call, or keep it as an unsolicited frame. """
+
+    log_command(self.__class__.__name__, "received", frame)
+    with self._lock:
+      for waiter in self._waiters:
+        loop, fut, match = waiter
+        if fut.done() or not self._matches(match, frame):
+          continue
+        self._waiters.remove(waiter)
+        break
+      else:
+        logger.debug("[%s] Received unsolicited frame: %r", self.__class__.__name__, frame)
+        while len(self._frame_waiters) > 0:
+          loop, fut = self._frame_waiters.popleft()
+          if not fut.done():
+            break
+        else:
+          self._unsolicited.append(frame)
+          return
+
+    logger.debug("[%s] Received: %r", self.__class__.__name__, frame)
+    self._complete_future(loop, fut, result=frame)
+
+  def _matches(self, match: Optional[FrameMatcher], frame: bytes) -> bool:
+    """ Whether `frame` matches a waiter. A matcher that raises does not match. """
+
+    if match is None:
+      return True
+    try:
+      return match(frame)
+    except Exception as e: # pylint: disable=broad-exception-caught
+      logger.debug("[%s] Matcher raised on frame %r: %s", self.__class__.__name__, frame, e)
+      return False
+
+  def _continuously_read(self) -> None:
+    """ Read from the device and dispatch frames until `_stop_reading` is set. """
+
+    while not self._stop_reading.is_set():
+      try:
+        chunk = self._read_chunk()
+      except Exception as e: # pylint: disable=broad-exception-caught
+        if not self._stop_reading.is_set():
+          logger.error("[%s] Error while reading: %s", self.__class__.__name__, e)
+          self._stop_reading.wait(self.read_interval)
+        continue
+      if len(chunk) == 0:
+        continue
+      # An error in handling one chunk or frame must not stop the reader thread.
+      try:
+        with self._buffer_lock:
+          frames = self._split_frames(chunk)
+      except Exception as e: # pylint: disable=broad-exception-caught
+        logger.error("[%s] Error while splitting %r into frames: %s", self.__class__.__name__,
+                     chunk, e)
+        continue
+      for frame in frames:
+        try:
+          self._dispatch(frame)
+        except Exception as e: # pylint: disable=broad-exception-caught
+          logger.error("[%s] Error while dispatching %r: %s", self.__class__.__name__, frame, e)
+
+
+class SerialTransport(Transport):
+  """ A transport over a serial port, using pyserial. """
+
+  def __init__(
+    self,
+    port: str,
+    baudrate: int = 9600,
+    bytesize: int = 8,
+    parity: str = "N",
+    stopbits: float = 1,
+    write_timeout: Optional[float] = None,
+    terminator: bytes = b"\r\n",
+    read_interval: float = 0.1,
+  ):
+    """ Initialize a serial transport.
+
+    Args:
+      port: The serial port, such as `"/dev/ttyUSB0"` or `"COM3"`.
+      baudrate: The baud rate.
+      bytesize: The number of data bits.
+      parity: The parity, one of pyserial's `PARITY_*` constants (`"N"`, `"E"`, `"O"`, ...).
+      stopbits: The number of stop bits.
+      write_timeout: The timeout for writing in seconds. If `None`, block until written.
+      terminator: The bytes that end a frame.
+      read_interval: The maximum time in seconds that the reader thread blocks on a single read.
+    """
+
+    super().__init__(terminator=terminator, read_interval=read_interval)
+    self.port = port
+    self.baudrate = baudrate
+    self.bytesize = bytesize
+    self.parity = parity
+    self.stopbits = stopbits
+    self.write_timeout = write_timeout
+    self.ser: Optional["serial.Serial"] = None
+
+  def _open(self) -> None:
+    if not HAS_SERIAL:
+      raise RuntimeError("pyserial not installed.")
+    self.ser = serial.Serial(
+      port=self.port,
+      baudrate=self.baudrate,
+      bytesize=self.bytesize,
+      parity=self.parity,
+      stopbits=self.stopbits,
+      write_timeout=self.write_timeout,
+      timeout=self.read_interval)
+
+  def _close(self) -> None:
+    if self.ser is not None:
+      self.ser.close()
+      self.ser = None
+
+  def _read_chunk(self) -> bytes:
+    assert self.ser is not None, "Serial port not open."
+    # Block until at least one byte is available, then take everything that is.
+    data = self.ser.read(1)
+    if len(data) > 0 and self.ser.in_waiting > 0:
+      data += self.ser.read(self.ser.in_waiting)
+    return bytes(data)
+
+  def _write(self, data: bytes) -> None:
+    assert self.ser is not None, "Serial port not open."
+    self.ser.write(data)
+
+
+class HIDTransport(Transport):
+  """ A transport to a HID device, using the `hid` package.
+
+  The device is read one report at a time. Subclasses can override :meth:`_split_frames` for
+  devices that frame messages by report instead of by terminator.
+  """
+
+  def __init__(
+    self,
+    vid: int,
+    pid: int,
+    serial_number: Optional[str] = None,
+    report_size: int = 64,
+    write_report_size: Optional[int] = None,
+    terminator: bytes = b"\r\n",
+    read_interval: float = 0.1,
+  ):
+    """ Initialize a HID transport.
+
+    Args:
+      vid: The USB vendor ID.
+      pid: The USB product ID.
+      serial_number: The serial number of the device. If `None`, use the first device found.
+      report_size: The maximum size of a report read from the device.
+      write_report_size: If not `None`, data is written in reports of this size.
+      terminator: The bytes that end a frame.
+      read_interval: The maximum time in seconds that the reader thread blocks on a single read.
+    """
+
+    super().__init__(terminator=terminator, read_interval=read_interval)
+    self.vid = vid
+    self.pid = pid
+    self.serial_number = serial_number
+    self.report_size = report_size
+    self.write_report_size = write_report_size
+    self.device = None
+
+  def _open(self) -> None:
+    if not HAS_HID:
+      raise RuntimeError("This backend requires the `hid` package to be installed")
+    self.device = hid.Device(vid=self.vid, pid=self.pid, serial=self.serial_number)
+
+  def _close(self) -> None:
+    if self.device is not None:
+      self.device.close()
+      self.device = None
+
+  def _read_chunk(self) -> bytes:
+    assert self.device is not None, "HID device not open."
+    report = self.device.read(self.report_size, timeout=int(self.read_interval * 1000))
+    return bytes(report or b"")
+
+  def _write(self, data: bytes) -> None:
+    assert self.device is not None, "HID device not open."
+    if self.write_report_size is None:
+      self.device.write(data)
+      return
+    for i in range(0, len(data), self.write_report_size):
+      self.device.write(data[i:i + self.write_report_size])
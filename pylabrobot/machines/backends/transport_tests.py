@@ -0,0 +1,153 @@
+import asyncio
+import time
+import unittest
+import unittest.mock
+
+from pylabrobot.heating_shaking import InhecoThermoShake
+from pylabrobot.machines.backends.transport import SerialTransport
+from pylabrobot.scales import MettlerToledoWXS205SDU
+from pylabrobot.tilting import HamiltonTiltModuleBackend
+
+from tests.serial_devices import FakeHIDDevice, FakeSerialDevice
+
+
+def echo(command: bytes) -> bytes:
+  return b"echo " + command
+
+
+class SerialTransportTests(unittest.IsolatedAsyncioTestCase):
+  """ Tests for the serial transport, with a fake device on a pseudo terminal. """
+
+  async def asyncSetUp(self):
+    await super().asyncSetUp()
+    self.device = FakeSerialDevice(echo)
+    self.device.start()
+    self.transport = SerialTransport(self.device.port, read_interval=0.05)
+    await self.transport.setup()
+
+  async def asyncTearDown(self):
+    await self.transport.stop()
+    self.device.stop()
+    await super().asyncTearDown()
+
+  async def test_send_command(self):
+    response = await self.transport.send_command(b"hello\r\n", timeout=1)
+    self.assertEqual(response, b"echo hello\r\n")
+    self.assertEqual(self.device.commands, [b"hello\r\n"])
+
+  async def test_commands_in_order(self):
+    responses = await asyncio.gather(*[
+      self.transport.send_command(f"command {i}\r\n".encode(), timeout=1) for i in range(10)])
+    self.assertEqual(responses, [f"echo command {i}\r\n".encode() for i in range(10)])
+
+  async def test_match(self):
+    self.device.respond = lambda command: b"unsolicited\r\n" + echo(command)
+    response = await self.transport.send_command(b"hello\r\n", timeout=1,
+                                                 match=lambda frame: frame.startswith(b"echo"))
+    self.assertEqual(response, b"echo hello\r\n")
+    self.assertEqual(await self.transport.read_frame(timeout=1), b"unsolicited\r\n")
+
+  async def test_read_frame_does_not_take_responses(self):
+    self.device.respond = lambda command: echo(command) + b"unsolicited\r\n"
+    read = asyncio.create_task(self.transport.read_frame(timeout=1))
+    await asyncio.sleep(0.05)
+    self.assertEqual(await self.transport.send_command(b"hello\r\n", timeout=1), b"echo hello\r\n")
+    self.assertEqual(await read, b"unsolicited\r\n")
+
+  async def test_matcher_raises(self):
+    # like the Inheco matcher, which decodes the frame with "unicode_escape"
+    self.device.respond = lambda command: b"\\x\r\n" + echo(command)
+    response = await self.transport.send_command(b"hello\r\n", timeout=1,
+      match=lambda frame: frame.decode("unicode_escape").startswith("echo"))
+    self.assertEqual(response, b"echo hello\r\n")
+    self.assertEqual(await self.transport.read_frame(timeout=1), b"\\x\r\n")
+
+  async def test_reader_survives_errors(self):
+    with unittest.mock.patch.object(self.transport, "_split_frames", side_effect=ValueError):
+      with self.assertRaises(TimeoutError):
+        await self.transport.send_command(b"hello\r\n", timeout=0.2)
+    self.assertEqual(await self.transport.send_command(b"again\r\n", timeout=1),
+                     b"echo again\r\n")
+
+  async def test_timeout(self):
+    self.device.respond = lambda command: None
+    with self.assertRaises(TimeoutError):
+      await self.transport.send_command(b"hello\r\n", timeout=0.1)
+    self.assertEqual(len(self.transport._waiters), 0) # pylint: disable=protected-access
+
+  async def test_stop_fails_waiting_commands(self):
+    self.device.respond = lambda command: None
+    task = asyncio.create_task(self.transport.send_command(b"hello\r\n"))
+    await asyncio.sleep(0.1)
+    await self.transport.stop()
+    with self.assertRaises(RuntimeError):
+      await task
+
+
+class HamiltonTiltModuleTests(unittest.IsolatedAsyncioTestCase):
+  """ Tests for the framing of the Hamilton tilt module responses. """
+
+  async def test_unterminated_response(self):
+    with FakeSerialDevice(lambda command: command[2:4] + b"er00") as device:
+      tilter = HamiltonTiltModuleBackend(com_port=device.port, timeout=0.2)
+      await tilter.setup()
+      self.assertEqual(await tilter.send_command("GP", "5"), "GPer00")
+      await tilter.stop()
+
+  async def test_no_response(self):
+    with FakeSerialDevice(lambda command: None) as device:
+      tilter = HamiltonTiltModuleBackend(com_port=device.port, timeout=0.2)
+      with self.assertRaises(TimeoutError):
+        await tilter.setup()
+      await tilter.stop()
+
+
+class ConcurrentDevicesTests(unittest.IsolatedAsyncioTestCase):
+  """ Several slow devices on the same event loop should not block each other, or the loop. """
+
+  DELAY = 0.3
+
+  async def test_concurrent_devices(self):
+    scale_device = FakeSerialDevice(lambda command: b"S S      1.2345 g\r\n", delay=self.DELAY)
+    tilter_device = FakeSerialDevice(lambda command: command[2:4] + b"er00\r\n", delay=self.DELAY)
+    # reply with the lowercase echo, no error, a temperature of 37.0 and a checksum byte
+    hid_device = FakeHIDDevice(lambda report: [b"1rat0370X\x00"], delay=self.DELAY)
+
+    with scale_device, tilter_device, \
+      unittest.mock.patch("pylabrobot.machines.backends.transport.hid", create=True) as hid, \
+      unittest.mock.patch("pylabrobot.machines.backends.transport.HAS_HID", True):
+      hid.Device.return_value = hid_device
+      scale = MettlerToledoWXS205SDU(port=scale_device.port)
+      tilter = HamiltonTiltModuleBackend(com_port=tilter_device.port)
+      shaker = InhecoThermoShake()
+      await asyncio.gather(scale.setup(), tilter.setup(), shaker.setup())
+
+      longest_stall = 0.0
+      done = False
+
+      async def ticker():
+        nonlocal longest_stall
+        while not done:
+          t0 = time.perf_counter()
+          await asyncio.sleep(0.001)
+          longest_stall = max(longest_stall, time.perf_counter() - t0 - 0.001)
+
+      ticker_task = asyncio.create_task(ticker())
+      t0 = time.perf_counter()
+      weight, _, temperature = await asyncio.gather(
+        scale.get_stable_weight(),
+        tilter.set_angle(5),
+        shaker.get_current_temperature())
+      duration = time.perf_counter() - t0
+      done = True
+      await ticker_task
+
+      await scale.stop()
+      await tilter.stop()
+      await shaker.io.stop() # stop() would also stop shaking and temperature control
+
+    self.assertEqual(weight, 1.2345)
+    self.assertEqual(temperature, 37.0)
+    self.assertEqual(tilter_device.commands, [b"99SO0\r\n", b"99SI\r\n", b"99GP5\r\n"])
+    self.assertLess(duration, 2 * self.DELAY)
+    self.assertLess(longest_stall, 0.05)
@@ -6,6 +6,7 @@ import time
 from typing import List, Optional, TYPE_CHECKING
 
 from pylabrobot.machines.backends.machine import MachineBackend
+from pylabrobot.utils.log_handlers import log_command
 
 try:
   import usb.core
@@ -86,6 +87,7 @@ class USBBackend(MachineBackend, metaclass=ABCMeta):
     # write command to endpoint
     self.dev.write(self.write_endpoint, data, timeout=timeout)
     logger.info("Sent command: %s", data)
+    log_command(self.__class__.__name__, "sent", data)
 
   def _read_packet(self) -> Optional[bytearray]:
     """ Read a packet from the machine.
@@ -142,6 +144,7 @@ class USBBackend(MachineBackend, metaclass=ABCMeta):
         continue
 
       logger.debug("Received data: %s", resp)
+      log_command(self.__class__.__name__, "received", resp)
       return resp
 
     raise TimeoutError("Timeout while reading.")
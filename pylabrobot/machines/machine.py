@@ -3,6 +3,7 @@ from __future__ import annotations
 from abc import ABCMeta
 from typing import Optional, Callable
 
+from pylabrobot import get_config
 from pylabrobot.machines.backends import MachineBackend
 from pylabrobot.resources import Resource
 
@@ -41,6 +42,7 @@ class Machine(Resource, metaclass=ABCMeta):
   ):
     super().__init__(name=name, size_x=size_x, size_y=size_y, size_z=size_z,
                      category=category, model=model)
+    get_config() # load the config file and set up logging, if this has not been done yet
     self.backend = backend
     self._setup_finished = False
 
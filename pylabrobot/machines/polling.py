@@ -0,0 +1,215 @@
+""" Waiting for a device to reach a state by polling it, with exponential backoff.
+
+Machines often have to wait for a device: for a plate reader to finish a run, for a temperature
+controller to reach its target. :func:`poll_until` polls the device often right after the wait
+starts, when the device is likely to become ready soon, and less and less often as the wait goes
+on, so that short waits return as soon as the device is ready and long waits do not flood the
+device with status requests. An :class:`asyncio.Event` can be given to poll immediately when
+something changes, for example when the target of the wait is updated.
+
+The duration of every wait is recorded in a histogram per wait name, see :func:`get_wait_timings`.
+"""
+
+import asyncio
+import bisect
+import logging
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+
+logger = logging.getLogger("pylabrobot")
+
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class Backoff:
+  """ Exponential backoff between polls.
+
+  Attributes:
+    initial: The time in seconds to wait after the first poll.
+    maximum: The maximum time in seconds to wait between polls.
+    factor: The factor by which the time between polls grows after every poll.
+    jitter: The fraction by which every wait is randomly lengthened or shortened, so that several
+      waits that started at the same time do not poll the device at the same time.
+  """
+
+  initial: float = 0.01
+  maximum: float = 1.0
+  factor: float = 2.0
+  jitter: float = 0.1
+
+  def __post_init__(self):
+    if self.initial <= 0 or self.maximum < self.initial:
+      raise ValueError("Backoff needs 0 < initial <= maximum.")
+    if self.factor < 1:
+      raise ValueError("Backoff factor must be at least 1.")
+    if not 0 <= self.jitter < 1:
+      raise ValueError("Backoff jitter must be between 0 and 1.")
+
+  def delays(self) -> Iterator[float]:
+    """ Yield the times to wait between consecutive polls. """
+
+    delay = self.initial
+    while True:
+      yield delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+      delay = min(delay * self.factor, self.maximum)
+
+
+# Upper bounds in seconds of the histogram buckets of wait durations. The last bucket is unbounded.
+WAIT_TIME_BUCKETS: Tuple[float, ...] = \
+  (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 30, 60, 300, math.inf)
+
+
+@dataclass
+class WaitTimings:
+  """ Timings of the waits with the same name.
+
+  Attributes:
+    name: The name of the waits.
+    histogram: The number of waits per bucket of :data:`WAIT_TIME_BUCKETS`.
+    outcomes: The number of waits that were `"ready"`, `"timeout"`, `"cancelled"` or `"error"`.
+    num_polls: The total number of polls.
+    total_time: The total time in seconds spent waiting.
+    poll_time: The part of `total_time` spent polling the device.
+    sleep_time: The part of `total_time` spent between polls.
+  """
+
+  name: str
+  histogram: List[int] = field(default_factory=lambda: [0] * len(WAIT_TIME_BUCKETS))
+  outcomes: Dict[str, int] = field(default_factory=dict)
+  num_polls: int = 0
+  total_time: float = 0
+  poll_time: float = 0
+  sleep_time: float = 0
+
+  @property
+  def num_waits(self) -> int:
+    return sum(self.histogram)
+
+  def record(self, outcome: str, num_polls: int, total_time: float, poll_time: float,
+             sleep_time: float) -> None:
+    self.histogram[bisect.bisect_left(WAIT_TIME_BUCKETS, total_time)] += 1
+    self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+    self.num_polls += num_polls
+    self.total_time += total_time
+    self.poll_time += poll_time
+    self.sleep_time += sleep_time
+
+  def __str__(self) -> str:
+    lines = [f"{self.name}: {self.num_waits} waits, {self.num_polls} polls, "
+             f"{self.total_time:.3f}s waiting ({self.poll_time:.3f}s polling, "
+             f"{self.sleep_time:.3f}s between polls), {self.outcomes}"]
+    for bound, count in zip(WAIT_TIME_BUCKETS, self.histogram):
+      if count > 0:
+        lines.append(f"  <= {bound * 1000:>8.0f}ms: {count}")
+    return "\n".join(lines)
+
+
+_wait_timings: Dict[str, WaitTimings] = {}
+_wait_timings_lock = threading.Lock()
+
+
+def get_wait_timings() -> Dict[str, WaitTimings]:
+  """ Return the timings of all waits since the last reset, by wait name. """
+
+  with _wait_timings_lock:
+    return dict(_wait_timings)
+
+
+def reset_wait_timings() -> None:
+  """ Forget the timings of all waits. """
+
+  with _wait_timings_lock:
+    _wait_timings.clear()
+
+
+def _record_wait(name: str, outcome: str, num_polls: int, total_time: float, poll_time: float,
+                 sleep_time: float) -> None:
+  with _wait_timings_lock:
+    if name not in _wait_timings:
+      _wait_timings[name] = WaitTimings(name=name)
+    _wait_timings[name].record(outcome, num_polls, total_time, poll_time, sleep_time)
+
+
+async def poll_until(
+  poll: Callable[[], Awaitable[T]],
+  done: Callable[[T], bool],
+  timeout: Optional[float] = None,
+  backoff: Optional[Backoff] = None,
+  event: Optional[asyncio.Event] = None,
+  name: str = "poll",
+) -> T:
+  """ Poll until `done` returns `True` for the result of `poll`, and return that result.
+
+  The first poll is immediate. The time between polls follows `backoff`. The wait can be cancelled
+  by cancelling the task that awaits it, or by :func:`asyncio.wait_for`.
+
+  Example:
+    >>> await poll_until(backend.get_current_temperature, lambda t: abs(t - 37) < 0.5,
+    ...                  timeout=300, backoff=Backoff(initial=0.1, maximum=1.0))
+
+  Args:
+    poll: A coroutine function that queries the device.
+    done: A function that returns whether the wait is over, given the result of `poll`.
+    timeout: The maximum time in seconds to wait. The device is polled one last time when the
+      timeout expires. If `None`, wait indefinitely.
+    backoff: The times between polls. Defaults to :class:`Backoff` with default values.
+    event: If given, poll as soon as this event is set, clearing it, and restart the backoff.
+    name: The name under which the timing of the wait is recorded.
+
+  Returns:
+    The first result of `poll` for which `done` returned `True`.
+
+  Raises:
+    TimeoutError: If `done` did not return `True` within `timeout` seconds.
+  """
+
+  backoff = backoff or Backoff()
+  delays = backoff.delays()
+  start = time.monotonic()
+  deadline = None if timeout is None else start + timeout
+  num_polls, poll_time, sleep_time = 0, 0.0, 0.0
+  outcome = "error"
+
+  try:
+    while True:
+      poll_start = time.monotonic()
+      result = await poll()
+      num_polls += 1
+      poll_time += time.monotonic() - poll_start
+      if done(result):
+        outcome = "ready"
+        return result
+
+      delay = next(delays)
+      if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+          outcome = "timeout"
+          raise TimeoutError(f"{name} did not finish within {timeout} seconds.")
+        delay = min(delay, remaining)
+
+      sleep_start = time.monotonic()
+      if event is None:
+        await asyncio.sleep(delay)
+      else:
+        try:
+          await asyncio.wait_for(event.wait(), timeout=delay)
+          event.clear()
+          delays = backoff.delays()
+        except asyncio.TimeoutError:
+          pass
+      sleep_time += time.monotonic() - sleep_start
+  except asyncio.CancelledError:
+    outcome = "cancelled"
+    raise
+  finally:
+    total_time = time.monotonic() - start
+    _record_wait(name, outcome, num_polls, total_time, poll_time, sleep_time)
+    logger.debug("%s: %s after %.3fs and %d polls", name, outcome, total_time, num_polls)
@@ -0,0 +1,96 @@
+import asyncio
+import itertools
+import time
+import unittest
+
+from pylabrobot.machines.polling import (
+  Backoff,
+  WAIT_TIME_BUCKETS,
+  get_wait_timings,
+  poll_until,
+  reset_wait_timings,
+)
+
+
+class BackoffTests(unittest.TestCase):
+  """ Tests for the backoff between polls. """
+
+  def test_delays(self):
+    backoff = Backoff(initial=0.01, maximum=0.05, factor=2, jitter=0)
+    self.assertEqual(list(itertools.islice(backoff.delays(), 5)), [0.01, 0.02, 0.04, 0.05, 0.05])
+
+  def test_jitter(self):
+    backoff = Backoff(initial=1, maximum=1, jitter=0.1)
+    for delay in itertools.islice(backoff.delays(), 100):
+      self.assertTrue(0.9 <= delay <= 1.1)
+
+  def test_invalid(self):
+    with self.assertRaises(ValueError):
+      Backoff(initial=1, maximum=0.5)
+    with self.assertRaises(ValueError):
+      Backoff(factor=0.5)
+    with self.assertRaises(ValueError):
+      Backoff(jitter=1)
+
+
+class PollUntilTests(unittest.IsolatedAsyncioTestCase):
+  """ Tests for `poll_until`. """
+
+  def setUp(self):
+    super().setUp()
+    reset_wait_timings()
+    self.polls = 0
+
+  async def poll(self) -> int:
+    self.polls += 1
+    return self.polls
+
+  async def test_ready(self):
+    t0 = time.monotonic()
+    result = await poll_until(self.poll, lambda n: n == 4, name="test",
+                              backoff=Backoff(initial=0.01, maximum=0.02, jitter=0))
+    self.assertEqual(result, 4)
+    # 0.01 + 0.02 + 0.02, not a fixed tick per poll
+    self.assertLess(time.monotonic() - t0, 0.1)
+
+    timings = get_wait_timings()["test"]
+    self.assertEqual(timings.num_waits, 1)
+    self.assertEqual(timings.num_polls, 4)
+    self.assertEqual(timings.outcomes, {"ready": 1})
+    self.assertGreaterEqual(timings.sleep_time, 0.05)
+    self.assertEqual(timings.histogram[WAIT_TIME_BUCKETS.index(0.1)], 1)
+
+  async def test_first_poll_immediate(self):
+    self.assertEqual(await poll_until(self.poll, lambda n: True, name="test"), 1)
+    self.assertEqual(get_wait_timings()["test"].histogram[0], 1)
+
+  async def test_timeout(self):
+    with self.assertRaises(TimeoutError):
+      await poll_until(self.poll, lambda n: False, timeout=0.05, name="test",
+                       backoff=Backoff(initial=0.02, maximum=0.02))
+    self.assertEqual(get_wait_timings()["test"].outcomes, {"timeout": 1})
+    self.assertGreaterEqual(self.polls, 3)
+
+  async def test_event(self):
+    event = asyncio.Event()
+    asyncio.get_running_loop().call_later(0.05, event.set)
+    t0 = time.monotonic()
+    await poll_until(self.poll, lambda n: n == 2, event=event,
+                     backoff=Backoff(initial=10, maximum=10))
+    self.assertLess(time.monotonic() - t0, 1)
+    self.assertFalse(event.is_set())
+
+  async def test_cancel(self):
+    task = asyncio.create_task(poll_until(self.poll, lambda n: False, name="test"))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with self.assertRaises(asyncio.CancelledError):
+      await task
+    self.assertEqual(get_wait_timings()["test"].outcomes, {"cancelled": 1})
+
+  async def test_error(self):
+    def done(n):
+      raise ValueError("device error")
+    with self.assertRaises(ValueError):
+      await poll_until(self.poll, done, name="test")
+    self.assertEqual(get_wait_timings()["test"].outcomes, {"error": 1})
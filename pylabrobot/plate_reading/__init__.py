@@ -1,2 +1,19 @@
+from typing import TYPE_CHECKING
+
+from pylabrobot.utils.lazy_import import LazyAttributes
+
 from .plate_reader import PlateReader
-from .clario_star import CLARIOStar
+
+if TYPE_CHECKING:
+  from .clario_star import CLARIOStar
+
+# Backends for machines are imported on first use, see `pylabrobot.utils.lazy_import`.
+_lazy = LazyAttributes(__name__, attributes={"CLARIOStar": ".clario_star"})
+
+
+def __getattr__(name: str):
+  return _lazy.getattr(name)
+
+
+def __dir__():
+  return _lazy.dir()
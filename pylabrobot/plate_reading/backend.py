@@ -5,6 +5,7 @@ import sys
 from typing import List, Optional, Type
 
 from pylabrobot.machines.backends import MachineBackend
+from pylabrobot.utils.lazy_import import import_lazy_attribute
 
 if sys.version_info >= (3, 8):
   from typing import Literal
@@ -75,6 +76,8 @@ class PlateReaderBackend(MachineBackend, metaclass=ABCMeta):
       return None
 
     subclass = find_subclass(cls, data["type"])
+    if subclass is None and import_lazy_attribute(data["type"]) is not None:
+      subclass = find_subclass(cls, data["type"]) # the backend had not been imported yet
     if subclass is None:
       raise ValueError(f'Could not find subclass with name {data["type"]}')
 
@@ -1,14 +1,25 @@
+import array
 import asyncio
 import ctypes
 import logging
 import math
 import time
-import struct
 import sys
-from typing import List, Optional, Union
+from typing import (
+  AsyncIterator,
+  Awaitable,
+  Callable,
+  Dict,
+  List,
+  Optional,
+  Tuple,
+  Union,
+  cast,
+)
 
 from .backend import PlateReaderBackend
 from pylabrobot import utils
+from pylabrobot.machines.polling import Backoff, poll_until
 
 if sys.version_info >= (3, 8):
   from typing import Literal
@@ -21,16 +32,172 @@ try:
 except ImportError:
   USE_FTDI = False
 
+try:
+  import numpy as np
+  HAS_NUMPY = True
+except ImportError:
+  HAS_NUMPY = False
+
 
 logger = logging.getLogger("pylabrobot")
 
 
+# (rows, columns) of the plate layouts that measurement values can be decoded for, by number of
+# wells.
+WELL_LAYOUTS: Dict[int, Tuple[int, int]] = {96: (8, 12), 384: (16, 24), 1536: (32, 48)}
+
+# Plate geometry sent in run commands, in 0.01 mm: plate length and width, and x and y of the first
+# and the last well. The 96-well values are from the CLARIOStar software, the 384-well values follow
+# the ANSI/SLAS footprint. Run commands select wells with a 384-bit mask, so 1536-well plates can
+# not be read (yet).
+_PLATE_GEOMETRIES: Dict[int, Tuple[int, int, int, int, int, int]] = {
+  96: (12780, 8550, 1430, 1120, 11350, 7430),
+  384: (12780, 8550, 1213, 899, 11563, 7649),
+}
+
+# The command status after a measurement run has finished.
+_RUN_FINISHED_STATUS = b"\x02\x00\x18\x0c\x01\x25\x04\x2e\x00\x00\x04\x01\x00\x00\x03\x00" \
+  b"\x00\x00\x00\xc0\x00\x01\x46\x0d"
+
+# Measurement values follow a variable length header, which ends with this separator.
+_DATA_SEPARATOR = b"\x00" * 6
+
+ReadResult = Union[List[List[float]], "np.ndarray"]
+
+
+def _get_layout(num_wells: int) -> Tuple[int, int]:
+  if num_wells not in WELL_LAYOUTS:
+    raise ValueError(f"Unsupported number of wells: {num_wells}. Supported: {list(WELL_LAYOUTS)}")
+  return WELL_LAYOUTS[num_wells]
+
+
+def _plate_bytes(num_wells: int) -> bytes:
+  """ The plate geometry and well selection in run commands, selecting all wells. """
+
+  if num_wells not in _PLATE_GEOMETRIES:
+    raise NotImplementedError(f"Reading {num_wells}-well plates is not supported.")
+  rows, cols = _get_layout(num_wells)
+  geometry = b"".join(v.to_bytes(2, byteorder="big") for v in _PLATE_GEOMETRIES[num_wells])
+  mask = b"\xff" * (num_wells // 8) + b"\x00" * ((384 - num_wells) // 8)
+  return geometry + bytes([cols, rows]) + mask
+
+
+def _find_data_start(vals: bytes) -> int:
+  # The header is variable length, so we need to find the start of the data. In the future, when we
+  # understand the protocol better, this can be replaced with a more robust solution.
+  return vals.index(_DATA_SEPARATOR) + len(_DATA_SEPARATOR)
+
+
+def _unpack_ints(vals: bytes, start: int, count: int) -> "array.array[int]":
+  """ Decode `count` big endian 32 bit integers starting at `start`, in a single pass. """
+
+  if len(vals) < start + count * 4:
+    raise ValueError(f"Expected {count} values in response, but it is only {len(vals)} bytes.")
+  ints = array.array("i")
+  ints.frombytes(memoryview(vals)[start:start + count * 4])
+  if sys.byteorder == "little":
+    ints.byteswap()
+  return ints
+
+
+def _check_numpy(as_numpy: bool) -> None:
+  if as_numpy and not HAS_NUMPY:
+    raise RuntimeError("NumPy is not installed, can not return a NumPy array.")
+
+
+def decode_luminescence(vals: bytes, num_wells: int = 96, as_numpy: bool = False) -> ReadResult:
+  """ Decode the measurement values of a luminescence read.
+
+  Args:
+    vals: The response to the get measurement values command.
+    num_wells: The number of wells of the plate: 96, 384 or 1536.
+    as_numpy: If `True`, return a NumPy array of shape (rows, columns).
+
+  Returns:
+    The luminescence values, as a list of rows.
+  """
+
+  _check_numpy(as_numpy)
+  rows, cols = _get_layout(num_wells)
+  start = _find_data_start(vals)
+  ints = _unpack_ints(vals, start, num_wells)
+
+  if as_numpy:
+    return np.asarray(ints, dtype=np.float64).reshape(rows, cols)
+
+  # for backend conformity, convert to float
+  return utils.reshape_2d([float(int_) for int_ in ints], (rows, cols))
+
+
+def decode_absorbance(
+  vals: bytes,
+  report: Literal["OD", "transmittance"],
+  num_wells: int = 96,
+  as_numpy: bool = False,
+) -> ReadResult:
+  """ Decode the measurement values of an absorbance read.
+
+  The response contains the chromatic readings of all wells, then the reference readings of all
+  wells, then the chromatic and reference values at 100% and 0% intensity.
+
+  Args:
+    vals: The response to the get measurement values command.
+    report: whether to report absorbance as optical depth (OD) or transmittance.
+    num_wells: The number of wells of the plate: 96, 384 or 1536.
+    as_numpy: If `True`, return a NumPy array of shape (rows, columns).
+
+  Returns:
+    The absorbance values, as a list of rows.
+  """
+
+  if report not in {"OD", "transmittance"}:
+    raise ValueError("report must be either 'OD' or 'transmittance'.")
+  _check_numpy(as_numpy)
+  rows, cols = _get_layout(num_wells)
+  start = _find_data_start(vals)
+  ints = _unpack_ints(vals, start, num_wells * 2 + 4)
+
+  # c100 is the value of the chromatic at 100% intensity
+  # c0 is the value of the chromatic at 0% intensity (black reading)
+  # r100 is the value of the reference at 100% intensity
+  # r0 is the value of the reference at 0% intensity (black reading)
+  c100, c0, r100, r0 = ints[num_wells * 2:]
+
+  if as_numpy:
+    readings = np.asarray(ints, dtype=np.float64)
+    chromatic, reference = readings[:num_wells], readings[num_wells:num_wells * 2]
+    transmittance_array = (chromatic - c0) / c100 / ((reference - r0) / r100) * 100
+    if report == "OD":
+      return np.log10(100 / transmittance_array).reshape(rows, cols)
+    return transmittance_array.reshape(rows, cols)
+
+  transmittance = [(cr - c0) / c100 / ((rr - r0) / r100) * 100
+                   for cr, rr in zip(ints[:num_wells], ints[num_wells:num_wells * 2])]
+  if report == "OD":
+    return utils.reshape_2d([math.log10(100 / t) for t in transmittance], (rows, cols))
+  return utils.reshape_2d(transmittance, (rows, cols))
+
+
 class CLARIOStar(PlateReaderBackend):
   """ A plate reader backend for the Clario star. Note that this is not a complete implementation
   and many commands and parameters are not implemented yet. """
 
-  def __init__(self):
+  # The maximum number of bytes to read from the device at once, and the time to wait before reading
+  # again when no data was available. The latency timer of the FTDI chip is set to 2ms.
+  READ_SIZE = 4096
+  POLL_INTERVAL = 0.001
+
+  def __init__(self, status_backoff: Backoff = Backoff(initial=0.01, maximum=0.05)):
+    """ Initialize a CLARIOStar backend.
+
+    Args:
+      status_backoff: The times between polls of the command status while waiting for the plate
+        reader to be ready or for a run to finish.
+    """
+
     self.dev: Optional[Device] = None
+    self.status_backoff = status_backoff
+    self._read_buffer = bytearray()
 
   async def setup(self):
     if not USE_FTDI:
@@ -41,6 +208,7 @@ class CLARIOStar(PlateReaderBackend):
     self.dev.baudrate = 125000
     self.dev.ftdi_fn.ftdi_set_line_property(8, 0, 0) # 8N1
     self.dev.ftdi_fn.ftdi_set_latency_timer(2)
+    self._read_buffer.clear()
 
     await self.initialize()
     await self.request_eeprom_data()
@@ -58,45 +226,70 @@ class CLARIOStar(PlateReaderBackend):
 
   async def read_resp(self, timeout=20) -> bytes:
     """ Read a response from the plate reader. If the timeout is reached, return the data that has
-    been read so far. """
+    been read so far.
+
+    Responses are framed: they start with 0x02, followed by the length of the whole frame (including
+    the checksum and the trailing 0x0d) as a big endian 16 bit integer. Everything the device sends
+    is appended to a buffer, and a frame is returned as soon as the buffer holds all of it, so no
+    time is spent waiting for more data after the frame is complete.
+    """
 
     if self.dev is None:
       raise RuntimeError("device not initialized")
 
-    d = b""
-    last_read = b""
-    end_byte_found = False
     t = time.time()
-
-    # Commands are terminated with 0x0d, but this value may also occur as a part of the response.
-    # Therefore, we read until we read a 0x0d, but if that's the last byte we read in a full packet,
-    # we keep reading for at least one more cycle. We only check the timeout if the last read was
-    # unsuccessful (i.e. keep reading if we are still getting data).
     while True:
-      last_read = self.dev.read(25) # 25 is max length observed in pcap
-      if len(last_read) > 0:
-        d += last_read
-        end_byte_found = d[-1] == 0x0d
-        if len(last_read) < 25 and end_byte_found: # if we read less than 25 bytes, we're at the end
-          break
-      else:
-        # If we didn't read any data, check if the last read ended in an end byte. If so, we're done
-        if end_byte_found:
-          break
-
-        # Check if we've timed out.
-        if time.time() - t > timeout:
-          logger.warning("timed out reading response")
-          break
+      frame = self._next_frame()
+      if frame is not None:
+        break
 
+      last_read = self.dev.read(self.READ_SIZE)
+      if len(last_read) > 0:
         # If we read data, we don't wait and immediately try to read more.
-        await asyncio.sleep(0.0001)
+        self._read_buffer += last_read
+        continue
+
+      if time.time() - t > timeout:
+        logger.warning("timed out reading response")
+        frame = bytes(self._read_buffer)
+        self._read_buffer.clear()
+        break
+
+      await asyncio.sleep(self.POLL_INTERVAL)
+
+    logger.debug("read %s", frame.hex())
 
-    logger.debug("read %s", d.hex())
+    return frame
 
-    return d
+  def _next_frame(self) -> Optional[bytes]:
+    """ Remove the first complete frame from the read buffer and return it, or return `None` if the
+    buffer does not hold a complete frame yet. """
 
-  async def send(self, cmd: Union[bytearray, bytes], read_timeout=20):
+    buffer = self._read_buffer
+    while True:
+      start = buffer.find(b"\x02")
+      if start != 0:
+        if len(buffer) > 0:
+          logger.warning("discarding unexpected data %s",
+                         (buffer[:start] if start > 0 else buffer).hex())
+        if start == -1:
+          buffer.clear()
+          return None
+        del buffer[:start]
+
+      if len(buffer) < 3:
+        return None
+      length = int.from_bytes(buffer[1:3], byteorder="big")
+      if length < 4: # not a valid frame, look for the next start byte
+        del buffer[:1]
+        continue
+      if len(buffer) < length:
+        return None
+      frame = bytes(buffer[:length])
+      del buffer[:length]
+      return frame
+
+  async def send(self, cmd: Union[bytearray, bytes], read_timeout=20) -> bytes:
     """ Send a command to the plate reader and return the response. """
 
     if self.dev is None:
@@ -119,22 +312,20 @@ class CLARIOStar(PlateReaderBackend):
   async def _wait_for_ready_and_return(self, ret, timeout=150):
     """ Wait for the plate reader to be ready and return the response. """
     last_status = None
-    t = time.time()
-    while time.time() - t < timeout:
-      await asyncio.sleep(0.1)
 
+    async def poll_status() -> bytes:
+      nonlocal last_status
       command_status = await self.read_command_status()
 
       if len(command_status) != 24:
         logger.warning("unexpected response %s. I think a command status response is always 24 "
                        "bytes", command_status)
-        continue
+        return command_status
 
-      if command_status != last_status:
-        logger.info("status changed %s", command_status.hex())
-        last_status = command_status
-      else:
-        continue
+      if command_status == last_status:
+        return command_status
+      logger.info("status changed %s", command_status.hex())
+      last_status = command_status
 
       if command_status[2] != 0x18 or command_status[3] != 0x0c or command_status[4] != 0x01:
         logger.warning("unexpected response %s. I think 18 0c 01 indicates a command status "
@@ -143,11 +334,39 @@ class CLARIOStar(PlateReaderBackend):
       if command_status[5] not in {0x25, 0x05}: # 25 is busy, 05 is ready. probably.
         logger.warning("unexpected response %s.", command_status)
 
-      if command_status[5] == 0x05:
-        logger.debug("status is ready")
-        return ret
+      return command_status
+
+    try:
+      await poll_until(poll_status, lambda status: len(status) == 24 and status[5] == 0x05,
+                       timeout=timeout, backoff=self.status_backoff,
+                       name="CLARIOStar._wait_for_ready_and_return")
+    except TimeoutError:
+      logger.warning("timed out waiting for the plate reader to be ready")
+      return None
+    logger.debug("status is ready")
+    return ret
+
+  async def _wait_for_run_finished(self):
+    """ Wait until a measurement run has finished: the status is the "run finished" status twice in
+    a row. """
+
+    last_status = None
+
+    async def poll_status() -> Tuple[Optional[bytes], bytes]:
+      nonlocal last_status
+      previous_status, last_status = last_status, await self.read_command_status()
+      if last_status != previous_status:
+        logger.info("status changed %s", last_status)
+      return previous_status, last_status
+
+    def finished(statuses: Tuple[Optional[bytes], bytes]) -> bool:
+      previous_status, command_status = statuses
+      return previous_status == command_status == _RUN_FINISHED_STATUS
+
+    await poll_until(poll_status, finished, backoff=self.status_backoff,
+                     name="CLARIOStar._wait_for_run_finished")
 
-  async def read_command_status(self):
+  async def read_command_status(self) -> bytes:
     status = await self.send(b"\x02\x00\x09\x0c\x80\x00")
     return status
 
@@ -174,64 +393,34 @@ class CLARIOStar(PlateReaderBackend):
                                                          b"\x00\x00")
     return await self._wait_for_ready_and_return(mp_and_focus_height_value_response)
 
-  async def _run_luminescence(self, focal_height: float):
+  async def _run_luminescence(self, focal_height: float, num_wells: int = 96):
     """ Run a plate reader luminescence run. """
 
     assert 0 <= focal_height <= 25, "focal height must be between 0 and 25 mm"
 
     focal_height_data = int(focal_height * 100).to_bytes(2, byteorder="big")
 
-    run_response = await self.send(b"\x02\x00\x86\x0c\x04\x31\xec\x21\x66\x05\x96\x04\x60\x2c\x56"
-      b"\x1d\x06\x0c\x08\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\xff\x00\x00\x00\x00\x00\x00"
-      b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
-      b"\x00\x00\x00\x00\x00\x00\x00\x00\x02\x01\x00\x00\x00\x00\x00\x00\x00\x20\x04\x00\x1e\x27"
-      b"\x0f\x27\x0f\x01" + focal_height_data + b"\x00\x00\x01\x00\x00\x0e\x10\x00\x01\x00\x01\x00"
+    run_response = await self.send(b"\x02\x00\x86\x0c\x04" + _plate_bytes(num_wells) +
+      b"\x02\x01\x00\x00\x00\x00\x00\x00\x00\x20\x04\x00\x1e\x27\x0f\x27\x0f\x01" +
+      focal_height_data + b"\x00\x00\x01\x00\x00\x0e\x10\x00\x01\x00\x01\x00"
       b"\x01\x00\x01\x00\x01\x00\x06\x00\x00\x00\x00\x00\x00\x00\x00\x00\x02\x00\x00\x00\x00\x01"
       b"\x00\x00\x00\x01\x00\x64\x00\x20\x00\x00")
 
-    # TODO: find a prettier way to do this. It's essentially copied from _wait_for_ready_and_return.
-    last_status = None
-    while True:
-      await asyncio.sleep(0.1)
-
-      command_status = await self.read_command_status()
-
-      if command_status != last_status:
-        last_status = command_status
-        logger.info("status changed %s", command_status)
-        continue
-
-      if command_status == bytes(b"\x02\x00\x18\x0c\x01\x25\x04\x2e\x00\x00\x04\x01\x00\x00\x03\x00"
-                                 b"\x00\x00\x00\xc0\x00\x01\x46\x0d"):
-        return run_response
+    await self._wait_for_run_finished()
+    return run_response
 
-  async def _run_absorbance(self, wavelength: float):
+  async def _run_absorbance(self, wavelength: float, num_wells: int = 96):
     """ Run a plate reader absorbance run. """
     wavelength_data = int(wavelength * 10).to_bytes(2, byteorder="big")
 
-    absorbance_command = (b"\x02\x00\x7C\x0C\x04\x31\xEC\x21\x66\x05\x96\x04\x60\x2C\x56\x1D\x06"
-      b"\x0C\x08\xFF\xFF\xFF\xFF\xFF\xFF\xFF\xFF\xFF\xFF\xFF\xFF\x00\x00\x00\x00\x00\x00\x00\x00"
-      b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
-      b"\x00\x00\x00\x00\x00\x00\x82\x02\x00\x00\x00\x00\x00\x00\x00\x20\x04\x00\x1E\x27\x0F\x27"
-      b"\x0F\x19\x01" + wavelength_data + b"\x00\x00\x00\x64\x00\x00\x00\x00\x00\x00\x00\x64\x00"
+    absorbance_command = (b"\x02\x00\x7C\x0C\x04" + _plate_bytes(num_wells) +
+      b"\x82\x02\x00\x00\x00\x00\x00\x00\x00\x20\x04\x00\x1E\x27\x0F\x27\x0F\x19\x01" +
+      wavelength_data + b"\x00\x00\x00\x64\x00\x00\x00\x00\x00\x00\x00\x64\x00"
       b"\x00\x00\x00\x00\x02\x00\x00\x00\x00\x01\x00\x00\x00\x01\x00\x16\x00\x01\x00\x00")
     run_response = await self.send(absorbance_command)
 
-    # TODO: find a prettier way to do this. It's essentially copied from _wait_for_ready_and_return.
-    last_status = None
-    while True:
-      await asyncio.sleep(0.1)
-
-      command_status = await self.read_command_status()
-
-      if command_status != last_status:
-        last_status = command_status
-        logger.info("status changed %s", command_status)
-        continue
-
-      if command_status == bytes(b"\x02\x00\x18\x0c\x01\x25\x04\x2e\x00\x00\x04\x01\x00\x00\x03\x00"
-                                 b"\x00\x00\x00\xc0\x00\x01\x46\x0d"):
-        return run_response
+    await self._wait_for_run_finished()
+    return run_response
 
   async def _read_order_values(self):
     return await self.send(b"\x02\x00\x0F\x0C\x05\x1D\x00\x00\x00\x00\x00\x00")
@@ -240,42 +429,48 @@ class CLARIOStar(PlateReaderBackend):
     status_hw_response = await self.send(b"\x02\x00\x09\x0C\x81\x00")
     return await self._wait_for_ready_and_return(status_hw_response)
 
-  async def _get_measurement_values(self):
+  async def _get_measurement_values(self) -> bytes:
     return await self.send(b"\x02\x00\x0F\x0C\x05\x02\x00\x00\x00\x00\x00\x00")
 
-  async def read_luminescence(self, focal_height: float = 13) -> List[List[float]]:
-    """ Read luminescence values from the plate reader. """
+  async def _measure_luminescence(self, focal_height: float, num_wells: int) -> bytes:
     await self._mp_and_focus_height_value()
 
-    await self._run_luminescence(focal_height=focal_height)
+    await self._run_luminescence(focal_height=focal_height, num_wells=num_wells)
 
     await self._read_order_values()
 
     await self._status_hw()
 
-    vals = await self._get_measurement_values()
+    return await self._get_measurement_values()
 
-    # All 96 values are 32 bit integers. The header is variable length, so we need to find the
-    # start of the data. In the future, when we understand the protocol better, this can be
-    # replaced with a more robust solution.
-    start_idx = vals.index(b"\x00\x00\x00\x00\x00\x00") + len(b"\x00\x00\x00\x00\x00\x00")
-    data = list(vals)[start_idx:start_idx+96*4]
+  async def _measure_absorbance(self, wavelength: int, num_wells: int) -> bytes:
+    await self._mp_and_focus_height_value()
 
-    # group bytes by 4
-    int_bytes = [data[i:i+4] for i in range(0, len(data), 4)]
+    await self._run_absorbance(wavelength=wavelength, num_wells=num_wells)
 
-    # convert to int
-    ints = [struct.unpack(">i", bytes(int_data))[0] for int_data in int_bytes]
+    await self._read_order_values()
 
-    # for backend conformity, convert to float, and reshape to 2d array
-    floats = [[float(int_) for int_ in ints[i:i+12]] for i in range(0, len(ints), 12)]
+    await self._status_hw()
 
-    return floats
+    return await self._get_measurement_values()
+
+  async def read_luminescence(self, focal_height: float = 13, num_wells: int = 96
+                              ) -> List[List[float]]:
+    """ Read luminescence values from the plate reader.
+
+    Args:
+      focal_height: The focal height in mm.
+      num_wells: The number of wells of the plate: 96 or 384.
+    """
+
+    vals = await self._measure_luminescence(focal_height=focal_height, num_wells=num_wells)
+    return cast(List[List[float]], decode_luminescence(vals, num_wells=num_wells))
 
   async def read_absorbance(
     self,
     wavelength: int,
-    report: Literal["OD", "transmittance"]
+    report: Literal["OD", "transmittance"],
+    num_wells: int = 96
   ) -> List[List[float]]:
     """ Read absorbance values from the device.
 
@@ -283,53 +478,85 @@ class CLARIOStar(PlateReaderBackend):
       wavelength: wavelength to read absorbance at, in nanometers.
       report: whether to report absorbance as optical depth (OD) or transmittance. Transmittance is
         used interchangeably with "transmission" in the CLARIOStar software and documentation.
+      num_wells: The number of wells of the plate: 96 or 384.
 
     Returns:
       A 2d array of absorbance values, as transmission percentage (values between 0 and 100).
     """
 
-    await self._mp_and_focus_height_value()
+    vals = await self._measure_absorbance(wavelength=wavelength, num_wells=num_wells)
+    return cast(List[List[float]], decode_absorbance(vals, report=report, num_wells=num_wells))
 
-    await self._run_absorbance(wavelength=wavelength)
+  def read_luminescence_kinetic(
+    self,
+    num_timepoints: int,
+    interval: float,
+    focal_height: float = 13,
+    num_wells: int = 96,
+    as_numpy: bool = False
+  ) -> AsyncIterator[Tuple[float, ReadResult]]:
+    """ Read luminescence values at regular intervals, yielding each timepoint when it is read.
+
+    Example:
+      >>> async for t, values in clario_star.read_luminescence_kinetic(10, interval=60):
+      ...   print(t, values[0][0])
 
-    await self._read_order_values()
+    Args:
+      num_timepoints: The number of reads.
+      interval: The time in seconds between the starts of consecutive reads. If a read takes longer,
+        the next read starts right after it.
+      focal_height: The focal height in mm.
+      num_wells: The number of wells of the plate: 96 or 384.
+      as_numpy: If `True`, yield NumPy arrays instead of lists of rows.
 
-    await self._status_hw()
+    Returns:
+      An async iterator of (time in seconds since the first read started, values) tuples.
+    """
 
-    vals = await self._get_measurement_values()
-    div = b"\x00"*6
-    start_idx = vals.index(div) + len(div)
-    chromatic_data = vals[start_idx:start_idx+96*4]
-    ref_data = vals[start_idx+96*4:start_idx+(96*2)*4]
-    chromatic_bytes = [bytes(chromatic_data[i:i+4]) for i in range(0, len(chromatic_data), 4)]
-    ref_bytes = [bytes(ref_data[i:i+4]) for i in range(0, len(ref_data), 4)]
-    chromatic_reading = [struct.unpack(">i", x)[0] for x in chromatic_bytes]
-    reference_reading = [struct.unpack(">i", x)[0] for x in ref_bytes]
-
-    # c100 is the value of the chromatic at 100% intensity
-    # c0 is the value of the chromatic at 0% intensity (black reading)
-    # r100 is the value of the reference at 100% intensity
-    # r0 is the value of the reference at 0% intensity (black reading)
-    after_values_idx = start_idx+(96*2)*4
-    c100, c0, r100, r0 = struct.unpack(">iiii", vals[after_values_idx:after_values_idx+4*4])
-
-    # a bit much, but numpy should not be a dependency
-    real_chromatic_reading = []
-    for cr in chromatic_reading:
-      real_chromatic_reading.append((cr-c0)/c100)
-    real_reference_reading = []
-    for rr in reference_reading:
-      real_reference_reading.append((rr-r0)/r100)
-
-    transmittance = []
-    for rcr, rrr in zip(real_chromatic_reading, real_reference_reading):
-      transmittance.append(rcr/rrr*100)
+    async def read() -> ReadResult:
+      vals = await self._measure_luminescence(focal_height=focal_height, num_wells=num_wells)
+      return decode_luminescence(vals, num_wells=num_wells, as_numpy=as_numpy)
 
-    if report == "OD":
-      od = []
-      for t in transmittance:
-        od.append(math.log10(100/t))
-      return utils.reshape_2d(od, (8, 12))
+    return self._kinetic(read, num_timepoints=num_timepoints, interval=interval)
+
+  def read_absorbance_kinetic(
+    self,
+    num_timepoints: int,
+    interval: float,
+    wavelength: int,
+    report: Literal["OD", "transmittance"],
+    num_wells: int = 96,
+    as_numpy: bool = False
+  ) -> AsyncIterator[Tuple[float, ReadResult]]:
+    """ Read absorbance values at regular intervals, yielding each timepoint when it is read.
+
+    See :meth:`read_luminescence_kinetic` and :meth:`read_absorbance` for the arguments.
+    """
 
-    if report == "transmittance":
-      return utils.reshape_2d(transmittance, (8, 12))
+    async def read() -> ReadResult:
+      vals = await self._measure_absorbance(wavelength=wavelength, num_wells=num_wells)
+      return decode_absorbance(vals, report=report, num_wells=num_wells, as_numpy=as_numpy)
+
+    return self._kinetic(read, num_timepoints=num_timepoints, interval=interval)
+
+  async def _kinetic(
+    self,
+    read: Callable[[], Awaitable[ReadResult]],
+    num_timepoints: int,
+    interval: float
+  ) -> AsyncIterator[Tuple[float, ReadResult]]:
+    """ Start a read every `interval` seconds, scheduled from the start of the first read so that
+    the time a read takes does not make later timepoints drift. """
+
+    if num_timepoints < 1:
+      raise ValueError("num_timepoints must be at least 1.")
+    if interval < 0:
+      raise ValueError("interval must be non-negative.")
+
+    start = time.monotonic()
+    for i in range(num_timepoints):
+      delay = start + i * interval - time.monotonic()
+      if delay > 0:
+        await asyncio.sleep(delay)
+      t = time.monotonic() - start
+      yield t, await read()
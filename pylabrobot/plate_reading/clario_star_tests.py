@@ -0,0 +1,225 @@
+# pylint: disable=protected-access
+import math
+import struct
+import time
+import unittest
+import unittest.mock
+from typing import List
+
+from pylabrobot.plate_reading.clario_star import (
+  HAS_NUMPY,
+  CLARIOStar,
+  WELL_LAYOUTS,
+  _RUN_FINISHED_STATUS,
+  _plate_bytes,
+  decode_absorbance,
+  decode_luminescence,
+)
+
+try:
+  import numpy as np
+except ImportError:
+  pass # the numpy tests are skipped
+
+
+def frame(payload: bytes) -> bytes:
+  """ Wrap a payload in a frame, like the plate reader does. """
+  length = (len(payload) + 6).to_bytes(2, byteorder="big")
+  data = b"\x02" + length + payload
+  return data + (sum(data) & 0xffff).to_bytes(2, byteorder="big") + b"\x0d"
+
+
+def measurement_values(ints: List[int]) -> bytes:
+  """ A get measurement values response: a header that ends in six zeros, then the values. """
+  return frame(b"\x02\x05\x06\x26\x00\x00\x00\x00\x00\x00" + struct.pack(f">{len(ints)}i", *ints))
+
+
+class FakeFTDIDevice:
+  """ A fake `pylibftdi.Device` that returns the given chunks from successive reads. """
+
+  def __init__(self, chunks: List[bytes]):
+    self.chunks = chunks
+    self.written: List[bytes] = []
+
+  def read(self, size: int) -> bytes:
+    if len(self.chunks) == 0:
+      return b""
+    chunk = self.chunks.pop(0)
+    assert len(chunk) <= size
+    return chunk
+
+  def write(self, data: bytes) -> int:
+    self.written.append(data)
+    return len(data)
+
+
+class CLARIOStarReadTests(unittest.IsolatedAsyncioTestCase):
+  """ Tests for assembling response frames from what the device sends. """
+
+  def setUp(self):
+    super().setUp()
+    self.backend = CLARIOStar()
+
+  async def test_frame_split_over_reads(self):
+    # a 0x0d at the end of a read is not necessarily the end of a response
+    response = frame(b"\x0c\x01\x0d\x0d\x00")
+    chunks = [response[:6], b"", response[6:8], response[8:]]
+    self.backend.dev = FakeFTDIDevice(chunks)
+    self.assertEqual(await self.backend.read_resp(timeout=1), response)
+
+  async def test_frames_in_one_read(self):
+    first, second = frame(b"\x0c\x01"), frame(b"\x0c\x02\x03")
+    self.backend.dev = FakeFTDIDevice([first + second[:4], second[4:]])
+    self.assertEqual(await self.backend.read_resp(timeout=1), first)
+    self.assertEqual(await self.backend.read_resp(timeout=1), second)
+
+  async def test_discard_data_before_frame(self):
+    response = frame(b"\x0c\x01")
+    self.backend.dev = FakeFTDIDevice([b"\x00\xff" + response])
+    self.assertEqual(await self.backend.read_resp(timeout=1), response)
+
+  async def test_timeout_returns_partial_data(self):
+    response = frame(b"\x0c\x01\x02\x03")
+    self.backend.dev = FakeFTDIDevice([response[:5]])
+    self.assertEqual(await self.backend.read_resp(timeout=0.05), response[:5])
+
+  async def test_send(self):
+    response = frame(b"\x0c\x80")
+    self.backend.dev = FakeFTDIDevice([response])
+    self.assertEqual(await self.backend.send(b"\x02\x00\x09\x0c\x80\x00"), response)
+    self.assertEqual(self.backend.dev.written, [b"\x02\x00\x09\x0c\x80\x00\x00\x97\x0d"])
+
+
+class CLARIOStarStatusTests(unittest.IsolatedAsyncioTestCase):
+  """ Tests for waiting on the command status. """
+
+  def setUp(self):
+    super().setUp()
+    self.backend = CLARIOStar()
+
+  @staticmethod
+  def status(state: int) -> bytes:
+    return frame(bytes([0x0c, 0x01, state]) + b"\x00" * 15)
+
+  async def test_wait_for_ready(self):
+    busy, ready = self.status(0x25), self.status(0x05)
+    self.assertEqual(len(ready), 24)
+    self.backend.dev = FakeFTDIDevice([busy, busy, ready, ready])
+    t0 = time.monotonic()
+    self.assertEqual(await self.backend._wait_for_ready_and_return(b"ret", timeout=1), b"ret")
+    self.assertLess(time.monotonic() - t0, 0.1)
+    self.assertEqual(len(self.backend.dev.written), 3)
+
+  async def test_wait_for_ready_timeout(self):
+    busy = self.status(0x25)
+    self.backend.dev = FakeFTDIDevice([busy] * 100)
+    self.assertIsNone(await self.backend._wait_for_ready_and_return(b"ret", timeout=0.05))
+
+  async def test_wait_for_run_finished(self):
+    # the run has finished when the finished status is read twice in a row
+    busy = self.status(0x25)
+    self.backend.dev = FakeFTDIDevice([busy, _RUN_FINISHED_STATUS, busy, _RUN_FINISHED_STATUS,
+                                       _RUN_FINISHED_STATUS, busy])
+    await self.backend._wait_for_run_finished()
+    self.assertEqual(len(self.backend.dev.written), 5)
+
+
+class CLARIOStarDecodeTests(unittest.TestCase):
+  """ Tests for decoding measurement values. """
+
+  def test_decode_luminescence(self):
+    for num_wells, (rows, cols) in WELL_LAYOUTS.items():
+      with self.subTest(num_wells=num_wells):
+        vals = measurement_values(list(range(num_wells)))
+        result = decode_luminescence(vals, num_wells=num_wells)
+        self.assertEqual(len(result), rows)
+        self.assertEqual(result[0], [float(i) for i in range(cols)])
+        self.assertEqual(result[-1][-1], float(num_wells - 1))
+
+  def test_decode_luminescence_negative_values(self):
+    vals = measurement_values([-1] * 96)
+    self.assertEqual(decode_luminescence(vals), [[-1.0] * 12] * 8)
+
+  def test_decode_absorbance(self):
+    chromatic = [1000 + i for i in range(384)]
+    reference = [2000 + i for i in range(384)]
+    c100, c0, r100, r0 = 4000, 10, 5000, 20
+    vals = measurement_values(chromatic + reference + [c100, c0, r100, r0])
+
+    transmittance = decode_absorbance(vals, report="transmittance", num_wells=384)
+    od = decode_absorbance(vals, report="OD", num_wells=384)
+
+    expected = (chromatic[25] - c0) / c100 / ((reference[25] - r0) / r100) * 100
+    self.assertEqual(transmittance[1][1], expected) # well B2
+    self.assertEqual(od[1][1], math.log10(100 / expected))
+
+  def test_decode_short_response(self):
+    with self.assertRaises(ValueError):
+      decode_luminescence(measurement_values(list(range(96))), num_wells=384)
+
+  def test_unsupported_layout(self):
+    with self.assertRaises(ValueError):
+      decode_luminescence(measurement_values(list(range(24))), num_wells=24)
+
+  @unittest.skipIf(not HAS_NUMPY, "NumPy is not installed")
+  def test_decode_numpy(self):
+    ints = [3 * i - 100 for i in range(1536 * 2)] + [4000, 10, 5000, 20]
+    vals = measurement_values(ints)
+    for num_wells, shape in WELL_LAYOUTS.items():
+      with self.subTest(num_wells=num_wells):
+        lum = decode_luminescence(vals, num_wells=num_wells, as_numpy=True)
+        assert isinstance(lum, np.ndarray)
+        self.assertEqual(lum.shape, shape)
+        np.testing.assert_array_equal(lum, decode_luminescence(vals, num_wells=num_wells))
+
+    vals = measurement_values(ints[100:196] + ints[1000:1096] + [4000, 10, 5000, 20])
+    for report in ("OD", "transmittance"):
+      np.testing.assert_allclose(
+        decode_absorbance(vals, report=report, as_numpy=True), # type: ignore[arg-type]
+        decode_absorbance(vals, report=report)) # type: ignore[arg-type]
+
+
+class CLARIOStarCommandTests(unittest.TestCase):
+  """ Tests for the plate geometry in run commands. """
+
+  def test_96_well_plate(self):
+    self.assertEqual(_plate_bytes(96),
+      b"\x31\xec\x21\x66\x05\x96\x04\x60\x2c\x56\x1d\x06\x0c\x08" + b"\xff" * 12 + b"\x00" * 36)
+
+  def test_384_well_plate(self):
+    plate_bytes = _plate_bytes(384)
+    self.assertEqual(plate_bytes[12:14], b"\x18\x10")
+    self.assertEqual(plate_bytes[14:], b"\xff" * 48)
+
+  def test_1536_well_plate(self):
+    with self.assertRaises(NotImplementedError):
+      _plate_bytes(1536)
+
+
+class CLARIOStarKineticTests(unittest.IsolatedAsyncioTestCase):
+  """ Tests for kinetic reads. """
+
+  async def test_read_luminescence_kinetic(self):
+    backend = CLARIOStar()
+    reads = [measurement_values([i] * 384) for i in range(3)]
+
+    async def slow_measure(**kwargs):
+      del kwargs
+      time.sleep(0.03)
+      return reads.pop(0)
+
+    with unittest.mock.patch.object(backend, "_measure_luminescence",
+                                    side_effect=slow_measure) as measure:
+      timepoints = [tp async for tp in
+                    backend.read_luminescence_kinetic(3, interval=0.1, num_wells=384)]
+
+    self.assertEqual([values[15][23] for _, values in timepoints], [0.0, 1.0, 2.0])
+    measure.assert_called_with(focal_height=13, num_wells=384)
+    # reads start every interval, regardless of how long a read takes
+    for i, (t, _) in enumerate(timepoints):
+      self.assertAlmostEqual(t, i * 0.1, delta=0.02)
+
+  async def test_invalid_kinetic_arguments(self):
+    with self.assertRaises(ValueError):
+      async for _ in CLARIOStar().read_luminescence_kinetic(0, interval=1):
+        pass
@@ -1,8 +1,15 @@
+from typing import TYPE_CHECKING
+
+from pylabrobot.utils.lazy_import import LazyAttributes
+
 from .carrier import (
   Carrier,
   CarrierSite,
   PlateCarrier,
+  PlateCarrierSite,
   TipCarrier,
+  TroughCarrier,
+  TubeCarrier,
   MFXCarrier,
   create_homogeneous_carrier_sites,
   create_carrier_sites
@@ -10,7 +17,7 @@ from .carrier import (
 from .container import Container
 from .coordinate import Coordinate
 from .deck import Deck
-from .errors import ResourceNotFoundError
+from .errors import ResourceDefinitionIncompleteError, ResourceNotFoundError
 from .itemized_resource import ItemizedResource
 from .liquid import Liquid
 from .petri_dish import PetriDish, PetriDishHolder
@@ -18,11 +25,14 @@ from .plate import Plate, Lid, Well
 from .plate_adapter import PlateAdapter
 from .powder import Powder
 from .resource import Resource
+from .resource_index import ResourceIndex
+from .tip import Tip
 from .tip_rack import TipRack, TipSpot
 from .trash import Trash
-from .trough import Trough
+from .trough import Trough, TroughBottomType
 from .tube import Tube
 from .tube_rack import TubeRack
+from .well import CrossSectionType, WellBottomType
 from .utils import (
   create_equally_spaced_x,
   create_equally_spaced_y,
@@ -34,23 +44,61 @@ from .volume_tracker import VolumeTracker, does_volume_tracking, no_volume_track
 
 from .resource_stack import ResourceStack
 
-# labware manufacturers and suppliers
-from .alpaqua import *
-from .azenta import *
-from .boekel import *
-from .corning_costar import *
-from .corning_axygen import *
-from .eppendorf import *
-from .falcon import *
-from .greiner import *
-from .hamilton import *
-from .limbro import *
-from .ml_star import *
-from .opentrons import *
-from .porvair import *
-from .revvity import *
-from .tecan import *
-from .thermo_fisher import *
-from .vwr import *
-
-# labware made from 3rd parties that share their designs with PLR
+# labware manufacturers and suppliers. The catalogs are large, so they are imported when one of
+# their resources is first accessed, see `pylabrobot.utils.lazy_import`.
+_VENDOR_CATALOGS = [
+  ".alpaqua",
+  ".azenta",
+  ".boekel",
+  ".corning_costar",
+  ".corning_axygen",
+  ".eppendorf",
+  ".falcon",
+  ".greiner",
+  ".hamilton",
+  ".limbro",
+  ".ml_star",
+  ".opentrons",
+  ".porvair",
+  ".revvity",
+  ".tecan",
+  ".thermo_fisher",
+  ".vwr",
+  # labware made from 3rd parties that share their designs with PLR
+]
+
+if TYPE_CHECKING:
+  from .plate_volume_tracker import PlateVolumeTracker, WellVolumeTracker
+  from .alpaqua import *
+  from .azenta import *
+  from .boekel import *
+  from .corning_costar import *
+  from .corning_axygen import *
+  from .eppendorf import *
+  from .falcon import *
+  from .greiner import *
+  from .hamilton import *
+  from .limbro import *
+  from .ml_star import *
+  from .opentrons import *
+  from .porvair import *
+  from .revvity import *
+  from .tecan import *
+  from .thermo_fisher import *
+  from .vwr import *
+
+_lazy = LazyAttributes(
+  __name__,
+  attributes={ # requires NumPy, imported when a plate first uses a plate volume tracker
+    "PlateVolumeTracker": ".plate_volume_tracker",
+    "WellVolumeTracker": ".plate_volume_tracker",
+  },
+  star_modules=_VENDOR_CATALOGS)
+
+
+def __getattr__(name: str):
+  return _lazy.getattr(name)
+
+
+def __dir__():
+  return _lazy.dir()
@@ -2,7 +2,7 @@ from typing import Any, Callable, Dict, Optional
 
 from .resource import Resource
 from .coordinate import Coordinate
-from .volume_tracker import VolumeTracker
+from .volume_tracker import VolumeTracker, VolumeTrackerSnapshot
 
 from pylabrobot.serializer import serialize
 
@@ -62,6 +62,12 @@ class Container(Resource):
   def load_state(self, state: Dict[str, Any]):
     self.tracker.load_state(state)
 
+  def snapshot_state(self) -> VolumeTrackerSnapshot:
+    return self.tracker.snapshot()
+
+  def restore_state(self, snapshot: VolumeTrackerSnapshot):
+    self.tracker.restore(snapshot)
+
   def compute_volume_from_height(self, height: float) -> float:
     """ Compute the volume of liquid in a container from the height of the liquid relative to the
     bottom of the container. """
@@ -6,6 +6,7 @@ from pylabrobot.resources.errors import ResourceNotFoundError
 
 from .coordinate import Coordinate
 from .resource import Resource
+from .resource_index import ResourceIndex
 from .trash import Trash
 
 
@@ -16,6 +17,10 @@ class Deck(Resource):
   resource name and is updated when resources are assigned and unassigned from the deck. The point
   of this dictionary is to allow O(1) naming collision checks as well as the quick lookup of
   resources by name.
+
+  Resources on the deck can also be queried by type, name prefix, category and absolute location
+  through :attr:`index`, a :class:`~pylabrobot.resources.resource_index.ResourceIndex` that is
+  updated in the same way.
   """
 
   def __init__(
@@ -32,10 +37,15 @@ class Deck(Resource):
     super().__init__(name=name, size_x=size_x, size_y=size_y, size_z=size_z, category=category)
     self.location = origin
     self.resources: Dict[str, Resource] = {}
+    self.index = ResourceIndex(self)
 
     self.register_will_assign_resource_callback(self._check_name_exists)
+    self.register_will_assign_resource_callback(self._index_will_change)
     self.register_did_assign_resource_callback(self._register_resource)
+    self.register_did_assign_resource_callback(self._index_did_change)
+    self.register_will_unassign_resource_callback(self._index_will_change)
     self.register_did_unassign_resource_callback(self._deregister_resource)
+    self.register_did_unassign_resource_callback(self._index_did_change)
 
   def serialize(self) -> dict:
     """ Serialize this deck. """
@@ -65,6 +75,7 @@ class Deck(Resource):
     for child in resource.children:
       self._register_resource(child)
     self.resources[resource.name] = resource
+    self.index.add(resource)
 
   def _deregister_resource(self, resource: Resource):
     """ Recursively deregisters the given resource and all child resources from the `self.resources`
@@ -74,9 +85,22 @@ class Deck(Resource):
 
     if self.has_resource(resource.name):
       del self.resources[resource.name]
+    self.index.remove(resource)
     for child in resource.children:
       self._deregister_resource(child)
 
+  def _index_will_change(self, resource: Resource):
+    """ Callback called before a resource is assigned to or unassigned from the deck, see
+    :meth:`ResourceIndex.will_change`. """
+    del resource
+    self.index.will_change()
+
+  def _index_did_change(self, resource: Resource):
+    """ Callback called after a resource is assigned to or unassigned from the deck and the index is
+    updated, see :meth:`ResourceIndex.did_change`. """
+    del resource
+    self.index.did_change()
+
   def get_resource(self, name: str) -> Resource:
     """ Returns the resource with the given name.
 
@@ -4,6 +4,7 @@ from typing import Dict, Union, Tuple, TypeVar, Generic, List, Optional, Generat
 from string import ascii_uppercase as LETTERS
 
 import pylabrobot.utils
+from pylabrobot.utils.positions import row_label, split_identifier
 
 from .resource import Resource
 
@@ -99,8 +100,16 @@ class ItemizedResource(Resource, Generic[T], metaclass=ABCMeta):
 
     # validate that ordering is in the transposed Excel style notation
     for identifier in self._ordering:
-      if not identifier[0] in LETTERS or not identifier[1:].isdigit():
-        raise ValueError("Ordering must be in the transposed Excel style notation, e.g. 'A1'.")
+      try:
+        split_identifier(identifier)
+      except ValueError as e:
+        raise ValueError("Ordering must be in the transposed Excel style notation, e.g. 'A1'.") \
+          from e
+
+    # map identifiers to their index in `children`, so that items can be looked up in O(1)
+    self._identifier_to_index: Dict[str, int] = {}
+    for index, identifier in enumerate(self._ordering):
+      self._identifier_to_index.setdefault(identifier, index)
 
   def __getitem__(
     self,
@@ -151,9 +160,9 @@ class ItemizedResource(Resource, Generic[T], metaclass=ABCMeta):
     if isinstance(identifier, (slice, range)):
       start, stop = identifier.start, identifier.stop
       if isinstance(identifier.start, str):
-        start = self._ordering.index(identifier.start)
+        start = self._index_of_identifier(identifier.start)
       if isinstance(identifier.stop, str):
-        stop = self._ordering.index(identifier.stop)
+        stop = self._index_of_identifier(identifier.stop)
       identifier = list(range(start, stop))
       return self.get_items(identifier)
 
@@ -177,13 +186,9 @@ class ItemizedResource(Resource, Generic[T], metaclass=ABCMeta):
 
     if isinstance(identifier, tuple):
       row, column = identifier
-      identifier = LETTERS[row] + str(column+1) # standard transposed-Excel style notation
+      identifier = row_label(row) + str(column+1) # standard transposed-Excel style notation
     if isinstance(identifier, str):
-      try:
-        identifier = self._ordering.index(identifier)
-      except ValueError as e:
-        raise IndexError(f"Item with identifier '{identifier}' does not exist on "
-                         f"resource '{self.name}'.") from e
+      identifier = self._index_of_identifier(identifier)
 
     if not 0 <= identifier < self.num_items:
       raise IndexError(f"Item with identifier '{identifier}' does not exist on "
@@ -192,15 +197,15 @@ class ItemizedResource(Resource, Generic[T], metaclass=ABCMeta):
     # Cast child to item type. Children will always be `T`, but the type checker doesn't know that.
     return cast(T, self.children[identifier])
 
-  def get_items(self, identifiers: Union[str, Sequence[int], Sequence[str]]) -> List[T]:
+  def get_items(self, identifiers: Union[str, Sequence[Union[int, str]]]) -> List[T]:
     """ Get the items with the given identifier.
 
     Args:
       identifier: Deprecated. Use `identifiers` instead. # TODO(deprecate-ordered-items)
-      identifiers: The identifiers of the items. Either a string range or a list of integers. If a
-        string, it uses transposed MS Excel style notation. Regions of items can be specified using
-        a colon, e.g. "A1:H1" for the first column. If a list of integers, it is the indices of the
-        items in the list of items (counted from 0, top to bottom, left to right).
+      identifiers: The identifiers of the items. Either a string range or a list of integers and
+        identifiers. If a string, it uses transposed MS Excel style notation. Regions of items can
+        be specified using a colon, e.g. "A1:H1" for the first column. Integers in a list are the
+        indices of the items in the list of items (counted from 0, top to bottom, left to right).
 
     Examples:
       Getting the items with identifiers "A1" through "E1":
@@ -218,7 +223,39 @@ class ItemizedResource(Resource, Generic[T], metaclass=ABCMeta):
 
     if isinstance(identifiers, str):
       identifiers = pylabrobot.utils.expand_string_range(identifiers)
-    return [self.get_item(i) for i in identifiers]
+
+    # Resolve all identifiers in one pass. This is equivalent to calling `get_item` for each
+    # identifier, but avoids the per-item overhead for large plates.
+    identifier_to_index = self._identifier_to_index
+    children = self.children
+    num_items = len(children)
+    items: List[T] = []
+    for identifier in identifiers:
+      if isinstance(identifier, str):
+        index = identifier_to_index.get(identifier)
+        if index is None:
+          raise IndexError(f"Item with identifier '{identifier}' does not exist on "
+                           f"resource '{self.name}'.")
+      elif isinstance(identifier, int) and 0 <= identifier < num_items:
+        index = identifier
+      else:
+        items.append(self.get_item(identifier)) # raises or handles other types of identifiers
+        continue
+      items.append(cast(T, children[index]))
+    return items
+
+  def _index_of_identifier(self, identifier: str) -> int:
+    """ Get the index of the item with the given identifier in `children`.
+
+    Raises:
+      IndexError: If there is no item with the given identifier.
+    """
+
+    try:
+      return self._identifier_to_index[identifier]
+    except KeyError as e:
+      raise IndexError(f"Item with identifier '{identifier}' does not exist on "
+                       f"resource '{self.name}'.") from e
 
   @property
   def num_items(self) -> int:
@@ -429,12 +466,13 @@ class ItemizedResource(Resource, Generic[T], metaclass=ABCMeta):
     """ Get the size of the grid from the identifiers, or raise an error if not a full grid. """
     rows_set, columns_set = set(), set()
     for identifier in identifiers:
-      rows_set.add(identifier[0])
-      columns_set.add(identifier[1:])
+      row, column = split_identifier(identifier)
+      rows_set.add(row)
+      columns_set.add(column)
 
-    rows, columns = sorted(list(rows_set)), sorted(list(columns_set), key=int)
+    rows, columns = sorted(list(rows_set)), sorted(list(columns_set))
 
-    expected_identifiers = sorted([c + r for c in rows for r in columns])
+    expected_identifiers = sorted([row_label(r) + str(c) for r in rows for c in columns])
     if sorted(identifiers) != expected_identifiers:
       raise ValueError(f"Not a full grid: {identifiers}")
     return len(rows), len(columns)
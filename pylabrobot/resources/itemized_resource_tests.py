@@ -1,7 +1,8 @@
 import sys
-from typing import List
+from typing import List, Union
 import unittest
 
+import pylabrobot.utils
 from pylabrobot.resources import (
   Coordinate,
   Plate,
@@ -94,6 +95,40 @@ class TestItemizedResource(unittest.TestCase):
     self.assertEqual([w.name for w in self.plate["A1", "B2", "A2"]],
       ["plate_well_0_0", "plate_well_1_1", "plate_well_1_0"])
 
+  def test_get_items(self):
+    identifiers: List[Union[str, int]] = ["A1", 95, "B2"]
+    self.assertEqual([w.name for w in self.plate.get_items(identifiers)],
+      ["plate_well_0_0", "plate_well_11_7", "plate_well_1_1"])
+    self.assertEqual(self.plate.get_items("A1:H12"),
+      [self.plate.get_item(i) for i in pylabrobot.utils.expand_string_range("A1:H12")])
+    with self.assertRaises(IndexError):
+      self.plate.get_items(["A1", "A13"])
+    with self.assertRaises(IndexError):
+      self.plate.get_items([0, 96])
+    with self.assertRaises(IndexError):
+      self.plate.get_items([-1])
+
+  def test_getitem_slice_str(self):
+    self.assertEqual(self.plate["A1":"A2"], self.plate.get_items(range(8)))
+    with self.assertRaises(IndexError):
+      _ = self.plate["A1":"I1"]
+
+  def test_1536_wells(self):
+    plate = Plate("plate", size_x=1, size_y=1, size_z=1,
+      ordered_items=create_ordered_items_2d(Well,
+      num_items_x=48, num_items_y=32,
+      dx=0, dy=0, dz=0,
+      item_dx=2, item_dy=2,
+      size_x=2, size_y=2, size_z=2))
+    self.assertEqual(plate.num_items_x, 48)
+    self.assertEqual(plate.num_items_y, 32)
+    self.assertEqual(plate.get_item("Z1").name, "plate_well_0_25")
+    self.assertEqual(plate.get_item("AA1").name, "plate_well_0_26")
+    self.assertEqual(plate.get_item("AF48").name, "plate_well_47_31")
+    self.assertEqual(plate.get_item((31, 47)).name, "plate_well_47_31")
+    self.assertEqual([w.name for w in plate["Z1:AA2"]],
+      ["plate_well_0_25", "plate_well_1_25", "plate_well_0_26", "plate_well_1_26"])
+
   def _traverse_test(
     self,
     direction: Literal["up", "down", "right", "left",
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Sequence, Tuple, Union, cast, Literal
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Union, cast, Literal
 
 
 from .liquid import Liquid
@@ -10,6 +10,8 @@ from .itemized_resource import ItemizedResource
 from .resource import Resource, Coordinate
 from .well import Well
 
+if TYPE_CHECKING:
+  from .plate_volume_tracker import PlateVolumeTracker
 
 
 class Lid(Resource):
@@ -78,6 +80,7 @@ class Plate(ItemizedResource[Well]):
       model=model)
     self.lid: Optional[Lid] = None
     self.plate_type = plate_type
+    self.volume_tracker: Optional[PlateVolumeTracker] = None
 
     if lid is not None:
       self.assign_child_resource(lid)
@@ -179,6 +182,24 @@ class Plate(ItemizedResource[Well]):
     for well in self.get_all_items():
       well.tracker.enable()
 
+  def use_plate_volume_tracker(self) -> PlateVolumeTracker:
+    """ Track the liquids in all wells of the plate in one :class:`PlateVolumeTracker`, so that
+    operations on many wells at once, like `aspirate96` and `dispense96`, update all wells at once.
+
+    The trackers of the wells are replaced by views on the plate tracker, keeping their liquids. The
+    plate tracker is not serialized: a deserialized plate uses a tracker per well again. Requires
+    NumPy.
+
+    Returns:
+      The plate tracker, also available as `plate.volume_tracker`.
+    """
+
+    if self.volume_tracker is None:
+      # imported here, because importing NumPy is slow
+      from .plate_volume_tracker import PlateVolumeTracker # pylint: disable=import-outside-toplevel
+      self.volume_tracker = PlateVolumeTracker(self.get_all_items())
+    return self.volume_tracker
+
 # TODO: add quadrant definition for 96-well plates & specify current
 # quadrant definition is only for 384-well plates
   def get_quadrant(self, quadrant: int) -> List[Well]:
@@ -0,0 +1,489 @@
+""" Volume tracking for all wells of a plate in arrays.
+
+A :class:`~pylabrobot.resources.volume_tracker.VolumeTracker` per well keeps the liquids in the
+well in Python lists. A :class:`PlateVolumeTracker` keeps the liquids in all wells of a plate in
+NumPy arrays instead, so that operations on many wells at once, like aspirating from or dispensing
+to a plate with a 96 head, are done for all wells in a few array operations.
+
+The liquids in a well are layers, bottom first, each with a liquid and a volume. The tracker holds
+the committed and pending layers of every well, and which liquids have been in each well.
+
+Every well keeps a `tracker` with the :class:`VolumeTracker` API, a :class:`WellVolumeTracker`
+that reads and writes the arrays of the plate tracker, so code that works with a single well does
+not have to know whether the plate uses a plate tracker.
+
+Example:
+  >>> plate_tracker = plate.use_plate_volume_tracker()
+  >>> plate.set_well_liquids((Liquid.WATER, 100))
+  >>> plate_tracker.remove_liquid(10, wells=range(96))
+  >>> plate_tracker.commit()
+"""
+
+import copy
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple, Union, cast
+
+try:
+  import numpy as np
+  HAS_NUMPY = True
+except ImportError:
+  HAS_NUMPY = False
+
+from pylabrobot.resources.errors import TooLittleLiquidError, TooLittleVolumeError
+from pylabrobot.resources.liquid import Liquid
+from pylabrobot.resources.volume_tracker import VolumeTracker
+
+if TYPE_CHECKING:
+  from pylabrobot.resources.container import Container
+
+
+LiquidLayers = List[Tuple[Optional[Liquid], float]]
+Volumes = Union[float, Sequence[float], "np.ndarray"]
+
+# Indices of the first axis of the layer arrays.
+_COMMITTED = 0
+_PENDING = 1
+
+
+class PlateVolumeTracker:
+  """ Tracks the liquids in a number of containers, usually the wells of a plate, in arrays.
+
+  Operations take the indices of the wells they apply to in `wells`, or apply to all wells if
+  `wells` is `None`. An operation on many wells either succeeds for all wells or raises an error
+  without changing the tracker.
+  """
+
+  def __init__(self, containers: Sequence["Container"], num_layers: int = 4):
+    """ Create a tracker for the containers, and replace their trackers with views on it.
+
+    The current liquids, liquid history and callbacks of the trackers of the containers are kept.
+
+    Args:
+      containers: The containers, usually the wells of a plate. Container `i` is well `i` of the
+        tracker.
+      num_layers: The initial number of layers per well. More layers are added when needed.
+    """
+
+    if not HAS_NUMPY:
+      raise RuntimeError("NumPy is not installed, it is required for PlateVolumeTracker.")
+
+    num_wells = len(containers)
+    self.max_volumes = np.array([container.max_volume for container in containers], dtype=float)
+
+    # The liquids in the tracker are identified by their index in `_liquids`. 0 is `None`.
+    self._liquids: List[Optional[Liquid]] = [None]
+    self._liquid_ids: Dict[Optional[Liquid], int] = {None: 0}
+
+    # The layers in each well, bottom first, as committed ([0]) and pending ([1]). Layers beyond
+    # `_num_layers` have volume 0.
+    self._volumes = np.zeros((2, num_wells, num_layers), dtype=float)
+    self._ids = np.zeros((2, num_wells, num_layers), dtype=np.int16)
+    self._num_layers = np.zeros((2, num_wells), dtype=np.int32)
+
+    # Whether liquid `j` has been in well `i`, for cross contamination tracking.
+    self._history = np.zeros((num_wells, 1), dtype=bool)
+
+    self._disabled = np.zeros(num_wells, dtype=bool)
+    self._cross_contamination_disabled = np.zeros(num_wells, dtype=bool)
+
+    self.trackers: List[WellVolumeTracker] = []
+    for i, container in enumerate(containers):
+      old_tracker = container.tracker
+      tracker = WellVolumeTracker(self, i)
+      self._write_layers(_COMMITTED, i, old_tracker.liquids)
+      self._write_layers(_PENDING, i, old_tracker.pending_liquids)
+      tracker.liquid_history = old_tracker.liquid_history
+      self._disabled[i] = old_tracker.is_disabled
+      self._cross_contamination_disabled[i] = old_tracker.is_cross_contamination_tracking_disabled
+      tracker._callback = old_tracker._callback # pylint: disable=protected-access
+      self.trackers.append(tracker)
+      container.tracker = tracker
+
+  @property
+  def num_wells(self) -> int:
+    return len(self.trackers)
+
+  @staticmethod
+  def shared_by(
+    containers: Sequence["Container"]
+  ) -> Optional[Tuple["PlateVolumeTracker", List[int]]]:
+    """ Return the plate tracker that tracks all containers and their indices in it, or `None` if
+    the containers are not all tracked by the same plate tracker. """
+
+    if len(containers) == 0 or not isinstance(containers[0].tracker, WellVolumeTracker):
+      return None
+    plate_tracker = containers[0].tracker.plate_tracker
+    indices = []
+    for container in containers:
+      tracker = container.tracker
+      if not isinstance(tracker, WellVolumeTracker) or tracker.plate_tracker is not plate_tracker:
+        return None
+      indices.append(tracker.index)
+    return plate_tracker, indices
+
+  # Operations on many wells
+
+  def get_used_volumes(self, wells: Optional[Iterable[int]] = None) -> "np.ndarray":
+    """ Get the used volume of the wells, including pending operations. """
+    used: "np.ndarray" = self._volumes[_PENDING, self._indices(wells)].sum(axis=1)
+    return used
+
+  def get_free_volumes(self, wells: Optional[Iterable[int]] = None) -> "np.ndarray":
+    """ Get the free volume of the wells, including pending operations. """
+    indices = self._indices(wells)
+    free: "np.ndarray" = self.max_volumes[indices] - self._volumes[_PENDING, indices].sum(axis=1)
+    return free
+
+  def is_disabled(self, wells: Optional[Iterable[int]] = None) -> bool:
+    """ Whether the tracker of any of the wells is disabled. """
+    return bool(self._disabled[self._indices(wells)].any())
+
+  def remove_liquid(self, volume: Volumes, wells: Optional[Iterable[int]] = None
+                    ) -> List[LiquidLayers]:
+    """ Remove liquid from the wells, top to bottom.
+
+    Args:
+      volume: The volume to remove from every well, or a volume per well.
+      wells: The indices of the wells, without duplicates. All wells if `None`.
+
+    Returns:
+      The removed liquids of each well, top first, like :meth:`VolumeTracker.remove_liquid`.
+
+    Raises:
+      TooLittleLiquidError: If a well has less liquid than `volume`.
+    """
+
+    indices = self._indices(wells, unique=True)
+    volumes = self._per_well(volume, indices)
+    pending_volumes = self._volumes[_PENDING]
+    num_layers = self._num_layers[_PENDING]
+
+    used = pending_volumes[indices].sum(axis=1)
+    too_little = np.flatnonzero(volumes > used)
+    if len(too_little) > 0:
+      j = too_little[0]
+      raise TooLittleLiquidError(f"Container {indices[j]} has too little liquid: {volumes[j]}uL > "
+                                 f"{used[j]}uL.")
+
+    # Most removals only take liquid from the top layer of a well, which is done for all wells at
+    # once. Removals that empty the top layer and continue below are done one well at a time.
+    tops = np.maximum(num_layers[indices] - 1, 0)
+    top_volumes = pending_volumes[indices, tops]
+    top_ids = self._ids[_PENDING, indices, tops]
+    in_top = (volumes > 0) & (volumes <= top_volumes)
+    pending_volumes[indices[in_top], tops[in_top]] -= volumes[in_top]
+    emptied = in_top & (volumes == top_volumes)
+    num_layers[indices[emptied]] -= 1
+
+    removed: List[LiquidLayers] = []
+    for j in range(len(indices)):
+      if in_top[j]:
+        removed.append([(self._liquids[top_ids[j]], float(volumes[j]))])
+      elif volumes[j] > 0:
+        removed.append(self._remove_layers(int(indices[j]), float(volumes[j])))
+      else:
+        removed.append([])
+
+    self._call_callbacks(indices)
+    return removed
+
+  def add_liquid(self, liquid: Union[Optional[Liquid], Sequence[Optional[Liquid]]],
+                 volume: Volumes, wells: Optional[Iterable[int]] = None) -> None:
+    """ Add liquid to the top of the wells.
+
+    Args:
+      liquid: The liquid to add to every well, or a liquid per well.
+      volume: The volume to add to every well, or a volume per well.
+      wells: The indices of the wells, without duplicates. All wells if `None`.
+
+    Raises:
+      TooLittleVolumeError: If a well has less free volume than `volume`.
+    """
+
+    indices = self._indices(wells, unique=True)
+    volumes = self._per_well(volume, indices)
+    free = self.max_volumes[indices] - self._volumes[_PENDING, indices].sum(axis=1)
+    self._check_free_volume(indices, volumes, free)
+    self._add_layer(indices, self._ids_of(liquid, len(indices)), volumes)
+    self._call_callbacks(indices)
+
+  def add_liquids(self, liquids: Sequence[LiquidLayers], wells: Optional[Iterable[int]] = None
+                  ) -> None:
+    """ Add layers of liquid to the top of each well, bottom first.
+
+    Args:
+      liquids: The layers to add to each well, bottom first.
+      wells: The indices of the wells, without duplicates. All wells if `None`.
+
+    Raises:
+      TooLittleVolumeError: If a well has less free volume than the total volume of its layers.
+    """
+
+    indices = self._indices(wells, unique=True)
+    if len(liquids) != len(indices):
+      raise ValueError(f"Expected liquids for {len(indices)} wells, got {len(liquids)}.")
+    totals = np.array([sum(volume for _, volume in layers) for layers in liquids], dtype=float)
+    free = self.max_volumes[indices] - self._volumes[_PENDING, indices].sum(axis=1)
+    self._check_free_volume(indices, totals, free)
+
+    for depth in range(max((len(layers) for layers in liquids), default=0)):
+      selected = [j for j, layers in enumerate(liquids) if len(layers) > depth]
+      layer_liquids = [liquids[j][depth][0] for j in selected]
+      layer_volumes = np.array([liquids[j][depth][1] for j in selected], dtype=float)
+      self._add_layer(indices[selected], self._ids_of(layer_liquids, len(selected)),
+                      layer_volumes)
+
+    self._call_callbacks(indices)
+
+  def commit(self, wells: Optional[Iterable[int]] = None) -> None:
+    """ Commit the pending operations of the wells. """
+
+    indices = self._indices(wells)
+    assert not self._disabled[indices].any(), "Volume tracker is disabled. Call `enable()`."
+    self._volumes[_COMMITTED, indices] = self._volumes[_PENDING, indices]
+    self._ids[_COMMITTED, indices] = self._ids[_PENDING, indices]
+    self._num_layers[_COMMITTED, indices] = self._num_layers[_PENDING, indices]
+    self._call_callbacks(indices)
+
+  def rollback(self, wells: Optional[Iterable[int]] = None) -> None:
+    """ Roll back the pending operations of the wells. Like :meth:`VolumeTracker.rollback`, this
+    clears the pending liquids. """
+
+    indices = self._indices(wells)
+    assert not self._disabled[indices].any(), "Volume tracker is disabled. Call `enable()`."
+    self._volumes[_PENDING, indices] = 0
+    self._ids[_PENDING, indices] = 0
+    self._num_layers[_PENDING, indices] = 0
+
+  def clear_cross_contamination_history(self, wells: Optional[Iterable[int]] = None) -> None:
+    """ Reset the liquid history of the wells. """
+    self._history[self._indices(wells)] = False
+
+  # Helpers
+
+  def _indices(self, wells: Optional[Iterable[int]], unique: bool = False) -> "np.ndarray":
+    if wells is None:
+      return np.arange(self.num_wells)
+    indices = np.fromiter(wells, dtype=np.intp)
+    if unique and len(np.unique(indices)) != len(indices):
+      raise ValueError("Wells must not contain duplicates.")
+    return indices
+
+  @staticmethod
+  def _per_well(volume: Volumes, indices: "np.ndarray") -> "np.ndarray":
+    volumes = np.asarray(volume, dtype=float)
+    if volumes.ndim == 0:
+      return np.full(len(indices), float(volumes))
+    if volumes.shape != indices.shape:
+      raise ValueError(f"Expected {len(indices)} volumes, got {len(volumes)}.")
+    return volumes
+
+  def _liquid_id(self, liquid: Optional[Liquid]) -> int:
+    if liquid not in self._liquid_ids:
+      self._liquid_ids[liquid] = len(self._liquids)
+      self._liquids.append(liquid)
+      self._history = np.pad(self._history, ((0, 0), (0, 1)))
+    return self._liquid_ids[liquid]
+
+  def _ids_of(self, liquid: Union[Optional[Liquid], Sequence[Optional[Liquid]]],
+              num_wells: int) -> "np.ndarray":
+    if isinstance(liquid, (list, tuple)):
+      if len(liquid) != num_wells:
+        raise ValueError(f"Expected {num_wells} liquids, got {len(liquid)}.")
+      return np.array([self._liquid_id(l) for l in liquid], dtype=np.int16)
+    return np.full(num_wells, self._liquid_id(cast(Optional[Liquid], liquid)), dtype=np.int16)
+
+  def _ensure_layers(self, num_layers: int) -> None:
+    """ Make room for at least `num_layers` layers in every well. """
+
+    capacity = self._volumes.shape[2]
+    if num_layers <= capacity:
+      return
+    extra = max(num_layers, 2 * capacity) - capacity
+    self._volumes = np.pad(self._volumes, ((0, 0), (0, 0), (0, extra)))
+    self._ids = np.pad(self._ids, ((0, 0), (0, 0), (0, extra)))
+
+  def _check_free_volume(self, indices: "np.ndarray", volumes: "np.ndarray",
+                         free: "np.ndarray") -> None:
+    too_much = np.flatnonzero(volumes > free)
+    if len(too_much) > 0:
+      j = too_much[0]
+      raise TooLittleVolumeError(f"Container {indices[j]} has too little volume: {volumes[j]}uL > "
+                                 f"{free[j]}uL.")
+
+  def _add_layer(self, indices: "np.ndarray", ids: "np.ndarray", volumes: "np.ndarray") -> None:
+    """ Add a layer to each of the wells, or add to the top layer if it is the same liquid. """
+
+    tracked = (ids != 0) & ~self._cross_contamination_disabled[indices]
+    self._history[indices[tracked], ids[tracked]] = True
+
+    num_layers = self._num_layers[_PENDING, indices]
+    tops = np.maximum(num_layers - 1, 0)
+    same = (num_layers > 0) & (self._ids[_PENDING, indices, tops] == ids)
+    self._volumes[_PENDING, indices[same], tops[same]] += volumes[same]
+
+    new = ~same
+    if new.any():
+      self._ensure_layers(int(num_layers[new].max()) + 1)
+      self._volumes[_PENDING, indices[new], num_layers[new]] = volumes[new]
+      self._ids[_PENDING, indices[new], num_layers[new]] = ids[new]
+      self._num_layers[_PENDING, indices[new]] += 1
+
+  def _remove_layers(self, i: int, volume: float) -> LiquidLayers:
+    """ Remove liquid from the top of well `i`, one layer at a time. """
+
+    volumes, ids, num_layers = self._volumes[_PENDING, i], self._ids[_PENDING, i], \
+      self._num_layers[_PENDING]
+    removed_liquids: LiquidLayers = []
+    removed_volume = 0.0
+    while removed_volume < volume:
+      top = num_layers[i] - 1
+      liquid, liquid_volume = self._liquids[ids[top]], float(volumes[top])
+      removed_volume += liquid_volume
+
+      # If we have more liquid than we need, put the excess back.
+      if removed_volume > volume:
+        volumes[top] = removed_volume - volume
+        removed_liquids.append((liquid, liquid_volume - (removed_volume - volume)))
+      else:
+        volumes[top] = 0
+        num_layers[i] -= 1
+        removed_liquids.append((liquid, liquid_volume))
+    return removed_liquids
+
+  def _read_layers(self, state: int, i: int) -> LiquidLayers:
+    num_layers = self._num_layers[state, i]
+    return [(self._liquids[liquid_id], float(volume)) for liquid_id, volume in
+            zip(self._ids[state, i, :num_layers], self._volumes[state, i, :num_layers])]
+
+  def _write_layers(self, state: int, i: int, liquids: LiquidLayers) -> None:
+    self._ensure_layers(len(liquids))
+    self._volumes[state, i] = 0
+    self._ids[state, i] = 0
+    for layer, (liquid, volume) in enumerate(liquids):
+      self._volumes[state, i, layer] = volume
+      self._ids[state, i, layer] = self._liquid_id(liquid)
+    self._num_layers[state, i] = len(liquids)
+
+  def _call_callbacks(self, indices: "np.ndarray") -> None:
+    for i in indices:
+      callback = self.trackers[i]._callback # pylint: disable=protected-access
+      if callback is not None:
+        callback()
+
+
+class WellVolumeTracker(VolumeTracker):
+  """ The :class:`VolumeTracker` of a single well, whose liquids are kept in a
+  :class:`PlateVolumeTracker`.
+
+  `liquids`, `pending_liquids` and `liquid_history` return copies. Modify them through the methods
+  of the tracker, or assign to them.
+  """
+
+  # The state is kept in the plate tracker, so the attributes set by `VolumeTracker` are not used.
+  # pylint: disable=super-init-not-called
+  def __init__(self, plate_tracker: PlateVolumeTracker, index: int):
+    self.plate_tracker = plate_tracker
+    self.index = index
+    self._callback = None
+
+  @property # type: ignore[override]
+  def max_volume(self) -> float: # type: ignore[override]
+    return float(self.plate_tracker.max_volumes[self.index])
+
+  @max_volume.setter
+  def max_volume(self, max_volume: float) -> None:
+    self.plate_tracker.max_volumes[self.index] = max_volume
+
+  @property # type: ignore[override]
+  def liquids(self) -> LiquidLayers: # type: ignore[override]
+    return self.plate_tracker._read_layers(_COMMITTED, self.index) # pylint: disable=protected-access
+
+  @liquids.setter
+  def liquids(self, liquids: LiquidLayers) -> None:
+    self.plate_tracker._write_layers(_COMMITTED, self.index, liquids) # pylint: disable=protected-access
+
+  @property # type: ignore[override]
+  def pending_liquids(self) -> LiquidLayers: # type: ignore[override]
+    return self.plate_tracker._read_layers(_PENDING, self.index) # pylint: disable=protected-access
+
+  @pending_liquids.setter
+  def pending_liquids(self, liquids: LiquidLayers) -> None:
+    self.plate_tracker._write_layers(_PENDING, self.index, liquids) # pylint: disable=protected-access
+
+  @property # type: ignore[override]
+  def liquid_history(self) -> set: # type: ignore[override]
+    # pylint: disable=protected-access
+    plate_tracker = self.plate_tracker
+    return {plate_tracker._liquids[j] for j in np.flatnonzero(plate_tracker._history[self.index])}
+
+  @liquid_history.setter
+  def liquid_history(self, liquid_history: set) -> None:
+    # pylint: disable=protected-access
+    plate_tracker = self.plate_tracker
+    ids = [plate_tracker._liquid_id(liquid) for liquid in liquid_history if liquid is not None]
+    plate_tracker._history[self.index] = False
+    plate_tracker._history[self.index, ids] = True
+
+  @property
+  def is_disabled(self) -> bool:
+    return bool(self.plate_tracker._disabled[self.index]) # pylint: disable=protected-access
+
+  @property
+  def is_cross_contamination_tracking_disabled(self) -> bool:
+    # pylint: disable=protected-access
+    return bool(self.plate_tracker._cross_contamination_disabled[self.index])
+
+  def disable(self) -> None:
+    self.plate_tracker._disabled[self.index] = True # pylint: disable=protected-access
+
+  def disable_cross_contamination_tracking(self) -> None:
+    # pylint: disable=protected-access
+    self.plate_tracker._cross_contamination_disabled[self.index] = True
+
+  def enable(self) -> None:
+    self.plate_tracker._disabled[self.index] = False # pylint: disable=protected-access
+
+  def enable_cross_contamination_tracking(self) -> None:
+    # pylint: disable=protected-access
+    self.plate_tracker._cross_contamination_disabled[self.index] = False
+
+  def set_liquids(self, liquids: List[Tuple[Optional[Liquid], float]]) -> None:
+    self.liquids = liquids
+    self.pending_liquids = liquids
+    if not self.is_cross_contamination_tracking_disabled:
+      self.liquid_history = self.liquid_history | {liquid for liquid, _ in liquids}
+    if self._callback is not None:
+      self._callback()
+
+  def remove_liquid(self, volume: float) -> List[Tuple[Optional[Liquid], float]]:
+    if volume > self.get_used_volume():
+      raise TooLittleLiquidError(
+        f"Container has too little liquid: {volume}uL > {self.get_used_volume()}uL.")
+    return self.plate_tracker.remove_liquid(volume, wells=[self.index])[0]
+
+  def add_liquid(self, liquid: Optional[Liquid], volume: float) -> None:
+    if volume > self.get_free_volume():
+      raise TooLittleVolumeError(
+        f"Container has too little volume: {volume}uL > {self.get_free_volume()}uL.")
+    self.plate_tracker.add_liquid(liquid, volume, wells=[self.index])
+
+  def get_used_volume(self) -> float:
+    # pylint: disable=protected-access
+    return float(self.plate_tracker._volumes[_PENDING, self.index].sum())
+
+  def commit(self) -> None:
+    self.plate_tracker.commit(wells=[self.index])
+
+  def rollback(self) -> None:
+    self.plate_tracker.rollback(wells=[self.index])
+
+  def clear_cross_contamination_history(self) -> None:
+    self.plate_tracker.clear_cross_contamination_history(wells=[self.index])
+
+  def __deepcopy__(self, memo) -> "WellVolumeTracker":
+    tracker = self.__class__.__new__(self.__class__)
+    memo[id(self)] = tracker
+    tracker.plate_tracker = copy.deepcopy(self.plate_tracker, memo)
+    tracker.index = self.index
+    tracker._callback = copy.deepcopy(self._callback, memo)
+    return tracker
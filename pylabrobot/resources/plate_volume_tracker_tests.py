@@ -0,0 +1,186 @@
+import unittest
+
+from pylabrobot.resources import Plate, Well, create_ordered_items_2d
+from pylabrobot.resources.errors import TooLittleLiquidError, TooLittleVolumeError
+from pylabrobot.resources.liquid import Liquid
+from pylabrobot.resources.plate_volume_tracker import (
+  HAS_NUMPY,
+  PlateVolumeTracker,
+  WellVolumeTracker,
+)
+from pylabrobot.resources.volume_tracker import VolumeTracker
+
+
+def make_plate() -> Plate:
+  return Plate("plate", size_x=127, size_y=85, size_z=14,
+    ordered_items=create_ordered_items_2d(Well,
+      num_items_x=3, num_items_y=2,
+      dx=10, dy=7, dz=1,
+      item_dx=9, item_dy=9,
+      size_x=8, size_y=8, size_z=10, max_volume=100))
+
+
+@unittest.skipIf(not HAS_NUMPY, "NumPy is not installed")
+class PlateVolumeTrackerTests(unittest.TestCase):
+  """ Tests for the plate volume tracker and the trackers of its wells. """
+
+  def setUp(self):
+    super().setUp()
+    self.plate = make_plate()
+    self.wells = self.plate.get_all_items()
+    self.wells[0].tracker.set_liquids([(Liquid.WATER, 50)])
+    self.tracker = self.plate.use_plate_volume_tracker()
+
+  def test_keeps_state(self):
+    self.assertIsInstance(self.wells[0].tracker, WellVolumeTracker)
+    self.assertIs(self.plate.use_plate_volume_tracker(), self.tracker)
+    self.assertEqual(self.wells[0].tracker.liquids, [(Liquid.WATER, 50)])
+    self.assertEqual(self.wells[0].tracker.liquid_history, {Liquid.WATER})
+    self.assertEqual(self.wells[1].tracker.liquids, [])
+    self.assertEqual(self.wells[1].tracker.max_volume, 100)
+
+  def test_add_remove(self):
+    self.tracker.add_liquid(Liquid.WATER, 30)
+    self.tracker.add_liquid([Liquid.WATER, Liquid.ETHANOL] * 3, [10, 20, 10, 20, 10, 20])
+    self.assertEqual(list(self.tracker.get_used_volumes()), [90, 50, 40, 50, 40, 50])
+    self.assertEqual(self.wells[1].tracker.pending_liquids,
+                     [(Liquid.WATER, 30), (Liquid.ETHANOL, 20)])
+    self.assertEqual(self.wells[1].tracker.liquids, [])
+
+    removed = self.tracker.remove_liquid(25, wells=[0, 1])
+    self.assertEqual(removed, [[(Liquid.WATER, 25)], [(Liquid.ETHANOL, 20), (Liquid.WATER, 5)]])
+    self.assertEqual(self.wells[1].tracker.pending_liquids, [(Liquid.WATER, 25)])
+    self.assertEqual(list(self.tracker.get_free_volumes(wells=[0, 1])), [35, 75])
+
+  def test_remove_whole_layer(self):
+    self.assertEqual(self.tracker.remove_liquid(50, wells=[0]), [[(Liquid.WATER, 50)]])
+    self.assertEqual(self.wells[0].tracker.pending_liquids, [])
+    self.assertEqual(self.tracker.remove_liquid(0, wells=[0]), [[]])
+
+  def test_errors_do_not_change_state(self):
+    with self.assertRaises(TooLittleLiquidError):
+      self.tracker.remove_liquid(10)
+    self.assertEqual(self.wells[0].tracker.pending_liquids, [(Liquid.WATER, 50)])
+    with self.assertRaises(TooLittleVolumeError):
+      self.tracker.add_liquid(None, 60)
+    self.assertEqual(list(self.tracker.get_used_volumes()), [50, 0, 0, 0, 0, 0])
+    with self.assertRaises(ValueError):
+      self.tracker.add_liquid(None, 1, wells=[1, 1])
+
+  def test_commit_rollback(self):
+    self.tracker.add_liquid(Liquid.ETHANOL, 10)
+    self.tracker.commit(wells=[0])
+    self.tracker.rollback(wells=[1])
+    self.assertEqual(self.wells[0].tracker.pending_liquids,
+                     [(Liquid.WATER, 50), (Liquid.ETHANOL, 10)])
+    self.assertEqual(self.wells[1].tracker.pending_liquids, [])
+    self.assertEqual(self.wells[1].tracker.liquids, [])
+
+  def test_parity_with_volume_tracker(self):
+    """ A well tracker behaves like a `VolumeTracker` for the same sequence of operations. """
+
+    well_tracker = self.wells[1].tracker
+    volume_tracker = VolumeTracker(max_volume=100)
+
+    def check():
+      for attribute in ("liquids", "pending_liquids", "liquid_history"):
+        self.assertEqual(getattr(well_tracker, attribute), getattr(volume_tracker, attribute),
+                         attribute)
+      self.assertEqual(well_tracker.get_used_volume(), volume_tracker.get_used_volume())
+      self.assertEqual(well_tracker.get_free_volume(), volume_tracker.get_free_volume())
+
+    for tracker in (well_tracker, volume_tracker):
+      tracker.set_liquids([(Liquid.WATER, 40)])
+      tracker.add_liquid(Liquid.ETHANOL, 20)
+      tracker.commit()
+    check()
+
+    for tracker in (well_tracker, volume_tracker):
+      self.assertEqual(tracker.remove_liquid(30), [(Liquid.ETHANOL, 20), (Liquid.WATER, 10)])
+      tracker.add_liquid(None, 5)
+    check()
+
+    for tracker in (well_tracker, volume_tracker):
+      tracker.rollback()
+    check()
+
+    for tracker in (well_tracker, volume_tracker):
+      tracker.add_liquid(Liquid.WATER, 10)
+      tracker.commit()
+      tracker.clear_cross_contamination_history()
+    check()
+
+  def test_add_liquids(self):
+    self.tracker.add_liquids([[(None, 5), (Liquid.WATER, 5)], [(Liquid.WATER, 5)], []],
+                             wells=[0, 1, 2])
+    self.assertEqual(self.wells[0].tracker.pending_liquids,
+                     [(Liquid.WATER, 50), (None, 5), (Liquid.WATER, 5)])
+    self.assertEqual(self.wells[1].tracker.pending_liquids, [(Liquid.WATER, 5)])
+    self.assertEqual(self.wells[2].tracker.pending_liquids, [])
+
+  def test_many_layers(self):
+    for i in range(10):
+      self.tracker.add_liquid(Liquid.WATER if i % 2 == 0 else Liquid.ETHANOL, 1, wells=[2])
+    self.assertEqual(len(self.wells[2].tracker.pending_liquids), 10)
+    self.assertEqual(len(self.tracker.remove_liquid(4, wells=[2])[0]), 4)
+
+  def test_well_tracker(self):
+    tracker = self.wells[1].tracker
+    tracker.add_liquid(Liquid.ETHANOL, 20)
+    self.assertEqual(tracker.remove_liquid(5), [(Liquid.ETHANOL, 5)])
+    tracker.commit()
+    self.assertEqual(tracker.get_used_volume(), 15)
+    self.assertEqual(tracker.get_liquids(top_volume=10), [(Liquid.ETHANOL, 10)])
+    with self.assertRaises(TooLittleLiquidError):
+      tracker.remove_liquid(20)
+
+    snapshot = tracker.snapshot()
+    tracker.set_liquids([(Liquid.WATER, 1)])
+    self.assertEqual(tracker.liquid_history, {Liquid.ETHANOL, Liquid.WATER})
+    tracker.restore(snapshot)
+    self.assertEqual(tracker.liquids, [(Liquid.ETHANOL, 15)])
+    self.assertEqual(tracker.liquid_history, {Liquid.ETHANOL})
+
+    state = tracker.serialize()
+    tracker.set_liquids([])
+    tracker.load_state(state)
+    self.assertEqual(tracker.serialize(), state)
+
+  def test_disable(self):
+    self.wells[0].tracker.disable()
+    self.assertTrue(self.tracker.is_disabled())
+    self.assertFalse(self.tracker.is_disabled(wells=[1, 2]))
+    with self.assertRaises(AssertionError):
+      self.tracker.commit()
+    self.wells[0].tracker.enable()
+    self.tracker.commit()
+
+    self.wells[1].tracker.disable_cross_contamination_tracking()
+    self.tracker.add_liquid(Liquid.BLOOD, 1, wells=[1, 2])
+    self.assertEqual(self.wells[1].tracker.liquid_history, set())
+    self.assertEqual(self.wells[2].tracker.liquid_history, {Liquid.BLOOD})
+    self.tracker.clear_cross_contamination_history()
+    self.assertEqual(self.wells[0].tracker.liquid_history, set())
+
+  def test_callbacks(self):
+    updates: list = []
+    self.wells[0].register_state_update_callback(updates.append)
+    self.tracker.add_liquid(None, 1)
+    self.tracker.commit(wells=[1])
+    self.tracker.commit(wells=[0])
+    self.assertEqual(len(updates), 2)
+
+  def test_shared_by(self):
+    self.assertEqual(PlateVolumeTracker.shared_by(self.wells[2:4]), (self.tracker, [2, 3]))
+    other = make_plate()
+    self.assertIsNone(PlateVolumeTracker.shared_by([self.wells[0], other.get_well(0)]))
+
+  def test_copy(self):
+    plate_copy = self.plate.copy()
+    well_copy = plate_copy.get_well(0)
+    assert plate_copy.volume_tracker is not None
+    self.assertIsNot(plate_copy.volume_tracker, self.tracker)
+    self.assertIs(well_copy.tracker, plate_copy.volume_tracker.trackers[0])
+    plate_copy.volume_tracker.remove_liquid(50, wells=[0])
+    self.assertEqual(well_copy.tracker.get_used_volume(), 0)
+    self.assertEqual(self.wells[0].tracker.get_used_volume(), 50)
@@ -1,15 +1,17 @@
 from __future__ import annotations
 
+import copy
 import itertools
 import json
 import logging
 import sys
-from typing import Any, Callable, Dict, List, Optional, cast
+import types
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, cast
 
 from .coordinate import Coordinate
 from .errors import ResourceNotFoundError
 from .rotation import Rotation
-from pylabrobot.serializer import serialize, deserialize
+from pylabrobot.serializer import deserialize, register_class, serialize
 from pylabrobot.utils.linalg import matrix_vector_multiply_3x3
 from pylabrobot.utils.object_parsing import find_subclass
 
@@ -27,6 +29,30 @@ WillUnassignResourceCallback = Callable[["Resource"], None]
 DidUnassignResourceCallback = Callable[["Resource"], None]
 ResourceDidUpdateState = Callable[[Dict[str, Any]], None]
 
+_RotationMatrix = List[List[float]]
+
+# State snapshots of resources in a tree, see `Resource.snapshot_all_state`.
+ResourceStateSnapshot = List[Tuple["Resource", Any]]
+
+# Attributes of Resource holding callbacks. When a resource tree is copied, only callbacks bound to
+# resources in the tree are copied.
+_CALLBACK_ATTRIBUTES = frozenset({
+  "_will_assign_resource_callbacks",
+  "_did_assign_resource_callbacks",
+  "_will_unassign_resource_callbacks",
+  "_did_unassign_resource_callbacks",
+  "_resource_state_updated_callbacks",
+})
+
+# Attributes of Resource holding caches, which are not copied.
+_CACHE_ATTRIBUTES = frozenset({"_absolute_rotation", "_absolute_location", "_rotated_size"})
+
+# Types of attribute values that are shared instead of copied when a resource tree is copied.
+_IMMUTABLE_TYPES = frozenset({type(None), bool, int, float, str, types.FunctionType})
+
+# Key in the `copy.deepcopy` memo holding the ids of the resources in the tree being copied.
+_COPIED_TREE_MEMO_KEY = "pylabrobot.resources.resource.copied_tree"
+
 
 class Resource:
   """ Base class for deck resources.
@@ -41,6 +67,27 @@ class Resource:
     category: The category of the resource, e.g. `tips`, `plate_carrier`, etc.
   """
 
+  # Subclasses of Resource by class name, used by `deserialize`. Cleared when a subclass is defined.
+  _subclasses_by_name: Dict[str, Optional[Type[Resource]]] = {}
+
+  def __init_subclass__(cls, **kwargs):
+    super().__init_subclass__(**kwargs)
+    Resource._subclasses_by_name.clear()
+    register_class(cls)
+
+  @staticmethod
+  def _find_subclass(class_name: str) -> Optional[Type[Resource]]:
+    """ Cached version of :func:`pylabrobot.utils.object_parsing.find_subclass` for Resource. """
+    if class_name not in Resource._subclasses_by_name:
+      subclass = find_subclass(class_name, cls=Resource)
+      if subclass is None:
+        # the subclass may be defined in a labware catalog that has not been imported yet
+        resources = sys.modules["pylabrobot.resources"]
+        if getattr(resources, class_name, None) is not None:
+          subclass = find_subclass(class_name, cls=Resource)
+      Resource._subclasses_by_name[class_name] = subclass
+    return Resource._subclasses_by_name[class_name]
+
   def __init__(
     self,
     name: str,
@@ -55,14 +102,23 @@ class Resource:
     self._size_x = size_x
     self._size_y = size_y
     self._size_z = size_z
-    self.rotation = rotation or Rotation()
+    self._rotation = rotation or Rotation()
     self.category = category
     self.model = model
 
-    self.location: Optional[Coordinate] = None
-    self.parent: Optional[Resource] = None
+    self._location: Optional[Coordinate] = None
+    self._parent: Optional[Resource] = None
     self.children: List[Resource] = []
 
+    # Caches for the world transform of this resource, see `_invalidate_absolute_location_cache`.
+    self._absolute_rotation: Optional[Tuple[Rotation, _RotationMatrix]] = None
+    self._absolute_location: Optional[Coordinate] = None
+    self._rotated_size: Optional[Tuple[Tuple[float, float, float], Tuple[float, float, float]]] = \
+      None
+    # Incremented on the root of the tree when a resource in the tree is moved or rotated, so that
+    # absolute locations kept outside of the tree, such as in a `ResourceIndex`, can be refreshed.
+    self._transform_version = 0
+
     self._will_assign_resource_callbacks: List[WillAssignResourceCallback] = []
     self._did_assign_resource_callbacks: List[DidAssignResourceCallback] = []
     self._will_unassign_resource_callbacks: List[WillUnassignResourceCallback] = []
@@ -101,6 +157,67 @@ class Resource:
       raise RuntimeError("Cannot change the name of a resource that is assigned.")
     self._name = name
 
+  @property
+  def location(self) -> Optional[Coordinate]:
+    """ The location of this resource, relative to its parent.
+
+    Absolute locations are cached, so assign a new :class:`Coordinate` to move a resource instead of
+    modifying the current one in place.
+    """
+    return self._location
+
+  @location.setter
+  def location(self, location: Optional[Coordinate]):
+    self._location = location
+    self._invalidate_absolute_location_cache()
+    self._bump_transform_version()
+
+  @property
+  def parent(self) -> Optional[Resource]:
+    """ The resource this resource is assigned to, or `None` if it is not assigned. """
+    return self._parent
+
+  @parent.setter
+  def parent(self, parent: Optional[Resource]):
+    self._parent = parent
+    self._invalidate_absolute_location_cache()
+
+  @property
+  def rotation(self) -> Rotation:
+    """ The rotation of this resource, relative to its parent.
+
+    Use :meth:`rotate` or assign a new :class:`Rotation` to rotate a resource instead of modifying
+    the current one in place.
+    """
+    return self._rotation
+
+  @rotation.setter
+  def rotation(self, rotation: Rotation):
+    self._rotation = rotation
+    self._invalidate_absolute_location_cache()
+    self._bump_transform_version()
+
+  def _bump_transform_version(self):
+    root = self
+    while root.parent is not None:
+      root = root.parent
+    root._transform_version += 1
+
+  def _invalidate_absolute_location_cache(self):
+    """ Clear the cached absolute location and rotation of this resource and all its descendants.
+
+    A resource only caches its world transform after its parent did, so if nothing is cached for
+    this resource, nothing is cached for its descendants either.
+    """
+
+    if self._absolute_rotation is None and self._absolute_location is None:
+      return
+    self._absolute_rotation = None
+    self._absolute_location = None
+    self._rotated_size = None
+    for child in self.children:
+      child._invalidate_absolute_location_cache() # pylint: disable=protected-access
+
   def __eq__(self, other):
     return (
       isinstance(other, Resource) and
@@ -179,11 +296,46 @@ class Resource:
 
     return Coordinate(x_, y_, z_)
 
+  def _get_absolute_rotation(self) -> Tuple[Rotation, _RotationMatrix]:
+    """ Get the cached absolute rotation of this resource and its rotation matrix. """
+
+    if self._absolute_rotation is None:
+      if self._parent is None:
+        rotation = Rotation(self._rotation.x, self._rotation.y, self._rotation.z)
+      else:
+        rotation = self._parent._get_absolute_rotation()[0] + self._rotation
+      self._absolute_rotation = (rotation, rotation.get_rotation_matrix())
+    return self._absolute_rotation
+
   def get_absolute_rotation(self) -> Rotation:
     """ Get the absolute rotation of this resource. """
     if self.parent is None:
       return self.rotation
-    return self.parent.get_absolute_rotation() + self.rotation
+    rotation = self._get_absolute_rotation()[0]
+    return Rotation(rotation.x, rotation.y, rotation.z)
+
+  def _get_absolute_location(self) -> Coordinate:
+    """ Get the cached absolute location of the left front bottom corner of this resource. Do not
+    modify the returned coordinate. """
+
+    if self._absolute_location is None:
+      assert self._location is not None, "Resource has no location."
+      if self._parent is None:
+        self._absolute_location = self._location
+      else:
+        self._absolute_location = self._compute_absolute_location(
+          self._location + self.get_anchor(x="l", y="f", z="b"))
+    return self._absolute_location
+
+  def _compute_absolute_location(self, local_location: Coordinate) -> Coordinate:
+    """ Transform a location relative to the parent of this resource to an absolute location. """
+    # pylint: disable=protected-access
+    assert self._parent is not None
+    parent_pos = self._parent._get_absolute_location()
+    parent_rotation_matrix = self._parent._get_absolute_rotation()[1]
+    rotated_position = Coordinate(*matrix_vector_multiply_3x3(parent_rotation_matrix,
+      local_location.vector()))
+    return parent_pos + rotated_position
 
   def get_absolute_location(self, x: str = "l", y: str = "f", z: str = "b") -> Coordinate:
     """ Get the absolute location of this resource, probably within the
@@ -199,15 +351,13 @@ class Resource:
     assert self.location is not None, "Resource has no location."
     if self.parent is None:
       return self.location
-    parent_pos = self.parent.get_absolute_location()
-    parent_rotation_matrix = self.parent.get_absolute_rotation().get_rotation_matrix()
-    local_vector = (self.location + self.get_anchor(x=x, y=y, z=z)).vector()
-    rotated_position = Coordinate(*matrix_vector_multiply_3x3(parent_rotation_matrix, local_vector))
-    return parent_pos + rotated_position
+    if x == "l" and y == "f" and z == "b":
+      location = self._get_absolute_location()
+      return Coordinate(location.x, location.y, location.z)
+    return self._compute_absolute_location(self.location + self.get_anchor(x=x, y=y, z=z))
 
   def _get_rotated_corners(self) -> List[Coordinate]:
-    absolute_rotation = self.get_absolute_rotation()
-    rot_mat = absolute_rotation.get_rotation_matrix()
+    rot_mat = self._get_absolute_rotation()[1]
     return [
       Coordinate(*matrix_vector_multiply_3x3(rot_mat, corner.vector()))
       for corner in [
@@ -222,17 +372,28 @@ class Resource:
       ]
     ]
 
+  def _get_rotated_size(self) -> Tuple[float, float, float]:
+    """ Get the size of the bounding box of this resource after rotation. The result is cached
+    until the rotation of this resource or one of its parents, or the size of this resource
+    changes. """
+
+    size = (self._size_x, self._size_y, self._size_z)
+    if self._rotated_size is None or self._rotated_size[0] != size:
+      rotated_corners = self._get_rotated_corners()
+      self._rotated_size = (size, (
+        max(c.x for c in rotated_corners) - min(c.x for c in rotated_corners),
+        max(c.y for c in rotated_corners) - min(c.y for c in rotated_corners),
+        max(c.z for c in rotated_corners) - min(c.z for c in rotated_corners)))
+    return self._rotated_size[1]
+
   def get_size_x(self) -> float:
-    rotated_corners = self._get_rotated_corners()
-    return max(c.x for c in rotated_corners) - min(c.x for c in rotated_corners)
+    return self._get_rotated_size()[0]
 
   def get_size_y(self) -> float:
-    rotated_corners = self._get_rotated_corners()
-    return max(c.y for c in rotated_corners) - min(c.y for c in rotated_corners)
+    return self._get_rotated_size()[1]
 
   def get_size_z(self) -> float:
-    rotated_corners = self._get_rotated_corners()
-    return max(c.z for c in rotated_corners) - min(c.z for c in rotated_corners)
+    return self._get_rotated_size()[2]
 
   def assign_child_resource(
     self,
@@ -376,14 +537,13 @@ class Resource:
       ValueError: If no resource with the given name exists.
     """
 
-    if self.name == name:
-      return self
-
-    for child in self.children:
-      try:
-        return child.get_resource(name)
-      except ResourceNotFoundError:
-        pass
+    # Depth first, in the same order as a recursive search, without recursion or exceptions.
+    stack = [self]
+    while len(stack) > 0:
+      resource = stack.pop()
+      if resource.name == name:
+        return resource
+      stack.extend(reversed(resource.children))
 
     raise ResourceNotFoundError(f"Resource with name '{name}' does not exist.")
 
@@ -393,10 +553,55 @@ class Resource:
     self.rotation.x = (self.rotation.x + x) % 360
     self.rotation.y = (self.rotation.y + y) % 360
     self.rotation.z = (self.rotation.z + z) % 360
+    self._invalidate_absolute_location_cache()
+    self._bump_transform_version()
 
   def copy(self) -> Self:
-    resource_copy = self.__class__.deserialize(self.serialize(), allow_marshal=True)
-    resource_copy.load_all_state(self.serialize_all_state())
+    """ Return a deep copy of this resource, its children and their state.
+
+    The copy is not assigned to a parent, but keeps the location of this resource. Resources outside
+    of this tree that are referenced by resources in the tree, such as the origin of a tip, are not
+    copied. Callbacks registered by objects outside of this tree, like a liquid handler or a
+    visualizer, are not copied either.
+    """
+
+    return copy.deepcopy(self)
+
+  def __deepcopy__(self, memo: Dict[Any, Any]) -> Self:
+    tree = memo.get(_COPIED_TREE_MEMO_KEY)
+    if tree is None: # this is the root of a tree being copied
+      memo[_COPIED_TREE_MEMO_KEY] = {id(r) for r in [self] + self.get_all_children()}
+      try:
+        return self._deepcopy_tree(memo)
+      finally:
+        # Resources copied later with the same memo, like the next plate in a list, are the root of
+        # a new tree.
+        del memo[_COPIED_TREE_MEMO_KEY]
+    if id(self) not in tree:
+      return self
+    return self._deepcopy_tree(memo)
+
+  def _deepcopy_tree(self, memo: Dict[Any, Any]) -> Self:
+    tree = memo[_COPIED_TREE_MEMO_KEY]
+    resource_copy = self.__class__.__new__(self.__class__)
+    memo[id(self)] = resource_copy
+    for key, value in self.__dict__.items():
+      if value.__class__ in _IMMUTABLE_TYPES:
+        pass
+      elif key in _CACHE_ATTRIBUTES:
+        value = None
+      elif key == "_location" and value.__class__ is Coordinate:
+        value = Coordinate(value.x, value.y, value.z)
+      elif key == "_rotation" and value.__class__ is Rotation:
+        value = Rotation(value.x, value.y, value.z)
+      elif key in _CALLBACK_ATTRIBUTES:
+        value = [copy.deepcopy(callback, memo) for callback in value
+          if id(getattr(callback, "__self__", None)) in tree]
+      elif key == "_parent" and id(value) not in tree:
+        value = None
+      else:
+        value = copy.deepcopy(value, memo)
+      resource_copy.__dict__[key] = value
     return resource_copy
 
   def rotated(self, x: float = 0, y: float = 0, z: float = 0) -> Self:
@@ -528,7 +733,7 @@ class Resource:
 
     data_copy = data.copy() # copy data because we will be modifying it
 
-    subclass = find_subclass(data["type"], cls=Resource)
+    subclass = Resource._find_subclass(data["type"])
     if subclass is None:
       raise ValueError(f'Could not find subclass with name "{data["type"]}"')
     assert issubclass(subclass, cls) # mypy does not know the type after the None check...
@@ -541,7 +746,7 @@ class Resource:
     resource.rotation = Rotation.deserialize(rotation) # not pretty, should be done in init.
 
     for child_data in children_data:
-      child_cls = find_subclass(child_data["type"], cls=Resource)
+      child_cls = Resource._find_subclass(child_data["type"])
       if child_cls is None:
         raise ValueError(f'Could not find subclass with name {child_data["type"]}')
       child = child_cls.deserialize(child_data, allow_marshal=allow_marshal)
@@ -649,6 +854,43 @@ class Resource:
       child.load_state(state[child.name])
       child.load_all_state(state)
 
+  # Developer note: by default, snapshots are serialized states. If you override `serialize_state`
+  # and `load_state`, you can override this method and `restore_state` with a faster version.
+  def snapshot_state(self) -> Any:
+    """ Take a snapshot of the state of this resource only, to restore with
+    :meth:`~Resource.restore_state`. Unlike serialized states, snapshots can only be restored to the
+    same resource. They must not be modified. """
+    return self.serialize_state()
+
+  def restore_state(self, snapshot: Any) -> None:
+    """ Restore the state of this resource only from a snapshot taken with
+    :meth:`~Resource.snapshot_state`. """
+    self.load_state(snapshot)
+
+  def snapshot_all_state(self) -> ResourceStateSnapshot:
+    """ Take a snapshot of the state of this resource and all children.
+
+    Snapshots are faster to take and restore than :meth:`~Resource.serialize_all_state` and
+    :meth:`~Resource.load_all_state`, because they share immutable data with the current state of
+    the resources instead of serializing it. The same snapshot can be restored many times, for
+    example to try different plans on the same deck.
+
+    Examples:
+      Restore the state of the deck after a dry run:
+
+      >>> snapshot = deck.snapshot_all_state()
+      >>> await lh.aspirate(...)
+      >>> deck.restore_all_state(snapshot)
+    """
+
+    return [(resource, resource.snapshot_state()) for resource in [self] + self.get_all_children()]
+
+  def restore_all_state(self, snapshot: ResourceStateSnapshot) -> None:
+    """ Restore the state of resources from a snapshot taken with
+    :meth:`~Resource.snapshot_all_state`. """
+    for resource, state in snapshot:
+      resource.restore_state(state)
+
   def save_state_to_file(self, fn: str, indent: Optional[int] = None):
     """ Save the state of this resource and all children to a JSON file.
 
@@ -0,0 +1,356 @@
+from __future__ import annotations
+
+import bisect
+import copy
+import heapq
+import math
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, TypeVar, cast
+
+from .coordinate import Coordinate
+from .resource import Resource
+
+
+T = TypeVar("T", bound=Resource)
+
+_Cell = Tuple[int, int]
+
+
+class ResourceIndex:
+  """ An index of the resources in a tree, for querying resources by type, name prefix, category
+  and absolute location without walking the tree.
+
+  The index is kept up to date with :meth:`add` and :meth:`remove`. A :class:`~pylabrobot.resources.
+  Deck` calls these from its resource assignment callbacks, so that `deck.index` always reflects
+  the resources on the deck.
+
+  Locations are absolute locations of the left front bottom of resources. They are kept in a grid of
+  square cells in the xy plane, so that resources near a location or within a box are found by only
+  looking at the cells around it. Moving or rotating a resource in the tree is noticed through a
+  counter on the root of the tree, after which the grid is rebuilt on the next spatial query.
+
+  Categories are indexed as they were when a resource was added.
+
+  Example:
+    >>> deck.index.query(Plate, name_prefix="plate_")
+    >>> deck.index.nearest(Coordinate(100, 100, 0), type_=TipSpot, k=8)
+  """
+
+  def __init__(self, root: Resource, cell_size: float = 20):
+    """ Initialize an index.
+
+    Args:
+      root: The resource whose descendants are indexed. Resources are not added automatically.
+      cell_size: The size in mm of the cells of the spatial grid.
+    """
+
+    if cell_size <= 0:
+      raise ValueError("cell_size must be positive.")
+
+    self.root = root
+    self.cell_size = cell_size
+
+    self._resources: Dict[str, Resource] = {}
+    # Resources are returned in the order they were added. This is the position of each resource.
+    self._order: Dict[str, int] = {}
+    self._next_order = 0
+    self._by_type: Dict[Type[Resource], Dict[str, Resource]] = {}
+    self._subtypes: Dict[Type[Resource], List[Type[Resource]]] = {}
+    self._by_category: Dict[Optional[str], Dict[str, Resource]] = {}
+    self._names: List[str] = [] # sorted, for prefix queries
+
+    # The spatial grid. `None` if it has to be (re)built before the next spatial query.
+    self._grid: Optional[Dict[_Cell, Dict[str, Resource]]] = None
+    self._locations: Dict[str, Tuple[_Cell, Coordinate]] = {}
+    self._bounds: Optional[Tuple[int, int, int, int]] = None # min x, min y, max x, max y cell
+    self._transform_version = -1
+    self._grid_was_current = False
+
+  def __len__(self) -> int:
+    return len(self._resources)
+
+  def __contains__(self, name: object) -> bool:
+    return name in self._resources
+
+  def __deepcopy__(self, memo: Dict[Any, Any]) -> ResourceIndex:
+    # The copied tree may be in a different place, so the copy rebuilds its grid when it is used.
+    index_copy = ResourceIndex.__new__(ResourceIndex)
+    memo[id(self)] = index_copy
+    for key, value in self.__dict__.items():
+      if key in {"_grid", "_bounds"}:
+        value = None
+      elif key in {"_locations", "_subtypes"}:
+        value = {}
+      else:
+        value = copy.deepcopy(value, memo)
+      index_copy.__dict__[key] = value
+    return index_copy
+
+  # Maintenance
+
+  def add(self, resource: Resource) -> None:
+    """ Add a resource, but not its children, to the index. """
+
+    name = resource.name
+    if name in self._resources:
+      self.remove(self._resources[name])
+
+    self._resources[name] = resource
+    self._order[name] = self._next_order
+    self._next_order += 1
+
+    type_ = type(resource)
+    if type_ not in self._by_type:
+      self._by_type[type_] = {}
+      self._subtypes.clear()
+    self._by_type[type_][name] = resource
+    self._by_category.setdefault(resource.category, {})[name] = resource
+    bisect.insort(self._names, name)
+
+    if self._grid is not None:
+      self._add_to_grid(resource)
+
+  def remove(self, resource: Resource) -> None:
+    """ Remove a resource, but not its children, from the index. Does nothing if the resource is not
+    in the index. """
+
+    name = resource.name
+    indexed = self._resources.get(name)
+    if indexed is not resource:
+      return
+
+    del self._resources[name]
+    del self._order[name]
+    del self._by_type[type(resource)][name]
+    for category, resources in self._by_category.items():
+      if resources.pop(name, None) is not None:
+        if len(resources) == 0:
+          del self._by_category[category]
+        break
+    del self._names[bisect.bisect_left(self._names, name)]
+
+    if self._grid is not None and name in self._locations:
+      cell, _ = self._locations.pop(name)
+      del self._grid[cell][name]
+      if len(self._grid[cell]) == 0:
+        del self._grid[cell]
+
+  def will_change(self) -> None:
+    """ Call before resources are assigned to or unassigned from the tree, and then call
+    :meth:`did_change` after the index is updated. Together they keep the spatial grid, which is
+    updated by :meth:`add` and :meth:`remove`, from being rebuilt because of the assignment. """
+
+    self._grid_was_current = self._grid is not None and \
+      self._transform_version == self._root_transform_version()
+
+  def did_change(self) -> None:
+    """ See :meth:`will_change`. """
+
+    if self._grid_was_current:
+      self._transform_version = self._root_transform_version()
+    else:
+      self._grid = None
+    self._grid_was_current = False
+
+  # Queries
+
+  def get(self, name: str) -> Optional[Resource]:
+    """ Return the resource with the given name, or `None`. """
+    return self._resources.get(name)
+
+  def by_type(self, type_: Type[T]) -> List[T]:
+    """ Return all resources that are instances of `type_`, including subclasses. """
+
+    types = self._matching_types(type_)
+    if len(types) == 1:
+      return cast(List[T], list(self._by_type[types[0]].values()))
+    return cast(List[T], self._sorted(r for t in types for r in self._by_type[t].values()))
+
+  def by_category(self, category: Optional[str]) -> List[Resource]:
+    """ Return all resources with the given category. """
+    return list(self._by_category.get(category, {}).values())
+
+  def by_name_prefix(self, prefix: str) -> List[Resource]:
+    """ Return all resources whose name starts with `prefix`. """
+    return self._sorted(self._resources[name] for name in self._names_with_prefix(prefix))
+
+  def query(
+    self,
+    type_: Type[T] = Resource, # type: ignore[assignment]
+    name_prefix: Optional[str] = None,
+    category: Optional[str] = None,
+    box: Optional[Tuple[Coordinate, Coordinate]] = None,
+  ) -> List[T]:
+    """ Return all resources that match all the given criteria, in the order they were added.
+
+    Starts from the smallest set of resources matching one criterion, and filters it by the others.
+
+    Args:
+      type_: The type of the resources, including subclasses.
+      name_prefix: A prefix of the names of the resources.
+      category: The category of the resources.
+      box: The minimum and maximum corner of a box in which the absolute location of the resources
+        must be (inclusive).
+    """
+
+    if box is not None and type_ is Resource and name_prefix is None and category is None:
+      return cast(List[T], self.within(*box))
+
+    options: List[Tuple[int, Callable[[], List[Resource]]]] = [
+      (sum(len(self._by_type[t]) for t in self._matching_types(type_)),
+       lambda: self.by_type(type_))]
+    if category is not None:
+      options.append((len(self._by_category.get(category, {})), lambda: self.by_category(category)))
+    if name_prefix is not None:
+      names = self._names_with_prefix(name_prefix)
+      options.append((len(names), lambda: self._sorted(self._resources[n] for n in names)))
+    _, get_candidates = min(options, key=lambda option: option[0])
+
+    result = [r for r in get_candidates()
+      if isinstance(r, type_) and
+        (category is None or r.category == category) and
+        (name_prefix is None or r.name.startswith(name_prefix))]
+    if box is not None:
+      self._ensure_grid()
+      result = [r for r in result if r.name in self._locations and
+                self._in_box(self._locations[r.name][1], *box)]
+    return cast(List[T], result)
+
+  def within(self, min_corner: Coordinate, max_corner: Coordinate,
+             type_: Type[T] = Resource # type: ignore[assignment]
+             ) -> List[T]:
+    """ Return the resources whose absolute location is within the box between `min_corner` and
+    `max_corner` (inclusive), in the order they were added. """
+
+    grid = self._ensure_grid()
+    if self._bounds is None:
+      return []
+    min_x, min_y, max_x, max_y = self._bounds
+    lo_x, lo_y = self._cell(min_corner)
+    hi_x, hi_y = self._cell(max_corner)
+    found = []
+    for cx in range(max(lo_x, min_x), min(hi_x, max_x) + 1):
+      for cy in range(max(lo_y, min_y), min(hi_y, max_y) + 1):
+        for name, resource in grid.get((cx, cy), {}).items():
+          if isinstance(resource, type_) and \
+            self._in_box(self._locations[name][1], min_corner, max_corner):
+            found.append(resource)
+    return cast(List[T], self._sorted(found))
+
+  def nearest(
+    self,
+    location: Coordinate,
+    type_: Type[T] = Resource, # type: ignore[assignment]
+    k: int = 1,
+    max_distance: float = math.inf,
+  ) -> List[T]:
+    """ Return the `k` resources whose absolute locations are closest to `location`, nearest first.
+
+    Args:
+      location: The absolute location to search around.
+      type_: Only return resources of this type, including subclasses.
+      k: The maximum number of resources to return.
+      max_distance: Only return resources within this distance in mm.
+    """
+
+    grid = self._ensure_grid()
+    if self._bounds is None or k < 1:
+      return []
+    min_x, min_y, max_x, max_y = self._bounds
+    cx, cy = self._cell(location)
+    max_ring = max(cx - min_x, max_x - cx, cy - min_y, max_y - cy)
+
+    # max heap of the k nearest so far, as (-distance, -order, name)
+    nearest: List[Tuple[float, int, str]] = []
+    ring = 0
+    while ring <= max_ring:
+      for cell in self._ring(cx, cy, ring):
+        for name, resource in grid.get(cell, {}).items():
+          if not isinstance(resource, type_):
+            continue
+          distance = self._distance(self._locations[name][1], location)
+          if distance > max_distance:
+            continue
+          item = (-distance, -self._order[name], name)
+          if len(nearest) < k:
+            heapq.heappush(nearest, item)
+          elif item > nearest[0]:
+            heapq.heapreplace(nearest, item)
+      # Cells outside the rings searched so far are at least `ring * cell_size` away.
+      searched = ring * self.cell_size
+      if searched >= max_distance or (len(nearest) == k and -nearest[0][0] <= searched):
+        break
+      ring += 1
+
+    return [cast(T, self._resources[name]) for _, _, name in sorted(nearest, reverse=True)]
+
+  # Helpers
+
+  def _matching_types(self, type_: Type[Resource]) -> List[Type[Resource]]:
+    if type_ not in self._subtypes:
+      self._subtypes[type_] = [t for t in self._by_type if issubclass(t, type_)]
+    return self._subtypes[type_]
+
+  def _names_with_prefix(self, prefix: str) -> List[str]:
+    lo = bisect.bisect_left(self._names, prefix)
+    hi = lo
+    while hi < len(self._names) and self._names[hi].startswith(prefix):
+      hi += 1
+    return self._names[lo:hi]
+
+  def _sorted(self, resources: Iterable[Resource]) -> List[Resource]:
+    return sorted(resources, key=lambda r: self._order[r.name])
+
+  def _root_transform_version(self) -> int:
+    root = self.root
+    while root.parent is not None:
+      root = root.parent
+    return root._transform_version # pylint: disable=protected-access
+
+  def _cell(self, location: Coordinate) -> _Cell:
+    return (math.floor(location.x / self.cell_size), math.floor(location.y / self.cell_size))
+
+  @staticmethod
+  def _ring(cx: int, cy: int, ring: int) -> Iterable[_Cell]:
+    if ring == 0:
+      return [(cx, cy)]
+    cells = [(x, y) for x in range(cx - ring, cx + ring + 1) for y in (cy - ring, cy + ring)]
+    cells += [(x, y) for x in (cx - ring, cx + ring) for y in range(cy - ring + 1, cy + ring)]
+    return cells
+
+  @staticmethod
+  def _in_box(location: Coordinate, min_corner: Coordinate, max_corner: Coordinate) -> bool:
+    return min_corner.x <= location.x <= max_corner.x and \
+      min_corner.y <= location.y <= max_corner.y and \
+      min_corner.z <= location.z <= max_corner.z
+
+  @staticmethod
+  def _distance(a: Coordinate, b: Coordinate) -> float:
+    return math.sqrt((a.x - b.x) ** 2 + (a.y - b.y) ** 2 + (a.z - b.z) ** 2)
+
+  def _add_to_grid(self, resource: Resource) -> None:
+    assert self._grid is not None
+    if resource.location is None:
+      return
+    location = resource.get_absolute_location()
+    cell = self._cell(location)
+    self._grid.setdefault(cell, {})[resource.name] = resource
+    self._locations[resource.name] = (cell, location)
+    if self._bounds is None:
+      self._bounds = (cell[0], cell[1], cell[0], cell[1])
+    else:
+      min_x, min_y, max_x, max_y = self._bounds
+      self._bounds = (min(min_x, cell[0]), min(min_y, cell[1]),
+                      max(max_x, cell[0]), max(max_y, cell[1]))
+
+  def _ensure_grid(self) -> Dict[_Cell, Dict[str, Resource]]:
+    """ Return the spatial grid, (re)building it if resources were moved since it was built. """
+
+    version = self._root_transform_version()
+    if self._grid is None or self._transform_version != version:
+      self._grid = {}
+      self._locations = {}
+      self._bounds = None
+      for resource in self._resources.values():
+        self._add_to_grid(resource)
+      self._transform_version = version
+    return self._grid
@@ -0,0 +1,125 @@
+import copy
+import unittest
+
+from pylabrobot.resources import (
+  Coordinate,
+  Deck,
+  Plate,
+  Resource,
+  Well,
+  create_ordered_items_2d,
+)
+from pylabrobot.resources.resource_index import ResourceIndex
+
+
+def make_plate(name: str) -> Plate:
+  return Plate(name, size_x=127, size_y=85, size_z=14,
+    ordered_items=create_ordered_items_2d(Well,
+      num_items_x=2, num_items_y=2,
+      dx=10, dy=7, dz=1,
+      item_dx=9, item_dy=9,
+      size_x=8, size_y=8, size_z=10))
+
+
+class ResourceIndexTests(unittest.TestCase):
+  """ Tests for the resource index of a deck. """
+
+  def setUp(self):
+    super().setUp()
+    self.deck = Deck()
+    self.p1 = make_plate("p1")
+    self.p2 = make_plate("p2")
+    self.other = Resource("other", size_x=10, size_y=10, size_z=10, category="waste")
+    self.deck.assign_child_resource(self.p1, location=Coordinate(0, 0, 0))
+    self.deck.assign_child_resource(self.p2, location=Coordinate(200, 0, 0))
+    self.deck.assign_child_resource(self.other, location=Coordinate(400, 100, 0))
+
+  def test_add_children(self):
+    self.assertEqual(len(self.deck.index), 11)
+    self.assertIn("p1_well_0_0", self.deck.index)
+    self.assertIs(self.deck.index.get("p2_well_1_1"), self.p2.get_item("B2"))
+
+  def test_by_type(self):
+    self.assertEqual(self.deck.index.by_type(Plate), [self.p1, self.p2])
+    self.assertEqual(len(self.deck.index.by_type(Well)), 8)
+    self.assertEqual(len(self.deck.index.by_type(Resource)), 11) # subclasses
+
+  def test_by_category(self):
+    self.assertEqual(self.deck.index.by_category("waste"), [self.other])
+    self.assertEqual(self.deck.index.by_category("plate"), [self.p1, self.p2])
+    self.assertEqual(self.deck.index.by_category("nothing"), [])
+
+  def test_by_name_prefix(self):
+    self.assertEqual([r.name for r in self.deck.index.by_name_prefix("p2_well_1")],
+                     ["p2_well_1_0", "p2_well_1_1"])
+    self.assertEqual(len(self.deck.index.by_name_prefix("p")), 10)
+    self.assertEqual(self.deck.index.by_name_prefix("x"), [])
+
+  def test_query(self):
+    self.assertEqual(self.deck.index.query(Plate, name_prefix="p2"), [self.p2])
+    self.assertEqual(self.deck.index.query(Well, category="plate"), [])
+    self.assertEqual(self.deck.index.query(category="waste"), [self.other])
+    wells = self.deck.index.query(Well, box=(Coordinate(0, 0, 0), Coordinate(15, 100, 100)))
+    self.assertEqual([w.name for w in wells], ["p1_well_0_0", "p1_well_0_1"])
+    self.assertEqual(self.deck.index.query(box=(Coordinate(390, 90, 0), Coordinate(410, 110, 0))),
+                     [self.other])
+
+  def test_within(self):
+    self.assertEqual(self.deck.index.within(Coordinate(200, 0, 0), Coordinate(220, 20, 0)),
+                     [self.p2])
+    wells = self.deck.index.within(Coordinate(200, 0, 0), Coordinate(215, 20, 10), type_=Well)
+    self.assertEqual([w.name for w in wells], ["p2_well_0_0", "p2_well_0_1"])
+    self.assertEqual(self.deck.index.within(Coordinate(-100, -100, 0), Coordinate(-1, -1, 0)), [])
+
+  def test_nearest(self):
+    self.assertEqual(self.deck.index.nearest(Coordinate(390, 90, 0)), [self.other])
+    wells = self.deck.index.nearest(Coordinate(209, 7, 1), type_=Well, k=2)
+    self.assertEqual([w.name for w in wells], ["p2_well_0_1", "p2_well_0_0"])
+    self.assertEqual(len(self.deck.index.nearest(Coordinate(0, 0, 0), k=100)), 11)
+    self.assertEqual(self.deck.index.nearest(Coordinate(1000, 1000, 0), max_distance=100), [])
+
+  def test_unassign(self):
+    self.deck.unassign_child_resource(self.p1)
+    self.assertNotIn("p1_well_0_0", self.deck.index)
+    self.assertEqual(self.deck.index.by_type(Plate), [self.p2])
+    self.assertEqual(self.deck.index.within(Coordinate(0, 0, 0), Coordinate(20, 20, 20)), [])
+    self.assertEqual(self.deck.index.by_name_prefix("p1"), [])
+
+  def test_assign_keeps_grid(self):
+    self.deck.index.nearest(Coordinate(0, 0, 0)) # build the grid
+    p3 = make_plate("p3")
+    self.deck.assign_child_resource(p3, location=Coordinate(0, 200, 0))
+    self.assertIsNotNone(self.deck.index._grid) # pylint: disable=protected-access
+    self.assertEqual(self.deck.index.nearest(Coordinate(0, 200, 0)), [p3])
+
+  def test_move(self):
+    self.assertEqual(self.deck.index.nearest(Coordinate(400, 100, 0)), [self.other])
+    self.other.location = Coordinate(600, 100, 0)
+    self.assertEqual(self.deck.index.nearest(Coordinate(600, 100, 0)), [self.other])
+    self.assertEqual(self.deck.index.within(Coordinate(390, 90, 0), Coordinate(410, 110, 0)), [])
+
+    # moving a parent moves its children
+    self.p2.location = Coordinate(300, 0, 0)
+    wells = self.deck.index.within(Coordinate(300, 0, 0), Coordinate(315, 20, 10), type_=Well)
+    self.assertEqual([w.name for w in wells], ["p2_well_0_0", "p2_well_0_1"])
+
+  def test_copy(self):
+    deck_copy = copy.deepcopy(self.deck)
+    plate = deck_copy.index.nearest(Coordinate(200, 0, 0), type_=Plate)[0]
+    self.assertIsNot(plate, self.p2)
+    self.assertIs(plate, deck_copy.get_resource("p2"))
+
+    deck_copy.unassign_child_resource(plate)
+    self.assertNotIn("p2", deck_copy.index)
+    self.assertIn("p2", self.deck.index)
+
+  def test_resource_tree(self):
+    root = Resource("root", size_x=100, size_y=100, size_z=10)
+    root.location = Coordinate.zero()
+    index = ResourceIndex(root)
+    plate = make_plate("plate")
+    root.assign_child_resource(plate, location=Coordinate(10, 10, 0))
+    index.add(plate)
+    self.assertEqual(index.nearest(Coordinate(0, 0, 0)), [plate])
+    index.remove(plate)
+    self.assertEqual(len(index), 0)
@@ -1,6 +1,7 @@
 """ Tests for Resource """
 # pylint: disable=missing-class-docstring
 
+import copy
 import math
 import unittest
 import unittest.mock
@@ -227,6 +228,67 @@ class TestResource(unittest.TestCase):
     r.assign_child_resource(c, location=Coordinate.zero())
     self.assertEqual(Resource.deserialize(r.serialize()), r)
 
+  def test_deserialize_subclass_defined_later(self):
+    data = {**Resource("test", size_x=10, size_y=10, size_z=10).serialize(), "type": "LateResource"}
+    with self.assertRaises(ValueError):
+      Resource.deserialize(data)
+
+    class LateResource(Resource):
+      pass
+
+    self.assertIsInstance(Resource.deserialize(data), LateResource)
+
+  def test_copy(self):
+    deck = Deck()
+    parent = Resource("parent", size_x=10, size_y=10, size_z=10)
+    deck.assign_child_resource(parent, location=Coordinate(10, 10, 10))
+    child = Resource("child", size_x=5, size_y=5, size_z=5)
+    parent.assign_child_resource(child, location=Coordinate(5, 5, 5))
+    state_callback = unittest.mock.Mock()
+    child.register_state_update_callback(state_callback)
+
+    parent_copy = parent.copy()
+    self.assertEqual(parent_copy, parent)
+    self.assertIsNone(parent_copy.parent)
+    child_copy = parent_copy.children[0]
+    self.assertIsNot(child_copy, child)
+    self.assertIs(child_copy.parent, parent_copy)
+    self.assertEqual(child_copy.get_absolute_location(), Coordinate(15, 15, 15))
+    self.assertEqual(child_copy._resource_state_updated_callbacks, []) # pylint: disable=protected-access
+
+    # callbacks within the copied tree are copied
+    did_assign = unittest.mock.Mock()
+    parent_copy.register_did_assign_resource_callback(did_assign)
+    grandchild = Resource("grandchild", size_x=1, size_y=1, size_z=1)
+    child_copy.assign_child_resource(grandchild, location=Coordinate.zero())
+    did_assign.assert_called_once_with(grandchild)
+    self.assertEqual(child.children, [])
+
+  def test_deepcopy_independent_resources(self):
+    plate_a = Resource("plate_a", size_x=10, size_y=10, size_z=10)
+    plate_b = Resource("plate_b", size_x=10, size_y=10, size_z=10)
+    child = Resource("child", size_x=5, size_y=5, size_z=5)
+    plate_b.assign_child_resource(child, location=Coordinate.zero())
+
+    a_copy, b_copy = copy.deepcopy([plate_a, plate_b])
+    self.assertIsNot(a_copy, plate_a)
+    self.assertIsNot(b_copy, plate_b)
+    self.assertIsNot(b_copy.children[0], child)
+    self.assertIs(b_copy.children[0].parent, b_copy)
+
+    copies = copy.deepcopy({"x": plate_a, "y": plate_b, "child": child})
+    self.assertIsNot(copies["y"], plate_b)
+    self.assertIs(copies["child"], copies["y"].children[0])
+
+  def test_snapshot_all_state(self):
+    resource = Resource("resource", size_x=10, size_y=10, size_z=10)
+    with unittest.mock.patch.object(Resource, "serialize_state", return_value={"a": 1}), \
+        unittest.mock.patch.object(Resource, "load_state") as load_state:
+      snapshot = resource.snapshot_all_state()
+      resource.restore_all_state(snapshot)
+    self.assertEqual(snapshot, [(resource, {"a": 1})])
+    load_state.assert_called_once_with({"a": 1})
+
   def test_get_center_offsets(self):
     r = Resource("test", size_x=10, size_y=120, size_z=10)
     self.assertEqual(r.centers(), [Coordinate(5.0, 60, 5.0)])
@@ -297,6 +359,39 @@ class TestResource(unittest.TestCase):
     self.assertAlmostEqual(r.get_size_y(), 100)
     self.assertEqual(c.get_absolute_location(), Coordinate(20, 10, 10))
 
+  def test_absolute_location_updated_on_tree_changes(self):
+    deck = Deck()
+    parent = Resource("parent", size_x=10, size_y=10, size_z=10)
+    deck.assign_child_resource(parent, location=Coordinate(10, 10, 10))
+    child = Resource("child", size_x=5, size_y=5, size_z=5)
+    parent.assign_child_resource(child, location=Coordinate(5, 5, 5))
+    grandchild = Resource("grandchild", size_x=1, size_y=1, size_z=1)
+    child.assign_child_resource(grandchild, location=Coordinate(1, 1, 1))
+    self.assertEqual(grandchild.get_absolute_location(), Coordinate(16, 16, 16))
+
+    parent.location = Coordinate(20, 20, 20)
+    self.assertEqual(grandchild.get_absolute_location(), Coordinate(26, 26, 26))
+
+    child.unassign()
+    deck.assign_child_resource(child, location=Coordinate(100, 0, 0))
+    self.assertEqual(grandchild.get_absolute_location(), Coordinate(101, 1, 1))
+    self.assertEqual(grandchild.get_absolute_location(x="r", y="b", z="t"), Coordinate(102, 2, 2))
+
+    child.rotate(z=90)
+    self.assertEqual(grandchild.get_absolute_location(), Coordinate(99, 1, 1))
+    self.assertAlmostEqual(grandchild.get_absolute_rotation().z, 90)
+    child.rotation = Rotation()
+    self.assertEqual(grandchild.get_absolute_location(), Coordinate(101, 1, 1))
+    self.assertEqual(grandchild.get_absolute_rotation().z, 0)
+
+  def test_absolute_location_is_a_copy(self):
+    deck = Deck()
+    parent = Resource("parent", size_x=10, size_y=10, size_z=10)
+    deck.assign_child_resource(parent, location=Coordinate(10, 10, 10))
+    location = parent.get_absolute_location()
+    location.x = 0
+    self.assertEqual(parent.get_absolute_location(), Coordinate(10, 10, 10))
+
 class TestResourceCallback(unittest.TestCase):
   def setUp(self) -> None:
     super().setUp()
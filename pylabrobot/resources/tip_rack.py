@@ -4,7 +4,7 @@ from abc import ABCMeta
 from typing import Any, Dict, List, Union, Optional, Sequence, cast
 
 from pylabrobot.resources.tip import Tip, TipCreator
-from pylabrobot.resources.tip_tracker import TipTracker, does_tip_tracking
+from pylabrobot.resources.tip_tracker import TipTracker, TipTrackerSnapshot, does_tip_tracking
 from pylabrobot.serializer import deserialize
 
 from .itemized_resource import ItemizedResource
@@ -83,6 +83,12 @@ class TipSpot(Resource):
   def load_state(self, state: Dict[str, Any]):
     self.tracker.load_state(state)
 
+  def snapshot_state(self) -> TipTrackerSnapshot:
+    return self.tracker.snapshot()
+
+  def restore_state(self, snapshot: TipTrackerSnapshot):
+    self.tracker.restore(snapshot)
+
 
 class TipRack(ItemizedResource[TipSpot], metaclass=ABCMeta):
   """ Tip rack for disposable tips. """
@@ -1,11 +1,13 @@
 import contextlib
+import copy
 import sys
-from typing import Callable, Optional, TYPE_CHECKING, cast
+from typing import Callable, Optional, Tuple, TYPE_CHECKING, cast
 
 from pylabrobot.resources.errors import HasTipError, NoTipError
 from pylabrobot.serializer import deserialize
 
 from pylabrobot.resources.tip import Tip
+from pylabrobot.resources.volume_tracker import VolumeTracker, VolumeTrackerSnapshot
 if TYPE_CHECKING:
   from pylabrobot.resources.tip_rack import TipSpot
 
@@ -28,6 +30,8 @@ def no_tip_tracking():
 
 
 TrackerCallback = Callable[[], None]
+_TipSnapshot = Optional[Tuple[Tip, VolumeTrackerSnapshot]]
+TipTrackerSnapshot = Tuple[_TipSnapshot, _TipSnapshot, Optional["TipSpot"]]
 
 
 class TipTracker:
@@ -130,6 +134,42 @@ class TipTracker:
     self._tip = cast(Optional[Tip], deserialize(state.get("tip")))
     self._pending_tip = cast(Optional[Tip], deserialize(state.get("pending_tip")))
 
+  def snapshot(self) -> TipTrackerSnapshot:
+    """ Take an immutable snapshot of the state of the tracker, to restore with `restore`. """
+
+    def snapshot_tip(tip: Optional[Tip]) -> _TipSnapshot:
+      return (tip, tip.tracker.snapshot()) if tip is not None else None
+
+    return (snapshot_tip(self._tip), snapshot_tip(self._pending_tip), self._tip_origin)
+
+  def restore(self, snapshot: TipTrackerSnapshot) -> None:
+    """ Restore the state of the tip tracker from a snapshot taken with `snapshot`.
+
+    Tips are shared with the snapshot while they stay in this tracker. Tips that have been moved
+    elsewhere since the snapshot was taken are copied when they are restored, so that they are not
+    shared with their new owner.
+    """
+
+    tip, pending_tip, origin = snapshot
+
+    def restore_tip(tip_snapshot: _TipSnapshot) -> Optional[Tip]:
+      if tip_snapshot is None:
+        return None
+      tip, tip_state = tip_snapshot
+      if tip is not self._tip and tip is not self._pending_tip:
+        tip = copy.copy(tip)
+        tip.tracker = VolumeTracker(max_volume=tip.maximal_volume)
+      tip.tracker.restore(tip_state)
+      return tip
+
+    restored_tip = restore_tip(tip)
+    if pending_tip is not None and tip is not None and pending_tip[0] is tip[0]:
+      self._pending_tip = restored_tip
+    else:
+      self._pending_tip = restore_tip(pending_tip)
+    self._tip = restored_tip
+    self._tip_origin = origin
+
   def get_tip_origin(self) -> Optional["TipSpot"]:
     """ Get the origin of the current tip, if known. """
     return self._tip_origin
@@ -33,3 +33,21 @@ class TestTipTracker(unittest.TestCase):
 
     with self.assertRaises(NoTipError):
       tracker.get_tip()
+
+  def test_snapshot(self):
+    tracker = TipTracker(thing="tester")
+    tracker.add_tip(self.tip)
+    snapshot = tracker.snapshot()
+    tracker.restore(snapshot)
+    self.assertIs(tracker.get_tip(), self.tip)
+
+    tracker.remove_tip(commit=True)
+    self.tip.tracker.add_liquid(liquid=None, volume=5) # the tip is used elsewhere
+    tracker.restore(snapshot)
+    self.assertTrue(tracker.has_tip)
+    self.assertIsNot(tracker.get_tip(), self.tip)
+    self.assertEqual(tracker.get_tip().tracker.get_used_volume(), 0)
+    self.assertEqual(self.tip.tracker.get_used_volume(), 5)
+
+    tracker.restore(TipTracker(thing="empty").snapshot())
+    self.assertFalse(tracker.has_tip)
@@ -1,9 +1,9 @@
 import re
-from string import ascii_uppercase as LETTERS
 from typing import Dict, List, Optional, Type, TypeVar
 
 from pylabrobot.resources.coordinate import Coordinate
 from pylabrobot.resources.resource import Resource
+from pylabrobot.utils.positions import row_label
 
 T = TypeVar("T", bound=Resource)
 
@@ -153,7 +153,7 @@ def create_ordered_items_2d(
     item_dx=item_dx, item_dy=item_dy,
     **kwargs
   )
-  keys = [f"{LETTERS[j]}{i+1}" for i in range(num_items_x) for j in range(num_items_y)]
+  keys = [f"{row_label(j)}{i+1}" for i in range(num_items_x) for j in range(num_items_y)]
   return dict(zip(keys, [item for sublist in items for item in sublist]))
 
 
@@ -168,6 +168,9 @@ def query(
 ) -> List[U]:
   """ Query resources based on their attributes.
 
+  Children of resources that do not match are not searched. To find resources anywhere on a deck,
+  use the deck's :attr:`~pylabrobot.resources.Deck.index`, which does not walk the tree.
+
   Args:
     root: The root resource to search
     type_: The type of resources to search for
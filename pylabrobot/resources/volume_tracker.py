@@ -1,7 +1,7 @@
 import contextlib
 import copy
 import sys
-from typing import Callable, List, Tuple, Optional, cast
+from typing import Callable, FrozenSet, List, Tuple, Optional, cast
 
 from pylabrobot.resources.errors import TooLittleLiquidError, TooLittleVolumeError
 from pylabrobot.resources.liquid import Liquid
@@ -46,6 +46,11 @@ def no_cross_contamination_tracking():
   this.cross_contamination_tracking_enabled = old_value # type: ignore
 
 VolumeTrackerCallback = Callable[[], None]
+VolumeTrackerSnapshot = Tuple[
+  Tuple[Tuple[Optional[Liquid], float], ...],
+  Tuple[Tuple[Optional[Liquid], float], ...],
+  FrozenSet[Liquid]
+]
 
 
 class VolumeTracker:
@@ -229,5 +234,27 @@ class VolumeTracker:
     if not self.is_cross_contamination_tracking_disabled:
       self.liquid_history = set(state["liquid_history"])
 
+  def __deepcopy__(self, memo) -> "VolumeTracker":
+    # Liquid entries are immutable tuples, so they can be shared between copies.
+    tracker = self.__class__.__new__(self.__class__)
+    memo[id(self)] = tracker
+    tracker.__dict__.update(self.__dict__)
+    tracker.liquids = list(self.liquids)
+    tracker.pending_liquids = list(self.pending_liquids)
+    tracker.liquid_history = set(self.liquid_history)
+    tracker._callback = copy.deepcopy(self._callback, memo)
+    return tracker
+
+  def snapshot(self) -> VolumeTrackerSnapshot:
+    """ Take an immutable snapshot of the state of the tracker, to restore with `restore`. """
+    return (tuple(self.liquids), tuple(self.pending_liquids), frozenset(self.liquid_history))
+
+  def restore(self, snapshot: VolumeTrackerSnapshot) -> None:
+    """ Restore the state of the volume tracker from a snapshot taken with `snapshot`. """
+    liquids, pending_liquids, liquid_history = snapshot
+    self.liquids = list(liquids)
+    self.pending_liquids = list(pending_liquids)
+    self.liquid_history = set(liquid_history)
+
   def register_callback(self, callback: VolumeTrackerCallback) -> None:
     self._callback = callback
@@ -61,3 +61,22 @@ class TestVolumeTracker(unittest.TestCase):
 
     with self.assertRaises(TooLittleLiquidError):
       tracker.get_liquids(top_volume=600)
+
+  def test_snapshot(self):
+    tracker = VolumeTracker(max_volume=200)
+    tracker.add_liquid(liquid=Liquid.WATER, volume=60)
+    tracker.commit()
+    snapshot = tracker.snapshot()
+
+    tracker.remove_liquid(volume=20)
+    tracker.add_liquid(liquid=Liquid.ETHANOL, volume=10)
+    tracker.commit()
+    self.assertEqual(tracker.get_used_volume(), 50)
+
+    for _ in range(2): # a snapshot can be restored more than once
+      tracker.restore(snapshot)
+      self.assertEqual(tracker.liquids, [(Liquid.WATER, 60)])
+      self.assertEqual(tracker.pending_liquids, [(Liquid.WATER, 60)])
+      self.assertEqual(tracker.liquid_history, {Liquid.WATER})
+      tracker.remove_liquid(volume=60)
+      tracker.commit()
@@ -1,12 +1,10 @@
 # similar library: https://github.com/janelia-pypi/mettler_toledo_device_python
 
-import asyncio
-import time
 from typing import List, Literal, Optional, Union
 
 import logging
-import serial # type: ignore
 
+from pylabrobot.machines.backends.transport import SerialTransport
 from pylabrobot.scales.scale_backend import ScaleBackend
 
 
@@ -129,18 +127,19 @@ class MettlerToledoWXS205SDU(ScaleBackend):
 
   def __init__(self, port: str) -> None:
     self.port = port
-    self.ser: Optional[serial.Serial] = None
+    self.io: Optional[SerialTransport] = None
 
   async def setup(self) -> None:
-    self.ser = serial.Serial(self.port, baudrate=9600, timeout=1)
+    self.io = SerialTransport(self.port, baudrate=9600)
+    await self.io.setup()
 
     # set output unit to grams
     await self.send_command("M21 0 0")
 
   async def stop(self) -> None:
-    if self.ser is not None:
-      self.ser.close()
-      self.ser = None
+    if self.io is not None:
+      await self.io.stop()
+      self.io = None
 
   def serialize(self) -> dict:
     return {**super().serialize(), "port": self.port}
@@ -152,21 +151,14 @@ class MettlerToledoWXS205SDU(ScaleBackend):
       timeout: The timeout in seconds.
     """
 
-    if self.ser is None:
+    if self.io is None:
       raise RuntimeError("Call scale.setup() before sending commands.")
 
-    self.ser.write(command.encode() + b"\r\n")
     logger.debug("[scale] Sent command: %s", command)
-
-    raw_response = b""
-    timeout_time = time.time() + timeout
-    while True:
-      raw_response = self.ser.readline()
-      await asyncio.sleep(0.001)
-      if time.time() > timeout_time:
-        raise TimeoutError("Timeout while waiting for response from scale.")
-      if raw_response != b"":
-        break
+    try:
+      raw_response = await self.io.send_command(command.encode() + b"\r\n", timeout=timeout)
+    except TimeoutError as e:
+      raise TimeoutError("Timeout while waiting for response from scale.") from e
     logger.debug("[scale] Received response: %s", raw_response)
     response = raw_response.decode("utf-8").strip().split()
 
@@ -260,7 +252,7 @@ class MettlerToledoWXS205SDU(ScaleBackend):
         timeout (in seconds).
     """
 
-    if self.ser is None:
+    if self.io is None:
       raise RuntimeError("Call scale.setup() before sending commands.")
 
     if timeout == "stable":
@@ -5,7 +5,7 @@ import inspect
 import marshal
 import sys
 import types
-from typing import Any, Dict, List, Union, cast
+from typing import Any, Dict, List, Optional, Set, TypeVar, Union, cast
 
 if sys.version_info >= (3, 10):
   from typing import TypeAlias
@@ -16,13 +16,83 @@ else:
 JSON: TypeAlias = Union[Dict[str, "JSON"], List["JSON"], str, int, float, bool, None]
 
 
-def get_plr_class_from_string(klass_type: str):
+T = TypeVar("T", bound=type)
+
+# Classes that can be deserialized by name, in addition to the classes exported by
+# `pylabrobot.resources` and `pylabrobot.liquid_handling`. `_registered_version` is incremented
+# whenever a class is registered, which includes every new subclass of Resource.
+_registered_classes: Dict[str, type] = {}
+_registered_version = 0
+
+# Classes exported by `pylabrobot.resources` and `pylabrobot.liquid_handling`, by name, and names
+# that are not exported. Built on the first lookup and rebuilt when a class was registered since.
+_module_classes: Dict[str, type] = {}
+_not_exported: Set[str] = set()
+_module_classes_version: Optional[int] = None
+
+
+def register_class(klass: T, name: Optional[str] = None) -> T:
+  """ Register a class so that it can be deserialized by name. Can be used as a decorator.
+
+  Classes exported by `pylabrobot.resources` and `pylabrobot.liquid_handling` do not have to be
+  registered, and take precedence over registered classes with the same name. Subclasses of
+  :class:`~pylabrobot.resources.Resource` are registered automatically.
+
+  Args:
+    klass: The class to register.
+    name: The name to register the class under. Defaults to the name of the class.
+  """
+
+  global _registered_version # pylint: disable=global-statement
+  _registered_classes[name or klass.__name__] = klass
+  _registered_version += 1
+  return klass
+
+
+def _exporting_modules() -> List[types.ModuleType]:
   # pylint: disable=import-outside-toplevel, cyclic-import
   import pylabrobot.resources as resource_module
   import pylabrobot.liquid_handling as lh_module
-  for name, obj in inspect.getmembers(resource_module) + inspect.getmembers(lh_module):
-    if inspect.isclass(obj) and name == klass_type:
-      return obj
+  return [resource_module, lh_module] # earlier modules take precedence
+
+
+def _get_module_classes() -> Dict[str, type]:
+  classes: Dict[str, type] = {}
+  for module in _exporting_modules():
+    for name, obj in vars(module).items():
+      if inspect.isclass(obj):
+        classes.setdefault(name, obj)
+  return classes
+
+
+def _find_exported_class(klass_type: str) -> Optional[type]:
+  for module in _exporting_modules():
+    # import the class if it is exported lazily, see `pylabrobot.utils.lazy_import`
+    obj = getattr(module, klass_type, None)
+    if inspect.isclass(obj):
+      return cast(type, obj)
+  return None
+
+
+def get_plr_class_from_string(klass_type: str):
+  global _module_classes, _module_classes_version # pylint: disable=global-statement
+  if _module_classes_version != _registered_version:
+    # a new class may have been exported since the classes were last collected
+    _module_classes = _get_module_classes()
+    _not_exported.clear()
+    _module_classes_version = _registered_version
+
+  if klass_type not in _module_classes and klass_type not in _not_exported:
+    klass = _find_exported_class(klass_type)
+    if klass is None:
+      _not_exported.add(klass_type)
+    else:
+      _module_classes[klass_type] = klass
+
+  if klass_type in _module_classes:
+    return _module_classes[klass_type]
+  if klass_type in _registered_classes:
+    return _registered_classes[klass_type]
   raise ValueError(f"Could not find class {klass_type}")
 
 
@@ -1,13 +1,16 @@
+import asyncio
 import logging
 from pathlib import Path
+import threading
 import time
-from typing import cast
+from typing import List, cast
 import unittest
 
 from pylabrobot import Config
 from pylabrobot.liquid_handling import LiquidHandler
 from pylabrobot.liquid_handling.backends import SerializingSavingBackend
 from pylabrobot.resources import (
+  Coordinate,
   Plate,
   TipRack,
   HTF_L,
@@ -18,7 +21,12 @@ from pylabrobot.resources import (
 )
 from pylabrobot.resources.hamilton import HamiltonDeck, STARLetDeck
 from pylabrobot.serializer import serialize
-from pylabrobot.server.liquid_handling_server import create_app
+from pylabrobot.server.liquid_handling_server import (
+  Task,
+  TaskQueue,
+  TaskQueueFullError,
+  create_app,
+)
 
 
 def build_layout() -> HamiltonDeck:
@@ -41,12 +49,87 @@ def _wait_for_task_done(base_url, client, task_id):
     response = client.get(base_url + f"/tasks/{task_id}")
     if response.json is None:
       raise RuntimeError("No JSON in response: " + response.text)
-    if response.json.get("status") == "running":
+    if response.json.get("status") in {"queued", "running"}:
       time.sleep(0.1)
     else:
       return response
 
 
+class TaskQueueTests(unittest.TestCase):
+  """ Tests for the queue that runs the tasks of the server """
+
+  def setUp(self):
+    self.queue = TaskQueue(max_unfinished=3, ttl=60, max_finished=2)
+
+  def tearDown(self):
+    self.queue.stop()
+
+  def _wait(self, task: Task):
+    while task.status in {"queued", "running"}:
+      time.sleep(0.01)
+
+  def test_tasks_run_in_order(self):
+    running: List[int] = []
+    order: List[int] = []
+
+    async def co(i: int):
+      running.append(i)
+      assert len(running) == 1, "tasks ran concurrently"
+      await asyncio.sleep(0.01)
+      order.append(i)
+      running.remove(i)
+
+    tasks = [self.queue.add(Task(co(i))) for i in range(3)]
+    self._wait(tasks[-1])
+    self.assertEqual(order, [0, 1, 2])
+    self.assertEqual([t.status for t in tasks], ["succeeded"] * 3)
+
+  def test_full(self):
+    event = threading.Event()
+
+    async def wait():
+      while not event.is_set():
+        await asyncio.sleep(0.01)
+
+    tasks = [self.queue.add(Task(wait())) for _ in range(3)]
+    co = wait()
+    with self.assertRaises(TaskQueueFullError):
+      self.queue.add(Task(co))
+    co.close()
+    event.set()
+    self._wait(tasks[-1])
+    self.queue.add(Task(wait()))
+
+  def test_error(self):
+    async def fail():
+      raise RuntimeError("oops")
+
+    task = self.queue.add(Task(fail()))
+    self._wait(task)
+    self.assertEqual(task.serialize(), {"id": 0, "status": "error", "error": "oops"})
+
+  def test_evict_max_finished(self):
+    async def nothing():
+      pass
+
+    tasks = [self.queue.add(Task(nothing())) for _ in range(3)]
+    self._wait(tasks[-1])
+    self.assertIsNone(self.queue.get(0))
+    self.assertEqual(self.queue.get_all(), tasks[1:])
+
+  def test_evict_ttl(self):
+    async def nothing():
+      pass
+
+    task = self.queue.add(Task(nothing()))
+    self._wait(task)
+    self.assertIs(self.queue.get(0), task)
+    assert task.finished_at is not None
+    task.finished_at -= 61
+    self.assertIsNone(self.queue.get(0))
+    self.assertEqual(self.queue.get_all(), [])
+
+
 class LiquidHandlingApiGeneralTests(unittest.IsolatedAsyncioTestCase):
   def setUp(self):
     self.backend = SerializingSavingBackend(num_channels=8)
@@ -119,6 +202,42 @@ class LiquidHandlingApiGeneralTests(unittest.IsolatedAsyncioTestCase):
       self.assertEqual(response.status_code, 200)
       self.assertEqual(self.lh.deck, deck)
 
+  def test_batch(self):
+    deck = build_layout()
+    tip_spot = cast(TipRack, deck.get_resource("tip_rack_01")).get_item("A1")
+    with no_tip_tracking():
+      tip = tip_spot.get_tip()
+    pickup = {"channels": [{"resource_name": tip_spot.name, "tip": serialize(tip),
+      "offset": serialize(Coordinate.zero())}], "use_channels": [0]}
+
+    with self.app.test_client() as client:
+      client.post(self.base_url + "/labware", json={"deck": deck.serialize()})
+      num_tasks = len(client.get(self.base_url + "/tasks").json)
+
+      # Invalid commands: nothing is run
+      response = client.post(self.base_url + "/batch", json={"commands": [
+        {"command": "setup"}, {"command": "foo"}]})
+      self.assertEqual(response.status_code, 400)
+      self.assertEqual(response.json, {"error": "unknown command 'foo'", "index": 1})
+      response = client.post(self.base_url + "/batch", json={"commands": [
+        {"command": "setup"}, {"command": "pick_up_tips", "data": {"channels": []}}]})
+      self.assertEqual(response.status_code, 400)
+      self.assertEqual(response.json,
+        {"error": "missing key in json data: 'use_channels'", "index": 1})
+      self.assertEqual(len(client.get(self.base_url + "/tasks").json), num_tasks)
+
+      with no_tip_tracking():
+        task = client.post(self.base_url + "/batch", json={"commands": [
+          {"command": "setup"},
+          {"command": "pick_up_tips", "data": pickup},
+          {"command": "drop-tips", "data": pickup},
+          {"command": "stop"},
+        ]})
+        response = _wait_for_task_done(self.base_url, client, task.json.get("id"))
+      self.assertEqual(response.json.get("status"), "succeeded")
+      self.assertEqual([c["command"] for c in self.backend.sent_commands],
+        ["setup", "resources_assigned", "pick_up_tips", "drop_tips", "stop"])
+
 
 class LiquidHandlingApiOpsTests(unittest.TestCase):
   def setUp(self) -> None:
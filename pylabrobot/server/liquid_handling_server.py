@@ -2,10 +2,12 @@
 # mypy: disable-error-code = attr-defined
 
 import asyncio
+import collections
 import json
 import os
 import threading
-from typing import Any, Coroutine, List, Tuple, Optional, cast
+import time
+from typing import Any, Callable, Coroutine, Deque, Dict, List, Tuple, Optional, cast
 
 from flask import Blueprint, Flask, request, jsonify, current_app, Request
 import werkzeug
@@ -17,54 +19,158 @@ from pylabrobot.liquid_handling import LiquidHandler
 from pylabrobot.liquid_handling.backends.backend import LiquidHandlerBackend
 from pylabrobot.liquid_handling.standard import Pickup, Aspiration, Dispense, \
   Drop
-from pylabrobot.resources import Coordinate, Deck, Tip, Liquid
+from pylabrobot.resources import Coordinate, Deck, Tip, Liquid, ResourceNotFoundError
 from pylabrobot.serializer import deserialize
 
 lh_api = Blueprint("liquid handling", __name__)
 
 
 class Task:
-  """ A task is a coroutine that runs in a separate thread. Maintains its own event loop and
-  status. """
+  """ A task is a coroutine that is run by a :class:`TaskQueue`. Maintains its status. """
 
   def __init__(self, co: Coroutine[Any, Any, None]):
+    self.id: Optional[int] = None
     self.status = "queued"
     self.co = co
     self.error: Optional[str] = None
+    self.finished_at: Optional[float] = None
 
-  def run_in_thread(self) -> None:
-    """ Run the coroutine in a new thread. """
-
-    def runner():
-      self.status = "running"
-      loop = asyncio.new_event_loop()
-      asyncio.set_event_loop(loop)
-      try:
-        loop.run_until_complete(self.co)
-      except Exception as e:  # pylint: disable=broad-except
-        self.error = str(e)
-        self.status = "error"
-      else:
-        self.status = "succeeded"
-
-    t = threading.Thread(target=runner)
-    t.start()
-
-  def serialize(self, id_: int) -> dict:
-    d = {"id": id_, "status": self.status}
+  def serialize(self) -> dict:
+    d = {"id": self.id, "status": self.status}
     if self.error is not None:
       d["error"] = self.error
     return d
 
 
-tasks: List[Task] = []
+class TaskQueueFullError(Exception):
+  """ Raised when a task is added to a :class:`TaskQueue` that has too many unfinished tasks. """
+
+
+class TaskQueue:
+  """ Runs tasks one at a time, in the order they were added, on a single event loop in a worker
+  thread. This guarantees that commands are never sent to the liquid handler concurrently.
+
+  Finished tasks are kept so that their status can be requested, until they finished more than
+  `ttl` seconds ago, or more than `max_finished` tasks have finished after them.
+  """
+
+  def __init__(self, max_unfinished: int = 100, ttl: float = 3600, max_finished: int = 1000):
+    """ Create a new task queue.
+
+    Args:
+      max_unfinished: The maximum number of queued and running tasks. Adding a task when this many
+        tasks are unfinished raises a :class:`TaskQueueFullError`.
+      ttl: The number of seconds a finished task is kept.
+      max_finished: The maximum number of finished tasks that are kept.
+    """
+
+    self.max_unfinished = max_unfinished
+    self.ttl = ttl
+    self.max_finished = max_finished
+
+    self._tasks: Dict[int, Task] = {}
+    self._finished: Deque[Task] = collections.deque()
+    self._num_unfinished = 0
+    self._next_id = 0
+    self._lock = threading.Lock()
+
+    self._loop: Optional[asyncio.AbstractEventLoop] = None
+    self._thread: Optional[threading.Thread] = None
+    self._run_lock: Optional[asyncio.Lock] = None
+
+  def add(self, task: Task) -> Task:
+    """ Assign an id to `task` and queue it. The worker thread is started when the first task is
+    added. """
+
+    with self._lock:
+      self._evict()
+      if self._num_unfinished >= self.max_unfinished:
+        raise TaskQueueFullError(f"There are {self._num_unfinished} unfinished tasks.")
+      task.id = self._next_id
+      self._next_id += 1
+      self._tasks[task.id] = task
+      self._num_unfinished += 1
+
+      if self._loop is None:
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="lh-server-tasks",
+          daemon=True)
+        self._thread.start()
+      asyncio.run_coroutine_threadsafe(self._run(task), self._loop)
+    return task
+
+  async def _run(self, task: Task):
+    # Coroutines scheduled with `run_coroutine_threadsafe` start in order, and the lock wakes up
+    # waiters in order, so tasks run in the order they were added.
+    if self._run_lock is None:
+      self._run_lock = asyncio.Lock()
+    error: Optional[str] = None
+    try:
+      async with self._run_lock:
+        task.status = "running"
+        try:
+          await task.co
+        except Exception as e:  # pylint: disable=broad-except
+          error = str(e)
+    except asyncio.CancelledError:
+      task.co.close()
+      error = "cancelled"
+      raise
+    finally:
+      with self._lock:
+        task.error = error
+        task.status = "succeeded" if error is None else "error"
+        task.finished_at = time.monotonic()
+        self._num_unfinished -= 1
+        self._finished.append(task)
+        self._evict()
+
+  def _evict(self):
+    """ Remove finished tasks that are too old or too many. Must be called with `_lock` held. """
+
+    now = time.monotonic()
+    while len(self._finished) > 0 and (len(self._finished) > self.max_finished or
+        now - cast(float, self._finished[0].finished_at) > self.ttl):
+      del self._tasks[cast(int, self._finished.popleft().id)]
+
+  def get(self, id_: int) -> Optional[Task]:
+    with self._lock:
+      self._evict()
+      return self._tasks.get(id_)
+
+  def get_all(self) -> List[Task]:
+    with self._lock:
+      self._evict()
+      return list(self._tasks.values())
+
+  def stop(self):
+    """ Stop the worker thread. Tasks that have not finished are cancelled. """
+
+    with self._lock:
+      loop, thread = self._loop, self._thread
+      self._loop = self._thread = None
+    if loop is None or thread is None:
+      return
+
+    async def cancel_tasks():
+      tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+      for t in tasks:
+        t.cancel()
+      await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(cancel_tasks(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
 
 
 def add_and_run_task(task: Task):
-  id_ = len(tasks)
-  tasks.append(task)
-  task.run_in_thread()
-  return task.serialize(id_)
+  try:
+    current_app.task_queue.add(task)
+  except TaskQueueFullError as e:
+    task.co.close()
+    return jsonify({"error": str(e)}), 503
+  return task.serialize()
 
 
 @lh_api.route("/")
@@ -74,23 +180,24 @@ def index():
 
 @lh_api.route("/tasks", methods=["GET"])
 def get_tasks():
-  return jsonify([{"id": i, "status": t.status} for i, t in enumerate(tasks)])
+  return jsonify([{"id": t.id, "status": t.status} for t in current_app.task_queue.get_all()])
 
 
 @lh_api.route("/tasks/<int:id_>", methods=["GET"])
 def get_task(id_: int):
-  if id_ >= len(tasks):
+  task = current_app.task_queue.get(id_)
+  if task is None:
     return jsonify({"error": "task not found"}), 404
-  return tasks[id_].serialize(id_)
+  return task.serialize()
 
 
 @lh_api.route("/setup", methods=["POST"])
-async def setup():
+def setup():
   return add_and_run_task(Task(current_app.lh.setup()))
 
 
 @lh_api.route("/stop", methods=["POST"])
-async def stop():
+def stop():
   return add_and_run_task(Task(current_app.lh.stop()))
 
 
@@ -124,148 +231,164 @@ class ErrorResponse(Exception):
     self.status_code = status_code
 
 
-@lh_api.route("/pick-up-tips", methods=["POST"])
-async def pick_up_tips():
-  try:
-    data = request.get_json()
-    pickups = []
-    for sc in data["channels"]:
-      try:
-        resource = current_app.lh.deck.get_resource(sc["resource_name"])
-      except ValueError as exc:
-        raise ErrorResponse(
-          {"error": f"resource with name '{sc['resource_name']}' not found"},
-          404) from exc
-      if not "tip" in sc:
-        raise ErrorResponse({"error": "missing key in json data: tip"}, 400)
-      tip = cast(Tip, deserialize(sc["tip"]))
-      if not "offset" in sc:
-        raise ErrorResponse({"error": "missing key in json data: offset"}, 400)
-      offset = cast(Coordinate, deserialize(sc["offset"]))
-      pickups.append(Pickup(resource=resource, tip=tip, offset=offset))
-    use_channels = data["use_channels"]
-  except ErrorResponse as e:
-    return jsonify(e.data), e.status_code
+def _parse_channel(sc: dict) -> Dict[str, Any]:
+  """ Parse the resource, tip and offset of a channel in the json data of a command. """
 
-  return add_and_run_task(Task(current_app.lh.pick_up_tips(
+  try:
+    resource = current_app.lh.deck.get_resource(sc["resource_name"])
+  except (ValueError, ResourceNotFoundError) as exc:
+    raise ErrorResponse(
+      {"error": f"resource with name '{sc['resource_name']}' not found"},
+      404) from exc
+  if not "tip" in sc:
+    raise ErrorResponse({"error": "missing key in json data: tip"}, 400)
+  tip = cast(Tip, deserialize(sc["tip"]))
+  if not "offset" in sc:
+    raise ErrorResponse({"error": "missing key in json data: offset"}, 400)
+  offset = cast(Coordinate, deserialize(sc["offset"]))
+  return {"resource": resource, "tip": tip, "offset": offset}
+
+
+def _parse_liquid_handling_channel(sc: dict) -> Dict[str, Any]:
+  """ Parse the arguments of an aspiration or dispense of a channel in the json data of a
+  command. """
+
+  return {
+    **_parse_channel(sc),
+    "volume": sc["volume"],
+    "flow_rate": sc["flow_rate"],
+    "liquid_height": sc["liquid_height"],
+    "blow_out_air_volume": sc["blow_out_air_volume"],
+    "liquids": cast(List[Tuple[Optional[Liquid], float]], deserialize(sc["liquids"])),
+  }
+
+
+def _pick_up_tips(data: dict):
+  """ Create the coroutine for a `pick-up-tips` command. """
+
+  pickups = [Pickup(**_parse_channel(sc)) for sc in data["channels"]]
+  return current_app.lh.pick_up_tips(
     tip_spots=[p.resource for p in pickups],
     offsets=[p.offset for p in pickups],
-    use_channels=use_channels
-  )))
+    use_channels=data["use_channels"]
+  )
 
 
-@lh_api.route("/drop-tips", methods=["POST"])
-async def drop_tips():
-  try:
-    data = request.get_json()
-    drops = []
-    for sc in data["channels"]:
-      try:
-        resource = current_app.lh.deck.get_resource(sc["resource_name"])
-      except ValueError as exc:
-        raise ErrorResponse(
-          {"error": f"resource with name '{sc['resource_name']}' not found"},
-          404) from exc
-      if not "tip" in sc:
-        raise ErrorResponse({"error": "missing key in json data: tip"}, 400)
-      tip = cast(Tip, deserialize(sc["tip"]))
-      if not "offset" in sc:
-        raise ErrorResponse({"error": "missing key in json data: offset"}, 400)
-      offset = cast(Coordinate, deserialize(sc["offset"]))
-      drops.append(Drop(resource=resource, tip=tip, offset=offset))
-    use_channels = data["use_channels"]
-  except ErrorResponse as e:
-    return jsonify(e.data), e.status_code
+def _drop_tips(data: dict):
+  """ Create the coroutine for a `drop-tips` command. """
 
-  return add_and_run_task(Task(current_app.lh.drop_tips(
+  drops = [Drop(**_parse_channel(sc)) for sc in data["channels"]]
+  return current_app.lh.drop_tips(
     tip_spots=[d.resource for d in drops],
     offsets=[d.offset for d in drops],
-    use_channels=use_channels
-  )))
+    use_channels=data["use_channels"]
+  )
 
 
-@lh_api.route("/aspirate", methods=["POST"])
-async def aspirate():
-  try:
-    data = request.get_json()
-    aspirations = []
-    for sc in data["channels"]:
-      try:
-        resource = current_app.lh.deck.get_resource(sc["resource_name"])
-      except ValueError as exc:
-        raise ErrorResponse(
-          {"error": f"resource with name '{sc['resource_name']}' not found"},
-          404) from exc
-      if not "tip" in sc:
-        raise ErrorResponse({"error": "missing key in json data: tip"}, 400)
-      tip = cast(Tip, deserialize(sc["tip"]))
-      if not "offset" in sc:
-        raise ErrorResponse({"error": "missing key in json data: offset"}, 400)
-      offset = cast(Coordinate, deserialize(sc["offset"]))
-      volume = sc["volume"]
-      flow_rate = sc["flow_rate"]
-      liquid_height = sc["liquid_height"]
-      blow_out_air_volume = sc["blow_out_air_volume"]
-      liquids = cast(List[Tuple[Optional[Liquid], float]],
-                     deserialize(sc["liquids"]))
-      aspirations.append(
-        Aspiration(resource=resource, tip=tip, offset=offset, volume=volume,
-                   flow_rate=flow_rate, liquid_height=liquid_height,
-                   blow_out_air_volume=blow_out_air_volume,
-                   liquids=liquids))
-    use_channels = data["use_channels"]
-  except ErrorResponse as e:
-    return jsonify(e.data), e.status_code
+def _aspirate(data: dict):
+  """ Create the coroutine for an `aspirate` command. """
 
-  return add_and_run_task(Task(current_app.lh.aspirate(
+  aspirations = [Aspiration(**_parse_liquid_handling_channel(sc)) for sc in data["channels"]]
+  return current_app.lh.aspirate(
     resources=[a.resource for a in aspirations],
     vols=[a.volume for a in aspirations],
     offsets=[a.offset for a in aspirations],
     flow_rates=[a.flow_rate for a in aspirations],
-    use_channels=use_channels
-  )))
+    use_channels=data["use_channels"]
+  )
+
+
+def _dispense(data: dict):
+  """ Create the coroutine for a `dispense` command. """
+
+  dispenses = [Dispense(**_parse_liquid_handling_channel(sc)) for sc in data["channels"]]
+  return current_app.lh.dispense(
+    resources=[d.resource for d in dispenses],
+    vols=[d.volume for d in dispenses],
+    offsets=[d.offset for d in dispenses],
+    flow_rates=[d.flow_rate for d in dispenses],
+    use_channels=data["use_channels"]
+  )
+
+
+def _add_command(create_co: Callable[[dict], Coroutine[Any, Any, None]]):
+  """ Create the coroutine for a command from the json data of the request, and queue it. """
+
+  try:
+    co = create_co(request.get_json())
+  except ErrorResponse as e:
+    return jsonify(e.data), e.status_code
+
+  return add_and_run_task(Task(co))
+
+
+@lh_api.route("/pick-up-tips", methods=["POST"])
+def pick_up_tips():
+  return _add_command(_pick_up_tips)
+
+
+@lh_api.route("/drop-tips", methods=["POST"])
+def drop_tips():
+  return _add_command(_drop_tips)
+
+
+@lh_api.route("/aspirate", methods=["POST"])
+def aspirate():
+  return _add_command(_aspirate)
 
 
 @lh_api.route("/dispense", methods=["POST"])
-async def dispense():
+def dispense():
+  return _add_command(_dispense)
+
+
+# commands that can be sent to the batch endpoint, by the name of their endpoint
+batch_commands: Dict[str, Callable[[dict], Coroutine[Any, Any, None]]] = {
+  "setup": lambda data: current_app.lh.setup(),
+  "stop": lambda data: current_app.lh.stop(),
+  "pick-up-tips": _pick_up_tips,
+  "drop-tips": _drop_tips,
+  "aspirate": _aspirate,
+  "dispense": _dispense,
+}
+
+
+async def _run_in_order(cos: List[Coroutine[Any, Any, None]]):
+  for co in cos:
+    await co
+
+
+@lh_api.route("/batch", methods=["POST"])
+def batch():
+  """ Run a list of commands, in order, as a single task. Each command is a dict with the name of
+  its endpoint in `command` and the json data for that endpoint in `data`. If a command is invalid,
+  no commands are run. """
+
+  data = request.get_json(silent=True)
+  if not isinstance(data, dict) or not isinstance(data.get("commands"), list):
+    return jsonify({"error": "json data must be a dict with a list of commands"}), 400
+
+  cos: List[Coroutine[Any, Any, None]] = []
   try:
-    data = request.get_json()
-    dispenses = []
-    for sc in data["channels"]:
+    for i, command in enumerate(data["commands"]):
+      if not isinstance(command, dict) or "command" not in command:
+        raise ErrorResponse({"error": "missing key in json data: 'command'", "index": i}, 400)
+      name = command["command"].replace("_", "-")
+      if name not in batch_commands:
+        raise ErrorResponse({"error": f"unknown command '{name}'", "index": i}, 400)
       try:
-        resource = current_app.lh.deck.get_resource(sc["resource_name"])
-      except ValueError as exc:
+        cos.append(batch_commands[name](command.get("data") or {}))
+      except ErrorResponse as e:
+        raise ErrorResponse({**e.data, "index": i}, e.status_code) from e
+      except KeyError as e:
         raise ErrorResponse(
-          {"error": f"resource with name '{sc['resource_name']}' not found"},
-          404) from exc
-      if not "tip" in sc:
-        raise ErrorResponse({"error": "missing key in json data: tip"}, 400)
-      tip = cast(Tip, deserialize(sc["tip"]))
-      if not "offset" in sc:
-        raise ErrorResponse({"error": "missing key in json data: offset"}, 400)
-      offset = cast(Coordinate, deserialize(sc["offset"]))
-      volume = sc["volume"]
-      flow_rate = sc["flow_rate"]
-      liquid_height = sc["liquid_height"]
-      blow_out_air_volume = sc["blow_out_air_volume"]
-      liquids = cast(List[Tuple[Optional[Liquid], float]],
-                     deserialize(sc["liquids"]))
-      dispenses.append(
-        Dispense(resource=resource, tip=tip, offset=offset, volume=volume,
-                 flow_rate=flow_rate, liquid_height=liquid_height,
-                 blow_out_air_volume=blow_out_air_volume,
-                 liquids=liquids))
-    use_channels = data["use_channels"]
+          {"error": "missing key in json data: " + str(e), "index": i}, 400) from e
   except ErrorResponse as e:
+    for co in cos:
+      co.close()
     return jsonify(e.data), e.status_code
 
-  return add_and_run_task(Task(current_app.lh.dispense(
-    resources=[d.resource for d in dispenses],
-    vols=[d.volume for d in dispenses],
-    offsets=[d.offset for d in dispenses],
-    flow_rates=[d.flow_rate for d in dispenses],
-    use_channels=use_channels
-  )))
+  return add_and_run_task(Task(_run_in_order(cos)))
 
 
 class HttpReader(ConfigReader):
@@ -277,16 +400,18 @@ CONFIG_READER = HttpReader(format_loader=JsonLoader())
 
 
 @lh_api.route("/config", methods=["POST"])
-async def config():
+def config():
   cfg = CONFIG_READER.read(request)
   configure(cfg)
   return jsonify(cfg.as_dict)
 
 
-def create_app(lh: LiquidHandler):
-  """ Create a Flask app with the given LiquidHandler """
+def create_app(lh: LiquidHandler, task_queue: Optional[TaskQueue] = None):
+  """ Create a Flask app with the given LiquidHandler. Tasks are run by `task_queue`, which
+  defaults to a new :class:`TaskQueue`. """
   app = Flask(__name__)
   app.lh = lh
+  app.task_queue = task_queue or TaskQueue()
   app.register_blueprint(lh_api)
   return app
 
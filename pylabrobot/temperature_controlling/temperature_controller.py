@@ -1,8 +1,8 @@
 import asyncio
-import time
-from typing import Optional
+from typing import Optional, Set
 
 from pylabrobot.machines.machine import Machine
+from pylabrobot.machines.polling import Backoff, poll_until
 
 from .backend import TemperatureControllerBackend
 
@@ -23,6 +23,9 @@ class TemperatureController(Machine):
     super().__init__(name, size_x, size_y, size_z, backend, category, model)
     self.backend: TemperatureControllerBackend = backend  # fix type
     self.target_temperature: Optional[float] = None
+    # An event for every wait, set when the target temperature changes, so that each wait checks the
+    # temperature immediately.
+    self._target_changed_events: Set[asyncio.Event] = set()
 
   async def set_temperature(self, temperature: float):
     """ Set the temperature of the temperature controller.
@@ -31,6 +34,7 @@ class TemperatureController(Machine):
       temperature: Temperature in Celsius.
     """
     self.target_temperature = temperature
+    self._notify_target_changed()
     return await self.backend.set_temperature(temperature)
 
   async def get_temperature(self) -> float:
@@ -41,27 +45,50 @@ class TemperatureController(Machine):
     """
     return await self.backend.get_current_temperature()
 
-  async def wait_for_temperature(self, timeout: float = 300.0, tolerance: float = 0.5):
+  def _notify_target_changed(self):
+    for event in self._target_changed_events:
+      event.set()
+
+  async def wait_for_temperature(
+    self,
+    timeout: float = 300.0,
+    tolerance: float = 0.5,
+    backoff: Backoff = Backoff(initial=0.05, maximum=0.25),
+  ):
     """ Wait for the temperature to reach the target temperature. The target temperature must be
     set by `set_temperature()`.
 
+    The temperature is polled often at first and then less often, up to `backoff.maximum` seconds
+    apart. When the target temperature is changed while waiting, it is polled immediately.
+
     Args:
       timeout: Timeout in seconds.
       tolerance: Tolerance in Celsius.
+      backoff: The times between polls of the temperature.
     """
     if self.target_temperature is None:
       raise RuntimeError("Target temperature is not set.")
-    start = time.time()
-    while time.time() - start < timeout:
-      temperature = await self.get_temperature()
-      if abs(temperature - self.target_temperature) < tolerance:
-        return
-      await asyncio.sleep(1.0)
-    raise TimeoutError(f"Temperature did not reach target temperature within {timeout} seconds.")
+
+    def reached(temperature: float) -> bool:
+      if self.target_temperature is None:
+        raise RuntimeError("Target temperature was reset while waiting.")
+      return abs(temperature - self.target_temperature) < tolerance
+
+    target_changed = asyncio.Event()
+    self._target_changed_events.add(target_changed)
+    try:
+      await poll_until(self.get_temperature, reached, timeout=timeout, backoff=backoff,
+                       event=target_changed, name=f"{self.name}.wait_for_temperature")
+    except TimeoutError as e:
+      raise TimeoutError(
+        f"Temperature did not reach target temperature within {timeout} seconds.") from e
+    finally:
+      self._target_changed_events.discard(target_changed)
 
   async def deactivate(self):
     """ Deactivate the temperature controller. This will stop the heating or cooling, and return
     the temperature to ambient temperature. The target temperature will be reset to `None`.
     """
     self.target_temperature = None
+    self._notify_target_changed()
     return await self.backend.deactivate()
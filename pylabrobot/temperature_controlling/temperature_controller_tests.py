@@ -0,0 +1,92 @@
+import asyncio
+import time
+import unittest
+
+from pylabrobot.machines.polling import Backoff
+from pylabrobot.temperature_controlling import TemperatureController
+from pylabrobot.temperature_controlling.backend import TemperatureControllerBackend
+
+
+class FakeTemperatureControllerBackend(TemperatureControllerBackend):
+  """ Reaches the target temperature `ramp_time` seconds after it is set. """
+
+  def __init__(self, ramp_time: float):
+    self.ramp_time = ramp_time
+    self.temperature = 20.0
+    self.target = 20.0
+    self.set_at = 0.0
+    self.polls = 0
+
+  async def setup(self):
+    pass
+
+  async def stop(self):
+    pass
+
+  async def set_temperature(self, temperature: float):
+    self.target, self.set_at = temperature, time.monotonic()
+
+  async def get_current_temperature(self) -> float:
+    self.polls += 1
+    if time.monotonic() - self.set_at >= self.ramp_time:
+      self.temperature = self.target
+    return self.temperature
+
+  async def deactivate(self):
+    self.target = 20.0
+
+
+class TemperatureControllerTests(unittest.IsolatedAsyncioTestCase):
+  """ Tests for the temperature controller front end. """
+
+  async def asyncSetUp(self):
+    await super().asyncSetUp()
+    self.backend = FakeTemperatureControllerBackend(ramp_time=0.05)
+    self.tc = TemperatureController(name="tc", size_x=1, size_y=1, size_z=1, backend=self.backend)
+    await self.tc.setup()
+
+  async def test_wait_for_temperature(self):
+    await self.tc.set_temperature(37)
+    t0 = time.monotonic()
+    await self.tc.wait_for_temperature()
+    # returns shortly after the temperature is reached, not on the next 1s tick
+    self.assertLess(time.monotonic() - t0, 0.5)
+    self.assertEqual(await self.tc.get_temperature(), 37)
+
+  async def test_wait_for_temperature_timeout(self):
+    self.backend.ramp_time = 10
+    await self.tc.set_temperature(37)
+    with self.assertRaises(TimeoutError):
+      await self.tc.wait_for_temperature(timeout=0.1)
+
+  async def test_target_changed_while_waiting(self):
+    self.backend.ramp_time = 0
+    await self.tc.set_temperature(37)
+    await self.tc.wait_for_temperature()
+    self.tc.target_temperature = 50 # not reached, because the backend was not told
+
+    backoff = Backoff(initial=10, maximum=10)
+    wait = asyncio.create_task(self.tc.wait_for_temperature(backoff=backoff))
+    await asyncio.sleep(0.05)
+    polls = self.backend.polls
+    await self.tc.set_temperature(37)
+    await asyncio.wait_for(wait, timeout=1)
+    self.assertEqual(self.backend.polls, polls + 1)
+
+  async def test_target_changed_while_waiting_concurrently(self):
+    self.backend.ramp_time = 0
+    await self.tc.set_temperature(37)
+    await self.tc.wait_for_temperature()
+    self.tc.target_temperature = 50
+
+    backoff = Backoff(initial=10, maximum=10)
+    waits = [asyncio.create_task(self.tc.wait_for_temperature(backoff=backoff)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    await self.tc.set_temperature(37)
+    # both waits are woken up, not only the first one
+    await asyncio.wait_for(asyncio.gather(*waits), timeout=1)
+    self.assertEqual(self.tc._target_changed_events, set()) # pylint: disable=protected-access
+
+  async def test_not_set(self):
+    with self.assertRaises(RuntimeError):
+      await self.tc.wait_for_temperature()
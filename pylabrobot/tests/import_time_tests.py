@@ -0,0 +1,107 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from typing import Optional
+
+from pylabrobot import project_root
+
+
+# Modules that must not be imported by importing each module: the labware catalogs, the machine
+# backends and their dependencies are imported when they are first used. The import times are
+# measured by `benchmarks/import_time.py`.
+DEFERRED_MODULES = {
+  "pylabrobot": [
+    "asyncio",
+    "numpy",
+    "pylabrobot.machines",
+    "pylabrobot.resources",
+  ],
+  "pylabrobot.resources": [
+    "numpy",
+    "pylabrobot.machines",
+    "pylabrobot.resources.corning_costar",
+    "pylabrobot.resources.ml_star",
+    "pylabrobot.resources.opentrons",
+    "pylabrobot.resources.plate_volume_tracker",
+    "pylabrobot.resources.tecan",
+  ],
+  "pylabrobot.liquid_handling": [
+    "IPython",
+    "numpy",
+    "requests",
+    "websockets",
+    "pylabrobot.resources.corning_costar",
+    "pylabrobot.resources.opentrons",
+    "pylabrobot.resources.tecan",
+    "pylabrobot.liquid_handling.backends.hamilton",
+    "pylabrobot.liquid_handling.backends.tecan",
+    "pylabrobot.plate_reading.clario_star",
+  ],
+}
+
+# Replaces config file discovery, which also searches the parent directories of the working
+# directory, with a search of the working directory only, so that config files in the parent
+# directories, like a stray /tmp/pylabrobot.ini, do not affect the tests.
+ISOLATE_CONFIG_DISCOVERY = (
+  "import pathlib\n"
+  "import pylabrobot.config\n"
+  "pylabrobot.config.get_config_file = lambda base_name, cur_dir=None: \\\n"
+  "  pylabrobot.config.get_file(base_name, pathlib.Path.cwd())\n"
+  "pylabrobot.config.get_dir_to_create_config_file_in = pathlib.Path.cwd\n"
+)
+
+
+def run_python(code: str, cwd: Optional[str] = None) -> str:
+  """ Run code in a fresh interpreter and return its stdout. """
+
+  env = dict(os.environ)
+  env["PYTHONPATH"] = os.pathsep.join(p for p in [str(project_root()), env.get("PYTHONPATH")] if p)
+  result = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env, check=True,
+    stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+  return result.stdout
+
+
+class ImportTimeTests(unittest.TestCase):
+  """ Tests for the side effects of importing pylabrobot. """
+
+  def test_deferred_modules(self):
+    for module, deferred_modules in DEFERRED_MODULES.items():
+      with self.subTest(module=module):
+        imported = json.loads(run_python(
+          "import json, sys\n"
+          f"import {module}\n"
+          "print(json.dumps(list(sys.modules)))"))
+        for deferred_module in deferred_modules:
+          self.assertNotIn(deferred_module, imported)
+
+  def test_no_config_file_on_import(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      run_python(ISOLATE_CONFIG_DISCOVERY +
+        "import pylabrobot.liquid_handling, pylabrobot.resources", cwd=tmp)
+      self.assertEqual(os.listdir(tmp), [])
+
+      run_python(ISOLATE_CONFIG_DISCOVERY + "import pylabrobot\nprint(pylabrobot.CONFIG)", cwd=tmp)
+      self.assertIn("pylabrobot.ini", os.listdir(tmp))
+
+  def test_deserialize_in_fresh_interpreter(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      serialized = run_python(
+        "import json\n"
+        "from pylabrobot.liquid_handling import LiquidHandler, STAR\n"
+        "from pylabrobot.resources import Cor_96_wellplate_360ul_Fb, STARLetDeck\n"
+        "deck = STARLetDeck()\n"
+        "deck.assign_child_resource(Cor_96_wellplate_360ul_Fb('plate'), rails=1)\n"
+        "print(json.dumps(LiquidHandler(backend=STAR(), deck=deck).serialize()))", cwd=tmp)
+
+      # the backend and the deck are imported when they are deserialized
+      output = run_python(
+        "import json\n"
+        "from pylabrobot.liquid_handling import LiquidHandler\n"
+        f"lh = LiquidHandler.deserialize(json.loads({serialized.strip()!r}))\n"
+        "print(type(lh.backend).__name__, type(lh.deck).__name__, lh.deck.get_resource('plate'))",
+        cwd=tmp)
+      self.assertEqual(output.split()[:2], ["STAR", "HamiltonSTARDeck"])
+      self.assertIn("Plate(name=plate", output)
@@ -1,4 +1,11 @@
-from pylabrobot.serializer import serialize, deserialize
+import pytest
+
+from pylabrobot.serializer import (
+  deserialize,
+  get_plr_class_from_string,
+  register_class,
+  serialize,
+)
 
 
 def test_serialize_deserialize_closure():
@@ -40,3 +47,54 @@ def test_serialize_deserialize_function_with_closure():
   deserialized = deserialize(serialized, allow_marshal=True)
 
   assert func(5) == deserialized(5)
+
+
+def test_get_plr_class_from_string():
+  # pylint: disable=import-outside-toplevel
+  from pylabrobot.resources import Coordinate
+  assert get_plr_class_from_string("Coordinate") is Coordinate
+  with pytest.raises(ValueError):
+    get_plr_class_from_string("NotAClass")
+
+
+def test_register_class():
+  @register_class
+  class CustomObject:
+    def __init__(self, value):
+      self.value = value
+
+  deserialized = deserialize(serialize(CustomObject(value=3)))
+  assert isinstance(deserialized, CustomObject)
+  assert deserialized.value == 3
+
+
+def test_resource_subclasses_are_registered():
+  # pylint: disable=import-outside-toplevel
+  from pylabrobot.resources import Resource
+
+  class CustomResource(Resource):
+    pass
+
+  assert get_plr_class_from_string("CustomResource") is CustomResource
+
+
+def test_classes_collected_once():
+  # pylint: disable=import-outside-toplevel
+  from unittest import mock
+  from pylabrobot import serializer
+  from pylabrobot.resources import Resource
+
+  get_plr_class_from_string("Coordinate")
+  with mock.patch.object(serializer, "_get_module_classes",
+                         wraps=serializer._get_module_classes) as get_module_classes: # pylint: disable=protected-access
+    for _ in range(3):
+      with pytest.raises(ValueError):
+        get_plr_class_from_string("NotAClass")
+    assert get_module_classes.call_count == 0
+
+    class OtherCustomResource(Resource):
+      pass
+
+    assert get_plr_class_from_string("OtherCustomResource") is OtherCustomResource
+    assert get_plr_class_from_string("Coordinate") is not None
+    assert get_module_classes.call_count == 1
@@ -1,12 +1,7 @@
 import re
-from typing import Optional, cast
-
-try:
-  import serial
-  HAS_SERIAL = True
-except ImportError:
-  HAS_SERIAL = False
+from typing import Optional
 
+from pylabrobot.machines.backends.transport import SerialTransport
 from pylabrobot.tilting.tilter_backend import TilterBackend, TiltModuleError
 
 
@@ -16,22 +11,19 @@ class HamiltonTiltModuleBackend(TilterBackend):
   def __init__(self, com_port: str, write_timeout: float = 10, timeout: float = 10):
     self.setup_finished = False
     self.com_port = com_port
-    self.serial: Optional[serial.Serial] = None
     self.timeout = timeout
     self.write_timeout = write_timeout
-    self.ser: Optional[serial.Serial] = None
+    self.io: Optional[SerialTransport] = None
 
   async def setup(self, initial_offset: int = 0):
-    if not HAS_SERIAL:
-      raise RuntimeError("pyserial not installed.")
-    self.ser = serial.Serial(
+    self.io = SerialTransport(
       port=self.com_port,
       baudrate=1200,
-      bytesize=serial.EIGHTBITS,
-      parity=serial.PARITY_EVEN,
-      stopbits=serial.STOPBITS_ONE,
-      write_timeout=self.write_timeout,
-      timeout=self.timeout)
+      bytesize=8,
+      parity="E",
+      stopbits=1,
+      write_timeout=self.write_timeout)
+    await self.io.setup()
 
     await self.tilt_initial_offset(initial_offset)
     await self.send_command("SI")
@@ -39,22 +31,30 @@ class HamiltonTiltModuleBackend(TilterBackend):
     self.setup_finished = True
 
   async def stop(self):
-    if self.ser is not None:
-      self.ser.close()
-      self.ser = None
+    if self.io is not None:
+      await self.io.stop()
+      self.io = None
     self.setup_finished = False
 
   async def send_command(self, command: str, parameter: Optional[str] = None) -> str:
     """ Send a command to the tilt module. """
 
-    if self.ser is None:
+    if self.io is None:
       raise RuntimeError("Tilt module not setup.")
 
     if parameter is None:
       parameter = ""
 
-    self.ser.write(f"99{command}{parameter}\r\n".encode("utf-8"))
-    resp = self.ser.read(128).decode("utf-8")
+    try:
+      frame = await self.io.send_command(f"99{command}{parameter}\r\n".encode("utf-8"),
+                                         timeout=self.timeout)
+    except TimeoutError:
+      # Responses are expected to end with "\r\n". If a response is not terminated, use what was
+      # received within the timeout, like reading from the port with a timeout would.
+      frame = self.io.take_partial_frame()
+      if len(frame) == 0:
+        raise
+    resp = frame.decode("utf-8")
 
     # Check for error.
     error_matches = re.search("er[0-9]{2}", resp)
@@ -72,7 +72,7 @@ class HamiltonTiltModuleBackend(TilterBackend):
       if err_code != 0:
         raise RuntimeError(f"Unexpected error code: {err_code}")
 
-    return cast(str, resp) # must do stupid because mypy will not recognize that pyserial is typed..
+    return resp
 
   async def set_angle(self, angle: float):
     """ Set the tilt module to rotate by a given angle. """
@@ -1,3 +1,3 @@
 from .list import assert_shape, reshape_2d
-from .positions import expand_string_range
+from .positions import expand_string_range, row_label, split_identifier
 from .object_parsing import find_subclass
@@ -0,0 +1,150 @@
+""" Module attributes that are imported on first access.
+
+A package can define the attributes it exports from heavy submodules, like labware catalogs and
+machine backends, as lazy attributes. The submodule is imported when the attribute is first
+accessed, instead of when the package is imported, using a module level `__getattr__` (PEP 562):
+
+>>> _lazy = LazyAttributes(__name__, attributes={"STAR": ".hamilton.STAR"})
+>>> def __getattr__(name: str):
+>>>   return _lazy.getattr(name)
+>>> def __dir__():
+>>>   return _lazy.dir()
+
+`star_modules` replace `from .module import *`: the public names of the modules are exported, but
+the modules are only imported, in order, when an attribute is accessed that the package does not
+have yet. Because later modules are not imported when a name is found, modules must not export
+the same name for different objects, and their submodules are not exported. `from package import *`
+imports all lazy attributes.
+
+Code that looks up classes by name, like deserialization, can import a class that has not been
+imported yet with :func:`import_lazy_attribute`.
+"""
+
+import importlib
+import sys
+import types
+from typing import Any, Dict, List, Optional, Sequence
+
+
+_lazy_attributes: List["LazyAttributes"] = []
+
+# Names that packages import to define their lazy attributes, which are not exported.
+_HELPER_NAMES = frozenset({"TYPE_CHECKING", "LazyAttributes"})
+
+
+class LazyAttributes:
+  """ The lazy attributes of a package. """
+
+  def __init__(
+    self,
+    package: str,
+    attributes: Optional[Dict[str, str]] = None,
+    star_modules: Sequence[str] = (),
+  ):
+    """ Create the lazy attributes of a package.
+
+    Args:
+      package: The name of the package, `__name__` in its `__init__.py`.
+      attributes: The module to import each attribute from, by name of the attribute. Relative
+        module names are relative to `package`.
+      star_modules: Modules whose public names are exported, as with `from .module import *`,
+        except for submodules.
+    """
+
+    self.package = package
+    self.attributes = attributes or {}
+    self.star_modules = list(star_modules)
+    self._num_star_modules_loaded = 0
+    _lazy_attributes.append(self)
+
+  @property
+  def _namespace(self) -> Dict[str, Any]:
+    return vars(sys.modules[self.package])
+
+  def _import(self, module_name: str):
+    return importlib.import_module(module_name, package=self.package)
+
+  def _load_next_star_module(self):
+    """ Import the next star module and export its public names.
+
+    Raises:
+      ImportError: If the module exports a name that the package already has, for a different
+        object.
+    """
+
+    module_name = self.star_modules[self._num_star_modules_loaded]
+    module = self._import(module_name)
+    self._num_star_modules_loaded += 1
+    names = getattr(module, "__all__", None)
+    if names is None:
+      names = [name for name in vars(module) if not name.startswith("_")]
+    namespace = self._namespace
+    for name in names:
+      value = getattr(module, name)
+      if isinstance(value, types.ModuleType):
+        continue
+      if name in namespace and namespace[name] is not value:
+        raise ImportError(f"{module_name!r} exports {name!r}, which {self.package!r} already has.")
+      namespace[name] = value
+
+  def getattr(self, name: str) -> Any:
+    """ Import and return a lazy attribute of the package. Called by the `__getattr__` of the
+    package, so only for attributes the package does not have yet.
+
+    Raises:
+      AttributeError: If the package has no attribute with this name.
+    """
+
+    if name == "__all__":
+      return self.all()
+
+    if name in self.attributes:
+      value = getattr(self._import(self.attributes[name]), name)
+      self._namespace[name] = value
+      return value
+
+    if not name.startswith("__"):
+      namespace = self._namespace
+      while self._num_star_modules_loaded < len(self.star_modules):
+        self._load_next_star_module()
+        if name in namespace:
+          return namespace[name]
+
+    raise AttributeError(f"module {self.package!r} has no attribute {name!r}")
+
+  def load_all(self):
+    """ Import all lazy attributes. """
+
+    for name in self.attributes:
+      if name not in self._namespace:
+        self.getattr(name)
+    while self._num_star_modules_loaded < len(self.star_modules):
+      self._load_next_star_module()
+
+  def all(self) -> List[str]:
+    """ The names exported by `from package import *`: the public names of the package, including
+    all lazy attributes, which are imported, except for the names used to define them. """
+
+    self.load_all()
+    return [name for name in self._namespace
+      if not name.startswith("_") and name not in _HELPER_NAMES]
+
+  def dir(self) -> List[str]:
+    """ The names in the package, including all lazy attributes, which are imported. """
+
+    self.load_all()
+    return sorted(self._namespace)
+
+
+def import_lazy_attribute(name: str) -> Optional[Any]:
+  """ Import an attribute that a package exports lazily with :class:`LazyAttributes` `attributes`,
+  if it has not been imported yet.
+
+  Returns:
+    The attribute, or `None` if no package exports an attribute with this name lazily.
+  """
+
+  for lazy in _lazy_attributes:
+    if name in lazy.attributes:
+      return lazy.getattr(name)
+  return None
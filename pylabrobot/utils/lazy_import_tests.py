@@ -0,0 +1,112 @@
+""" Tests for lazy module attributes """
+
+import importlib
+import os
+import sys
+import tempfile
+import unittest
+
+from pylabrobot.utils import lazy_import
+from pylabrobot.utils.lazy_import import import_lazy_attribute
+
+
+PACKAGE_INIT = """
+from typing import TYPE_CHECKING
+
+from pylabrobot.utils.lazy_import import LazyAttributes
+
+EAGER = "eager"
+
+_lazy = LazyAttributes(__name__,
+  attributes={"Backend": ".backend"},
+  star_modules=[".catalog_a", ".catalog_b"])
+
+
+def __getattr__(name):
+  return _lazy.getattr(name)
+
+
+def __dir__():
+  return _lazy.dir()
+"""
+
+
+class TestLazyAttributes(unittest.TestCase):
+  """ Tests for LazyAttributes, on a package written to a temporary directory. """
+
+  def setUp(self):
+    super().setUp()
+    self.tmp = tempfile.TemporaryDirectory() # pylint: disable=consider-using-with
+    self.package = f"lazy_package_{id(self)}"
+    files = {
+      "__init__.py": PACKAGE_INIT,
+      "backend.py": "class Backend:\n  pass\n",
+      "catalog_a.py": "def plate_a():\n  return 'a'\n\ndef shared():\n  return 'a'\n",
+      "catalog_b.py": "import json\nfrom .catalog_a import shared\n\n"
+                      "def plate_b():\n  return 'b'\n\n_private = 1\n",
+    }
+    os.mkdir(os.path.join(self.tmp.name, self.package))
+    for file_name, content in files.items():
+      with open(os.path.join(self.tmp.name, self.package, file_name), "w", encoding="utf-8") as f:
+        f.write(content)
+    sys.path.insert(0, self.tmp.name)
+    self.module = importlib.import_module(self.package)
+
+  def tearDown(self):
+    super().tearDown()
+    lazy_import._lazy_attributes.remove(self.module._lazy) # pylint: disable=protected-access
+    sys.path.remove(self.tmp.name)
+    for name in list(sys.modules):
+      if name.split(".")[0] == self.package:
+        del sys.modules[name]
+    self.tmp.cleanup()
+
+  def imported(self, submodule: str) -> bool:
+    return f"{self.package}.{submodule}" in sys.modules
+
+  def test_attribute(self):
+    self.assertFalse(self.imported("backend"))
+    backend = self.module.Backend
+    self.assertTrue(self.imported("backend"))
+    self.assertIs(backend, sys.modules[f"{self.package}.backend"].Backend)
+    self.assertIn("Backend", vars(self.module))
+    self.assertFalse(self.imported("catalog_a"))
+
+  def test_star_modules(self):
+    self.assertEqual(self.module.plate_a(), "a")
+    self.assertFalse(self.imported("catalog_b"))
+    self.assertEqual(self.module.plate_b(), "b")
+    self.assertEqual(self.module.shared(), "a") # exported by both, for the same object
+    with self.assertRaises(AttributeError):
+      self.module._private # pylint: disable=pointless-statement, protected-access
+    with self.assertRaises(AttributeError):
+      self.module.missing # pylint: disable=pointless-statement
+
+  def test_dunder_does_not_import(self):
+    self.assertFalse(hasattr(self.module, "__wrapped__"))
+    self.assertFalse(self.imported("catalog_a"))
+
+  def test_star_import(self):
+    namespace: dict = {}
+    exec(f"from {self.package} import *", namespace) # pylint: disable=exec-used
+    for name in ["EAGER", "Backend", "plate_a", "plate_b", "shared"]:
+      self.assertIn(name, namespace)
+    for name in ["_private", "TYPE_CHECKING", "LazyAttributes"]:
+      self.assertNotIn(name, namespace)
+    self.assertEqual(namespace["shared"](), "a")
+    self.assertIn("plate_b", dir(self.module))
+
+  def test_modules_not_exported(self):
+    self.assertEqual(self.module.plate_b(), "b")
+    self.assertNotIn("json", vars(self.module)) # imported by catalog_b
+
+  def test_duplicate_names(self):
+    with open(os.path.join(self.tmp.name, self.package, "catalog_b.py"), "w",
+              encoding="utf-8") as f:
+      f.write("def plate_a():\n  return 'b'\n")
+    with self.assertRaises(ImportError):
+      self.module.plate_b # pylint: disable=pointless-statement
+
+  def test_import_lazy_attribute(self):
+    self.assertIs(import_lazy_attribute("Backend"), self.module.Backend)
+    self.assertIsNone(import_lazy_attribute("NotLazy"))
@@ -0,0 +1,177 @@
+""" Logging that does not wait for the disk, and a trace of the commands sent to devices.
+
+By default, the `pylabrobot` logger writes to a `logging.FileHandler` on the thread that logs, so
+the reading threads of the backends and the event loop wait for the disk on every command they log.
+With :func:`start_queued_logging`, records are put in a bounded queue by a
+:class:`BoundedQueueHandler` and written by the handlers on a `logging.handlers.QueueListener`
+thread. When the queue is full, records are dropped or the thread that logs waits, depending on the
+overflow policy.
+
+The commands sent to and the responses received from devices are logged by the backends with
+:func:`log_command` to the `pylabrobot.commands` logger, which is disabled unless a handler like the
+:class:`CommandTraceHandler`, which writes one JSON object per line, is added to it.
+
+These are set up by :func:`pylabrobot.configure` from :class:`pylabrobot.config.Config.Logging`.
+"""
+
+import json
+import logging
+import logging.handlers
+import queue
+from typing import List, Union
+
+
+# The commands sent to and responses received from devices. The logger does not propagate to the
+# `pylabrobot` logger, and is disabled while it has no handlers.
+command_logger = logging.getLogger("pylabrobot.commands")
+command_logger.propagate = False
+command_logger.setLevel(logging.DEBUG)
+command_logger.disabled = True
+
+OVERFLOW_POLICIES = ("drop", "drop_oldest", "block")
+
+
+def log_command(device: str, direction: str, data: Union[str, bytes, bytearray]) -> None:
+  """ Log a command sent to, or a response received from, a device to the command trace.
+
+  Args:
+    device: The name of the device or backend.
+    direction: "sent" or "received".
+    data: The command or response.
+  """
+
+  if command_logger.disabled:
+    return
+  if not isinstance(data, str):
+    data = bytes(data).decode("utf-8", errors="backslashreplace")
+  command_logger.debug("%s %s: %s", device, direction, data,
+    extra={"device": device, "direction": direction, "data": data})
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+  """ A `QueueHandler` with a queue of at most `maxsize` records, that handles a full queue with
+  an overflow policy:
+
+  - "drop": drop the new record.
+  - "drop_oldest": drop the oldest record in the queue to make room for the new record.
+  - "block": wait until there is room in the queue.
+
+  The number of dropped records is kept in `dropped`.
+  """
+
+  def __init__(self, maxsize: int = 10_000, overflow: str = "drop"):
+    if overflow not in OVERFLOW_POLICIES:
+      raise ValueError(f"Unknown overflow policy '{overflow}', expected one of {OVERFLOW_POLICIES}")
+    self._records: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=maxsize)
+    super().__init__(self._records)
+    self.overflow = overflow
+    self.dropped = 0
+
+  def emit(self, record: logging.LogRecord):
+    # don't format records that would be dropped anyway
+    if self.overflow == "drop" and self._records.full():
+      self.dropped += 1
+      return
+    super().emit(record)
+
+  def enqueue(self, record: logging.LogRecord):
+    if self.overflow == "block":
+      self._records.put(record)
+      return
+
+    while True:
+      try:
+        self._records.put_nowait(record)
+        return
+      except queue.Full:
+        self.dropped += 1
+        if self.overflow == "drop":
+          return
+      try:
+        self._records.get_nowait()
+      except queue.Empty:
+        pass
+
+
+class CommandTraceHandler(logging.handlers.RotatingFileHandler):
+  """ Writes records of the `pylabrobot.commands` logger as one JSON object per line, with the
+  time (`t`), device, direction (`dir`) and data, like
+  `{"t":1718000000.123456,"device":"STAR","dir":"sent","data":"C0QMid0001"}`. The file is rotated
+  when it grows larger than `maxBytes`, if `maxBytes` is not 0. """
+
+  def format(self, record: logging.LogRecord) -> str:
+    return json.dumps({
+      "t": round(record.created, 6),
+      "device": getattr(record, "device", record.name),
+      "dir": getattr(record, "direction", None),
+      "data": getattr(record, "data", record.getMessage()),
+    }, separators=(",", ":"))
+
+
+class _QueueListener(logging.handlers.QueueListener):
+  def enqueue_sentinel(self):
+    # wait for room in the queue, instead of raising `queue.Full` like `put_nowait` does
+    self.queue.put(self._sentinel) # type: ignore[attr-defined] # pylint: disable=no-member
+
+
+class QueuedLogging:
+  """ Log records of a number of loggers through a :class:`BoundedQueueHandler`, and handle them
+  on a `QueueListener` thread. """
+
+  def __init__(
+    self,
+    loggers: List[logging.Logger],
+    handlers: List[logging.Handler],
+    maxsize: int = 10_000,
+    overflow: str = "drop",
+  ):
+    self.loggers = loggers
+    self.handler = BoundedQueueHandler(maxsize=maxsize, overflow=overflow)
+    self.listener = _QueueListener(self.handler.queue, *handlers,
+      respect_handler_level=True)
+    self.running = False
+
+  def start(self):
+    self.listener.start()
+    self.running = True
+    for logger in self.loggers:
+      logger.addHandler(self.handler)
+
+  def stop(self):
+    """ Stop logging to the queue, and wait until all records in the queue are handled. """
+
+    for logger in self.loggers:
+      logger.removeHandler(self.handler)
+    if not self.running:
+      return
+    self.listener.stop()
+    self.running = False
+    if self.handler.dropped > 0:
+      record = logging.makeLogRecord({"name": "pylabrobot", "levelno": logging.WARNING,
+        "levelname": "WARNING", "msg": f"Dropped {self.handler.dropped} log records because the "
+        "log queue was full."})
+      for handler in self.listener.handlers:
+        if handler.filter(record):
+          handler.handle(record)
+
+
+def start_queued_logging(
+  loggers: List[logging.Logger],
+  handlers: List[logging.Handler],
+  maxsize: int = 10_000,
+  overflow: str = "drop",
+) -> QueuedLogging:
+  """ Handle the records of `loggers` with `handlers` on a listener thread, through a bounded
+  queue. Stop with :meth:`QueuedLogging.stop`, which writes the records left in the queue.
+
+  Args:
+    loggers: The loggers to add the queue handler to.
+    handlers: The handlers that handle the records on the listener thread. Their level and filters
+      are respected.
+    maxsize: The maximum number of records in the queue.
+    overflow: What to do when the queue is full, see :class:`BoundedQueueHandler`.
+  """
+
+  queued = QueuedLogging(loggers=loggers, handlers=handlers, maxsize=maxsize, overflow=overflow)
+  queued.start()
+  return queued
@@ -0,0 +1,159 @@
+""" Tests for queued logging and the command trace """
+
+import json
+import logging
+import queue
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from typing import cast
+
+from pylabrobot import setup_logger
+from pylabrobot.utils.log_handlers import (
+  BoundedQueueHandler,
+  CommandTraceHandler,
+  command_logger,
+  log_command,
+  start_queued_logging,
+)
+
+
+def make_record(msg: str) -> logging.LogRecord:
+  return logging.makeLogRecord({"name": "pylabrobot", "levelno": logging.INFO, "msg": msg})
+
+
+class BlockingHandler(logging.Handler):
+  """ A handler that collects messages, and waits for `unblocked` before handling a record. """
+
+  def __init__(self):
+    super().__init__()
+    self.messages: list = []
+    self.unblocked = threading.Event()
+
+  def emit(self, record):
+    self.unblocked.wait()
+    self.messages.append(record.getMessage())
+
+
+class TestBoundedQueueHandler(unittest.TestCase):
+  """ Tests for the overflow policies of BoundedQueueHandler. """
+
+  def messages(self, handler: BoundedQueueHandler):
+    records = cast(queue.Queue, handler.queue)
+    messages = []
+    while not records.empty():
+      messages.append(records.get_nowait().getMessage())
+    return messages
+
+  def test_drop(self):
+    handler = BoundedQueueHandler(maxsize=2, overflow="drop")
+    for i in range(4):
+      handler.handle(make_record(str(i)))
+    self.assertEqual(self.messages(handler), ["0", "1"])
+    self.assertEqual(handler.dropped, 2)
+
+  def test_drop_oldest(self):
+    handler = BoundedQueueHandler(maxsize=2, overflow="drop_oldest")
+    for i in range(4):
+      handler.handle(make_record(str(i)))
+    self.assertEqual(self.messages(handler), ["2", "3"])
+    self.assertEqual(handler.dropped, 2)
+
+  def test_unknown_policy(self):
+    with self.assertRaises(ValueError):
+      BoundedQueueHandler(overflow="ignore")
+
+
+class TestQueuedLogging(unittest.TestCase):
+  """ Tests for logging through a queue and a listener thread. """
+
+  def setUp(self):
+    super().setUp()
+    self.logger = logging.getLogger("pylabrobot.tests.queued")
+    self.logger.propagate = False
+    self.logger.setLevel(logging.INFO)
+
+  def test_records_are_handled_on_stop(self):
+    target = BlockingHandler()
+    queued = start_queued_logging([self.logger], [target], maxsize=10, overflow="drop")
+    for i in range(15):
+      self.logger.info("record %d", i)
+    self.assertEqual(target.messages, []) # the listener is waiting for the target
+    target.unblocked.set()
+    queued.stop()
+    self.assertNotIn(queued.handler, self.logger.handlers)
+    # the listener took the first record off the queue before the queue filled up
+    self.assertGreaterEqual(len(target.messages), 11)
+    self.assertEqual(target.messages[0], "record 0")
+    self.assertEqual(target.messages[-1], f"Dropped {queued.handler.dropped} log records because "
+                     "the log queue was full.")
+
+  def test_block(self):
+    target = BlockingHandler()
+    target.unblocked.set()
+    queued = start_queued_logging([self.logger], [target], maxsize=1, overflow="block")
+    for i in range(100):
+      self.logger.info("record %d", i)
+    queued.stop()
+    self.assertEqual(target.messages, [f"record {i}" for i in range(100)])
+
+
+class TestSetupLogger(unittest.TestCase):
+  """ Tests for the log files written by setup_logger. """
+
+  def setUp(self):
+    super().setUp()
+    self.tmp = tempfile.TemporaryDirectory() # pylint: disable=consider-using-with
+    self.log_dir = Path(self.tmp.name)
+    self.logger = logging.getLogger("pylabrobot")
+    self.handlers, self.level = self.logger.handlers[:], self.logger.level
+
+  def tearDown(self):
+    super().tearDown()
+    setup_logger(self.log_dir, logging.INFO) # stop the listener and close the files
+    for handler in self.logger.handlers:
+      handler.close()
+    self.logger.handlers = self.handlers
+    self.logger.setLevel(self.level)
+    self.tmp.cleanup()
+
+  def read(self, pattern: str) -> str:
+    return "".join(path.read_text() for path in sorted(self.log_dir.glob(pattern)))
+
+  def test_queue_and_command_trace(self):
+    setup_logger(self.log_dir, logging.INFO, queue=True, command_trace=True)
+    logging.getLogger("pylabrobot").info("hello")
+    log_command("STAR", "sent", "C0QMid0001")
+    log_command("STAR", "received", b"C0QMid0001er00/00")
+    setup_logger(self.log_dir, logging.INFO) # writes the queued records
+
+    log = self.read("pylabrobot-*.log")
+    self.assertIn("hello", log)
+    self.assertNotIn("C0QM", log)
+    trace = [json.loads(line) for line in self.read("pylabrobot-commands-*.jsonl").splitlines()]
+    self.assertEqual([(t["device"], t["dir"], t["data"]) for t in trace], [
+      ("STAR", "sent", "C0QMid0001"),
+      ("STAR", "received", "C0QMid0001er00/00"),
+    ])
+    self.assertTrue(command_logger.disabled)
+
+  def test_rotation(self):
+    setup_logger(self.log_dir, logging.INFO, max_bytes=1000, backup_count=2)
+    for i in range(100):
+      logging.getLogger("pylabrobot").info("record %d", i)
+    self.assertEqual(len(list(self.log_dir.glob("pylabrobot-*.log*"))), 3)
+    self.assertIn("record 99", self.read("pylabrobot-*.log"))
+
+
+class TestCommandTraceHandler(unittest.TestCase):
+  """ Tests for the JSONL format of the command trace. """
+
+  def test_format(self):
+    with tempfile.TemporaryDirectory() as tmp:
+      handler = CommandTraceHandler(Path(tmp) / "trace.jsonl", delay=True)
+      record = logging.makeLogRecord({"name": "pylabrobot.commands", "msg": "x", "created": 1.5,
+        "device": "EVO", "direction": "sent", "data": "M1PIA"})
+      self.assertEqual(json.loads(handler.format(record)),
+        {"t": 1.5, "device": "EVO", "dir": "sent", "data": "M1PIA"})
+      handler.close()
@@ -1,7 +1,14 @@
+import functools
+import re
 from string import ascii_uppercase as LETTERS
 import typing
 
 
+# Rows are labelled A-Z, then AA, AB, etc. (like columns in MS Excel) for plates with more than 26
+# rows, such as 1536-well plates.
+_IDENTIFIER_RE = re.compile(r"([A-Z]+)(\d+)")
+
+
 def string_to_position(position_string: str) -> typing.Tuple[int, int]:
   raise NotImplementedError("Deprecated.") # TODO(deprecate-ordered-items)
 
@@ -15,21 +22,59 @@ def string_to_pattern(position_range_string: str, num_rows: int, num_columns: in
   -> typing.List[typing.List[bool]]:
   raise NotImplementedError("Deprecated.") # TODO(deprecate-ordered-items)
 
-def expand_string_range(range_str: str) -> list:
-  """ Turns a range string into a list of position strings. Horizontal, vertical, or grids.
+def row_label(row: int) -> str:
+  """ Get the label of the row with the given index, counted from 0: "A", "B", ..., "Z", "AA", "AB",
+  etc. """
+  if row < 0:
+    raise ValueError(f"Invalid row: {row}")
+  label = ""
+  row += 1
+  while row > 0:
+    row, remainder = divmod(row - 1, 26)
+    label = LETTERS[remainder] + label
+  return label
 
-  Args:
-    range_str: A string showing a range, like "A1:C3".
 
-  Returns:
-    A list of position identifier strings.
+@functools.lru_cache(maxsize=4096)
+def split_identifier(identifier: str) -> typing.Tuple[int, int]:
+  """ Split an identifier in transposed MS Excel style notation into the index of the row and the
+  column number, e.g. "B3" -> (1, 3) and "AA1" -> (26, 1).
+
+  Raises:
+    ValueError: If the identifier is not in transposed MS Excel style notation.
   """
+  match = _IDENTIFIER_RE.fullmatch(identifier)
+  if match is None:
+    raise ValueError(f"Invalid identifier: {identifier}")
+  letters, column = match.groups()
+  row = 0
+  for letter in letters:
+    row = row * 26 + LETTERS.index(letter) + 1
+  return row - 1, int(column)
+
+
+@functools.lru_cache(maxsize=1024)
+def _expand_string_range(range_str: str) -> typing.Tuple[str, ...]:
   if ":" not in range_str:
     raise ValueError(f"Invalid range: {range_str}")
 
   start, end = range_str.split(":")
-  start_col, start_row = LETTERS.index(start[0]), int(start[1:])
-  end_col, end_row = LETTERS.index(end[0]), int(end[1:])
+  start_col, start_row = split_identifier(start)
+  end_col, end_row = split_identifier(end)
   row_range = range(start_row, end_row+1) if start_row < end_row else range(start_row, end_row-1,-1)
   col_range = range(start_col, end_col+1) if start_col < end_col else range(start_col, end_col-1,-1)
-  return [f"{LETTERS[col]}{row}" for col in col_range for row in row_range]
+  return tuple(f"{row_label(col)}{row}" for col in col_range for row in row_range)
+
+
+def expand_string_range(range_str: str) -> list:
+  """ Turns a range string into a list of position strings. Horizontal, vertical, or grids.
+
+  Ranges are parsed once and cached, so expanding the same range again is cheap.
+
+  Args:
+    range_str: A string showing a range, like "A1:C3".
+
+  Returns:
+    A list of position identifier strings.
+  """
+  return list(_expand_string_range(range_str))
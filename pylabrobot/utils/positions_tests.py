@@ -2,7 +2,7 @@
 
 import unittest
 
-from pylabrobot.utils import expand_string_range
+from pylabrobot.utils import expand_string_range, row_label, split_identifier
 
 
 class TestPositions(unittest.TestCase):
@@ -22,3 +22,29 @@ class TestPositions(unittest.TestCase):
   def test_expand_string_range_reverse(self):
     self.assertEqual(expand_string_range("C3:C1"), ["C3", "C2", "C1"])
     self.assertEqual(expand_string_range("C1:A1"), ["C1", "B1", "A1"])
+
+  def test_expand_string_range_many_rows(self):
+    self.assertEqual(expand_string_range("Z1:AB1"), ["Z1", "AA1", "AB1"])
+    self.assertEqual(expand_string_range("AF48:AE47"), ["AF48", "AF47", "AE48", "AE47"])
+
+  def test_expand_string_range_cached(self):
+    wells = expand_string_range("A1:B2")
+    wells.append("C3")
+    self.assertEqual(expand_string_range("A1:B2"), ["A1", "A2", "B1", "B2"])
+
+  def test_expand_string_range_invalid(self):
+    for range_str in ["A1", "a1:b2", "A1:B", "1:B2"]:
+      with self.assertRaises(ValueError):
+        expand_string_range(range_str)
+
+  def test_row_label(self):
+    self.assertEqual([row_label(i) for i in [0, 25, 26, 31, 51, 52, 701, 702]],
+                     ["A", "Z", "AA", "AF", "AZ", "BA", "ZZ", "AAA"])
+
+  def test_split_identifier(self):
+    self.assertEqual(split_identifier("A1"), (0, 1))
+    self.assertEqual(split_identifier("H12"), (7, 12))
+    self.assertEqual(split_identifier("AF48"), (31, 48))
+    for identifier in ["", "A", "1", "a1", "A1B"]:
+      with self.assertRaises(ValueError):
+        split_identifier(identifier)
@@ -30,6 +30,35 @@ let recordingCounter = 0; // Counter to track the number of recorded frames
 var frameImages = [];
 let frameInterval = 8;
 
+// Resources to redraw when updates are being applied in bulk, see `applyUpdates`.
+let pendingUpdates = null;
+
+function recordFrame() {
+  if (isRecording) {
+    if (recordingCounter % frameInterval == 0) {
+      stageToBlob(stage, handleBlob);
+    }
+    recordingCounter += 1;
+  }
+}
+
+function applyUpdates(f) {
+  // Call `f`, and redraw every resource it updates only once afterwards, as a single frame.
+  pendingUpdates = new Set();
+  try {
+    f();
+  } finally {
+    const updated = pendingUpdates;
+    pendingUpdates = null;
+    for (const resource of updated) {
+      resource.draw(resourceLayer);
+    }
+    if (updated.size > 0) {
+      recordFrame();
+    }
+  }
+}
+
 function getSnappingResourceAndLocationAndSnappingBox(resourceToSnap, x, y) {
   // Return the snapping resource that the given point is within, or undefined if there is no such resource.
   // A snapping resource is a spot within a plate/tip carrier or the OT deck.
@@ -385,14 +414,14 @@ class Resource {
   }
 
   update() {
-    this.draw(resourceLayer);
-
-    if (isRecording) {
-      if (recordingCounter % frameInterval == 0) {
-        stageToBlob(stage, handleBlob);
-      }
-      recordingCounter += 1;
+    if (pendingUpdates !== null) {
+      // Redrawn once in `applyUpdates`.
+      pendingUpdates.add(this);
+      return;
     }
+
+    this.draw(resourceLayer);
+    recordFrame();
   }
 
   setState() {}
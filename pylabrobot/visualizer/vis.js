@@ -43,11 +43,18 @@ function removeResource(resourceName) {
 }
 
 function setState(allStates) {
-  for (let resourceName in allStates) {
-    let state = allStates[resourceName];
-    let resource = resources[resourceName];
-    resource.setState(state);
-  }
+  // The states of all resources that changed in a frame are sent at once, redraw them in bulk.
+  applyUpdates(() => {
+    for (let resourceName in allStates) {
+      let state = allStates[resourceName];
+      let resource = resources[resourceName];
+      if (resource === undefined) {
+        // The resource was removed after its state was sent.
+        continue;
+      }
+      resource.setState(state);
+    }
+  });
 }
 
 async function processCentralEvent(event, data) {
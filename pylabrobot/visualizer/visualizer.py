@@ -1,11 +1,13 @@
 import asyncio
+import collections
+import concurrent.futures
 import http.server
 import json
 import logging
 import os
 import threading
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Deque, Dict, Optional, Tuple, cast
 import webbrowser
 
 try:
@@ -47,6 +49,7 @@ class Visualizer:
     fs_host: str = "127.0.0.1",
     fs_port: int = 1337,
     open_browser: bool = True,
+    state_update_interval: float = 1 / 30,
   ):
     """ Create a new Visualizer. Use :meth:`.setup` to start the visualization.
 
@@ -58,8 +61,14 @@ class Visualizer:
       fs_port: The port of the file server. If this port is in use, the port will be incremented
         until a free port is found.
       open_browser: If `True`, the visualizer will open a browser window when it is started.
+      state_update_interval: The interval, in seconds, at which state updates are sent to the
+        browser. All resources whose state changed during an interval are sent in a single
+        `set_state` event, with the state they have when it is sent.
     """
 
+    if state_update_interval < 0:
+      raise ValueError("state_update_interval must not be negative.")
+
     self.setup_finished = False
 
     # Hook into the resource (un)assigned callbacks so we can send the appropriate events to the
@@ -71,11 +80,18 @@ class Visualizer:
     # register for callbacks
     def register_state_update(resource):
       resource.register_state_update_callback(
-        lambda _: self._handle_state_update_callback(resource))
+        lambda state: self._handle_state_update_callback(resource, state))
       for child in resource.children:
         register_state_update(child)
     register_state_update(resource)
 
+    # The latest state of the resources whose state changed since the last `set_state` event, by
+    # name. Sent by `_flush_state_updates` once per `state_update_interval`.
+    self.state_update_interval = state_update_interval
+    self._updated_resources: Dict[str, Any] = {}
+    self._updated_resources_lock = threading.Lock()
+    self._flush_scheduled = False
+
     # file server attributes
     self.fs_host = fs_host
     self.fs_port = fs_port
@@ -94,7 +110,9 @@ class Visualizer:
     self._t: Optional[threading.Thread] = None
     self._stop_: Optional[asyncio.Future] = None
 
-    self.received: List[dict] = []
+    # Futures for commands waiting for a response, by id. Resolved in `_socket_handler`.
+    self._pending: Dict[str, concurrent.futures.Future] = {}
+    self.received: Deque[dict] = collections.deque(maxlen=100)
 
   @property
   def websocket(self) -> "websockets.legacy.server.WebSocketServerProtocol":
@@ -143,8 +161,8 @@ class Visualizer:
       await self.websocket.send(json.dumps({"event": "pong"}))
 
   async def _socket_handler(self, websocket: "websockets.legacy.server.WebSocketServerProtocol"):
-    """ Handle a new websocket connection. Save the websocket connection store received
-    messages in `self.received`. """
+    """ Handle a new websocket connection. Save the websocket connection, resolve the futures of
+    commands waiting for a response and store the last received messages in `self.received`. """
 
     while True:
       try:
@@ -157,6 +175,10 @@ class Visualizer:
       data = json.loads(message)
       self.received.append(data)
 
+      future = self._pending.pop(data["id"], None) if "id" in data else None
+      if future is not None and not future.done():
+        future.set_result(data)
+
       # If the event is "ready", then we can save the connection and send the saved messages.
       if data.get("event") == "ready":
         self._websocket = websocket
@@ -192,6 +214,7 @@ class Visualizer:
     event: str,
     data: Optional[Dict[str, Any]] = None,
     wait_for_response: bool = True,
+    timeout: Optional[float] = None,
   )-> Optional[dict]:
     """ Send an event to the browser.
 
@@ -205,10 +228,13 @@ class Visualizer:
         `False`, it is not guaranteed that the response will be available for reading at a later
         time. This is useful for sending events that do not require a response. When `True`, a
         `RuntimeError` will be raised if the response `"success"` field is not `True`.
-      data: The event arguments, which must be serializable by `json.dumps`.
+      timeout: The maximum number of seconds to wait for a response. If `None`, wait indefinitely.
 
     Returns:
       The response from the browser, if `wait_for_response` is `True`, otherwise `None`.
+
+    Raises:
+      TimeoutError: If no response was received within `timeout` seconds.
     """
 
     if data is None:
@@ -220,24 +246,39 @@ class Visualizer:
     if wait_for_response and not self.has_connection():
       raise RuntimeError("Cannot wait for response when no websocket connection is established.")
 
-    if self.has_connection():
-      await self.websocket.send(serialized_data)
+    if not self.has_connection():
+      return None
+
+    if not wait_for_response:
+      await self._send(serialized_data)
+      return None
+
+    # Register the future before sending, so that the response can not arrive before it.
+    future: concurrent.futures.Future = concurrent.futures.Future()
+    self._pending[id_] = future
+    try:
+      await self._send(serialized_data)
+      message = await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+    except asyncio.TimeoutError as e:
+      raise TimeoutError(f"Timed out waiting for a response to {event} ({id_}).") from e
+    finally:
+      self._pending.pop(id_, None)
 
-      if wait_for_response:
-        while True:
-          if len(self.received) > 0:
-            message = self.received.pop()
-            if "id" in message and message["id"] == id_:
-              break
-          await asyncio.sleep(0.1)
+    if not message["success"]:
+      error = message.get("error", "unknown error")
+      raise RuntimeError(f"Error during event {event}: " + error)
 
-        if not message["success"]:
-          error = message.get("error", "unknown error")
-          raise RuntimeError(f"Error during event {event}: " + error)
+    return cast(dict, message)
 
-        return message
+  async def _send(self, message: str):
+    """ Send a message over the websocket connection, which lives on the loop of the websocket
+    server thread. """
 
-    return None
+    if asyncio.get_running_loop() is self.loop:
+      await self.websocket.send(message)
+    else:
+      await asyncio.wrap_future(
+        asyncio.run_coroutine_threadsafe(self.websocket.send(message), self.loop))
 
   @property
   def httpd(self) -> http.server.HTTPServer:
@@ -394,6 +435,17 @@ class Visualizer:
       # must be thread safe, because event loop is running in a separate thread
       self.loop.call_soon_threadsafe(self.stop_.set_result, "done")
 
+    # Fail commands that are still waiting for a response.
+    for future in self._pending.values():
+      if not future.done():
+        future.set_exception(RuntimeError("The visualizer was stopped."))
+    self._pending.clear()
+
+    # Drop state updates that were not sent yet, the full state is sent when the browser connects.
+    with self._updated_resources_lock:
+      self._updated_resources.clear()
+      self._flush_scheduled = False
+
     # Clear all relevant attributes.
     self.received.clear()
     self._websocket = None
@@ -433,7 +485,7 @@ class Visualizer:
     # register for callbacks
     def register_state_update(resource: Resource):
       resource.register_state_update_callback(
-        lambda _: self._handle_state_update_callback(resource))
+        lambda state: self._handle_state_update_callback(resource, state))
       for child in resource.children:
         register_state_update(child)
     register_state_update(resource)
@@ -454,6 +506,12 @@ class Visualizer:
     """ Called when a resource is unassigned from a resource already in the tree starting from the
     root resource. This method will send an event about the removed resource """
 
+    # Drop state updates of the resource and its children that were not sent yet, the browser
+    # removes them.
+    with self._updated_resources_lock:
+      for r in [resource] + resource.get_all_children():
+        self._updated_resources.pop(r.name, None)
+
     # Send a `resource_unassigned` event to the browser.
     data = { "resource_name": resource.name }
     fut = self.send_command(
@@ -462,14 +520,31 @@ class Visualizer:
       wait_for_response=False)
     asyncio.run_coroutine_threadsafe(fut, self.loop)
 
-  def _handle_state_update_callback(self, resource: Resource) -> None:
-    """ Called when the state of a resource is updated. This method will send an event to the
-    browser about the updated state. """
+  def _handle_state_update_callback(self, resource: Resource, state: Any) -> None:
+    """ Called when the state of a resource is updated. The state is serialized by the resource on
+    the thread that updated it, and sent to the browser in the next `set_state` event, see
+    :meth:`_flush_state_updates`. """
 
-    # Send a `set_state` event to the browser.
-    data = { resource.name: resource.serialize_state() }
-    fut = self.send_command(
-      event="set_state",
-      data=data,
-      wait_for_response=False)
-    asyncio.run_coroutine_threadsafe(fut, self.loop)
+    with self._updated_resources_lock:
+      self._updated_resources[resource.name] = state
+      if self._flush_scheduled or self._loop is None:
+        return
+      self._flush_scheduled = True
+
+    # must be thread safe, because event loop is running in a separate thread
+    self.loop.call_soon_threadsafe(
+      self.loop.call_later, self.state_update_interval, self._flush_state_updates)
+
+  def _flush_state_updates(self) -> None:
+    """ Send the latest state of all resources that were updated since the last flush in a single
+    `set_state` event. Called on the websocket server loop. """
+
+    with self._updated_resources_lock:
+      data = self._updated_resources
+      self._updated_resources = {}
+      self._flush_scheduled = False
+
+    if len(data) == 0 or self._loop is None:
+      return
+
+    self.loop.create_task(self.send_command(event="set_state", data=data, wait_for_response=False))
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import time
 import unittest
@@ -83,6 +84,23 @@ class VisualizerServerTests(unittest.IsolatedAsyncioTestCase):
     data = json.loads(recv)
     self.assertEqual(data["event"], "test")
 
+  async def test_event_response(self):
+    await self.client.send("{\"event\": \"ready\"}")
+    _ = await self.client.recv() # set_root_resource
+    _ = await self.client.recv() # set_state
+
+    async def respond():
+      data = json.loads(await self.client.recv())
+      await self.client.send(json.dumps({"event": "test", "id": data["id"], "success": True}))
+
+    response, _ = await asyncio.gather(self.vis.send_command("test"), respond())
+    assert response is not None
+    self.assertTrue(response["success"])
+
+    with self.assertRaises(TimeoutError):
+      await self.vis.send_command("test", timeout=0.05)
+    self.assertEqual(self.vis._pending, {}) # pylint: disable=protected-access
+
 
 class VisualizerCommandTests(unittest.IsolatedAsyncioTestCase):
   """ Tests for command sending using the visualizer backend. """
@@ -138,3 +156,46 @@ class VisualizerCommandTests(unittest.IsolatedAsyncioTestCase):
     call_args = self.vis.send_command.call_args[1] # type: ignore[attr-defined]
     self.assertEqual(call_args["event"], "set_state")
     self.assertEqual(call_args["data"]["plate_01_well_11_7"]["liquids"], [[None, 500]])
+
+  async def test_state_updates_coalesced(self):
+    """ Test that state updates within a frame are sent in one event, with the latest state. """
+    plate = Cor_96_wellplate_360ul_Fb(name="plate_01")
+    self.r.assign_child_resource(plate, location=Coordinate(0, 0, 0))
+    time.sleep(0.1)
+    self.vis.send_command.reset_mock() # type: ignore[attr-defined]
+
+    plate.set_well_liquids((None, 500))
+    plate.get_well("A1").tracker.remove_liquid(100)
+    time.sleep(0.1)
+    self.vis.send_command.assert_called_once() # type: ignore[attr-defined]
+    data = self.vis.send_command.call_args[1]["data"] # type: ignore[attr-defined]
+    self.assertEqual(len(data), 96)
+    self.assertEqual(data["plate_01_well_0_0"]["liquids"], [[None, 400]])
+
+  async def test_state_updates_of_unassigned_resource_dropped(self):
+    """ Test that state updates that were not sent yet are dropped when the resource is
+    unassigned. """
+    plate = Cor_96_wellplate_360ul_Fb(name="plate_01")
+    self.r.assign_child_resource(plate, location=Coordinate(0, 0, 0))
+    time.sleep(0.1)
+    self.vis.send_command.reset_mock() # type: ignore[attr-defined]
+
+    plate.set_well_liquids((None, 500))
+    self.r.unassign_child_resource(plate)
+    time.sleep(0.1)
+    events = [call[1]["event"] for call in self.vis.send_command.call_args_list] # type: ignore[attr-defined]
+    self.assertEqual(events, ["resource_unassigned"])
+
+  async def test_state_sent_as_updated(self):
+    """ Test that the state is serialized when it is updated, not when it is sent. """
+    plate = Cor_96_wellplate_360ul_Fb(name="plate_01")
+    self.r.assign_child_resource(plate, location=Coordinate(0, 0, 0))
+    time.sleep(0.1)
+    self.vis.send_command.reset_mock() # type: ignore[attr-defined]
+
+    well = plate.get_well("A1")
+    well.tracker.set_liquids([(None, 500)])
+    well.tracker.liquids.clear() # a change that does not notify the visualizer
+    time.sleep(0.1)
+    data = self.vis.send_command.call_args[1]["data"] # type: ignore[attr-defined]
+    self.assertEqual(data["plate_01_well_0_0"]["liquids"], [[None, 500]])
@@ -34,7 +34,10 @@ setup(
     long_description_content_type="text/markdown",
     install_requires=install_requires,
     url="https://github.com/SLKS99/pylabrobot_Fluent",
-    package_data={"pylabrobot_Fluent": ["sila2_connector/*"]},  # Include SiLA2 connector files if needed
+    package_data={
+        "pylabrobot_Fluent": ["sila2_connector/*"],  # Include SiLA2 connector files if needed
+        "pylabrobot.liquid_handling.liquid_classes.hamilton": ["*.json"],
+    },
     extras_require={
         "sila2": extras_sila2,
         "dev": extras_dev,
@@ -0,0 +1,123 @@
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class FakeFluentServer():
+  """ A stand-in for a Fluent SiLA2 server and the `tecan.Fluent` client connected to it, for
+  testing and benchmarking the `FLUENT` backend. Set it as the `client` of the backend before
+  calling `setup`.
+
+  Like the server, commands are executed one at a time: a call waits for the calls before it to
+  finish, takes `latency` seconds for the round trip, and another `execution_time` seconds to
+  execute tip and pipetting commands, whether they use one channel or all of them. Calls are
+  recorded in `calls` as `(command, kwargs)`, and commands in `errors` raise a `RuntimeError` with
+  the given message.
+
+  Methods in `methods` run the worklist file at the given path, like a FluentControl method with a
+  Worklist command. Like FluentControl, `run_method` returns when the method has started, and
+  `is_method_running` returns whether it is still running. Consecutive aspirate or dispense lines
+  on the same labware are executed at once in `execution_time`, and a `W` line drops and picks up
+  tips in twice that time. The lines that were executed are recorded in `worklist_lines`. When
+  `fail_after` is set, a method is aborted after that many lines have been executed, once, and the
+  next call of `is_method_running` raises a `RuntimeError`.
+  """
+
+  def __init__(self, latency: float = 0, execution_time: float = 0,
+               errors: Optional[Dict[str, str]] = None):
+    self.latency = latency
+    self.execution_time = execution_time
+    self.errors = errors or {}
+    self.calls: List[Tuple[str, dict]] = []
+    self.threads: Set[str] = set() # names of the threads that made calls
+    self.methods: Dict[str, str] = {} # method name -> path of the worklist it runs
+    self.worklist_lines: List[str] = []
+    self.fail_after: Optional[int] = None
+    self._prepared_method: Optional[str] = None
+    self._method_thread: Optional[threading.Thread] = None
+    self._method_error: Optional[Exception] = None
+    self._lock = threading.Lock()
+
+  def _execute(self, command: str, execution_time: float = 0, **kwargs):
+    with self._lock:
+      self.calls.append((command, kwargs))
+      self.threads.add(threading.current_thread().name)
+      time.sleep(self.latency + execution_time)
+      if command in self.errors:
+        raise RuntimeError(self.errors[command])
+
+  def commands(self, command: str) -> List[dict]:
+    """ The kwargs of every call of `command`. """
+    return [kwargs for name, kwargs in self.calls if name == command]
+
+  def start_fluent(self, simulation_mode: bool = False):
+    self._execute("start_fluent", simulation_mode=simulation_mode)
+
+  def shutdown(self, timeout: float):
+    self._execute("shutdown", timeout=timeout)
+
+  def get_tips(self, airgap_volume: float, airgap_speed: float, diti_type: str):
+    self._execute("get_tips", self.execution_time, airgap_volume=airgap_volume,
+      airgap_speed=airgap_speed, diti_type=diti_type)
+
+  def drop_tips(self, labware: str):
+    self._execute("drop_tips", self.execution_time, labware=labware)
+
+  def aspirate(self, volume: List[float], labware: str, liquid_class: str, well_offset: int):
+    self._execute("aspirate", self.execution_time, volume=volume, labware=labware,
+      liquid_class=liquid_class, well_offset=well_offset)
+
+  def dispense(self, volume: List[float], labware: str, liquid_class: str, well_offset: int):
+    self._execute("dispense", self.execution_time, volume=volume, labware=labware,
+      liquid_class=liquid_class, well_offset=well_offset)
+
+  def set_location(self, labware: str, rotation: int, target_location: str, target_site: int):
+    self._execute("set_location", labware=labware, rotation=rotation,
+      target_location=target_location, target_site=target_site)
+
+  def add_labware(self, labware_name: str, labware_type: str, target_location: str):
+    self._execute("add_labware", labware_name=labware_name, labware_type=labware_type,
+      target_location=target_location)
+
+  def remove_labware(self, labware_name: str):
+    self._execute("remove_labware", labware_name=labware_name)
+
+  def prepare_method(self, method_name: str):
+    self._execute("prepare_method", method_name=method_name)
+    self._prepared_method = method_name
+
+  def run_method(self):
+    self._execute("run_method")
+    path = self.methods.get(self._prepared_method or "")
+    if path is None:
+      return
+    with open(path, "r", encoding="utf-8") as f:
+      lines = f.read().splitlines()
+    self._method_thread = threading.Thread(target=self._run_worklist, args=(lines,), daemon=True)
+    self._method_thread.start()
+
+  def _run_worklist(self, lines: List[str]):
+    previous = None
+    for line in lines:
+      if self.fail_after is not None and len(self.worklist_lines) >= self.fail_after:
+        self.fail_after = None
+        self._method_error = RuntimeError("Method aborted")
+        return
+      fields = line.split(";")
+      if fields[0] == "W":
+        time.sleep(2 * self.execution_time)
+      elif (fields[0], fields[1]) != previous:
+        time.sleep(self.execution_time)
+      previous = (fields[0], fields[1])
+      self.worklist_lines.append(line)
+
+  def is_method_running(self) -> bool:
+    self._execute("is_method_running")
+    running = self._method_thread is not None and self._method_thread.is_alive()
+    if not running and self._method_error is not None:
+      error, self._method_error = self._method_error, None
+      raise error
+    return running
+
+  def stop_method(self):
+    self._execute("stop_method")
@@ -0,0 +1,111 @@
+import os
+import select
+import threading
+import time
+import tty
+from typing import Callable, List, Optional
+
+
+class FakeSerialDevice():
+  """ A fake serial device on a pseudo terminal, for testing and benchmarking serial backends.
+
+  Use `port` as the serial port of the backend. Every command ending with `terminator` is passed to
+  `respond`, and its return value, if not `None`, is written back after `delay` seconds. Commands
+  are handled one at a time, like a real device. Received commands are kept in `commands`.
+
+  Example:
+    >>> with FakeSerialDevice(lambda command: b"OK\\r\\n", delay=0.1) as device:
+    ...   scale = MettlerToledoWXS205SDU(port=device.port)
+  """
+
+  def __init__(self, respond: Callable[[bytes], Optional[bytes]], delay: float = 0,
+               terminator: bytes = b"\r\n"):
+    self.respond = respond
+    self.delay = delay
+    self.terminator = terminator
+    self.commands: List[bytes] = []
+    self.port = ""
+    self._master: Optional[int] = None
+    self._slave: Optional[int] = None
+    self._thread: Optional[threading.Thread] = None
+    self._stop = threading.Event()
+
+  def start(self):
+    self._master, self._slave = os.openpty()
+    tty.setraw(self._master)
+    tty.setraw(self._slave)
+    self.port = os.ttyname(self._slave)
+    self._stop.clear()
+    self._thread = threading.Thread(target=self._serve, daemon=True)
+    self._thread.start()
+
+  def stop(self):
+    self._stop.set()
+    if self._thread is not None:
+      self._thread.join()
+      self._thread = None
+    for fd in (self._master, self._slave):
+      if fd is not None:
+        os.close(fd)
+    self._master = self._slave = None
+
+  def __enter__(self):
+    self.start()
+    return self
+
+  def __exit__(self, *exc):
+    self.stop()
+
+  def _serve(self):
+    assert self._master is not None
+    buffer = b""
+    while not self._stop.is_set():
+      readable, _, _ = select.select([self._master], [], [], 0.05)
+      if not readable:
+        continue
+      buffer += os.read(self._master, 1024)
+      while self.terminator in buffer:
+        end = buffer.index(self.terminator) + len(self.terminator)
+        command, buffer = buffer[:end], buffer[end:]
+        self.commands.append(command)
+        response = self.respond(command)
+        if response is not None:
+          time.sleep(self.delay)
+          os.write(self._master, response)
+
+
+class FakeHIDDevice():
+  """ A fake `hid.Device`, for testing HID backends without hardware.
+
+  Every report written is passed to `respond`, which returns the reports to answer with, if any.
+  Reads block until a report is available or the timeout (in ms) expires, like a real device.
+  """
+
+  def __init__(self, respond: Callable[[bytes], List[bytes]], delay: float = 0):
+    self.respond = respond
+    self.delay = delay
+    self.written: List[bytes] = []
+    self._reports: List[bytes] = []
+    self._condition = threading.Condition()
+
+  def write(self, data: bytes) -> int:
+    self.written.append(data)
+    reports = self.respond(data)
+    if len(reports) > 0:
+      def answer():
+        time.sleep(self.delay)
+        with self._condition:
+          self._reports.extend(reports)
+          self._condition.notify_all()
+      threading.Thread(target=answer, daemon=True).start()
+    return len(data)
+
+  def read(self, size: int, timeout: Optional[int] = None) -> bytes:
+    with self._condition:
+      self._condition.wait_for(lambda: len(self._reports) > 0, timeout=(timeout or 0) / 1000)
+      if len(self._reports) == 0:
+        return b""
+      return self._reports.pop(0)[:size]
+
+  def close(self):
+    pass
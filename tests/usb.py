@@ -1,3 +1,8 @@
+import queue
+import time
+from typing import List
+
+
 class MockDev():
   def __init__(self, send_response=None):
     self.send_response = send_response
@@ -19,3 +24,81 @@ class MockDev():
 class MockEndpoint():
   def __init__(self):
     self.wMaxPacketSize = 64
+
+
+class FakeUSBDevice():
+  """ A fake USB device that answers every command with its module, command and id (`C0QMid0001`).
+
+  Unlike `MockDev`, reads block until a response is available or the timeout expires, like a real
+  device does, so that reading threads do not spin. Responses can be delayed with `delay` (seconds)
+  and commands whose id is in `ignore_ids` are never answered.
+  """
+
+  def __init__(self, delay: float = 0, ignore_ids=None):
+    self.delay = delay
+    self.ignore_ids = set(ignore_ids or [])
+    # (time at which the response becomes available, response), in order of availability.
+    self.responses: "queue.Queue[tuple]" = queue.Queue()
+    self.num_reads = 0
+
+  def write(self, endpoint, data, timeout=None):
+    if isinstance(data, bytes):
+      data = data.decode("utf-8")
+    id_index = data.index("id")
+    id_ = int(data[id_index+2:id_index+6])
+    if id_ not in self.ignore_ids:
+      response = f"{data[:4]}id{id_:04}".encode("utf-8")
+      self.responses.put((time.monotonic() + self.delay, response))
+    return len(data)
+
+  def read(self, endpoint, size, timeout=None):
+    import usb.core # pylint: disable=import-outside-toplevel
+    self.num_reads += 1
+    try:
+      available_at, response = self.responses.get(timeout=(timeout or 0) / 1000)
+    except queue.Empty as e:
+      raise usb.core.USBTimeoutError("Operation timed out") from e
+    time.sleep(max(0, available_at - time.monotonic()))
+    return response
+
+
+class FakeTecanDevice():
+  """ A fake Tecan EVO that answers every firmware command with an empty success response.
+
+  Responses to report commands (`R*`) contain the data in `reports`, keyed by command, and commands
+  in `errors` are answered with that error code. Each command takes `latency` seconds to be
+  transferred to the device and back, plus `execution_time` seconds to execute. Commands are
+  executed one after the other, so sending multiple commands before reading hides the latency.
+  """
+
+  def __init__(self, latency: float = 0, execution_time: float = 0, reports=None, errors=None):
+    self.latency = latency
+    self.execution_time = execution_time
+    self.reports = reports or {}
+    self.errors = errors or {}
+    self.commands: List[str] = []
+    self.responses: "queue.Queue[tuple]" = queue.Queue()
+    self._busy_until = 0.0
+
+  def write(self, endpoint, data, timeout=None):
+    if isinstance(data, bytes):
+      data = data.decode("utf-8")
+    cmd = data.strip("\x02\x00")
+    self.commands.append(cmd)
+    module, command = cmd[:2], cmd[2:5]
+    now = time.monotonic()
+    self._busy_until = max(now + self.latency / 2, self._busy_until) + self.execution_time
+    status = 0x80 | self.errors.get(command, 0)
+    response = b"\x02" + module.encode() + bytes([status]) + \
+      self.reports.get(command, "").encode() + b"\x00"
+    self.responses.put((self._busy_until + self.latency / 2, response))
+    return len(data)
+
+  def read(self, endpoint, size, timeout=None):
+    import usb.core # pylint: disable=import-outside-toplevel
+    try:
+      available_at, response = self.responses.get(timeout=(timeout or 0) / 1000)
+    except queue.Empty as e:
+      raise usb.core.USBTimeoutError("Operation timed out") from e
+    time.sleep(max(0, available_at - time.monotonic()))
+    return response
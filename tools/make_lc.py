@@ -1,10 +1,10 @@
-""" Convert liquid classes from Venus into Python. """
+""" Convert liquid classes from Venus into the JSON format of `liquid_classes/hamilton`. """
 
 import binascii
 import csv
+import json
 import struct
 import sys
-import textwrap
 from typing import Dict
 
 from pylabrobot.resources.liquid import Liquid
@@ -40,7 +40,7 @@ def main():
     reader = csv.reader(lines)
     rows = list(reader) # copy into rows, then close file.
 
-  out_file = open("liquid_classes.py", "w", encoding="utf-8")
+  out_rows = []
 
   rows.sort(key=lambda row: row[1])
 
@@ -95,39 +95,27 @@ def main():
       curve[key] = value
 
     notes = notes.replace("\x00", "")
-    if notes != "":
-      notes = '\n    # ' + '\n    # '.join(notes.splitlines())
 
     if name[0] in {str(i) for i in range(11)}: # python doesn't allow numbers as first character
       name = "_" + name
 
-    out_file.write(textwrap.dedent(f"""\n
-    {notes}
-    mapping[({tip_volume}, {core}, {tip}, {has_filter}, Liquid.{liquid.name}, {jet}, {empty})] = \\
-    {name} = HamiltonLiquidClass(
-      curve={curve},
-      aspiration_flow_rate={aspiration_flow_rate},
-      aspiration_mix_flow_rate={aspiration_mix_flow_rate},
-      aspiration_air_transport_volume={aspiration_air_transport_volume},
-      aspiration_blow_out_volume={aspiration_blow_out_volume},
-      aspiration_swap_speed={aspiration_swap_speed},
-      aspiration_settling_time={aspiration_settling_time},
-      aspiration_over_aspirate_volume={aspiration_over_aspirate_volume},
-      aspiration_clot_retract_height={aspiration_clot_retract_height},
-      dispense_flow_rate={dispense_flow_rate},
-      dispense_mode={dispense_mode},
-      dispense_mix_flow_rate={dispense_mix_flow_rate},
-      dispense_air_transport_volume={dispense_air_transport_volume},
-      dispense_blow_out_volume={dispense_blow_out_volume},
-      dispense_swap_speed={dispense_swap_speed},
-      dispense_settling_time={dispense_settling_time},
-      dispense_stop_flow_rate={dispense_stop_flow_rate},
-      dispense_stop_back_volume={dispense_stop_back_volume}
-    )"""))
+    # Rows of `star_liquid_classes.json` and `vantage_liquid_classes.json`, see
+    # `HamiltonLiquidClassMapping`.
+    key = [tip_volume, core, tip, has_filter, liquid.name, jet, empty]
+    parameters = [aspiration_flow_rate, aspiration_mix_flow_rate, aspiration_air_transport_volume,
+      aspiration_blow_out_volume, aspiration_swap_speed, aspiration_settling_time,
+      aspiration_over_aspirate_volume, aspiration_clot_retract_height, dispense_flow_rate,
+      dispense_mode, dispense_mix_flow_rate, dispense_air_transport_volume,
+      dispense_blow_out_volume, dispense_swap_speed, dispense_settling_time,
+      dispense_stop_flow_rate, dispense_stop_back_volume]
+    out_rows.append(json.dumps([key, name, "\n".join(notes.splitlines()), list(curve.items()),
+      parameters], ensure_ascii=False))
 
     print(name)
 
-  out_file.close()
+  # One liquid class per line, so that changes are easy to review.
+  with open("liquid_classes.json", "w", encoding="utf-8") as out_file:
+    out_file.write("[\n" + ",\n".join(out_rows) + "\n]\n")
 
 
 if __name__ == "__main__":